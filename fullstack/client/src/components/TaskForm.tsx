@@ -15,6 +15,7 @@ import {
   TaskInitiate,
   TaskResult
 } from "@/utils/tasks-api";
+import { isFinalEvent, subscribeToTaskEvents } from "@/utils/task-events";
 import { useSettings } from "@/contexts/SettingsContext";
 import { encryptApiKey } from "@/utils/encryption";
 
@@ -52,6 +53,7 @@ export const TaskForm: React.FC<TaskFormProps> = ({ taskId, onBack, setTaskData
   const [apiResponse, setApiResponse] = useState<any>(null);
   const [taskResult, setTaskResult] = useState<TaskResult | null>(null);
   const [resultLoading, setResultLoading] = useState(false);
+  const [resultVersion, setResultVersion] = useState(0);
 
   const { updateAgentSettings, updateBrowserSettings, settings } = useSettings();
 
@@ -90,7 +92,34 @@ export const TaskForm: React.FC<TaskFormProps> = ({ taskId, onBack, setTaskData
     };
 
     fetchTaskResult();
-  }, [task?.status, taskId]);
+  }, [task?.status, taskId, resultVersion]);
+
+  // Follow queued and running tasks live; the stream falls back to polling if it fails.
+  // Following continues past "completed" until the result (and its recording) arrive.
+  const isActive = task?.status === 'queued' || task?.status === 'running';
+  const [following, setFollowing] = useState(false);
+  useEffect(() => {
+    if (isActive) {
+      setFollowing(true);
+    }
+  }, [isActive]);
+  useEffect(() => {
+    if (!following) {
+      return;
+    }
+    return subscribeToTaskEvents(taskId, (event) => {
+      if (event.type === 'status') {
+        setTask((prev) => prev && { ...prev, status: event.status });
+        setTaskData((prev) => prev && { ...prev, status: event.status });
+      } else if (event.type === 'result' || event.type === 'recording') {
+        // The result row is written after the task is marked completed, the recording after that
+        setResultVersion((version) => version + 1);
+      }
+      if (isFinalEvent(event)) {
+        setFollowing(false);
+      }
+    });
+  }, [following, taskId]);
 
   const fetchTask = async () => {
     setLoading(true);
@@ -32,6 +32,10 @@ const TaskHeader: React.FC<TaskHeaderProps> = ({ taskName, status, createdAt, in
 
     const getStatusConfig = () => {
         const statusConfigs = {
+            queued: {
+                color: "bg-yellow-500",
+                text: "Queued"
+            },
             running: {
                 color: "bg-blue-500",
                 text: "Running"
@@ -24,6 +24,8 @@ interface TaskListProps {
 export const TaskList: React.FC<TaskListProps> = ({ onTaskSelect }) => {
   const [tasks, setTasks] = useState<TaskSummary[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState("");
   const [showCreateForm, setShowCreateForm] = useState(false);
   const [newTaskName, setNewTaskName] = useState("");
@@ -58,7 +60,8 @@ export const TaskList: React.FC<TaskListProps> = ({ onTaskSelect }) => {
       if ('error' in result) {
         setError(result.error);
       } else {
-        setTasks(result);
+        setTasks(result.tasks);
+        setNextCursor(result.nextCursor);
       }
     } catch (err) {
       setError("Failed to fetch tasks");
@@ -67,6 +70,28 @@ export const TaskList: React.FC<TaskListProps> = ({ onTaskSelect }) => {
     }
   };
 
+  const fetchMoreTasks = async () => {
+    if (!nextCursor) return;
+
+    setLoadingMore(true);
+    setError("");
+
+    try {
+      const result = await getTasks(nextCursor);
+
+      if ('error' in result) {
+        setError(result.error);
+      } else {
+        setTasks(prev => [...prev, ...result.tasks]);
+        setNextCursor(result.nextCursor);
+      }
+    } catch (err) {
+      setError("Failed to fetch tasks");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCreateTask = async () => {
     if (!newTaskName.trim()) {
       setCreateError("Task name is required");
@@ -82,12 +107,12 @@ export const TaskList: React.FC<TaskListProps> = ({ onTaskSelect }) => {
       if ('error' in result) {
         setCreateError(result.error);
       } else {
-        // Add the new task to the list
-        setTasks(prev => [...prev, {
+        // Add the new task to the top of the list (newest first)
+        setTasks(prev => [{
           id: result.id,
           task_name: result.task_name,
           status: result.status
-        }]);
+        }, ...prev]);
         
         // Reset form
         setNewTaskName("");
@@ -274,6 +299,25 @@ export const TaskList: React.FC<TaskListProps> = ({ onTaskSelect }) => {
                   </Button>
                 </div>
               ))}
+              {nextCursor && (
+                <div className="flex justify-center pt-2">
+                  <Button
+                    variant="outline"
+                    onClick={fetchMoreTasks}
+                    disabled={loadingMore}
+                    className="flex items-center gap-2"
+                  >
+                    {loadingMore ? (
+                      <>
+                        <Loader2 className="w-4 h-4 animate-spin" />
+                        Loading...
+                      </>
+                    ) : (
+                      "Load more"
+                    )}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
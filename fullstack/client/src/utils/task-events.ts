@@ -0,0 +1,138 @@
+import { API_BASE_URL, getAuthHeaders } from './api-config';
+import { getTask, getTaskResult } from './tasks-api';
+
+export type TaskEvent =
+  | { type: 'status'; task_id: number; status: string }
+  | { type: 'step'; task_id: number; step: number; [key: string]: unknown }
+  | { type: 'result'; task_id: number; success: boolean; recording_pending?: boolean }
+  | { type: 'recording'; task_id: number; url: string | null };
+
+const POLL_INTERVAL_MS = 5000;
+// Polling stops looking for the result of a completed task after this many attempts
+const RESULT_POLL_ATTEMPTS = 60;
+
+const TERMINAL_STATUSES = ['completed', 'failed', 'deleted'];
+
+// A result whose recording is still encoding is followed by a recording event
+export const isFinalEvent = (event: TaskEvent) =>
+  (event.type === 'result' && !event.recording_pending) ||
+  event.type === 'recording' ||
+  (event.type === 'status' && (event.status === 'failed' || event.status === 'deleted'));
+
+const sleep = (ms: number, signal: AbortSignal) =>
+  new Promise<void>((resolve) => {
+    const timer = setTimeout(resolve, ms);
+    signal.addEventListener('abort', () => {
+      clearTimeout(timer);
+      resolve();
+    });
+  });
+
+const parseSseBlock = (block: string): TaskEvent | null => {
+  // Lines starting with ":" are keepalive comments
+  const data = block
+    .split('\n')
+    .filter((line) => line.startsWith('data:'))
+    .map((line) => line.slice(5).trimStart())
+    .join('\n');
+  return data ? JSON.parse(data) : null;
+};
+
+// Reads GET /tasks/{id}/events until the stream ends. EventSource cannot send the
+// Authorization header, so the stream is read through fetch. Resolves true when the
+// task finished, false when the stream failed or was cut off.
+const streamTaskEvents = async (taskId: number, onEvent: (event: TaskEvent) => void, signal: AbortSignal) => {
+  let res: Response;
+  try {
+    res = await fetch(`${API_BASE_URL}/tasks/${taskId}/events`, {
+      headers: { ...getAuthHeaders(), Accept: 'text/event-stream' },
+      signal,
+    });
+  } catch (err) {
+    return false;
+  }
+  if (!res.ok || !res.body) {
+    return false;
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let lastEvent: TaskEvent | null = null;
+  try {
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) {
+        // The server closes the stream after the status of a task that is already finished
+        return lastEvent?.type === 'status' && TERMINAL_STATUSES.includes(lastEvent.status);
+      }
+      buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n');
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const event = parseSseBlock(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+        if (event) {
+          lastEvent = event;
+          onEvent(event);
+          if (isFinalEvent(event)) {
+            return true;
+          }
+        }
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+  } catch (err) {
+    return false;
+  } finally {
+    reader.cancel().catch(() => undefined);
+  }
+};
+
+// Fallback when the event stream is unavailable (proxy buffering, older browsers):
+// polls the task, then the result of a completed task, and reports them as events.
+const pollTaskEvents = async (taskId: number, onEvent: (event: TaskEvent) => void, signal: AbortSignal) => {
+  let lastStatus: string | null = null;
+  while (!signal.aborted) {
+    const task = await getTask(taskId);
+    if (task && !('error' in task) && task.status !== lastStatus) {
+      lastStatus = task.status;
+      onEvent({ type: 'status', task_id: taskId, status: task.status });
+      if (task.status === 'failed') {
+        return;
+      }
+      if (task.status === 'completed') {
+        break;
+      }
+    }
+    await sleep(POLL_INTERVAL_MS, signal);
+  }
+
+  for (let attempt = 0; attempt < RESULT_POLL_ATTEMPTS && !signal.aborted; attempt++) {
+    const result = await getTaskResult(taskId);
+    if (result && !('error' in result)) {
+      onEvent({ type: 'result', task_id: taskId, success: true });
+      return;
+    }
+    await sleep(POLL_INTERVAL_MS, signal);
+  }
+};
+
+// Follows a task's progress over server-sent events, polling if the stream fails.
+// Returns a function that stops following it.
+export const subscribeToTaskEvents = (taskId: number, onEvent: (event: TaskEvent) => void) => {
+  const controller = new AbortController();
+  const emit = (event: TaskEvent) => {
+    if (!controller.signal.aborted) {
+      onEvent(event);
+    }
+  };
+
+  (async () => {
+    const finished = await streamTaskEvents(taskId, emit, controller.signal);
+    if (!finished && !controller.signal.aborted) {
+      await pollTaskEvents(taskId, emit, controller.signal);
+    }
+  })();
+
+  return () => controller.abort();
+};
@@ -66,14 +66,20 @@ export interface TaskResult {
   task_id: number;
 }
 
-export const getTasks = async (): Promise<TaskSummary[] | { error: string }> => {
+export interface TaskPage {
+  tasks: TaskSummary[];
+  nextCursor: string | null;
+}
+
+export const getTasks = async (cursor?: string): Promise<TaskPage | { error: string }> => {
   try {
     const res = await axios.get(`${API_BASE_URL}/tasks`, {
       headers: getAuthHeaders(),
+      params: cursor ? { cursor } : undefined,
     });
 
     if (res.status === 200) {
-      return res.data;
+      return { tasks: res.data, nextCursor: res.headers["x-next-cursor"] ?? null };
     }
 
   } catch (err) {
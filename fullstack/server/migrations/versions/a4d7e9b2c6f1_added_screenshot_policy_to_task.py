@@ -0,0 +1,25 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = 'a4d7e9b2c6f1'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c2d8b6e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('screenshot_policy', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default='full'))
+    op.add_column('tasks', sa.Column('screenshot_quality', sa.Integer(), nullable=False, server_default='70'))
+    op.add_column('tasks', sa.Column('screenshot_max_dimension', sa.Integer(), nullable=False, server_default='1024'))
+    op.add_column('tasks', sa.Column('screenshot_bytes_saved', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'screenshot_bytes_saved')
+    op.drop_column('tasks', 'screenshot_max_dimension')
+    op.drop_column('tasks', 'screenshot_quality')
+    op.drop_column('tasks', 'screenshot_policy')
@@ -0,0 +1,23 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = 'b7e2d4c1a9f3'
+down_revision: Union[str, Sequence[str], None] = 'f6c8bec96d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('runner', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default='agent'))
+    op.add_column('tasks', sa.Column('worker_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('tasks', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'heartbeat_at')
+    op.drop_column('tasks', 'worker_id')
+    op.drop_column('tasks', 'runner')
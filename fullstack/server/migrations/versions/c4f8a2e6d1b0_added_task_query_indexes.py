@@ -0,0 +1,25 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c4f8a2e6d1b0'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4c1a9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Task list pages: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+    op.create_index('ix_tasks_user_id_created_at_id', 'tasks', ['user_id', 'created_at', 'id'], unique=False)
+    # Status-filtered counts per user and running tasks per user (worker claims)
+    op.create_index('ix_tasks_status_user_id', 'tasks', ['status', 'user_id'], unique=False)
+    # Queue order, queue position, worker claims and the stale running-task check
+    op.create_index('ix_tasks_status_initiated_at_id', 'tasks', ['status', 'initiated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_status_initiated_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_status_user_id', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_created_at_id', table_name='tasks')
@@ -0,0 +1,38 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = 'd9a3f1b7e5c2'
+down_revision: Union[str, Sequence[str], None] = 'c4f8a2e6d1b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'artifact_blobs',
+        sa.Column('digest', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('backend', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('storage_key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('url', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('digest'),
+    )
+    # Garbage collection: WHERE ref_count <= 0 AND last_used_at < ?
+    op.create_index('ix_artifact_blobs_ref_count_last_used_at', 'artifact_blobs', ['ref_count', 'last_used_at'], unique=False)
+    op.add_column('results', sa.Column('gif_digest', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('results', sa.Column('script_digest', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('results', 'script_digest')
+    op.drop_column('results', 'gif_digest')
+    op.drop_index('ix_artifact_blobs_ref_count_last_used_at', table_name='artifact_blobs')
+    op.drop_table('artifact_blobs')
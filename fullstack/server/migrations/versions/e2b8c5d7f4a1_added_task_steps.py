@@ -0,0 +1,35 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = 'e2b8c5d7f4a1'
+down_revision: Union[str, Sequence[str], None] = 'd9a3f1b7e5c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_steps',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('step_number', sa.Integer(), nullable=False),
+        sa.Column('url', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('actions', sa.JSON(), nullable=True),
+        sa.Column('duration_seconds', sa.Float(), nullable=True),
+        sa.Column('input_tokens', sa.Integer(), nullable=True),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Steps of a task in order: WHERE task_id = ? ORDER BY step_number
+    op.create_index('ix_task_steps_task_id_step_number', 'task_steps', ['task_id', 'step_number'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_steps_task_id_step_number', table_name='task_steps')
+    op.drop_table('task_steps')
@@ -0,0 +1,26 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f3a9c2d8b6e4'
+down_revision: Union[str, Sequence[str], None] = 'e2b8c5d7f4a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('task_steps', sa.Column('output_tokens', sa.Integer(), nullable=True))
+    op.add_column('task_steps', sa.Column('llm_seconds', sa.Float(), nullable=True))
+    op.add_column('task_steps', sa.Column('dom_seconds', sa.Float(), nullable=True))
+    op.add_column('task_steps', sa.Column('action_seconds', sa.Float(), nullable=True))
+    op.add_column('task_steps', sa.Column('wait_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('task_steps', 'wait_seconds')
+    op.drop_column('task_steps', 'action_seconds')
+    op.drop_column('task_steps', 'dom_seconds')
+    op.drop_column('task_steps', 'llm_seconds')
+    op.drop_column('task_steps', 'output_tokens')
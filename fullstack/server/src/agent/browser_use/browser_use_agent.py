@@ -21,7 +21,6 @@ from typing import (
     Union,
 )
 
-from browser_use.agent.gif import create_history_gif
 from browser_use.agent.memory.service import Memory, MemorySettings
 from browser_use.agent.message_manager.service import (
     MessageManager,
@@ -74,6 +73,11 @@ from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
 from pydantic import BaseModel, ValidationError
 
+from src.agent.browser_use.step_timing import StepTimer, collect_usage
+from src.browser.custom_context import CustomBrowserContext
+from src.browser.screenshot_policy import OFF, ScreenshotPolicy
+from src.utils.recording_encoder import FrameSpool, encode_history_recording, recording_encoder, recording_options
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -81,6 +85,109 @@ SKIP_LLM_API_KEY_VERIFICATION = os.environ.get('SKIP_LLM_API_KEY_VERIFICATION',
 
 
 class BrowserUseAgent(Agent):
+    def __init__(self, *args, screenshot_policy: Optional[ScreenshotPolicy] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # One entry per history item: exclusive llm/dom/action/wait seconds and reported token usage
+        self.step_timer = StepTimer()
+        self.step_timings: List[Dict[str, Any]] = []
+        self.screenshot_policy = screenshot_policy if screenshot_policy is not None else ScreenshotPolicy()
+        if self.settings.use_vision and self.screenshot_policy.mode == OFF:
+            logger.warning('Screenshot policy "off" leaves the vision model without screenshots')
+        self._screenshot_state = None
+        # Frames for the GIF are spooled to disk per step; run() hands them to the encoder pool without awaiting it
+        self._frame_spool: Optional[FrameSpool] = None
+        self.recording_job: Optional[asyncio.Future] = None
+        # Every step goes through _on_new_step so the policy is applied before the caller's callback sees the state
+        self._new_step_callback = self.register_new_step_callback
+        self.register_new_step_callback = self._on_new_step
+        self._attach_browser_context()
+
+    def _attach_browser_context(self) -> None:
+        # Called again by run(): the web UI swaps browser_context on a reused agent
+        if isinstance(self.browser_context, CustomBrowserContext):
+            self.browser_context.step_timer = self.step_timer
+            self.browser_context.screenshot_policy = self.screenshot_policy
+
+    def _select_screenshot(self, state: BrowserState, model_output: AgentOutput | None) -> None:
+        """Applies the screenshot policy to the step's state once, before it is streamed or stored."""
+        if state is None or state is self._screenshot_state:
+            return
+        self._screenshot_state = state
+        action_names = None
+        if model_output is not None:
+            action_names = [name for action in model_output.action for name in action.model_dump(exclude_unset=True)]
+        state.screenshot = self.screenshot_policy.select(state.url, state.screenshot, action_names)
+
+    async def _on_new_step(self, state: BrowserState, model_output: AgentOutput, n_steps: int) -> None:
+        # JPEG re-encoding is CPU-bound; keep it off the event loop
+        await asyncio.to_thread(self._select_screenshot, state, model_output)
+        callback = self._new_step_callback
+        if callback is None:
+            return
+        if inspect.iscoroutinefunction(callback):
+            await callback(state, model_output, n_steps)
+        else:
+            callback(state, model_output, n_steps)
+
+    async def step(self, step_info: Optional[AgentStepInfo] = None) -> None:
+        self.step_timer.start_step()
+        with collect_usage(self.step_timer):
+            await super().step(step_info)
+
+    async def get_next_action(self, input_messages: list[BaseMessage]) -> AgentOutput:
+        async with self.step_timer.measure("llm"):
+            return await super().get_next_action(input_messages)
+
+    async def _run_planner(self) -> Optional[str]:
+        async with self.step_timer.measure("llm"):
+            return await super()._run_planner()
+
+    async def multi_act(self, actions: list[ActionModel], check_for_new_elements: bool = True) -> list[ActionResult]:
+        async with self.step_timer.measure("action"):
+            return await super().multi_act(actions, check_for_new_elements)
+
+    def _make_history_item(
+            self,
+            model_output: AgentOutput | None,
+            state: BrowserState,
+            result: list[ActionResult],
+            metadata: Optional[StepMetadata] = None,
+    ) -> None:
+        # Steps that failed before the step callback still need the policy applied
+        self._select_screenshot(state, model_output)
+        super()._make_history_item(model_output, state, result, metadata)
+        self.step_timings.append(self.step_timer.finish_step())
+        self._spool_frame(state, model_output)
+
+    def _recording_path(self) -> str:
+        if isinstance(self.settings.generate_gif, str):
+            return self.settings.generate_gif
+        return 'agent_history.gif'
+
+    def _spool_frame(self, state: BrowserState, model_output: AgentOutput | None) -> None:
+        if not self.settings.generate_gif or state is None or not state.screenshot:
+            return
+        try:
+            if self._frame_spool is None:
+                self._frame_spool = FrameSpool(f'{self._recording_path()}.frames')
+            goal = model_output.current_state.next_goal if model_output is not None else None
+            self._frame_spool.append(state.screenshot, len(self.state.history.history), goal)
+        except Exception as e:
+            logger.warning(f'Could not spool recording frame: {e}')
+
+    def _submit_recording(self) -> None:
+        """Queues encoding of the spooled frames; the run returns without waiting for it."""
+        spool, self._frame_spool = self._frame_spool, None
+        if spool is None:
+            return
+        job = {
+            'spool_dir': spool.directory,
+            'output_path': self._recording_path(),
+            'task': self.task,
+            **recording_options(),
+        }
+        self.recording_job = recording_encoder.submit(encode_history_recording, job)
+
     @time_execution_async('--run (agent)')
     async def run(
             self, max_steps: int = 100, on_step_start: AgentHookFunc | None = None,
@@ -106,6 +213,9 @@ class BrowserUseAgent(Agent):
             except Exception:
                 pass
 
+        self._attach_browser_context()
+        self.recording_job = None
+
         try:
             self._log_agent_run()
 
@@ -176,8 +286,7 @@ class BrowserUseAgent(Agent):
             await self.close()
 
             if self.settings.generate_gif:
-                output_path: str = 'agent_history.gif'
-                if isinstance(self.settings.generate_gif, str):
-                    output_path = self.settings.generate_gif
-
-                create_history_gif(task=self.task, history=self.state.history, output_path=output_path)
\ No newline at end of file
+                try:
+                    self._submit_recording()
+                except Exception as e:
+                    logger.error(f'Failed to queue recording encoding: {e}')
\ No newline at end of file
@@ -0,0 +1,119 @@
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+# Where a step's time goes; each second is counted in exactly one bucket (or "other")
+TIMING_BUCKETS = ("llm", "dom", "action", "wait")
+
+
+class StepTimer:
+    """Splits each agent step's wall time into LLM, DOM extraction, action and page-wait time.
+
+    Buckets nest (an action waits for the page and re-reads the DOM), so
+    time is exclusive: while an inner bucket is measured, the enclosing
+    one is paused.
+    """
+
+    def __init__(self):
+        self.start_step()
+
+    def start_step(self) -> None:
+        self.seconds: Dict[str, float] = dict.fromkeys(TIMING_BUCKETS, 0.0)
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+        self._stack: List[List[Any]] = []
+
+    @asynccontextmanager
+    async def measure(self, bucket: str):
+        now = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.seconds[parent[0]] += now - parent[1]
+        frame = [bucket, now]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.seconds[bucket] += now - frame[1]
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def record_usage(self, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+        """Adds reported token usage; a step can make several LLM calls (retries, planner)."""
+        if input_tokens is not None:
+            self.input_tokens = (self.input_tokens or 0) + input_tokens
+        if output_tokens is not None:
+            self.output_tokens = (self.output_tokens or 0) + output_tokens
+
+    def finish_step(self) -> Dict[str, Any]:
+        timings = {f"{bucket}_seconds": round(seconds, 3) for bucket, seconds in self.seconds.items()}
+        timings["input_tokens"] = self.input_tokens
+        timings["output_tokens"] = self.output_tokens
+        self.start_step()
+        return timings
+
+
+class UsageCallback(BaseCallbackHandler):
+    """Feeds the token usage providers report for each chat completion into a StepTimer."""
+
+    run_inline = True
+
+    def __init__(self, timer: StepTimer):
+        self.timer = timer
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.timer.record_usage(usage.get("input_tokens"), usage.get("output_tokens"))
+
+
+_usage_callback: ContextVar[Optional[UsageCallback]] = ContextVar("step_usage_callback", default=None)
+# Attached to every chat model call made while the variable is set, without touching the (possibly shared) model
+register_configure_hook(_usage_callback, inheritable=True)
+
+
+@contextmanager
+def collect_usage(timer: StepTimer):
+    """Records token usage of LLM calls made in this context (and tasks it spawns) into the timer."""
+    token = _usage_callback.set(UsageCallback(timer))
+    try:
+        yield
+    finally:
+        _usage_callback.reset(token)
+
+
+SUMMED_FIELDS = ("duration_seconds", *(f"{bucket}_seconds" for bucket in TIMING_BUCKETS), "input_tokens", "output_tokens")
+
+
+def timing_totals(steps: int, sums: Dict[str, Any]) -> Dict[str, Any]:
+    """Totals, per-step mean and each bucket's share of the step time, from per-field sums over the steps."""
+    total_seconds = float(sums.get("duration_seconds") or 0.0)
+    totals = {f"{bucket}_seconds": round(float(sums.get(f"{bucket}_seconds") or 0.0), 3) for bucket in TIMING_BUCKETS}
+    totals["other_seconds"] = round(max(total_seconds - sum(totals.values()), 0.0), 3)
+    return {
+        "steps": steps,
+        "duration_seconds": round(total_seconds, 3),
+        **totals,
+        "mean_step_seconds": round(total_seconds / steps, 3) if steps else None,
+        "share": {
+            name.removesuffix("_seconds"): round(seconds / total_seconds, 3) if total_seconds else None
+            for name, seconds in totals.items()
+        },
+        "input_tokens": int(sums.get("input_tokens") or 0),
+        "output_tokens": int(sums.get("output_tokens") or 0),
+    }
+
+
+def summarize_timings(steps: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """timing_totals for a list of step timing dicts (task_steps rows or StepTimer output with durations)."""
+    steps = list(steps)
+    sums = {field: sum(step.get(field) or 0 for step in steps) for field in SUMMED_FIELDS}
+    return timing_totals(len(steps), sums)
@@ -1,24 +1,58 @@
 import logging
-from typing import Generator
+from typing import AsyncGenerator
 
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.api.config import DATABASE_URL
+from src.api.config import (
+    ASYNC_DATABASE_URL,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+)
 
 from src.api.models.user import User
 from src.api.models.task import Task
 from src.api.models.result import Result
+from src.api.models.artifact import ArtifactBlob
+from src.api.models.task_step import TaskStep
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _pool_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+    }
+
+
+# Synchronous engine for alembic, the CLIs and code that already runs in a worker thread
 engine = create_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
     pool_recycle=3600,
+    **_pool_options(DATABASE_URL),
 )
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    **_pool_options(ASYNC_DATABASE_URL),
+)
+
+# expire_on_commit=False: attributes stay readable after commit without another round trip
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 
 def create_db_and_tables() -> None:
     logger.info("Creating database tables...")
@@ -26,13 +60,11 @@ def create_db_and_tables() -> None:
     logger.info("Database tables created successfully.")
 
 
-def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session_factory() as session:
         try:
             yield session
         except Exception as e:
             logger.error(f"Database session error: {e}")
-            session.rollback()
+            await session.rollback()
             raise
-        finally:
-            session.close()
\ No newline at end of file
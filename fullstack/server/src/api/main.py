@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import sys
 from fastapi import FastAPI, HTTPException
@@ -5,8 +6,17 @@ from fastapi.middleware.cors import CORSMiddleware
 
 sys.path.append(".")
 
-from src.api.config import API_PREFIX
+from src.api.config import API_PREFIX, REGENERATE_SCRIPTS_ON_STARTUP, TASK_EXECUTION_MODE
 from src.api.routers import auth, hello, results, tasks
+from src.api.services.artifact_store import artifact_gc
+from src.api.services.browser_pool import browser_pool
+from src.api.services.result_processing import wait_for_recording_publishes
+from src.api.services.task_events import task_event_bus
+from src.api.services.task_scheduler import task_scheduler
+from src.api.services.task_sweeper import task_sweeper
+from src.browser.playwright_runtime import playwright_runtime
+from src.utils.llm_clients import close_client_registry
+from src.utils.recording_encoder import recording_encoder
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,6 +33,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(hello.router, prefix=API_PREFIX)
@@ -31,8 +42,93 @@ app.include_router(tasks.router, prefix=API_PREFIX)
 app.include_router(results.router, prefix=API_PREFIX)
 
 
+@app.on_event("startup")
+async def start_task_scheduler():
+    if TASK_EXECUTION_MODE == "worker":
+        logger.info("TASK_EXECUTION_MODE=worker: tasks are queued for src.cli.task_worker processes")
+        return
+    await task_scheduler.start()
+    # Workers run their own sweepers; in-process tasks are swept here
+    await task_sweeper.start()
 
 
+@app.on_event("shutdown")
+async def stop_task_scheduler():
+    await task_sweeper.stop()
+    await task_scheduler.stop()
+
+
+@app.on_event("startup")
+async def start_browser_pool():
+    if TASK_EXECUTION_MODE == "worker":
+        # Browsers are pooled by the worker processes that run the tasks
+        return
+    await browser_pool.start()
+
+
+@app.on_event("shutdown")
+async def stop_browser_pool():
+    await browser_pool.stop()
+    # After the pool, so its browsers are closed before their driver goes away
+    await playwright_runtime.stop()
+
+
+@app.on_event("startup")
+async def start_task_event_bus():
+    # Listens for events published by worker processes when a cross-process channel is configured
+    await task_event_bus.start()
+
+
+@app.on_event("shutdown")
+async def stop_task_event_bus():
+    await task_event_bus.stop()
+
+
+@app.on_event("startup")
+async def start_artifact_gc():
+    # Unreferenced blobs pile up in both execution modes, so this always runs
+    await artifact_gc.start()
+
+
+@app.on_event("shutdown")
+async def stop_artifact_gc():
+    await artifact_gc.stop()
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await close_client_registry()
+
+
+@app.on_event("shutdown")
+async def stop_recording_encoder():
+    await wait_for_recording_publishes()
+    await asyncio.to_thread(recording_encoder.shutdown)
+
+
+@app.on_event("startup")
+async def regenerate_scripts_after_upgrade():
+    if not REGENERATE_SCRIPTS_ON_STARTUP:
+        return
+    from src.api.services.script_regeneration import regenerate_all_scripts
+
+    # Runs in the background; generation itself happens in a process pool
+    app.state.script_regeneration = asyncio.create_task(regenerate_all_scripts())
+    logger.info("Scheduled background regeneration of stored scripts")
+
+
+@app.on_event("shutdown")
+async def stop_script_regeneration():
+    regeneration = getattr(app.state, "script_regeneration", None)
+    if regeneration is None or regeneration.done():
+        return
+    regeneration.cancel()
+    try:
+        await regeneration
+    except asyncio.CancelledError:
+        pass
+    logger.info("Cancelled background script regeneration")
+
 
 @app.get("/")
 async def root():
@@ -1,6 +1,8 @@
 from src.api.models.user import User, UserBase, UserCreate, UserRead
 from src.api.models.token import Token, TokenData
 from src.api.models.result import Result, ResultBase, ResultRead
+from src.api.models.artifact import ArtifactBlob
+from src.api.models.task_step import TaskStep, TaskStepRead
 
 __all__ = [
     "User",
@@ -12,4 +14,7 @@ __all__ = [
     "Result",
     "ResultBase",
     "ResultRead",
+    "ArtifactBlob",
+    "TaskStep",
+    "TaskStepRead",
 ]
\ No newline at end of file
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+from src.api.models.types import UTCDateTime
+
+
+class ArtifactBlob(SQLModel, table=True):
+    """A stored artifact addressed by the SHA-256 of its content.
+
+    ref_count is the number of result columns (gif_digest, script_digest)
+    pointing at the blob; unreferenced blobs are removed by the artifact
+    garbage collector once last_used_at is older than the grace period.
+    The collector sets it to -1 while it deletes the stored object.
+    """
+
+    __tablename__ = "artifact_blobs"
+    __table_args__ = (
+        Index("ix_artifact_blobs_ref_count_last_used_at", "ref_count", "last_used_at"),
+    )
+
+    digest: str = Field(primary_key=True)
+    kind: str
+    backend: str
+    storage_key: str
+    url: str
+    size_bytes: int
+    ref_count: int = Field(default=0)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
+    last_used_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
@@ -2,16 +2,21 @@ from datetime import datetime, timezone
 from typing import Optional
 from sqlmodel import Field, SQLModel
 
+from src.api.models.types import UTCDateTime
+
 
 class ResultBase(SQLModel):
     result_gif: Optional[str] = Field(default=None)
     result_json_url: Optional[str] = Field(default=None)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
 
 class Result(ResultBase, table=True):
     __tablename__ = "results"
     
     task_id: int = Field(primary_key=True, foreign_key="tasks.id")
+    # Content digests of the stored artifacts (artifact_blobs.digest); None for results stored before dedup
+    gif_digest: Optional[str] = Field(default=None)
+    script_digest: Optional[str] = Field(default=None)
 
 
 class ResultRead(ResultBase):
@@ -1,7 +1,10 @@
 from datetime import datetime, timezone
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+from src.api.models.types import UTCDateTime
+
 
 class TaskBase(SQLModel):
     task_name: str = Field(max_length=1000)
@@ -16,21 +19,38 @@ class TaskBase(SQLModel):
     disable_security: bool = Field(default=True)
     window_width: int = Field(default=1280)
     window_height: int = Field(default=720)
+    # "full", "off", "key_steps" or "jpeg" (see src/browser/screenshot_policy.py)
+    screenshot_policy: str = Field(default="full")
+    screenshot_quality: int = Field(default=70)
+    screenshot_max_dimension: int = Field(default=1024)
+    # Screenshot bytes the policy kept out of history, GIF and streaming in the last run
+    screenshot_bytes_saved: Optional[int] = Field(default=None)
     instruction: Optional[str] = Field(default=None)
     description: Optional[str] = Field(default=None)
     search_input_input: Optional[str] = Field(default=None)
     search_input_action: Optional[str] = Field(default=None)
     expected_outcome: Optional[str] = Field(default=None)
     expected_status: Optional[str] = Field(default=None)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    initiated_at: Optional[datetime] = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
+    initiated_at: Optional[datetime] = Field(default=None, sa_type=UTCDateTime)
 
 
 class Task(TaskBase, table=True):
     __tablename__ = "tasks"
+    # Mirrors migration c4f8a2e6d1b0; tests/test_query_plans.py checks the hot queries use them
+    __table_args__ = (
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_tasks_status_user_id", "status", "user_id"),
+        Index("ix_tasks_status_initiated_at_id", "status", "initiated_at", "id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
+    runner: str = Field(default="agent")
+    worker_id: Optional[str] = Field(default=None)
+    heartbeat_at: Optional[datetime] = Field(default=None, sa_type=UTCDateTime)
+    # Encrypted API key handed to the worker that claims the task; not in TaskBase, so never in TaskRead
+    queued_api_key: Optional[str] = Field(default=None)
 
 
 class TaskCreate(SQLModel):
@@ -40,6 +60,7 @@ class TaskCreate(SQLModel):
 class TaskRead(TaskBase):
     id: int
     user_id: int
+    queue_position: Optional[int] = None
 
 
 class TaskSummary(SQLModel):
@@ -62,6 +83,9 @@ class BrowserSettings(SQLModel):
     disable_security: Optional[bool] = None
     window_width: Optional[int] = None
     window_height: Optional[int] = None
+    screenshot_policy: Optional[str] = None
+    screenshot_quality: Optional[int] = None
+    screenshot_max_dimension: Optional[int] = None
 
 
 class TaskInitiate(SQLModel):
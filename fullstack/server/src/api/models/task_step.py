@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import JSON, Index
+from sqlmodel import Field, SQLModel
+
+from src.api.models.types import UTCDateTime
+
+
+class TaskStepBase(SQLModel):
+    step_number: int
+    url: Optional[str] = Field(default=None)
+    # Actions the model chose for the step, as {action_name: params} dicts
+    actions: List[Any] = Field(default_factory=list, sa_type=JSON)
+    duration_seconds: Optional[float] = Field(default=None)
+    input_tokens: Optional[int] = Field(default=None)
+    output_tokens: Optional[int] = Field(default=None)
+    # Exclusive shares of duration_seconds; the remainder is prompt building, callbacks and bookkeeping
+    llm_seconds: Optional[float] = Field(default=None)
+    dom_seconds: Optional[float] = Field(default=None)
+    action_seconds: Optional[float] = Field(default=None)
+    wait_seconds: Optional[float] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
+
+
+class TaskStep(TaskStepBase, table=True):
+    """One agent step of a task run, written in batches while the task runs."""
+
+    __tablename__ = "task_steps"
+    __table_args__ = (
+        Index("ix_task_steps_task_id_step_number", "task_id", "step_number"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int = Field(foreign_key="tasks.id")
+
+
+class TaskStepRead(TaskStepBase):
+    task_id: int
+
+
+class TimingTotals(SQLModel):
+    steps: int
+    duration_seconds: float
+    llm_seconds: float
+    dom_seconds: float
+    action_seconds: float
+    wait_seconds: float
+    other_seconds: float
+    mean_step_seconds: Optional[float] = None
+    # Fraction of duration_seconds spent in each bucket
+    share: Dict[str, Optional[float]]
+    input_tokens: int
+    output_tokens: int
+    # None when LLM_TOKEN_PRICES has no entry for the model
+    cost_usd: Optional[float] = None
+
+
+class StepTiming(SQLModel):
+    step_number: int
+    duration_seconds: Optional[float] = None
+    llm_seconds: Optional[float] = None
+    dom_seconds: Optional[float] = None
+    action_seconds: Optional[float] = None
+    wait_seconds: Optional[float] = None
+    other_seconds: Optional[float] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    cost_usd: Optional[float] = None
+
+
+class TaskTiming(SQLModel):
+    task_id: int
+    llm_provider: str
+    llm_model: str
+    totals: TimingTotals
+    steps: List[StepTiming]
+
+
+class ModelTimingSummary(TimingTotals):
+    llm_provider: str
+    llm_model: str
+    tasks: int
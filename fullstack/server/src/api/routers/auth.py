@@ -4,13 +4,14 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.api.config import JWT_EXPIRATION_MINUTES
 from src.api.db.session import get_session
 from src.api.models.token import Token
 from src.api.models.user import User
 from src.api.services.auth import authenticate_user, create_access_token, get_current_user
+from src.api.services.principal_cache import principal_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,9 +22,9 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
-    user = authenticate_user(session, form_data.username, form_data.password)
+    user = await authenticate_user(session, form_data.username, form_data.password)
     if not user:
         logger.warning(f"Failed login attempt for user: {form_data.username}")
         raise HTTPException(
@@ -47,4 +48,9 @@ async def read_users_me(current_user: User = Depends(get_current_user)) -> Any:
     return {
         "username": current_user.username,
         "user_id": current_user.id,
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/principal-cache", response_model=dict)
+async def read_principal_cache_stats(current_user: User = Depends(get_current_user)) -> Any:
+    return principal_cache.stats()
@@ -2,7 +2,7 @@ import logging
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.api.db.session import get_session
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/results", tags=["results"])
 async def get_task_result(
     task_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
     try:
         logger.info(f"API request: Get result for task {task_id} by user {current_user.id}")
@@ -35,7 +35,7 @@ async def get_task_result(
         logger.debug(f"User {current_user.id} ({current_user.username}) requesting result for task {task_id}")
         
         try:
-            task, result = validate_result_access(task_id, current_user, session)
+            task, result = await validate_result_access(task_id, current_user, session)
             logger.debug(f"Result access validation passed for task {task_id}")
         except HTTPException as e:
             logger.warning(f"Result access validation failed for task {task_id}: {e.detail}")
@@ -56,7 +56,7 @@ async def get_task_result(
             )
         
         try:
-            result_summary = get_result_summary(task_id, session)
+            result_summary = await get_result_summary(task_id, session)
             if result_summary:
                 logger.debug(f"Result summary for task {task_id}: {result_summary}")
         except Exception as e:
@@ -103,7 +103,7 @@ async def get_task_result(
 async def delete_task_result(
     task_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
     try:
         logger.info(f"API request: Delete result for task {task_id} by user {current_user.id}")
@@ -116,11 +116,11 @@ async def delete_task_result(
             )
         
         from src.api.services.task_validation import get_task_or_404, validate_task_ownership
-        task = get_task_or_404(task_id, session)
+        task = await get_task_or_404(task_id, session)
         validate_task_ownership(task, current_user)
         
         from src.api.services.result_management import delete_result_with_files
-        deletion_result = delete_result_with_files(task_id, session)
+        deletion_result = await delete_result_with_files(task_id, session)
         
         if deletion_result["success"]:
             if deletion_result["result_found"]:
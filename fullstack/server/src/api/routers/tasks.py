@@ -1,20 +1,33 @@
-import asyncio
 import logging
-from typing import Any, List
+from datetime import datetime
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.api.db.session import get_session
 from src.api.models.task import (
     AgentSettings, BrowserSettings, Task, TaskCreate, TaskInitiate, TaskRead, TaskSummary
 )
+from src.api.models.task_step import ModelTimingSummary, TaskStepRead, TaskTiming
 from src.api.models.user import User
 from src.api.services.auth import get_current_user
+from src.api.services.browser_pool import browser_pool
+from src.api.services.task_events import task_event_stream
+from src.api.services.task_steps import delete_task_steps, get_task_steps
+from src.api.services.task_timing import get_task_timing, get_timing_summary
+from src.api.services.task_queries import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, count_tasks, get_task_summary_page
+from src.api.services.task_scheduler import task_scheduler
 from src.api.services.task_validation import (
-    get_task_or_404, validate_task_ownership, validate_task_state, validate_temperature
+    VALID_STATUSES,
+    get_task_or_404,
+    validate_screenshot_settings,
+    validate_task_ownership,
+    validate_task_state,
+    validate_temperature,
 )
-from src.api.config import FAILURE_TIME_DELTA_IN_MINUTES
+from src.api.config import TASK_EXECUTION_MODE
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,11 +35,17 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+async def _to_task_read(task: Task, session: AsyncSession) -> TaskRead:
+    task_read = TaskRead.model_validate(task)
+    task_read.queue_position = await task_scheduler.queue_position(task, session)
+    return task_read
+
+
 @router.post("", response_model=TaskRead)
 async def create_task(
     task_data: TaskCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
     task = Task(
         **task_data.dict(),
@@ -34,38 +53,102 @@ async def create_task(
     )
     
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await session.commit()
+    await session.refresh(task)
     
     logger.info(f"Task created: {task.id} by user: {current_user.id}")
     return task
 
 
+def _validate_status_filter(statuses: Optional[List[str]]) -> None:
+    invalid = [value for value in statuses or [] if value not in VALID_STATUSES]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid status filter: {', '.join(invalid)}",
+        )
+
+
 @router.get("", response_model=List[TaskSummary])
 async def get_tasks(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    task_status: Optional[List[str]] = Query(None, alias="status"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
-    statement = select(Task).where(Task.user_id == current_user.id)
-    tasks = session.exec(statement).all()
-    
-    return [
-        TaskSummary(
-            id=task.id,
-            task_name=task.task_name,
-            status=task.status,
+    _validate_status_filter(task_status)
+    
+    try:
+        tasks, next_cursor = await get_task_summary_page(
+            session,
+            current_user.id,
+            limit=limit,
+            cursor=cursor,
+            statuses=task_status,
+            created_after=created_after,
+            created_before=created_before,
         )
-        for task in tasks
-    ]
+    except ValueError:
+        logger.warning(f"Invalid task list cursor from user {current_user.id}: {cursor}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tasks
+
+
+@router.get("/count", response_model=dict)
+async def get_task_count(
+    task_status: Optional[List[str]] = Query(None, alias="status"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    _validate_status_filter(task_status)
+    
+    count, estimated = await count_tasks(
+        session,
+        current_user.id,
+        statuses=task_status,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    return {"count": count, "estimated": estimated}
+
+
+@router.get("/browser-pool", response_model=dict)
+async def get_browser_pool_stats(
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    # Only this process's pool; each worker process keeps its own
+    return browser_pool.stats()
+
+
+@router.get("/timing-summary", response_model=List[ModelTimingSummary])
+async def get_task_timing_summary(
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    return await get_timing_summary(session, current_user.id, created_after, created_before)
 
 
 @router.get("/{task_id}", response_model=TaskRead)
 async def get_task_by_id(
     task_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
-    task = session.get(Task, task_id)
+    task = await session.get(Task, task_id)
     
     if not task:
         logger.warning(f"Task not found: {task_id}")
@@ -81,26 +164,54 @@ async def get_task_by_id(
             detail="Not authorized to access this task",
         )
     
-    if task.status == "running":
-        from datetime import datetime, timezone, timedelta
-        
-        current_time = datetime.now(timezone.utc)
-        
-        task_initiated_at = task.initiated_at
-        if task_initiated_at.tzinfo is None:
-            task_initiated_at = task_initiated_at.replace(tzinfo=timezone.utc)
-        
-        time_running = current_time - task_initiated_at
-        
-        if time_running > timedelta(minutes=FAILURE_TIME_DELTA_IN_MINUTES):
-            task.status = "failed"
-            session.add(task)
-            session.commit()
-            session.refresh(task)
-            
-            logger.warning(f"Task {task_id} marked as failed - running for {time_running.total_seconds()/60:.1f} minutes")
+    return await _to_task_read(task, session)
+
+
+@router.get("/{task_id}/events")
+async def stream_task_events(
+    task_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    task = await get_task_or_404(task_id, session)
     
-    return task
+    validate_task_ownership(task, current_user)
+    
+    # The stream can stay open for minutes; don't hold a pooled connection for it
+    await session.close()
+    
+    logger.info(f"User {current_user.id} subscribed to events of task {task_id}")
+    return StreamingResponse(
+        task_event_stream(task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{task_id}/steps", response_model=List[TaskStepRead])
+async def get_steps(
+    task_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    task = await get_task_or_404(task_id, session)
+    
+    validate_task_ownership(task, current_user)
+    
+    return await get_task_steps(session, task_id)
+
+
+@router.get("/{task_id}/timing", response_model=TaskTiming)
+async def get_timing(
+    task_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    task = await get_task_or_404(task_id, session)
+    
+    validate_task_ownership(task, current_user)
+    
+    return await get_task_timing(session, task)
 
 
 @router.patch("/{task_id}/agent-settings", response_model=TaskRead)
@@ -108,9 +219,9 @@ async def update_agent_settings(
     task_id: int,
     settings: AgentSettings,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
-    task = get_task_or_404(task_id, session)
+    task = await get_task_or_404(task_id, session)
     
     validate_task_ownership(task, current_user)
     
@@ -123,8 +234,8 @@ async def update_agent_settings(
         setattr(task, key, value)
     
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await session.commit()
+    await session.refresh(task)
     
     logger.info(f"Agent settings updated for task: {task.id} by user: {current_user.id}")
     return task
@@ -135,21 +246,23 @@ async def update_browser_settings(
     task_id: int,
     settings: BrowserSettings,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
-    task = get_task_or_404(task_id, session)
+    task = await get_task_or_404(task_id, session)
     
     validate_task_ownership(task, current_user)
     
     validate_task_state(task, "update browser settings")
     
+    validate_screenshot_settings(settings.screenshot_policy, settings.screenshot_quality, settings.screenshot_max_dimension)
+    
     update_data = settings.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(task, key, value)
     
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await session.commit()
+    await session.refresh(task)
     
     logger.info(f"Browser settings updated for task: {task.id} by user: {current_user.id}")
     return task
@@ -160,12 +273,12 @@ async def initiate_task(
     task_id: int,
     task_data: TaskInitiate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
     from datetime import datetime, timezone
     from src.api.services.api_key_decrypter import get_api_key_decrypter
     
-    task = get_task_or_404(task_id, session)
+    task = await get_task_or_404(task_id, session)
     
     validate_task_ownership(task, current_user)
     
@@ -175,6 +288,7 @@ async def initiate_task(
     if task_data.api_key:
         try:
             decrypter = get_api_key_decrypter()
+            api_key_encrypted = decrypter.is_encrypted(task_data.api_key)
             decrypted_api_key = decrypter.decrypt_if_encrypted(task_data.api_key)
             logger.info(f"API key processed for task {task_id}")
         except Exception as e:
@@ -183,27 +297,36 @@ async def initiate_task(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Failed to process API key",
             )
+        if TASK_EXECUTION_MODE == "worker" and not api_key_encrypted:
+            # The key waits in the database until a worker claims the task; never store it in plain text
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="API key must be encrypted when tasks run on workers",
+            )
     
     update_data = task_data.dict(exclude={"api_key"})
     for key, value in update_data.items():
         setattr(task, key, value)
     
     task.api_key = None
+    # Workers run in another process, so they get the key (still encrypted) through a column TaskRead leaves out
+    task.queued_api_key = task_data.api_key if TASK_EXECUTION_MODE == "worker" else None
+    task.runner = "agent"
     
-    task.status = "running"
+    task.status = "queued"
     task.initiated_at = datetime.now(timezone.utc)
     
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await session.commit()
+    await session.refresh(task)
     
-    logger.info(f"Task initiated: {task.id} by user: {current_user.id}")
+    logger.info(f"Task queued: {task.id} by user: {current_user.id}")
     logger.info(f"Task details: {task.task_name}, Instruction: {task.instruction}")
     
-    from src.api.services.task_execution import start_task_execution
-    asyncio.create_task(start_task_execution(task.id, api_key=decrypted_api_key))
+    if TASK_EXECUTION_MODE != "worker":
+        task_scheduler.enqueue(task.id, api_key=decrypted_api_key)
     
-    return task
+    return await _to_task_read(task, session)
 
 
 @router.patch("/{task_id}/initiate-webui", response_model=TaskRead)
@@ -211,11 +334,11 @@ async def initiate_task_with_webui_wrapper(
     task_id: int,
     task_data: TaskInitiate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
     from datetime import datetime, timezone
     
-    task = get_task_or_404(task_id, session)
+    task = await get_task_or_404(task_id, session)
     
     validate_task_ownership(task, current_user)
     
@@ -225,29 +348,30 @@ async def initiate_task_with_webui_wrapper(
     for key, value in update_data.items():
         setattr(task, key, value)
     
-    task.status = "running"
+    task.runner = "webui"
+    task.status = "queued"
     task.initiated_at = datetime.now(timezone.utc)
     
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await session.commit()
+    await session.refresh(task)
     
-    logger.info(f"Task initiated with WebUI wrapper: {task.id} by user: {current_user.id}")
+    logger.info(f"Task queued with WebUI wrapper: {task.id} by user: {current_user.id}")
     logger.info(f"Task details: {task.task_name}, Instruction: {task.instruction}")
     
-    from src.api.services.task_execution import start_task_execution_with_webui_wrapper
-    asyncio.create_task(start_task_execution_with_webui_wrapper(task.id))
+    if TASK_EXECUTION_MODE != "worker":
+        task_scheduler.enqueue(task.id)
     
-    return task
+    return await _to_task_read(task, session)
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_200_OK)
 async def delete_task(
     task_id: int,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> Any:
-    task = get_task_or_404(task_id, session)
+    task = await get_task_or_404(task_id, session)
     
     validate_task_ownership(task, current_user)
     
@@ -258,9 +382,12 @@ async def delete_task(
             detail="Cannot delete task in running state",
         )
     
+    if task.status == "queued":
+        task_scheduler.discard(task.id)
+    
     from src.api.services.result_management import delete_result_with_files
     
-    deletion_result = delete_result_with_files(task_id, session)
+    deletion_result = await delete_result_with_files(task_id, session)
     
     if not deletion_result["success"]:
         logger.error(f"Failed to delete result for task {task_id}: {deletion_result['errors']}")
@@ -271,8 +398,9 @@ async def delete_task(
     else:
         logger.info(f"No result found for task {task_id} - proceeding with task deletion")
     
-    session.delete(task)
-    session.commit()
+    await delete_task_steps(session, task_id)
+    await session.delete(task)
+    await session.commit()
     
     logger.info(f"Task deleted: {task_id} by user: {current_user.id}")
     return {"message": "Task deleted successfully"}
\ No newline at end of file
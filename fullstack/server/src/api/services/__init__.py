@@ -3,7 +3,9 @@ from src.api.services.security import hash_password, verify_password
 from src.api.services.cloudinary_service import cloudinary_service
 from src.api.services.result_processing import (
     create_task_result,
+    process_task_result,
     process_task_result_safe,
+    publish_recording,
     get_gif_path_for_task,
     check_gif_exists,
 )
@@ -16,7 +18,9 @@ __all__ = [
     "verify_password",
     "cloudinary_service",
     "create_task_result",
+    "process_task_result",
     "process_task_result_safe",
+    "publish_recording",
     "get_gif_path_for_task",
     "check_gif_exists",
 ]
\ No newline at end of file
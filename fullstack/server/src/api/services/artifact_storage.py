@@ -0,0 +1,179 @@
+import logging
+import os
+import shutil
+from typing import Dict, Optional, Tuple
+
+import cloudinary.uploader
+
+from src.api.config import (
+    LOCAL_UPLOAD_DIR,
+    S3_ACCESS_KEY_ID,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_PUBLIC_BASE_URL,
+    S3_REGION,
+    S3_SECRET_ACCESS_KEY,
+    UPLOAD_BACKEND,
+)
+from src.api.services.cloudinary_service import cloudinary_service
+
+logger = logging.getLogger(__name__)
+
+# kind -> (Cloudinary resource_type, content type, file extension)
+ARTIFACT_KINDS: Dict[str, Tuple[str, str, str]] = {
+    "gif": ("image", "image/gif", ".gif"),
+    # Recordings encoded as RECORDING_FORMAT=webp/mp4; stored in the result's GIF column like GIFs
+    "webp": ("image", "image/webp", ".webp"),
+    "mp4": ("video", "video/mp4", ".mp4"),
+    "script": ("raw", "text/x-python", ".py"),
+}
+
+
+def storage_key(kind: str, digest: str) -> str:
+    """Content-addressed key, e.g. script/ab/ab12...ef.py; identical files share one key."""
+    return f"{kind}/{digest[:2]}/{digest}{ARTIFACT_KINDS[kind][2]}"
+
+
+class LocalStorageBackend:
+    """Keeps artifacts under a local directory; stands in for remote storage in development and tests."""
+
+    name = "local"
+
+    def __init__(self, root: str = LOCAL_UPLOAD_DIR):
+        self.root = root
+
+    def is_available(self) -> bool:
+        return True
+
+    def unavailability_reason(self) -> Optional[str]:
+        return None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def put(self, file_path: str, key: str, kind: str, chunk_size: Optional[int]) -> str:
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = f"{target}.partial"
+        with open(file_path, "rb") as source, open(partial, "wb") as destination:
+            shutil.copyfileobj(source, destination, chunk_size or 1024 * 1024)
+        os.replace(partial, target)
+        return os.path.abspath(target)
+
+    def delete(self, key: str, kind: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3StorageBackend:
+    """S3-compatible object storage (AWS S3, MinIO)."""
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: Optional[str] = S3_BUCKET,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        region: Optional[str] = S3_REGION,
+        access_key_id: Optional[str] = S3_ACCESS_KEY_ID,
+        secret_access_key: Optional[str] = S3_SECRET_ACCESS_KEY,
+        public_base_url: Optional[str] = S3_PUBLIC_BASE_URL,
+        client=None,
+    ):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.public_base_url = public_base_url
+        self.client = client
+        self.config_error = None
+
+        if not bucket:
+            self.config_error = "S3_BUCKET is not set"
+        elif client is None:
+            try:
+                import boto3
+
+                self.client = boto3.client(
+                    "s3",
+                    endpoint_url=endpoint_url,
+                    region_name=region,
+                    aws_access_key_id=access_key_id,
+                    aws_secret_access_key=secret_access_key,
+                )
+            except ImportError:
+                self.config_error = "boto3 is not installed"
+            except Exception as e:
+                self.config_error = f"Failed to create S3 client: {str(e)}"
+        if self.config_error:
+            logger.warning(f"S3 storage unavailable: {self.config_error}")
+
+    def is_available(self) -> bool:
+        return self.config_error is None
+
+    def unavailability_reason(self) -> Optional[str]:
+        return self.config_error
+
+    def url_for(self, key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url.rstrip('/')}/{key}"
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+    def put(self, file_path: str, key: str, kind: str, chunk_size: Optional[int]) -> str:
+        from boto3.s3.transfer import TransferConfig
+
+        # Streams the file; above chunk_size it goes up as a multipart upload
+        config = TransferConfig(multipart_threshold=chunk_size, multipart_chunksize=chunk_size) if chunk_size else None
+        self.client.upload_file(
+            file_path,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": ARTIFACT_KINDS[kind][1]},
+            Config=config,
+        )
+        return self.url_for(key)
+
+    def delete(self, key: str, kind: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+
+class CloudinaryStorageBackend:
+    name = "cloudinary"
+
+    def is_available(self) -> bool:
+        return cloudinary_service.is_available()
+
+    def unavailability_reason(self) -> Optional[str]:
+        return cloudinary_service.get_unavailability_reason()
+
+    @staticmethod
+    def _public_id(key: str, kind: str) -> str:
+        # Cloudinary appends the format to image and video public ids itself; raw files keep their extension
+        return key if ARTIFACT_KINDS[kind][0] == "raw" else os.path.splitext(key)[0]
+
+    def put(self, file_path: str, key: str, kind: str, chunk_size: Optional[int]) -> str:
+        public_id = self._public_id(key, kind)
+        options = dict(resource_type=ARTIFACT_KINDS[kind][0], public_id=public_id, overwrite=True, invalidate=True, timeout=60)
+        if chunk_size:
+            upload_result = cloudinary.uploader.upload_large(file_path, chunk_size=chunk_size, **options)
+        else:
+            upload_result = cloudinary.uploader.upload(file_path, **options)
+        public_url = upload_result.get("secure_url")
+        if not public_url:
+            raise RuntimeError(f"Upload of {public_id} returned no secure_url: {upload_result}")
+        return public_url
+
+    def delete(self, key: str, kind: str) -> None:
+        if not cloudinary_service.delete_cloudinary_file(self._public_id(key, kind), ARTIFACT_KINDS[kind][0]):
+            raise RuntimeError(f"Cloudinary refused to delete {key}")
+
+
+def create_storage_backend(name: str = UPLOAD_BACKEND):
+    if name == "local":
+        return LocalStorageBackend()
+    if name == "s3":
+        return S3StorageBackend()
+    return CloudinaryStorageBackend()
@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from src.api.config import (
+    ARTIFACT_GC_BATCH_SIZE,
+    ARTIFACT_GC_GRACE_SECONDS,
+    ARTIFACT_GC_INTERVAL_SECONDS,
+    RECORDING_RETENTION_HOURS,
+    RECORDINGS_DIR,
+)
+from src.api.db.session import async_session_factory
+from src.api.models.artifact import ArtifactBlob
+from src.api.models.result import Result
+from src.api.services.artifact_storage import storage_key
+from src.api.services.upload_manager import UploadManager, upload_manager as default_upload_manager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# ref_count of a blob the collector is deleting from storage; the row goes once the object is gone
+DELETING_REF_COUNT = -1
+
+# Result columns holding artifact URLs and the digests they reference
+RESULT_ARTIFACT_COLUMNS = {
+    "gif": ("result_gif", "gif_digest"),
+    "script": ("result_json_url", "script_digest"),
+}
+
+
+class StoredArtifact(NamedTuple):
+    digest: str
+    url: str
+
+
+def file_digest(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _adjust_ref_counts(session: Session, deltas: Dict[str, int]) -> None:
+    now = datetime.now(timezone.utc)
+    for digest, delta in deltas.items():
+        if delta:
+            session.execute(
+                update(ArtifactBlob)
+                .where(ArtifactBlob.digest == digest)
+                .values(ref_count=ArtifactBlob.ref_count + delta, last_used_at=now)
+            )
+
+
+def assign_result_artifacts(session: Session, result: Result, **artifacts: Optional[StoredArtifact]) -> None:
+    """Points result at the given artifacts ("gif"/"script") and moves the blob references along.
+
+    Takes a sync Session; async callers go through AsyncSession.run_sync.
+    Kinds not passed keep their current artifact.
+    """
+    deltas: Counter = Counter()
+    for kind, artifact in artifacts.items():
+        url_column, digest_column = RESULT_ARTIFACT_COLUMNS[kind]
+        old_digest = getattr(result, digest_column)
+        if old_digest:
+            deltas[old_digest] -= 1
+        if artifact:
+            deltas[artifact.digest] += 1
+        setattr(result, url_column, artifact.url if artifact else None)
+        setattr(result, digest_column, artifact.digest if artifact else None)
+    _adjust_ref_counts(session, deltas)
+
+
+def release_result_artifacts(session: Session, result: Result) -> int:
+    """Drops the references a result holds; the blobs are collected later. Returns how many were released."""
+    deltas: Counter = Counter()
+    for _, digest_column in RESULT_ARTIFACT_COLUMNS.values():
+        digest = getattr(result, digest_column)
+        if digest:
+            deltas[digest] -= 1
+    _adjust_ref_counts(session, deltas)
+    return -sum(deltas.values())
+
+
+class ArtifactStore:
+    """Content-addressed artifact storage on top of the upload manager.
+
+    Each distinct file is stored once under its SHA-256; results reference
+    blobs through their digest columns and unreferenced blobs are deleted by
+    collect_garbage after a grace period.
+    """
+
+    def __init__(self, uploads: Optional[UploadManager] = None, session_factory=None):
+        self.uploads = uploads or default_upload_manager
+        self.session_factory = session_factory or async_session_factory
+
+    @property
+    def backend(self):
+        return self.uploads.backend
+
+    def is_available(self) -> bool:
+        return self.uploads.is_available()
+
+    def unavailability_reason(self) -> Optional[str]:
+        return self.uploads.unavailability_reason()
+
+    async def store(self, file_path: str, kind: str, task_id: int) -> Optional[StoredArtifact]:
+        digest = await asyncio.to_thread(file_digest, file_path)
+        now = datetime.now(timezone.utc)
+
+        async with self.session_factory() as session:
+            blob = await session.get(ArtifactBlob, digest)
+            if blob and blob.backend == self.backend.name and blob.ref_count != DELETING_REF_COUNT:
+                # Touching last_used_at keeps the collector off a blob that is about to be referenced
+                blob.last_used_at = now
+                session.add(blob)
+                await session.commit()
+                logger.info(f"Reusing stored {kind.upper()} {digest[:12]} for task {task_id} ({blob.size_bytes} bytes not uploaded)")
+                return StoredArtifact(digest, blob.url)
+
+        key = storage_key(kind, digest)
+        url = await self.uploads.upload(file_path, key, kind, task_id)
+        if not url:
+            return None
+
+        size_bytes = await asyncio.to_thread(os.path.getsize, file_path)
+        async with self.session_factory() as session:
+            blob = await session.get(ArtifactBlob, digest)
+            if blob:
+                # Stored by another backend before, by a concurrent store() of the same content,
+                # or being collected: the new upload revives it
+                blob.backend, blob.storage_key, blob.url, blob.last_used_at = self.backend.name, key, url, now
+                blob.ref_count = max(blob.ref_count, 0)
+            else:
+                blob = ArtifactBlob(
+                    digest=digest, kind=kind, backend=self.backend.name, storage_key=key, url=url, size_bytes=size_bytes
+                )
+            session.add(blob)
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                logger.info(f"{kind.upper()} {digest[:12]} was recorded concurrently for task {task_id}")
+        return StoredArtifact(digest, url)
+
+    async def collect_garbage(self, grace_seconds: float = ARTIFACT_GC_GRACE_SECONDS, limit: int = ARTIFACT_GC_BATCH_SIZE) -> List[str]:
+        """Deletes unreferenced blobs unused for grace_seconds from storage and the table. Returns their digests.
+
+        A blob is first marked as being deleted, then removed from storage, and
+        its row is deleted only once that succeeded; a blob whose storage
+        delete failed stays marked and is retried on the next run.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+        unreferenced = (ArtifactBlob.ref_count <= 0, ArtifactBlob.last_used_at < cutoff)
+
+        async with self.session_factory() as session:
+            blobs = (await session.exec(select(ArtifactBlob).where(*unreferenced).limit(limit))).all()
+
+        collected = []
+        for blob in blobs:
+            if blob.backend != self.backend.name:
+                logger.warning(f"Skipping blob {blob.digest[:12]} stored on {blob.backend}; only {self.backend.name} is configured")
+                continue
+            async with self.session_factory() as session:
+                # Re-checked in the UPDATE so a blob referenced meanwhile survives
+                marked = await session.execute(
+                    update(ArtifactBlob)
+                    .where(ArtifactBlob.digest == blob.digest, *unreferenced)
+                    .values(ref_count=DELETING_REF_COUNT)
+                )
+                await session.commit()
+            if marked.rowcount != 1:
+                continue
+            try:
+                await asyncio.to_thread(self.backend.delete, blob.storage_key, blob.kind)
+            except Exception as e:
+                logger.error(f"Failed to delete blob {blob.storage_key} from {blob.backend}: {str(e)}")
+                continue
+            async with self.session_factory() as session:
+                removed = await session.execute(
+                    delete(ArtifactBlob).where(
+                        ArtifactBlob.digest == blob.digest, ArtifactBlob.ref_count == DELETING_REF_COUNT
+                    )
+                )
+                await session.commit()
+            if removed.rowcount == 1:
+                collected.append(blob.digest)
+
+        if collected:
+            freed = sum(blob.size_bytes for blob in blobs if blob.digest in collected)
+            logger.info(f"Artifact garbage collection removed {len(collected)} blob(s), {freed} bytes")
+        return collected
+
+
+def prune_recordings(directory: str = RECORDINGS_DIR, max_age_hours: float = RECORDING_RETENTION_HOURS) -> int:
+    """Deletes browser recordings older than max_age_hours, including those in per-task
+    subdirectories, and removes subdirectories left empty. Returns how many files were removed.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for root, _, files in os.walk(directory, topdown=False):
+        pruned_here = 0
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    pruned_here += 1
+            except OSError as e:
+                logger.warning(f"Failed to prune recording {path}: {e}")
+        removed += pruned_here
+        if root == directory:
+            continue
+        try:
+            # A directory a running task just created is empty too; it goes only once it is old or we emptied it
+            if not os.listdir(root) and (pruned_here or os.stat(root).st_mtime < cutoff):
+                os.rmdir(root)
+        except OSError as e:
+            logger.warning(f"Failed to remove empty recording directory {root}: {e}")
+    if removed:
+        logger.info(f"Pruned {removed} recording(s) older than {max_age_hours}h from {directory}")
+    return removed
+
+
+class ArtifactGarbageCollector:
+    def __init__(self, store: Optional[ArtifactStore] = None, interval: float = ARTIFACT_GC_INTERVAL_SECONDS):
+        self.store = store or artifact_store
+        self.interval = interval
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._loop_task is not None and not self._loop_task.done():
+            return
+        self._loop_task = asyncio.create_task(self._run_loop())
+        logger.info(f"Artifact garbage collector started (interval={self.interval}s)")
+
+    async def stop(self) -> None:
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+    async def collect(self) -> None:
+        await self.store.collect_garbage()
+        await asyncio.to_thread(prune_recordings)
+
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.error(f"Artifact garbage collection failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+
+artifact_store = ArtifactStore()
+artifact_gc = ArtifactGarbageCollector()
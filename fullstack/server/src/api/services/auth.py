@@ -1,16 +1,21 @@
+import hashlib
 import logging
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.api.config import JWT_ALGORITHM, JWT_EXPIRATION_MINUTES, JWT_SECRET_KEY
+from src.api.config import AUTH_TRUST_TOKEN_CLAIMS, JWT_ALGORITHM, JWT_EXPIRATION_MINUTES, JWT_SECRET_KEY
 from src.api.db.session import get_session
 from src.api.models.token import TokenData
 from src.api.models.user import User
+from src.api.services.principal_cache import principal_cache
 from src.api.services.security import verify_password
 
 logging.basicConfig(level=logging.INFO)
@@ -20,8 +25,8 @@ from src.api.config import API_PREFIX
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{API_PREFIX}/auth/token")
 
 
-def authenticate_user(session: Session, username: str, password: str) -> Optional[User]:
-    user = session.exec(select(User).where(User.username == username)).first()
+async def authenticate_user(session: AsyncSession, username: str, password: str) -> Optional[User]:
+    user = (await session.exec(select(User).where(User.username == username))).first()
     if not user:
         return None
     if not verify_password(password, user.hashed_password):
@@ -36,12 +41,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=JWT_EXPIRATION_MINUTES)
     to_encode.update({"exp": expire})
+    # Token id used as the principal cache key
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)
+    token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,8 +66,20 @@ async def get_current_user(
         logger.error("JWT token validation error")
         raise credentials_exception
     
-    user = session.exec(select(User).where(User.id == user_id)).first()
+    if AUTH_TRUST_TOKEN_CLAIMS:
+        return User(id=token_data.user_id, username=token_data.username, hashed_password="")
+    
+    # Tokens issued before jti was added are keyed by their digest
+    cache_key = payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+    user = principal_cache.get(cache_key)
+    if user is not None:
+        return user
+    
+    user = (await session.exec(select(User).where(User.id == user_id))).first()
     if user is None:
         logger.error(f"User not found: {token_data.username}")
         raise credentials_exception
+    
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    principal_cache.put(cache_key, user, expires_in)
     return user
\ No newline at end of file
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Set
+
+import psutil
+from browser_use.browser.browser import BrowserConfig
+
+from src.api.config import (
+    BROWSER_POOL_HEALTH_CHECK_SECONDS,
+    BROWSER_POOL_MAX_CONTEXTS,
+    BROWSER_POOL_MAX_MEMORY_MB,
+    BROWSER_POOL_PREWARM,
+    BROWSER_POOL_SIZE,
+)
+from src.browser.custom_browser import CustomBrowser
+
+logger = logging.getLogger(__name__)
+
+# Chromium ignores unknown switches; this one lets the pool find a browser's processes
+POOL_MARKER_ARG = "--task-browser-pool-id"
+
+
+class BrowserProfile(NamedTuple):
+    headless: bool = True
+    disable_security: bool = True
+    window_width: int = 1280
+    window_height: int = 720
+
+    def browser_config(self, marker: str) -> BrowserConfig:
+        return BrowserConfig(
+            headless=self.headless,
+            disable_security=self.disable_security,
+            browser_binary_path=None,
+            extra_browser_args=[f"--window-size={self.window_width},{self.window_height}", f"{POOL_MARKER_ARG}={marker}"],
+            wss_url=None,
+            cdp_url=None,
+        )
+
+
+class PooledBrowser:
+    """A launched CustomBrowser plus the bookkeeping the pool recycles it by."""
+
+    def __init__(self, browser: CustomBrowser, profile: BrowserProfile, marker: str):
+        self.browser = browser
+        self.profile = profile
+        self.marker = marker
+        self.contexts_served = 0
+        self.launched_at = time.monotonic()
+        self._process: Optional[psutil.Process] = None
+
+    def is_connected(self) -> bool:
+        playwright_browser = self.browser.playwright_browser
+        return playwright_browser is not None and playwright_browser.is_connected()
+
+    def _find_process(self) -> Optional[psutil.Process]:
+        if self._process is not None and self._process.is_running():
+            return self._process
+        marker_arg = f"{POOL_MARKER_ARG}={self.marker}"
+        matches = [process for process in psutil.process_iter(["cmdline"]) if marker_arg in (process.info["cmdline"] or [])]
+        match_pids = {process.pid for process in matches}
+        for process in matches:
+            # Helper processes may carry the switch too; the browser process is the topmost match
+            if process.ppid() not in match_pids:
+                self._process = process
+                return process
+        return None
+
+    def memory_bytes(self) -> Optional[int]:
+        """Resident memory of the browser process and its renderers, or None if it can't be found."""
+        try:
+            process = self._find_process()
+            if process is None:
+                return None
+            return sum(proc.memory_info().rss for proc in [process, *process.children(recursive=True)])
+        except (psutil.Error, OSError):
+            return None
+
+    async def close(self) -> None:
+        await self.browser.close()
+
+
+async def launch_pooled_browser(profile: BrowserProfile) -> PooledBrowser:
+    marker = uuid.uuid4().hex
+    browser = CustomBrowser(config=profile.browser_config(marker))
+    # Starts Chromium now rather than on the task's first page
+    await browser.get_playwright_browser()
+    return PooledBrowser(browser, profile, marker)
+
+
+BrowserLauncher = Callable[[BrowserProfile], Awaitable[PooledBrowser]]
+
+
+class BrowserPool:
+    """Keeps launched browsers per launch profile so tasks skip the Chromium start-up.
+
+    A task leases a browser exclusively and opens its own fresh context on
+    it; on release the browser goes back to the pool unless it has served
+    ``max_contexts`` contexts, uses more than ``max_memory_mb`` or lost its
+    connection, in which case it is closed. At most ``size`` idle browsers
+    are kept per profile. A background health check closes idle browsers
+    that died or grew too large and launches replacements.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_contexts: int = BROWSER_POOL_MAX_CONTEXTS,
+        max_memory_mb: float = BROWSER_POOL_MAX_MEMORY_MB,
+        health_check_interval: float = BROWSER_POOL_HEALTH_CHECK_SECONDS,
+        prewarm: bool = BROWSER_POOL_PREWARM,
+        launcher: Optional[BrowserLauncher] = None,
+    ):
+        self.size = size
+        self.max_contexts = max_contexts
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.health_check_interval = health_check_interval
+        self.prewarm = prewarm
+        self.launcher = launcher or launch_pooled_browser
+        self._idle: Dict[BrowserProfile, List[PooledBrowser]] = {}
+        self._leased: Set[PooledBrowser] = set()
+        self._closed = False
+        self._loop_task: Optional[asyncio.Task] = None
+        self._refills: Set[asyncio.Task] = set()
+        self.counters: Counter = Counter()
+        self.closed: Counter = Counter()
+        self._acquire_seconds = 0.0
+
+    async def start(self, prewarm_profiles: Optional[List[BrowserProfile]] = None) -> None:
+        """Starts the health check and, unless disabled, warms the given profiles (the default task profile) in the background."""
+        self._closed = False
+        if self.size <= 0:
+            logger.info("Browser pool disabled; tasks launch their own browser")
+            return
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run_loop(prewarm_profiles or [BrowserProfile()]))
+        logger.info(
+            f"Browser pool started (size={self.size}, max_contexts={self.max_contexts}, "
+            f"max_memory_mb={self.max_memory_bytes / 1024 / 1024:.0f})"
+        )
+
+    async def stop(self) -> None:
+        self._closed = True
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        for refill in list(self._refills):
+            refill.cancel()
+        await asyncio.gather(*list(self._refills), return_exceptions=True)
+        idle = [pooled for browsers in self._idle.values() for pooled in browsers]
+        self._idle.clear()
+        await asyncio.gather(*(self._close(pooled, "shutdown") for pooled in idle))
+        logger.info(f"Browser pool stopped; {len(self._leased)} leased browser(s) close when released")
+
+    async def _launch(self, profile: BrowserProfile) -> PooledBrowser:
+        start = time.perf_counter()
+        pooled = await self.launcher(profile)
+        self.counters["launched"] += 1
+        logger.info(f"Launched browser for {profile} in {time.perf_counter() - start:.2f}s")
+        return pooled
+
+    async def _close(self, pooled: PooledBrowser, reason: str) -> None:
+        self.closed[reason] += 1
+        try:
+            await pooled.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser ({reason}): {e}")
+
+    async def _recycle_reason(self, pooled: PooledBrowser) -> Optional[str]:
+        if not pooled.is_connected():
+            return "disconnected"
+        if pooled.contexts_served >= self.max_contexts:
+            return "max_contexts"
+        # Finding the process scans the process table the first time; keep it off the event loop
+        memory = await asyncio.to_thread(pooled.memory_bytes)
+        if memory is not None and memory > self.max_memory_bytes:
+            return "memory"
+        return None
+
+    async def acquire(self, profile: BrowserProfile) -> PooledBrowser:
+        """Leases a warm browser for the profile, launching one if none is idle."""
+        start = time.perf_counter()
+        idle = self._idle.get(profile, [])
+        pooled = None
+        while idle:
+            candidate = idle.pop()
+            if candidate.is_connected():
+                pooled = candidate
+                self.counters["reused"] += 1
+                break
+            await self._close(candidate, "disconnected")
+        if pooled is None:
+            pooled = await self._launch(profile)
+            self.counters["cold_starts"] += 1
+        self._leased.add(pooled)
+        self._acquire_seconds += time.perf_counter() - start
+        return pooled
+
+    async def release(self, pooled: PooledBrowser) -> None:
+        """Returns a leased browser; its task must have closed its context already."""
+        self._leased.discard(pooled)
+        pooled.contexts_served += 1
+        reason = "shutdown" if self._closed else await self._recycle_reason(pooled)
+        idle = self._idle.setdefault(pooled.profile, [])
+        if reason is None and len(idle) >= self.size:
+            reason = "pool_full"
+        if reason:
+            await self._close(pooled, reason)
+            if reason in ("disconnected", "max_contexts", "memory") and not self._closed:
+                refill = asyncio.create_task(self.fill(pooled.profile))
+                self._refills.add(refill)
+                refill.add_done_callback(self._refills.discard)
+        else:
+            idle.append(pooled)
+
+    async def fill(self, profile: BrowserProfile) -> int:
+        """Launches browsers until the profile has ``size`` idle ones. Returns how many were launched."""
+        launched = 0
+        while not self._closed and len(self._idle.get(profile, [])) < self.size:
+            try:
+                pooled = await self._launch(profile)
+            except Exception as e:
+                logger.error(f"Failed to launch pooled browser for {profile}: {e}")
+                break
+            self._idle.setdefault(profile, []).append(pooled)
+            launched += 1
+        return launched
+
+    async def check_health(self) -> int:
+        """Closes idle browsers that should be recycled and refills their profiles. Returns how many were closed."""
+        closed = 0
+        for profile, idle in list(self._idle.items()):
+            profile_closed = 0
+            for pooled in list(idle):
+                reason = await self._recycle_reason(pooled)
+                if reason:
+                    idle.remove(pooled)
+                    await self._close(pooled, reason)
+                    profile_closed += 1
+            if profile_closed:
+                await self.fill(profile)
+            closed += profile_closed
+        return closed
+
+    async def _run_loop(self, prewarm_profiles: List[BrowserProfile]) -> None:
+        if self.prewarm:
+            for profile in prewarm_profiles:
+                await self.fill(profile)
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"Browser pool health check failed: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, object]:
+        acquisitions = self.counters["reused"] + self.counters["cold_starts"]
+        return {
+            "size": self.size,
+            "leased": len(self._leased),
+            "idle": {
+                f"{'headless' if profile.headless else 'headful'}-{profile.window_width}x{profile.window_height}"
+                f"{'-insecure' if profile.disable_security else ''}": len(idle)
+                for profile, idle in self._idle.items()
+            },
+            "hit_rate": round(self.counters["reused"] / acquisitions, 3) if acquisitions else None,
+            "mean_acquire_seconds": round(self._acquire_seconds / acquisitions, 3) if acquisitions else None,
+            "launched": self.counters["launched"],
+            "reused": self.counters["reused"],
+            "cold_starts": self.counters["cold_starts"],
+            "closed": dict(self.closed),
+        }
+
+
+browser_pool = BrowserPool()
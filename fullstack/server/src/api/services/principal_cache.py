@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set
+
+from sqlalchemy import event
+
+from src.api.config import AUTH_PRINCIPAL_CACHE_SIZE, AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+from src.api.models.user import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _Entry(NamedTuple):
+    user: User
+    expires_at: float
+
+
+class PrincipalCache:
+    """LRU cache of resolved users keyed by token id, so polling clients skip the users lookup.
+
+    Entries live for at most ``ttl_seconds`` and never past the token's own
+    expiry. Updating or deleting a User through the ORM invalidates that
+    user's entries in this process; other processes catch up within the TTL.
+    Cached users are detached instances and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_size: int = AUTH_PRINCIPAL_CACHE_SIZE,
+        ttl_seconds: float = AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        # Mapper events can fire from sync sessions in worker threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.user
+
+    def put(self, key: str, user: User, token_expires_in: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if token_expires_in is None else min(self.ttl_seconds, token_expires_in)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(user, self._clock() + ttl)
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> int:
+        with self._lock:
+            keys = list(self._keys_by_user.get(user_id, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached principal(s) for user {user_id}")
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry.user.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry.user.id]
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.id)
@@ -1,16 +1,18 @@
+import asyncio
 import logging
 from typing import Dict, Any
 
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.api.models.result import Result
+from src.api.services.artifact_store import release_result_artifacts
 from src.api.services.cloudinary_service import cloudinary_service
 
 logger = logging.getLogger(__name__)
 
 
-def delete_result_with_files(task_id: int, session: Session) -> Dict[str, Any]:
+async def delete_result_with_files(task_id: int, session: AsyncSession) -> Dict[str, Any]:
     operation_result = {
         "success": False,
         "result_found": False,
@@ -23,7 +25,7 @@ def delete_result_with_files(task_id: int, session: Session) -> Dict[str, Any]:
     try:
         logger.info(f"Starting result deletion process for task {task_id}")
         
-        result = session.get(Result, task_id)
+        result = await session.get(Result, task_id)
         if not result:
             logger.info(f"No result found for task {task_id} - nothing to delete")
             operation_result["success"] = True
@@ -32,34 +34,41 @@ def delete_result_with_files(task_id: int, session: Session) -> Dict[str, Any]:
         operation_result["result_found"] = True
         logger.info(f"Found result record for task {task_id}")
         
-        logger.info(f"Deleting Cloudinary files for task {task_id}")
-        file_deletion_results = cloudinary_service.delete_task_files(task_id)
-        
-        if file_deletion_results["errors"]:
-            error_msg = f"Some files could not be deleted from Cloudinary for task {task_id}"
-            logger.warning(f"{error_msg}: {file_deletion_results['errors']}")
-            operation_result["warnings"].extend(file_deletion_results["errors"])
-        
-        operation_result["files_deleted"] = (
-            file_deletion_results["gif_deleted"] or 
-            file_deletion_results["script_deleted"] or 
-            not file_deletion_results["errors"]
-        )
-        
-        if operation_result["files_deleted"]:
-            logger.info(f"Successfully processed Cloudinary file deletion for task {task_id}")
+        if result.gif_digest or result.script_digest:
+            # Content-addressed blobs may be shared with other results; the artifact
+            # collector deletes them once nothing references them any more
+            released = await session.run_sync(lambda sync_session: release_result_artifacts(sync_session, result))
+            operation_result["files_deleted"] = True
+            logger.info(f"Released {released} stored artifact(s) for task {task_id}")
+        else:
+            logger.info(f"Deleting Cloudinary files for task {task_id}")
+            file_deletion_results = await asyncio.to_thread(cloudinary_service.delete_task_files, task_id)
+            
+            if file_deletion_results["errors"]:
+                error_msg = f"Some files could not be deleted from Cloudinary for task {task_id}"
+                logger.warning(f"{error_msg}: {file_deletion_results['errors']}")
+                operation_result["warnings"].extend(file_deletion_results["errors"])
+            
+            operation_result["files_deleted"] = (
+                file_deletion_results["gif_deleted"] or 
+                file_deletion_results["script_deleted"] or 
+                not file_deletion_results["errors"]
+            )
+            
+            if operation_result["files_deleted"]:
+                logger.info(f"Successfully processed Cloudinary file deletion for task {task_id}")
         
         try:
             logger.info(f"Deleting result record from database for task {task_id}")
-            session.delete(result)
-            session.commit()
+            await session.delete(result)
+            await session.commit()
             operation_result["database_deleted"] = True
             logger.info(f"Successfully deleted result record for task {task_id}")
         except SQLAlchemyError as e:
             error_msg = f"Database error when deleting result for task {task_id}: {str(e)}"
             logger.error(error_msg)
             operation_result["errors"].append(error_msg)
-            session.rollback()
+            await session.rollback()
             return operation_result
         
         operation_result["success"] = True
@@ -70,7 +79,7 @@ def delete_result_with_files(task_id: int, session: Session) -> Dict[str, Any]:
         logger.error(error_msg)
         operation_result["errors"].append(error_msg)
         try:
-            session.rollback()
+            await session.rollback()
         except Exception as rollback_error:
             logger.error(f"Error during rollback for task {task_id}: {rollback_error}")
     
@@ -97,7 +106,7 @@ def cleanup_orphaned_files(task_id: int) -> Dict[str, Any]:
     return cleanup_result
 
 
-def get_result_file_status(task_id: int, session: Session) -> Dict[str, Any]:
+async def get_result_file_status(task_id: int, session: AsyncSession) -> Dict[str, Any]:
     status = {
         "result_exists": False,
         "has_gif_url": False,
@@ -107,7 +116,7 @@ def get_result_file_status(task_id: int, session: Session) -> Dict[str, Any]:
     }
     
     try:
-        result = session.get(Result, task_id)
+        result = await session.get(Result, task_id)
         if result:
             status["result_exists"] = True
             status["has_gif_url"] = result.result_gif is not None
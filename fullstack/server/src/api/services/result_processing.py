@@ -1,210 +1,228 @@
+import asyncio
 import os
 import logging
-import tempfile
-from typing import Optional, Tuple
+from typing import Dict, Optional, Set, Tuple
 
 from sqlmodel import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
-from src.api.db.session import engine
+from src.api.config import AGENT_HISTORY_DIR, RESULT_PIPELINE_CONCURRENCY
+from src.api.db.session import async_session_factory, engine
 from src.api.models.result import Result
+from src.api.services.artifact_store import StoredArtifact, artifact_store, assign_result_artifacts
+from src.api.services.artifact_storage import ARTIFACT_KINDS
 from src.api.services.cloudinary_service import cloudinary_service
-from src.api.services.script_conversion_service import convert_agent_history_to_script
+from src.api.services.script_conversion_service import convert_agent_history_to_script, task_scratch_dir
+from src.api.services.task_events import recording_event, task_event_bus
 
 logger = logging.getLogger(__name__)
 
+# Recordings still encoding/uploading after their task's result was processed; held so they are not garbage collected
+_recording_publishes: Set[asyncio.Task] = set()
 
-async def create_task_result(task_id: int, gif_path: Optional[str] = None) -> bool:
+# One semaphore per event loop; conversion launches a browser, so only a few run at once
+_pipeline_slots: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+
+def _get_pipeline_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _pipeline_slots.get(loop)
+    if slots is None:
+        for stale_loop in [known for known in _pipeline_slots if known.is_closed()]:
+            del _pipeline_slots[stale_loop]
+        slots = _pipeline_slots[loop] = asyncio.Semaphore(RESULT_PIPELINE_CONCURRENCY)
+    return slots
+
+
+async def _convert_script(task_id: int, agent_history_path: str) -> Optional[str]:
+    if not os.path.exists(agent_history_path):
+        logger.info(f"No agent history JSON found for task {task_id} at {agent_history_path}")
+        return None
+    
+    logger.info(f"Agent history JSON found for task {task_id}: {agent_history_path}")
     try:
-        logger.info(f"Starting result processing for task {task_id}")
-        
-        if not isinstance(task_id, int) or task_id <= 0:
-            logger.error(f"Invalid task_id provided: {task_id}")
-            return False
-        
-        if gif_path is None:
-            gif_path = f"./tmp/agent_history/task_{task_id}/task_{task_id}.gif"
-            logger.debug(f"Using default GIF path for task {task_id}: {gif_path}")
-        
-        result_gif_url = None
-        result_json_url = None
-        gif_upload_attempted = False
-        gif_upload_successful = False
-        script_upload_attempted = False
-        script_upload_successful = False
+        logger.info(f"Converting agent history to script for task {task_id}")
+        script_content = await convert_agent_history_to_script(agent_history_path, task_id)
+        if script_content:
+            logger.info(f"Successfully converted agent history to script for task {task_id}")
+        else:
+            logger.warning(f"Failed to convert agent history to script for task {task_id}")
+        return script_content
+    except Exception as e:
+        logger.error(f"Error during script conversion for task {task_id}: {str(e)}")
+        logger.error(f"Script conversion error details: {type(e).__name__}: {str(e)}")
+        return None
+
+
+def _write_script(script_path: str, script_content: str) -> None:
+    with open(script_path, 'w', encoding='utf-8') as script_file:
+        script_file.write(script_content)
+
+
+async def _upload_script(task_id: int, script_content: str) -> Optional[StoredArtifact]:
+    # The artifact store uploads from a file; it only lives in the task's scratch directory
+    with task_scratch_dir(os.path.join(AGENT_HISTORY_DIR, f"task_{task_id}"), task_id) as scratch_dir:
+        script_path = os.path.join(scratch_dir, f"task_{task_id}_script.py")
+        try:
+            await asyncio.to_thread(_write_script, script_path, script_content)
+        except Exception as e:
+            logger.error(f"Error writing script for upload for task {task_id}: {str(e)}")
+            return None
         
-        if not cloudinary_service.is_available():
-            reason = cloudinary_service.get_unavailability_reason()
-            logger.warning(f"Cloudinary service unavailable for task {task_id}: {reason}")
-            logger.info(f"Proceeding with result creation without file upload for task {task_id}")
+        try:
+            return await artifact_store.store(script_path, "script", task_id)
+        except Exception as e:
+            logger.error(f"Error during script upload for task {task_id}: {str(e)}")
+            logger.error(f"Script upload error details: {type(e).__name__}: {str(e)}")
+            return None
+
+
+def recording_kind(recording_path: str) -> str:
+    """Artifact kind of an agent recording from its extension (gif, webp or mp4)."""
+    kind = os.path.splitext(recording_path)[1].lstrip(".").lower()
+    return kind if kind in ARTIFACT_KINDS else "gif"
+
+
+async def _upload_gif(task_id: int, gif_path: str) -> Optional[StoredArtifact]:
+    try:
+        stored_gif = await artifact_store.store(gif_path, recording_kind(gif_path), task_id)
+    except Exception as e:
+        logger.error(f"Error during GIF upload for task {task_id}: {str(e)}")
+        logger.error(f"Upload error details: {type(e).__name__}: {str(e)}")
+        return None
+    
+    if stored_gif:
+        cleanup_success = await asyncio.to_thread(cloudinary_service.delete_local_file, gif_path, task_id)
+        if not cleanup_success:
+            logger.warning(f"Failed to delete local GIF file for task {task_id}, but upload was successful")
+            logger.warning(f"Manual cleanup may be required for: {gif_path}")
+    else:
+        logger.error(f"Failed to upload GIF for task {task_id}, keeping local file")
+    return stored_gif
+
+
+async def _save_result(task_id: int, **artifacts: Optional[StoredArtifact]) -> bool:
+    """Creates or updates the task's result; artifact kinds not passed keep their current value."""
+    try:
+        logger.info(f"Creating/updating result record for task {task_id}")
         
-        agent_history_path = f"./tmp/agent_history/task_{task_id}/task_{task_id}.json"
-        if os.path.exists(agent_history_path):
-            logger.info(f"Agent history JSON found for task {task_id}: {agent_history_path}")
+        async with async_session_factory() as session:
+            existing_result = await session.get(Result, task_id)
+            result = existing_result or Result(task_id=task_id)
+            old_gif_url, old_json_url = result.result_gif, result.result_json_url
             
-            try:
-                logger.info(f"Converting agent history to script for task {task_id}")
-                script_content = await convert_agent_history_to_script(agent_history_path, task_id)
-                
-                if script_content:
-                    logger.info(f"Successfully converted agent history to script for task {task_id}")
-                    
-                    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
-                        temp_file.write(script_content)
-                        temp_script_path = temp_file.name
-                    
-                    logger.debug(f"Temporary script file created for task {task_id}: {temp_script_path}")
-                    
-                    if cloudinary_service.is_available():
-                        script_upload_attempted = True
-                        logger.info(f"Attempting Cloudinary script upload for task {task_id}")
-                        
-                        try:
-                            result_json_url = cloudinary_service.upload_script(temp_script_path, task_id)
-                            
-                            if result_json_url:
-                                script_upload_successful = True
-                                logger.info(f"Successfully uploaded script for task {task_id}: {result_json_url}")
-                            else:
-                                logger.error(f"Failed to upload script for task {task_id}")
-                                
-                        except Exception as e:
-                            logger.error(f"Error during script upload for task {task_id}: {str(e)}")
-                            logger.error(f"Script upload error details: {type(e).__name__}: {str(e)}")
-                    else:
-                        logger.info(f"Skipping script upload for task {task_id} - Cloudinary service unavailable")
-                    
-                    try:
-                        os.unlink(temp_script_path)
-                        logger.debug(f"Cleaned up temporary script file for task {task_id}")
-                    except Exception as e:
-                        logger.warning(f"Failed to clean up temporary script file for task {task_id}: {str(e)}")
-                        
-                else:
-                    logger.warning(f"Failed to convert agent history to script for task {task_id}")
-                    
-            except Exception as e:
-                logger.error(f"Error during script conversion for task {task_id}: {str(e)}")
-                logger.error(f"Script conversion error details: {type(e).__name__}: {str(e)}")
-        else:
-            logger.info(f"No agent history JSON found for task {task_id} at {agent_history_path}")
-        
-        if os.path.exists(gif_path):
-            logger.info(f"GIF file found for task {task_id}: {gif_path}")
+            # Moves the blob references from the previous artifacts to the new ones
+            await session.run_sync(lambda sync_session: assign_result_artifacts(sync_session, result, **artifacts))
+            session.add(result)
             
-            try:
-                file_size = os.path.getsize(gif_path)
-                if file_size == 0:
-                    logger.warning(f"GIF file is empty for task {task_id}: {gif_path}")
-                else:
-                    logger.debug(f"GIF file size for task {task_id}: {file_size} bytes")
-                    
-                    if cloudinary_service.is_available():
-                        gif_upload_attempted = True
-                        logger.info(f"Attempting Cloudinary GIF upload for task {task_id}")
-                        
-                        try:
-                            result_gif_url = cloudinary_service.upload_gif(gif_path, task_id)
-                            
-                            if result_gif_url:
-                                gif_upload_successful = True
-                                logger.info(f"Successfully uploaded GIF for task {task_id}: {result_gif_url}")
-                                
-                                cleanup_success = cloudinary_service.delete_local_file(gif_path, task_id)
-                                if not cleanup_success:
-                                    logger.warning(f"Failed to delete local GIF file for task {task_id}, but upload was successful")
-                                    logger.warning(f"Manual cleanup may be required for: {gif_path}")
-                            else:
-                                logger.error(f"Failed to upload GIF for task {task_id}, keeping local file")
-                                
-                        except Exception as e:
-                            logger.error(f"Error during GIF upload for task {task_id}: {str(e)}")
-                            logger.error(f"Upload error details: {type(e).__name__}: {str(e)}")
-                    else:
-                        logger.info(f"Skipping GIF upload for task {task_id} - Cloudinary service unavailable")
-                        
-            except Exception as e:
-                logger.error(f"Error validating GIF file for task {task_id}: {str(e)}")
-                
-        else:
-            logger.info(f"No GIF file found for task {task_id} at {gif_path}")
-        
-        database_success = False
+            if existing_result:
+                logger.info(f"Updated existing result record for task {task_id}")
+                if old_gif_url != result.result_gif:
+                    logger.info(f"GIF URL changed for task {task_id}: {old_gif_url} -> {result.result_gif}")
+                if old_json_url != result.result_json_url:
+                    logger.info(f"Script URL changed for task {task_id}: {old_json_url} -> {result.result_json_url}")
+            else:
+                logger.info(f"Created new result record for task {task_id}")
+            
+            await session.commit()
+            logger.info(f"Successfully saved result record for task {task_id}")
+            return True
+            
+    except IntegrityError as e:
+        logger.error(f"Database integrity error for task {task_id}: {str(e)}")
+        logger.error("This may indicate a foreign key constraint violation")
+    except SQLAlchemyError as e:
+        logger.error(f"Database error when creating result for task {task_id}: {str(e)}")
+    except Exception as e:
+        logger.error(f"Unexpected database error for task {task_id}: {str(e)}")
+    return False
+
+
+async def create_task_result(task_id: int, gif_path: Optional[str] = None, recording_pending: bool = False) -> bool:
+    """Converts, uploads and records a finished task's result.
+
+    Each stage is awaited on the caller's loop with blocking work in threads,
+    and at most RESULT_PIPELINE_CONCURRENCY results are processed at once.
+    With recording_pending the GIF stage is skipped; the recording is still
+    encoding and publish_recording attaches it afterwards.
+    """
+    if not isinstance(task_id, int) or task_id <= 0:
+        logger.error(f"Invalid task_id provided: {task_id}")
+        return False
+    
+    slots = _get_pipeline_slots()
+    if slots.locked():
+        logger.info(f"Result processing for task {task_id} is waiting for a free pipeline slot")
+    
+    async with slots:
         try:
-            logger.info(f"Creating/updating result record for task {task_id}")
+            logger.info(f"Starting result processing for task {task_id}")
             
-            with Session(engine) as session:
-                existing_result = session.get(Result, task_id)
-                
-                if existing_result:
-                    old_gif_url = existing_result.result_gif
-                    old_json_url = existing_result.result_json_url
-                    existing_result.result_gif = result_gif_url
-                    existing_result.result_json_url = result_json_url
-                    session.add(existing_result)
-                    logger.info(f"Updated existing result record for task {task_id}")
-                    if old_gif_url != result_gif_url:
-                        logger.info(f"GIF URL changed for task {task_id}: {old_gif_url} -> {result_gif_url}")
-                    if old_json_url != result_json_url:
-                        logger.info(f"Script URL changed for task {task_id}: {old_json_url} -> {result_json_url}")
-                else:
-                    result = Result(
-                        task_id=task_id,
-                        result_gif=result_gif_url,
-                        result_json_url=result_json_url
-                    )
-                    session.add(result)
-                    logger.info(f"Created new result record for task {task_id}")
-                
-                session.commit()
-                database_success = True
-                logger.info(f"Successfully saved result record for task {task_id}")
+            task_dir = os.path.join(AGENT_HISTORY_DIR, f"task_{task_id}")
+            if gif_path is None:
+                gif_path = os.path.join(task_dir, f"task_{task_id}.gif")
+                logger.debug(f"Using default GIF path for task {task_id}: {gif_path}")
+            
+            upload_available = artifact_store.is_available()
+            if not upload_available:
+                reason = artifact_store.unavailability_reason()
+                logger.warning(f"Upload backend unavailable for task {task_id}: {reason}")
+                logger.info(f"Proceeding with result creation without file upload for task {task_id}")
+            
+            # The GIF doesn't depend on the script, so it uploads while conversion runs
+            gif_upload = None
+            if recording_pending:
+                logger.info(f"Recording for task {task_id} is still encoding; it is attached when ready")
+            elif not os.path.exists(gif_path):
+                logger.info(f"No GIF file found for task {task_id} at {gif_path}")
+            elif upload_available:
+                logger.info(f"GIF file found for task {task_id}: {gif_path}")
+                gif_upload = asyncio.create_task(_upload_gif(task_id, gif_path))
+            else:
+                logger.info(f"Skipping GIF upload for task {task_id} - upload backend unavailable")
+            
+            try:
+                script_content = await _convert_script(task_id, os.path.join(task_dir, f"task_{task_id}.json"))
                 
-        except IntegrityError as e:
-            logger.error(f"Database integrity error for task {task_id}: {str(e)}")
-            logger.error("This may indicate a foreign key constraint violation")
-            return False
-        except SQLAlchemyError as e:
-            logger.error(f"Database error when creating result for task {task_id}: {str(e)}")
-            return False
+                stored_script = None
+                script_upload_attempted = bool(script_content) and upload_available
+                if script_upload_attempted:
+                    stored_script = await _upload_script(task_id, script_content)
+                elif script_content:
+                    logger.info(f"Skipping script upload for task {task_id} - upload backend unavailable")
+            finally:
+                stored_gif = await gif_upload if gif_upload else None
+            
+            artifacts = {"script": stored_script}
+            if not recording_pending:
+                artifacts["gif"] = stored_gif
+            database_success = await _save_result(task_id, **artifacts)
+            result_gif_url = stored_gif.url if stored_gif else None
+            result_json_url = stored_script.url if stored_script else None
+            
+            _log_result_processing_summary(task_id, gif_upload is not None, bool(result_gif_url), script_upload_attempted, bool(result_json_url), database_success, result_gif_url, result_json_url)
+            
+            logger.info(f"Result processing completed for task {task_id}")
+            return database_success
+            
         except Exception as e:
-            logger.error(f"Unexpected database error for task {task_id}: {str(e)}")
+            logger.error(f"Critical error during result processing for task {task_id}: {str(e)}")
+            logger.error(f"Error type: {type(e).__name__}")
             return False
-        
-        _log_result_processing_summary(task_id, gif_upload_attempted, gif_upload_successful, script_upload_attempted, script_upload_successful, database_success, result_gif_url, result_json_url)
-        
-        logger.info(f"Result processing completed for task {task_id}")
-        return database_success
-        
-    except Exception as e:
-        logger.error(f"Critical error during result processing for task {task_id}: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
-        return False
 
 
-def process_task_result_safe(task_id: int, gif_path: Optional[str] = None) -> None:
-    import asyncio
-    
+async def process_task_result(task_id: int, gif_path: Optional[str] = None, recording_pending: bool = False) -> bool:
+    """Runs create_task_result and never raises, so result errors can't change the task's status."""
     try:
         logger.info(f"Starting safe result processing for task {task_id}")
-        
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, create_task_result(task_id, gif_path))
-                    success = future.result()
-            else:
-                success = loop.run_until_complete(create_task_result(task_id, gif_path))
-        except RuntimeError:
-            success = asyncio.run(create_task_result(task_id, gif_path))
+        success = await create_task_result(task_id, gif_path, recording_pending)
         
         if success:
             logger.info(f"Result processing completed successfully for task {task_id}")
         else:
             logger.warning(f"Result processing failed for task {task_id}")
             logger.warning("Task completion status remains unaffected by result processing failure")
+        return success
             
     except Exception as e:
         logger.error(f"Critical error in safe result processing for task {task_id}: {str(e)}")
@@ -213,6 +231,65 @@ def process_task_result_safe(task_id: int, gif_path: Optional[str] = None) -> No
         
         if gif_path:
             logger.error(f"GIF path involved: {gif_path}")
+        return False
+
+
+async def publish_recording(task_id: int, recording_job: "asyncio.Future") -> bool:
+    """Waits for a recording queued on the encoder pool, uploads it and points the task's result at it.
+
+    Called after process_task_result(recording_pending=True), so neither the
+    task's status nor its script wait for encoding. Ends with a recording
+    event either way, since the result event told subscribers to wait for
+    it. Never raises.
+    """
+    try:
+        report = await recording_job
+    except Exception as e:
+        logger.error(f"Recording encoding failed for task {task_id}: {type(e).__name__}: {e}")
+        report = {}
+    saved = False
+    stored_recording = None
+    try:
+        recording_path = report.get("path")
+        if not recording_path or not os.path.exists(recording_path):
+            logger.info(f"No recording produced for task {task_id}")
+        elif artifact_store.is_available():
+            logger.info(f"Recording for task {task_id} encoded in {report.get('seconds')}s ({report.get('bytes')} bytes): {recording_path}")
+            stored_recording = await _upload_gif(task_id, recording_path)
+        else:
+            logger.info(f"Skipping recording upload for task {task_id} - upload backend unavailable")
+        saved = await _save_result(task_id, gif=stored_recording)
+    except Exception as e:
+        logger.error(f"Error publishing recording for task {task_id}: {type(e).__name__}: {e}")
+    url = stored_recording.url if saved and stored_recording else None
+    await task_event_bus.publish(recording_event(task_id, url))
+    return saved
+
+
+def publish_recording_later(task_id: int, recording_job: Optional["asyncio.Future"]) -> None:
+    """Runs publish_recording in the background; the caller's task finishes without waiting for encoding."""
+    if recording_job is None:
+        return
+    publish = asyncio.create_task(publish_recording(task_id, recording_job))
+    _recording_publishes.add(publish)
+    publish.add_done_callback(_recording_publishes.discard)
+
+
+async def wait_for_recording_publishes() -> None:
+    """Lets recordings still being published finish, e.g. before the process exits."""
+    if _recording_publishes:
+        logger.info(f"Waiting for {len(_recording_publishes)} recording(s) to finish publishing")
+        await asyncio.gather(*_recording_publishes, return_exceptions=True)
+
+
+def process_task_result_safe(task_id: int, gif_path: Optional[str] = None) -> None:
+    """Blocking entry point for scripts without an event loop; async code awaits process_task_result."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(process_task_result(task_id, gif_path))
+        return
+    logger.error(f"process_task_result_safe called inside a running event loop for task {task_id}; await process_task_result instead")
 
 
 def get_gif_path_for_task(task_id: int) -> str:
@@ -220,7 +297,7 @@ def get_gif_path_for_task(task_id: int) -> str:
         logger.warning(f"Invalid task_id provided to get_gif_path_for_task: {task_id}")
         return ""
     
-    path = f"./tmp/agent_history/task_{task_id}/task_{task_id}.gif"
+    path = os.path.join(AGENT_HISTORY_DIR, f"task_{task_id}", f"task_{task_id}.gif")
     logger.debug(f"Generated GIF path for task {task_id}: {path}")
     return path
 
@@ -283,11 +360,11 @@ def _log_result_processing_summary(
 def validate_result_processing_environment() -> Tuple[bool, list]:
     issues = []
     
-    if not cloudinary_service.is_available():
-        reason = cloudinary_service.get_unavailability_reason()
-        issues.append(f"Cloudinary service unavailable: {reason}")
+    if not artifact_store.is_available():
+        reason = artifact_store.unavailability_reason()
+        issues.append(f"Upload backend unavailable: {reason}")
     
-    base_dir = "./tmp/agent_history"
+    base_dir = AGENT_HISTORY_DIR
     if not os.path.exists(base_dir):
         issues.append(f"Agent history directory does not exist: {base_dir}")
     elif not os.access(base_dir, os.W_OK):
@@ -1,6 +1,6 @@
 import logging
 from typing import Optional
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 
@@ -12,9 +12,9 @@ from src.api.services.task_validation import get_task_or_404, validate_task_owne
 logger = logging.getLogger(__name__)
 
 
-def get_result_or_404(
+async def get_result_or_404(
     task_id: int,
-    session: Session,
+    session: AsyncSession,
 ) -> Result:
     try:
         logger.debug(f"Attempting to retrieve result for task: {task_id}")
@@ -26,7 +26,7 @@ def get_result_or_404(
                 detail="Invalid task ID",
             )
         
-        result = session.get(Result, task_id)
+        result = await session.get(Result, task_id)
         
         if not result:
             logger.warning(f"Result not found for task: {task_id}")
@@ -98,10 +98,10 @@ def validate_task_completed(
         )
 
 
-def validate_result_access(
+async def validate_result_access(
     task_id: int,
     current_user: User,
-    session: Session,
+    session: AsyncSession,
 ) -> tuple[Task, Result]:
     try:
         logger.info(f"Starting result access validation for task {task_id} by user {current_user.id}")
@@ -122,7 +122,7 @@ def validate_result_access(
         
         logger.debug(f"Step 1: Validating task existence for task {task_id}")
         try:
-            task = get_task_or_404(task_id, session)
+            task = await get_task_or_404(task_id, session)
             logger.debug(f"Task {task_id} exists with status: {task.status}")
         except HTTPException as e:
             logger.warning(f"Task validation failed for task {task_id}: {e.detail}")
@@ -164,7 +164,7 @@ def validate_result_access(
         
         logger.debug(f"Step 4: Validating result existence for task {task_id}")
         try:
-            result = get_result_or_404(task_id, session)
+            result = await get_result_or_404(task_id, session)
             logger.debug(f"Result found for task {task_id} with GIF URL: {result.result_gif or 'None'}")
         except HTTPException as e:
             logger.warning(f"Result validation failed for task {task_id}: {e.detail}")
@@ -190,7 +190,7 @@ def validate_result_access(
         )
 
 
-def check_result_exists(task_id: int, session: Session) -> bool:
+async def check_result_exists(task_id: int, session: AsyncSession) -> bool:
     try:
         logger.debug(f"Checking result existence for task: {task_id}")
         
@@ -198,7 +198,7 @@ def check_result_exists(task_id: int, session: Session) -> bool:
             logger.warning(f"Invalid task_id in check_result_exists: {task_id}")
             return False
         
-        result = session.get(Result, task_id)
+        result = await session.get(Result, task_id)
         exists = result is not None
         
         logger.debug(f"Result existence check for task {task_id}: {exists}")
@@ -212,11 +212,11 @@ def check_result_exists(task_id: int, session: Session) -> bool:
         return False
 
 
-def get_result_summary(task_id: int, session: Session) -> Optional[dict]:
+async def get_result_summary(task_id: int, session: AsyncSession) -> Optional[dict]:
     try:
         logger.debug(f"Getting result summary for task: {task_id}")
         
-        result = session.get(Result, task_id)
+        result = await session.get(Result, task_id)
         if not result:
             logger.debug(f"No result found for task {task_id}")
             return None
@@ -2,142 +2,163 @@ import asyncio
 import json
 import logging
 import os
+import shutil
 import tempfile
-from typing import Optional
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+
+from src.api.config import CONVERSION_DEBUG_DIR
+from src.browser.playwright_runtime import playwright_runtime, run_with_playwright_runtime
 
 import sys
-sys.path.append("./socnv")
-from sconv import BW, Ah, Ai
+from pathlib import Path
+# Resolved from this file, not the working directory, so spawned worker processes find it too
+sys.path.append(str(Path(__file__).resolve().parents[3] / "socnv"))
+from sconv import BW, BZ, Ba
 
 logger = logging.getLogger(__name__)
 
+# Same browser setup the generator's own refine step (sconv.Ah) uses
+REFINER_LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-features=IsolateOrigins,site-per-process",
+    "--disable-site-isolation-trials",
+    "--disable-web-security",
+    "--disable-features=BlockInsecurePrivateNetworkRequests",
+]
+REFINER_VIEWPORT = {"width": 1280, "height": 720}
 
-def _cleanup_temp_files(file_paths: list, task_id: int, is_final: bool = False):
-    cleanup_type = "Final" if is_final else "Intermediate"
-    logger.debug(f"{cleanup_type} cleanup for task {task_id}")
-    
-    files_deleted = 0
-    files_failed = 0
-    
-    for temp_file in file_paths:
-        try:
-            if temp_file and os.path.exists(temp_file):
-                os.unlink(temp_file)
-                files_deleted += 1
-                if not is_final:
-                    logger.debug(f"Cleaned up temporary file: {temp_file}")
-        except Exception as e:
-            files_failed += 1
-            logger.warning(f"Failed to clean up temporary file {temp_file}: {e}")
-    
-    if files_deleted > 0 or files_failed > 0:
-        log_level = logger.debug if is_final else logger.info
-        log_level(f"Task {task_id} cleanup: {files_deleted} files deleted, {files_failed} failed")
-    
-    if not is_final:
-        try:
-            import tempfile
-            temp_dir = tempfile.gettempdir()
-            leftover_files = []
-            
-            for filename in os.listdir(temp_dir):
-                if filename.startswith(f'task_{task_id}_') and (
-                    filename.endswith('_parse.json') or 
-                    filename.endswith('_refine.json') or 
-                    filename.endswith('_script.py')
-                ):
-                    file_path = os.path.join(temp_dir, filename)
-                    try:
-                        os.unlink(file_path)
-                        leftover_files.append(filename)
-                    except Exception as e:
-                        logger.warning(f"Failed to clean leftover file {filename}: {e}")
-            
-            if leftover_files:
-                logger.info(f"Cleaned up {len(leftover_files)} leftover files for task {task_id}")
-                
-        except Exception as e:
-            logger.warning(f"Error during leftover file cleanup for task {task_id}: {e}")
 
+def remove_tree_atomically(path: str) -> None:
+    """Renames the directory out of the way first, so it is never seen half-deleted."""
+    trash_path = f"{path}.{uuid.uuid4().hex}.deleted"
+    try:
+        os.replace(path, trash_path)
+    except FileNotFoundError:
+        return
+    shutil.rmtree(trash_path, ignore_errors=True)
 
-async def convert_agent_history_to_script(agent_history_path: str, task_id: int) -> Optional[str]:
-    temp_parse_path = None
-    temp_refine_path = None
-    temp_script_path = None
-    
+
+@contextmanager
+def task_scratch_dir(parent_dir: str, task_id: int) -> Iterator[str]:
+    """Private directory for one task's temporary files, removed as a whole afterwards."""
+    os.makedirs(parent_dir, exist_ok=True)
+    path = tempfile.mkdtemp(prefix=f".task_{task_id}_scratch_", dir=parent_dir)
+    try:
+        yield path
+    finally:
+        remove_tree_atomically(path)
+
+
+def _write_json_atomically(data: Any, path: str) -> None:
+    partial_path = f"{path}.partial"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    os.replace(partial_path, path)
+
+
+def get_refined_actions_path(agent_history_path: str, task_id: int) -> str:
+    return os.path.join(os.path.dirname(agent_history_path), f"task_{task_id}_refined.json")
+
+
+def _persist_refined_actions(refined_actions: List[dict], agent_history_path: str, task_id: int):
+    # Kept beside the history so scripts can be regenerated without re-running the browser
+    refined_actions_path = get_refined_actions_path(agent_history_path, task_id)
+    try:
+        _write_json_atomically(refined_actions, refined_actions_path)
+        logger.info(f"Saved refined action list for task {task_id}: {refined_actions_path}")
+    except Exception as e:
+        logger.warning(f"Failed to save refined action list for task {task_id}: {e}")
+
+
+def _save_debug_artifacts(debug_dir: str, task_id: int, parsed_actions, refined_actions, script_content) -> None:
+    """Writes the intermediate stages to debug_dir/task_<id>, replacing the previous conversion's files."""
+    target = os.path.join(debug_dir, f"task_{task_id}")
+    try:
+        os.makedirs(debug_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".task_{task_id}_staging_", dir=debug_dir)
+        _write_json_atomically(parsed_actions, os.path.join(staging, f"task_{task_id}_parse.json"))
+        if refined_actions is not None:
+            _write_json_atomically(refined_actions, os.path.join(staging, f"task_{task_id}_refine.json"))
+        if script_content is not None:
+            with open(os.path.join(staging, f"task_{task_id}_script.py"), "w", encoding="utf-8") as f:
+                f.write(script_content)
+        remove_tree_atomically(target)
+        os.replace(staging, target)
+        logger.info(f"Saved conversion debug artifacts for task {task_id}: {target}")
+    except Exception as e:
+        logger.warning(f"Failed to save conversion debug artifacts for task {task_id}: {e}")
+
+
+def parse_agent_history(agent_history_path: str) -> List[dict]:
+    _, parsed_actions = BW(agent_history_path)
+    return parsed_actions
+
+
+async def refine_actions(parsed_actions: List[dict]) -> List[dict]:
+    """Replays the parsed actions in a browser and returns them with resolved selectors."""
+    browser = await playwright_runtime.run(
+        lambda playwright: playwright.chromium.launch(headless=False, args=REFINER_LAUNCH_ARGS)
+    )
+    try:
+        context = await browser.new_context(viewport=REFINER_VIEWPORT)
+        page = await context.new_page()
+        refined_actions = await BZ(page, parsed_actions)
+        await asyncio.sleep(2)
+    finally:
+        await browser.close()
+    return refined_actions
+
+
+def generate_script(refined_actions: List[dict]) -> str:
+    return Ba(refined_actions).generate_script_content()
+
+
+async def convert_agent_history_to_script(
+    agent_history_path: str,
+    task_id: int,
+    debug_dir: Optional[str] = CONVERSION_DEBUG_DIR,
+) -> Optional[str]:
+    """Agent history -> parsed actions -> refined actions -> Playwright script, all in memory.
+
+    Only the refined action list is written (beside the history, for
+    regeneration). With debug_dir set, every stage is also saved there.
+    """
+    parsed_actions = refined_actions = script_content = None
     try:
         logger.info(f"Starting full conversion pipeline for: {agent_history_path}")
         
-        temp_parse_file = tempfile.NamedTemporaryFile(mode='w', prefix=f'task_{task_id}_', suffix='_parse.json', delete=False)
-        temp_refine_file = tempfile.NamedTemporaryFile(mode='w', prefix=f'task_{task_id}_', suffix='_refine.json', delete=False)
-        temp_script_file = tempfile.NamedTemporaryFile(mode='w', prefix=f'task_{task_id}_', suffix='_script.py', delete=False)
-        
-        temp_parse_path = temp_parse_file.name
-        temp_refine_path = temp_refine_file.name
-        temp_script_path = temp_script_file.name
-        
-        temp_parse_file.close()
-        temp_refine_file.close()
-        temp_script_file.close()
-        
-        logger.info(f"Created task-specific temporary files:")
-        logger.info(f"  Parse file: {temp_parse_path}")
-        logger.info(f"  Refine file: {temp_refine_path}")
-        logger.info(f"  Script file: {temp_script_path}")
-        
         logger.info("Step 1: Parsing agent history")
-        history, parsed_actions = BW(agent_history_path)
-        
-        with open(temp_parse_path, 'w') as f:
-            json.dump(parsed_actions, f, indent=4)
-        
+        parsed_actions = await asyncio.to_thread(parse_agent_history, agent_history_path)
         logger.info(f"Successfully parsed {len(parsed_actions)} actions from agent history")
         
         logger.info("Step 2: Refining action list")
-        refined_actions = await Ah(temp_parse_path, temp_refine_path)
+        refined_actions = await refine_actions(parsed_actions)
         logger.info(f"Successfully refined action list with {len(refined_actions)} actions")
+        await asyncio.to_thread(_persist_refined_actions, refined_actions, agent_history_path, task_id)
         
         logger.info("Step 3: Generating script")
-        script_generated = Ai(temp_refine_path, temp_script_path)
-        
-        logger.info(f"Script generation returned: {script_generated}")
-        logger.info(f"Temp script file exists: {os.path.exists(temp_script_path)}")
-        if os.path.exists(temp_script_path):
-            logger.info(f"Temp script file size: {os.path.getsize(temp_script_path)} bytes")
+        script_content = await asyncio.to_thread(generate_script, refined_actions)
         
-        if os.path.exists(temp_script_path):
-            try:
-                with open(temp_script_path, 'r', encoding='utf-8') as f:
-                    script_content = f.read()
-                
-                if script_content.strip():
-                    logger.info("Full conversion pipeline completed successfully")
-                    _cleanup_temp_files([temp_parse_path, temp_refine_path, temp_script_path], task_id)
-                    return script_content
-                else:
-                    logger.error("Script file was created but is empty")
-                    _cleanup_temp_files([temp_parse_path, temp_refine_path, temp_script_path], task_id)
-                    return None
-            except Exception as e:
-                logger.error(f"Error reading script file: {e}")
-                _cleanup_temp_files([temp_parse_path, temp_refine_path, temp_script_path], task_id)
-                return None
-        else:
-            logger.error("Script generation failed or file was not created")
-            logger.error(f"Expected script file at: {temp_script_path}")
-            _cleanup_temp_files([temp_parse_path, temp_refine_path, temp_script_path], task_id)
+        if not script_content or not script_content.strip():
+            logger.error("Script generation returned an empty script")
             return None
         
+        logger.info(f"Full conversion pipeline completed successfully ({len(script_content)} characters)")
+        return script_content
+        
     except Exception as e:
         logger.error(f"Error in conversion pipeline: {str(e)}")
         logger.error(f"Error type: {type(e).__name__}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
-        _cleanup_temp_files([temp_parse_path, temp_refine_path, temp_script_path], task_id)
         return None
         
     finally:
-        _cleanup_temp_files([temp_parse_path, temp_refine_path, temp_script_path], task_id, is_final=True)
+        if debug_dir and parsed_actions is not None:
+            await asyncio.to_thread(_save_debug_artifacts, debug_dir, task_id, parsed_actions, refined_actions, script_content)
 
 
 async def main():
@@ -199,5 +220,5 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    asyncio.run(main())
+    asyncio.run(run_with_playwright_runtime(main()))
 
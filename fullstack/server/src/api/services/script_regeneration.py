@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlmodel import Session
+
+from src.api.config import (
+    AGENT_HISTORY_DIR,
+    SCRIPT_REGENERATION_CHUNKSIZE,
+    SCRIPT_REGENERATION_WORKERS,
+)
+from src.api.db.session import engine
+from src.api.models.result import Result
+from src.api.services.artifact_store import StoredArtifact, artifact_store, assign_result_artifacts
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "script_manifest.json"
+# Resolved from this file so regeneration works whatever the API's working directory is
+SOCNV_DIR = Path(__file__).resolve().parents[3] / "socnv"
+GENERATOR_SOURCE_PATH = SOCNV_DIR / "sconv.py"
+REFINED_ACTIONS_PATTERN = re.compile(r"^task_(\d+)_refined\.json$")
+
+
+def _generator_fingerprint() -> str:
+    try:
+        return hashlib.sha256(GENERATOR_SOURCE_PATH.read_bytes()).hexdigest()
+    except OSError as e:
+        logger.warning(f"Could not fingerprint script generator at {GENERATOR_SOURCE_PATH}: {e}")
+        return "unknown"
+
+
+def _input_hash(refined_path: str, fingerprint: str) -> str:
+    digest = hashlib.sha256(fingerprint.encode())
+    with open(refined_path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _regenerate_chunk(jobs: List[Tuple[int, str, str]]) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    # Runs in a worker process; the generator is imported there, not in the API process
+    import sys
+    if str(SOCNV_DIR) not in sys.path:
+        sys.path.append(str(SOCNV_DIR))
+    from sconv import Ba
+
+    results = []
+    for task_id, refined_path, script_path in jobs:
+        try:
+            with open(refined_path, "r", encoding="utf-8") as f:
+                refined_actions = json.load(f)
+            script_content = Ba(refined_actions).generate_script_content()
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(script_content)
+            results.append((task_id, hashlib.sha256(script_content.encode()).hexdigest(), None))
+        except Exception as e:
+            results.append((task_id, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def find_refined_action_lists(base_dir: str = AGENT_HISTORY_DIR) -> List[Tuple[int, str]]:
+    found = []
+    if not os.path.isdir(base_dir):
+        return found
+    for task_dir in sorted(os.listdir(base_dir)):
+        task_path = os.path.join(base_dir, task_dir)
+        if not os.path.isdir(task_path):
+            continue
+        for filename in os.listdir(task_path):
+            match = REFINED_ACTIONS_PATTERN.match(filename)
+            if match:
+                found.append((int(match.group(1)), os.path.join(task_path, filename)))
+    return found
+
+
+def _load_manifest(manifest_path: str) -> Dict[str, Any]:
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable script manifest {manifest_path}: {e}")
+        return {}
+
+
+def _update_result_script(task_id: int, script: StoredArtifact) -> bool:
+    with Session(engine) as session:
+        result = session.get(Result, task_id)
+        if not result:
+            return False
+        assign_result_artifacts(session, result, script=script)
+        session.add(result)
+        session.commit()
+        return True
+
+
+async def _publish_script(task_id: int, script_path: str) -> bool:
+    stored_script = await artifact_store.store(script_path, "script", task_id)
+    if not stored_script:
+        return False
+    return await asyncio.to_thread(_update_result_script, task_id, stored_script)
+
+
+async def regenerate_all_scripts(
+    base_dir: str = AGENT_HISTORY_DIR,
+    workers: Optional[int] = SCRIPT_REGENERATION_WORKERS,
+    chunksize: int = SCRIPT_REGENERATION_CHUNKSIZE,
+    force: bool = False,
+    upload: bool = True,
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    report = {"total": 0, "generated": 0, "skipped": 0, "uploaded": 0, "failed": {}}
+
+    refined_lists = await asyncio.to_thread(find_refined_action_lists, base_dir)
+    report["total"] = len(refined_lists)
+    if not refined_lists:
+        logger.info(f"No refined action lists found under {base_dir} - nothing to regenerate")
+        return report
+
+    manifest_path = os.path.join(base_dir, MANIFEST_FILENAME)
+    manifest = await asyncio.to_thread(_load_manifest, manifest_path)
+    fingerprint = await asyncio.to_thread(_generator_fingerprint)
+
+    jobs = []
+    input_hashes = {}
+    for task_id, refined_path in refined_lists:
+        script_path = os.path.join(os.path.dirname(refined_path), f"task_{task_id}_script.py")
+        current_hash = await asyncio.to_thread(_input_hash, refined_path, fingerprint)
+        entry = manifest.get(str(task_id))
+        if not force and entry and entry.get("input_hash") == current_hash and os.path.exists(script_path):
+            report["skipped"] += 1
+            continue
+        input_hashes[task_id] = (current_hash, script_path)
+        jobs.append((task_id, refined_path, script_path))
+
+    logger.info(f"Regenerating {len(jobs)} script(s), {report['skipped']} unchanged")
+
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+    if chunks:
+        # spawn, not fork: the API process already runs threads (the event loop's executor, DB pools)
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)), mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            chunk_results = await asyncio.gather(
+                *(loop.run_in_executor(executor, _regenerate_chunk, chunk) for chunk in chunks)
+            )
+        finally:
+            # Waiting for the workers to exit blocks, so it happens off the event loop
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+        publish = []
+        for task_id, output_hash, error in (item for chunk in chunk_results for item in chunk):
+            if error:
+                report["failed"][task_id] = error
+                logger.error(f"Failed to regenerate script for task {task_id}: {error}")
+                continue
+            current_hash, script_path = input_hashes[task_id]
+            manifest[str(task_id)] = {
+                "input_hash": current_hash,
+                "output_hash": output_hash,
+                "script_path": script_path,
+            }
+            report["generated"] += 1
+
+            if upload and artifact_store.is_available():
+                publish.append(task_id)
+
+        # The upload manager caps how many of these are in flight at once
+        published = await asyncio.gather(
+            *(_publish_script(task_id, input_hashes[task_id][1]) for task_id in publish),
+            return_exceptions=True,
+        )
+        for task_id, outcome in zip(publish, published):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to publish regenerated script for task {task_id}: {str(outcome)}")
+            elif outcome:
+                report["uploaded"] += 1
+
+    def _write_manifest():
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4)
+
+    await asyncio.to_thread(_write_manifest)
+
+    elapsed = time.perf_counter() - start
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["scripts_per_second"] = round(report["generated"] / elapsed, 2) if elapsed > 0 else None
+    logger.info(
+        f"Script regeneration finished: {report['generated']} generated, {report['skipped']} skipped, "
+        f"{len(report['failed'])} failed, {report['uploaded']} uploaded "
+        f"({report['scripts_per_second']} scripts/sec)"
+    )
+    return report
@@ -0,0 +1,356 @@
+import asyncio
+import base64
+import io
+import json
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.config import (
+    ASYNC_DATABASE_URL,
+    TASK_EVENT_CHANNEL,
+    TASK_EVENT_KEEPALIVE_SECONDS,
+    TASK_EVENT_QUEUE_SIZE,
+    TASK_EVENT_REPLAY_SIZE,
+    TASK_EVENT_RESULT_WAIT_SECONDS,
+    TASK_EVENT_THUMBNAIL_WIDTH,
+)
+from src.api.db.session import async_engine, async_session_factory
+from src.api.models.result import Result
+from src.api.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+TaskEvent = Dict[str, Any]
+EventSink = Callable[[TaskEvent], None]
+
+# pg_notify rejects payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7900
+ACTION_SUMMARY_LENGTH = 200
+
+
+def status_event(task_id: int, status: str) -> TaskEvent:
+    return {"type": "status", "task_id": task_id, "status": status}
+
+
+def result_event(task_id: int, success: bool, recording_pending: bool = False) -> TaskEvent:
+    return {"type": "result", "task_id": task_id, "success": success, "recording_pending": recording_pending}
+
+
+def recording_event(task_id: int, url: Optional[str]) -> TaskEvent:
+    """The task's recording finished encoding; url is None if there is none to show."""
+    return {"type": "recording", "task_id": task_id, "url": url}
+
+
+def _summarize_action(action) -> str:
+    params = action.model_dump(exclude_unset=True)
+    summary = ", ".join(f"{name}({json.dumps(values, default=str)})" for name, values in params.items())
+    return summary[:ACTION_SUMMARY_LENGTH]
+
+
+def make_thumbnail(screenshot_b64: Optional[str], width: int = TASK_EVENT_THUMBNAIL_WIDTH) -> Optional[str]:
+    """Downscales a base64 PNG screenshot to a small base64 JPEG, or None without Pillow."""
+    if not screenshot_b64 or width <= 0:
+        return None
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        image = Image.open(io.BytesIO(base64.b64decode(screenshot_b64)))
+        image.thumbnail((width, width * 4))
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=60)
+        return base64.b64encode(buffer.getvalue()).decode("ascii")
+    except Exception as e:
+        logger.debug(f"Could not build step thumbnail: {e}")
+        return None
+
+
+def step_event(task_id: int, step_num: int, state, output, input_tokens: Optional[int] = None) -> TaskEvent:
+    """Event for one agent step, built from the browser state and model output the step callback receives."""
+    current_state = getattr(output, "current_state", None)
+    return {
+        "type": "step",
+        "task_id": task_id,
+        "step": step_num,
+        "url": getattr(state, "url", None),
+        "title": getattr(state, "title", None),
+        "goal": getattr(current_state, "next_goal", None),
+        "evaluation": getattr(current_state, "evaluation_previous_goal", None),
+        "actions": [_summarize_action(action) for action in getattr(output, "action", None) or []],
+        "input_tokens": input_tokens,
+        "thumbnail": make_thumbnail(getattr(state, "screenshot", None)),
+    }
+
+
+def is_final_event(event: TaskEvent) -> bool:
+    """A failed status, a processed result or, when one is still encoding, the recording ends a task's event stream."""
+    if event["type"] == "result":
+        return not event.get("recording_pending")
+    return event["type"] == "recording" or (event["type"] == "status" and event["status"] == "failed")
+
+
+def _listen_dsn(url: str) -> str:
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+class PostgresEventChannel:
+    """Relays task events between processes with LISTEN/NOTIFY.
+
+    Publishing goes through the regular async engine; listening keeps one
+    dedicated asyncpg connection and reconnects when it drops.
+    """
+
+    name = "task_events"
+
+    def __init__(self, engine=None, dsn: str = ASYNC_DATABASE_URL, reconnect_delay: float = 1.0):
+        self.engine = engine or async_engine
+        self.dsn = _listen_dsn(dsn)
+        self.reconnect_delay = reconnect_delay
+        self._listen_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def encode(event: TaskEvent) -> str:
+        payload = json.dumps(event)
+        if len(payload) > NOTIFY_PAYLOAD_LIMIT and event.get("thumbnail"):
+            payload = json.dumps({**event, "thumbnail": None})
+        if len(payload) > NOTIFY_PAYLOAD_LIMIT and event.get("actions"):
+            payload = json.dumps({**event, "thumbnail": None, "actions": [f"{len(event['actions'])} action(s)"]})
+        return payload
+
+    async def send(self, event: TaskEvent) -> None:
+        async with self.engine.begin() as connection:
+            await connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.name, "payload": self.encode(event)},
+            )
+
+    async def start(self, sink: EventSink) -> None:
+        if self._listen_task is None or self._listen_task.done():
+            self._listen_task = asyncio.create_task(self._listen(sink))
+
+    async def stop(self) -> None:
+        if self._listen_task:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+
+    async def _listen(self, sink: EventSink) -> None:
+        import asyncpg
+
+        def on_notification(connection, pid, channel, payload):
+            try:
+                sink(json.loads(payload))
+            except Exception as e:
+                logger.error(f"Dropping malformed task event: {e}")
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.name, on_notification)
+                logger.info(f"Listening for task events on channel {self.name}")
+                await lost.wait()
+                logger.warning("Task event listener connection lost; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Task event listener failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+
+class TaskEventBus:
+    """Fans task events out to the subscribers of each task.
+
+    Without a channel, publish delivers straight to this process's
+    subscribers. With one, events only go through the channel and come back
+    through the listener started by start(), so the API process sees
+    events from every worker exactly once.
+    """
+
+    def __init__(
+        self,
+        channel=None,
+        queue_size: int = TASK_EVENT_QUEUE_SIZE,
+        replay_size: int = TASK_EVENT_REPLAY_SIZE,
+        max_tracked_tasks: int = 1000,
+    ):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.max_tracked_tasks = max_tracked_tasks
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._recent: "OrderedDict[int, Deque[TaskEvent]]" = OrderedDict()
+
+    async def start(self) -> None:
+        if self.channel:
+            await self.channel.start(self.deliver)
+
+    async def stop(self) -> None:
+        if self.channel:
+            await self.channel.stop()
+
+    async def publish(self, event: TaskEvent) -> None:
+        """Never raises: progress reporting must not break task execution."""
+        if not self.channel:
+            self.deliver(event)
+            return
+        try:
+            await self.channel.send(event)
+        except Exception as e:
+            logger.warning(f"Failed to publish {event['type']} event for task {event['task_id']}: {e}")
+
+    def deliver(self, event: TaskEvent) -> None:
+        task_id = event["task_id"]
+        if event["type"] == "status" and event["status"] == "running":
+            # A new run; events of an earlier run must not be replayed
+            self._recent.pop(task_id, None)
+        recent = self._recent.get(task_id)
+        if recent is None:
+            recent = self._recent[task_id] = deque(maxlen=self.replay_size)
+            while len(self._recent) > self.max_tracked_tasks:
+                self._recent.popitem(last=False)
+        else:
+            self._recent.move_to_end(task_id)
+        recent.append(event)
+
+        for queue in self._subscribers.get(task_id, ()):
+            if queue.full():
+                # A slow client loses its oldest event instead of holding up the agent
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def recent_events(self, task_id: int) -> List[TaskEvent]:
+        return list(self._recent.get(task_id, ()))
+
+    @asynccontextmanager
+    async def subscribe(self, task_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Queue of the task's events, starting with the recent ones."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for event in self.recent_events(task_id)[-self.queue_size:]:
+            queue.put_nowait(event)
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(task_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[task_id]
+
+    def subscriber_count(self, task_id: int) -> int:
+        return len(self._subscribers.get(task_id, ()))
+
+
+async def task_finished(session: AsyncSession, task_id: int) -> bool:
+    """True once nothing more will be published for the task (or it no longer exists)."""
+    task = await session.get(Task, task_id)
+    if not task or task.status == "failed":
+        return True
+    if task.status == "completed":
+        return await session.get(Result, task_id) is not None
+    return False
+
+
+def _recording_pending(events: List[TaskEvent]) -> bool:
+    pending = False
+    for event in events:
+        if event["type"] == "result":
+            pending = bool(event.get("recording_pending"))
+        elif event["type"] == "recording":
+            pending = False
+    return pending
+
+
+def format_sse(event: TaskEvent) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def task_event_stream(
+    task_id: int,
+    bus: Optional[TaskEventBus] = None,
+    keepalive: float = TASK_EVENT_KEEPALIVE_SECONDS,
+    session_factory=None,
+    result_wait: float = TASK_EVENT_RESULT_WAIT_SECONDS,
+) -> AsyncIterator[str]:
+    """Server-sent event stream of a task: current status, then live events until the task is finished.
+
+    The database is only read at the start and on keepalive ticks, which
+    catch the end of tasks whose final event was missed. A completed task
+    that still has no result ``result_wait`` seconds after the stream saw
+    it complete is treated as finished: its result processing failed or
+    never ran, and no result event is coming. The same bound applies to
+    a recording still encoding after the result event.
+    """
+    bus = bus or task_event_bus
+    session_factory = session_factory or async_session_factory
+    loop = asyncio.get_running_loop()
+    completed_at: Optional[float] = None
+    awaiting_recording = False
+
+    async def current_state():
+        nonlocal completed_at
+        async with session_factory() as session:
+            task = await session.get(Task, task_id)
+            status = task.status if task else "deleted"
+            finished = await task_finished(session, task_id)
+        if status == "completed" and (awaiting_recording or not finished):
+            # The result row exists before the recording is attached, so it can't tell us the stream is done
+            if completed_at is None:
+                completed_at = loop.time()
+            finished = loop.time() - completed_at >= result_wait
+        return status, finished
+
+    async with bus.subscribe(task_id) as queue:
+        awaiting_recording = _recording_pending(bus.recent_events(task_id))
+        status, finished = await current_state()
+        yield format_sse(status_event(task_id, status))
+        if finished:
+            return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                status, finished = await current_state()
+                if finished:
+                    yield format_sse(status_event(task_id, status))
+                    return
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+            if is_final_event(event):
+                return
+            if event["type"] == "result":
+                # A result event that was not final: its recording is still encoding
+                awaiting_recording = True
+            if completed_at is None and (
+                event["type"] == "result" or (event["type"] == "status" and event["status"] == "completed")
+            ):
+                completed_at = loop.time()
+
+
+def create_task_event_channel(name: str = TASK_EVENT_CHANNEL):
+    if name == "postgres":
+        if not ASYNC_DATABASE_URL.startswith("postgresql"):
+            logger.warning("TASK_EVENT_CHANNEL=postgres needs a PostgreSQL database; task events stay in-process")
+            return None
+        return PostgresEventChannel()
+    return None
+
+
+task_event_bus = TaskEventBus(channel=create_task_event_channel())
@@ -1,20 +1,23 @@
 import asyncio
 import logging
 import os
+import shutil
 import uuid
 from typing import Dict, Any, Optional
 
-from sqlmodel import Session, select
-
-from src.api.db.session import get_session, engine
+from src.api.config import AGENT_HISTORY_DIR, RECORDINGS_DIR
+from src.api.db.session import async_session_factory
 from src.api.models.task import Task
-from src.api.services.result_processing import process_task_result_safe
+from src.api.services.browser_pool import BrowserProfile, browser_pool
+from src.api.services.result_processing import process_task_result, publish_recording_later
+from src.api.services.task_events import result_event, status_event, step_event, task_event_bus
+from src.api.services.task_steps import TaskStepRecorder, delete_task_steps
 from src.agent.browser_use.browser_use_agent import BrowserUseAgent
-from src.browser.custom_browser import CustomBrowser
 from src.browser.custom_context import CustomBrowserContext, CustomBrowserContextConfig
+from src.browser.screenshot_policy import ScreenshotPolicy
 from src.controller.custom_controller import CustomController
 from src.utils import llm_provider
-from browser_use.browser.browser import BrowserConfig
+from src.utils.recording_encoder import recording_encoder, recording_options, transcode_video
 from browser_use.browser.context import BrowserContextWindowSize
 from browser_use.agent.views import AgentHistoryList
 
@@ -47,6 +50,7 @@ class MockComponent:
 def create_mock_webui_manager_and_components(task_data: Dict[str, Any]) -> tuple[WebuiManager, Dict[gr.components.Component, Any]]:
     webui_manager = WebuiManager()
     webui_manager.init_browser_use_agent()
+    webui_manager.bu_wait_for_recording = False
     
     mock_components = {}
     
@@ -75,6 +79,9 @@ def create_mock_webui_manager_and_components(task_data: Dict[str, Any]) -> tuple
     llm_api_key_comp = MockComponent()
     use_vision_comp = MockComponent()
     ollama_num_ctx_comp = MockComponent()
+    screenshot_policy_comp = MockComponent()
+    screenshot_quality_comp = MockComponent()
+    screenshot_max_dimension_comp = MockComponent()
     
     headless_comp = MockComponent()
     disable_security_comp = MockComponent()
@@ -108,6 +115,9 @@ def create_mock_webui_manager_and_components(task_data: Dict[str, Any]) -> tuple
         "agent_settings.llm_api_key": llm_api_key_comp,
         "agent_settings.use_vision": use_vision_comp,
         "agent_settings.ollama_num_ctx": ollama_num_ctx_comp,
+        "agent_settings.screenshot_policy": screenshot_policy_comp,
+        "agent_settings.screenshot_quality": screenshot_quality_comp,
+        "agent_settings.screenshot_max_dimension": screenshot_max_dimension_comp,
         
         "browser_settings.headless": headless_comp,
         "browser_settings.disable_security": disable_security_comp,
@@ -145,6 +155,9 @@ def create_mock_webui_manager_and_components(task_data: Dict[str, Any]) -> tuple
         llm_api_key_comp: task_data.get("api_key"),
         use_vision_comp: False,
         ollama_num_ctx_comp: task_data.get("context_length", 16000),
+        screenshot_policy_comp: task_data.get("screenshot_policy", "full"),
+        screenshot_quality_comp: task_data.get("screenshot_quality", 70),
+        screenshot_max_dimension_comp: task_data.get("screenshot_max_dimension", 1024),
         
         headless_comp: task_data.get("browser_headless_mode", True),
         disable_security_comp: task_data.get("disable_security", True),
@@ -156,10 +169,83 @@ def create_mock_webui_manager_and_components(task_data: Dict[str, Any]) -> tuple
     return webui_manager, components_dict
 
 
+async def _set_task_status(task_id: int, status: str) -> bool:
+    async with async_session_factory() as session:
+        task = await session.get(Task, task_id)
+        if not task:
+            return False
+        task.status = status
+        if status in ("completed", "failed"):
+            task.queued_api_key = None
+        session.add(task)
+        await session.commit()
+    await task_event_bus.publish(status_event(task_id, status))
+    return True
+
+
+def _screenshot_policy(task: Task) -> ScreenshotPolicy:
+    return ScreenshotPolicy(task.screenshot_policy, task.screenshot_quality, task.screenshot_max_dimension)
+
+
+async def _save_screenshot_report(task_id: int, policy: ScreenshotPolicy) -> None:
+    report = policy.report()
+    logger.info(
+        f"Task {task_id} screenshots ({report['mode']}): kept {report['screenshots_kept']} of {report['steps']} step(s), "
+        f"{report['kept_bytes']} of {report['captured_bytes']} bytes, saved {report['saved_bytes']}"
+    )
+    try:
+        async with async_session_factory() as session:
+            task = await session.get(Task, task_id)
+            if task:
+                task.screenshot_bytes_saved = report["saved_bytes"]
+                session.add(task)
+                await session.commit()
+    except Exception as e:
+        logger.error(f"Failed to save screenshot report for task {task_id}: {e}")
+
+
+async def _close_task_resources(task_id: int, resources: Dict[str, Any]) -> None:
+    try:
+        await resources["browser_context"].close()
+        if resources.get("browser_lease") is not None:
+            # Back to the pool; the pool closes it if it should not be reused
+            await browser_pool.release(resources["browser_lease"])
+        else:
+            await resources["browser"].close()
+        await resources["controller"].close_mcp_client()
+    except Exception as e:
+        logger.error(f"Error cleaning up resources for task {task_id}: {e}", exc_info=True)
+
+
+def _transcode_browser_recordings(task_id: int, recording_dir: str) -> None:
+    """Queues the task's raw webm browser recordings for MP4 transcoding; nothing waits for it."""
+    if not os.path.isdir(recording_dir):
+        return
+    target_bytes = recording_options()["target_bytes"]
+    for name in os.listdir(recording_dir):
+        if name.endswith(".webm"):
+            recording_encoder.submit(
+                transcode_video, {"source_path": os.path.join(recording_dir, name), "target_bytes": target_bytes}
+            )
+            logger.info(f"Queued transcoding of browser recording {name} for task {task_id}")
+
+
+async def release_task_resources(task_id: int) -> None:
+    """Stops a task the sweeper marked as failed and frees its browser and temp files."""
+    resources = running_tasks.pop(task_id, None)
+    if resources:
+        agent = resources["agent"]
+        agent.settings.generate_gif = False
+        agent.stop()
+        await _close_task_resources(task_id, resources)
+        logger.info(f"Released agent and browser of stale task {task_id}")
+    shutil.rmtree(os.path.join(AGENT_HISTORY_DIR, f"task_{task_id}"), ignore_errors=True)
+
+
 async def execute_task_with_webui_wrapper(task_id: int):
     try:
-        with Session(engine) as session:
-            task = session.get(Task, task_id)
+        async with async_session_factory() as session:
+            task = await session.get(Task, task_id)
             if not task:
                 logger.error(f"Task {task_id} not found")
                 return
@@ -182,11 +268,15 @@ async def execute_task_with_webui_wrapper(task_id: int):
                 "disable_security": task.disable_security,
                 "window_width": task.window_width,
                 "window_height": task.window_height,
+                "screenshot_policy": task.screenshot_policy,
+                "screenshot_quality": task.screenshot_quality,
+                "screenshot_max_dimension": task.screenshot_max_dimension,
             }
             
             task.status = "running"
             session.add(task)
-            session.commit()
+            await session.commit()
+        await task_event_bus.publish(status_event(task_id, "running"))
         
         logger.info(f"Starting task execution using webui wrapper for task {task_id}")
         
@@ -207,6 +297,7 @@ async def execute_task_with_webui_wrapper(task_id: int):
         
         task_completed_successfully = False
         task_failed = False
+        recording_job = None
         
         try:
             last_update = None
@@ -214,10 +305,14 @@ async def execute_task_with_webui_wrapper(task_id: int):
                 last_update = update
                 logger.debug(f"Task {task_id} - Received update from run_agent_task")
             
+            if webui_manager.bu_agent:
+                await _save_screenshot_report(task_id, webui_manager.bu_agent.screenshot_policy)
+                recording_job = webui_manager.bu_agent.recording_job
+            
             task_completed_successfully = os.path.exists(expected_history_path)
             logger.info(f"Task {task_id} execution completed via webui wrapper - Success: {task_completed_successfully}")
             logger.info(f"Expected history path: {expected_history_path}")
-            logger.info(f"Expected GIF path: {expected_gif_path}")
+            logger.info(f"Expected GIF path: {expected_gif_path} (encoding queued: {recording_job is not None})")
             
         except Exception as webui_error:
             logger.error(f"Error in webui run_agent_task for task {task_id}: {webui_error}", exc_info=True)
@@ -225,13 +320,8 @@ async def execute_task_with_webui_wrapper(task_id: int):
         
         final_status = "completed" if task_completed_successfully else "failed"
         
-        with Session(engine) as session:
-            task = session.get(Task, task_id)
-            if task:
-                task.status = final_status
-                session.add(task)
-                session.commit()
-                logger.info(f"Task {task_id} marked as {final_status}")
+        if await _set_task_status(task_id, final_status):
+            logger.info(f"Task {task_id} marked as {final_status}")
         
         if task_completed_successfully:
             try:
@@ -245,14 +335,23 @@ async def execute_task_with_webui_wrapper(task_id: int):
                 logger.info(f"History file exists: {history_exists}")
                 logger.info(f"GIF file exists: {gif_exists}")
                 
+                result_processed = False
+                recording_pending = history_exists and recording_job is not None
                 if history_exists:
-                    process_task_result_safe(task_id, expected_gif_path if gif_exists else None)
+                    result_processed = await process_task_result(
+                        task_id, expected_gif_path if gif_exists else None, recording_pending=recording_pending
+                    )
                     logger.info(f"Result processing completed for task {task_id}")
                 else:
                     logger.warning(f"Agent history file not found for task {task_id}: {expected_history_path}")
+                await task_event_bus.publish(result_event(task_id, result_processed, recording_pending))
+                # After the result event, so subscribers see the recording event last
+                if history_exists:
+                    publish_recording_later(task_id, recording_job)
                     
             except Exception as e:
                 logger.error(f"Error in result processing for task {task_id}: {str(e)}")
+                await task_event_bus.publish(result_event(task_id, False))
         else:
             logger.info(f"Skipping result processing for task {task_id} - task did not complete successfully")
         
@@ -260,13 +359,8 @@ async def execute_task_with_webui_wrapper(task_id: int):
         logger.error(f"Error executing task {task_id} with webui wrapper: {e}", exc_info=True)
         
         try:
-            with Session(engine) as session:
-                task = session.get(Task, task_id)
-                if task:
-                    task.status = "failed"
-                    session.add(task)
-                    session.commit()
-                    logger.info(f"Task {task_id} marked as failed due to error")
+            if await _set_task_status(task_id, "failed"):
+                logger.info(f"Task {task_id} marked as failed due to error")
         except Exception as db_error:
             logger.error(f"Failed to update task {task_id} status to failed: {db_error}")
 
@@ -275,9 +369,9 @@ async def start_task_execution_with_webui_wrapper(task_id: int):
     asyncio.create_task(execute_task_with_webui_wrapper(task_id))
 
 
-def _compose_task(task_id: int) -> str:
-    with Session(engine) as session:
-        task = session.get(Task, task_id)
+async def _compose_task(task_id: int) -> str:
+    async with async_session_factory() as session:
+        task = await session.get(Task, task_id)
         if not task:
             logger.error(f"Task {task_id} not found when composing task")
             return ""
@@ -308,8 +402,8 @@ def _compose_task(task_id: int) -> str:
 
 async def _initialize_llm(task_id: int, api_key: str) -> Any:
     try:
-        with Session(engine) as session:
-            task = session.get(Task, task_id)
+        async with async_session_factory() as session:
+            task = await session.get(Task, task_id)
             if not task:
                 logger.error(f"Task {task_id} not found when initializing LLM")
                 return None
@@ -344,15 +438,16 @@ async def _initialize_llm(task_id: int, api_key: str) -> Any:
         return None
 
 
-async def _handle_new_step(state, output, step_num: int, task_id: int):
+async def _handle_new_step(state, output, step_num: int, task_id: int, input_tokens: Optional[int] = None):
     logger.info(f"Task {task_id} - Step {step_num} completed.")
+    await task_event_bus.publish(step_event(task_id, step_num, state, output, input_tokens))
 
 
-def _handle_done(history: AgentHistoryList, task_id: int):
+async def _handle_done(history: AgentHistoryList, task_id: int):
     logger.info(f"Task {task_id} finished. Duration: {history.total_duration_seconds():.2f}s")
     
-    with Session(engine) as session:
-        task = session.get(Task, task_id)
+    async with async_session_factory() as session:
+        task = await session.get(Task, task_id)
         if task:
             final_result = history.final_result()
             errors = history.errors()
@@ -363,17 +458,19 @@ def _handle_done(history: AgentHistoryList, task_id: int):
             else:
                 task.status = "completed"
                 logger.info(f"Task {task_id} completed successfully")
+            task.queued_api_key = None
             
             session.add(task)
-            session.commit()
+            await session.commit()
+            await task_event_bus.publish(status_event(task_id, task.status))
         else:
             logger.error(f"Task {task_id} not found in database when updating status")
 
 
 async def execute_task(task_id: int, api_key: str = None):
     try:
-        with Session(engine) as session:
-            task = session.get(Task, task_id)
+        async with async_session_factory() as session:
+            task = await session.get(Task, task_id)
             if not task:
                 logger.error(f"Task {task_id} not found")
                 return
@@ -382,44 +479,37 @@ async def execute_task(task_id: int, api_key: str = None):
             disable_security = task.disable_security
             window_width = task.window_width
             window_height = task.window_height
+            screenshot_policy = _screenshot_policy(task)
+            
+            await delete_task_steps(session, task_id)
+            await session.commit()
+        
+        # The scheduler or worker already marked the task running
+        await task_event_bus.publish(status_event(task_id, "running"))
         
         llm = await _initialize_llm(task_id, api_key=api_key)
         if not llm:
             logger.error(f"Failed to initialize LLM for task {task_id}")
-            with Session(engine) as session:
-                task = session.get(Task, task_id)
-                if task:
-                    task.status = "failed"
-                    session.add(task)
-                    session.commit()
+            await _set_task_status(task_id, "failed")
             return
         
-        task_prompt = _compose_task(task_id)
+        task_prompt = await _compose_task(task_id)
         if not task_prompt:
             logger.error(f"Failed to compose task prompt for task {task_id}")
-            with Session(engine) as session:
-                task = session.get(Task, task_id)
-                if task:
-                    task.status = "failed"
-                    session.add(task)
-                    session.commit()
+            await _set_task_status(task_id, "failed")
             return
         
         controller = CustomController()
         
+        browser_lease = None
         try:
-            browser_config = BrowserConfig(
-                headless=browser_headless_mode,
-                disable_security=disable_security,
-                browser_binary_path=None,
-                extra_browser_args=[f"--window-size={window_width},{window_height}"],
-                wss_url=None,
-                cdp_url=None,
+            browser_lease = await browser_pool.acquire(
+                BrowserProfile(browser_headless_mode, disable_security, window_width, window_height)
             )
+            browser = browser_lease.browser
             
-            browser = CustomBrowser(config=browser_config)
-            
-            save_recording_path = "./tmp/videos"
+            # Per task, so its webm files can be handed to the transcoder once the context closes
+            save_recording_path = os.path.join(RECORDINGS_DIR, f"task_{task_id}")
             os.makedirs(save_recording_path, exist_ok=True)
             
             context_config = CustomBrowserContextConfig(
@@ -435,12 +525,9 @@ async def execute_task(task_id: int, api_key: str = None):
             browser_context = await browser.new_context(config=context_config)
         except Exception as e:
             logger.error(f"Failed to initialize browser for task {task_id}: {e}", exc_info=True)
-            with Session(engine) as session:
-                task = session.get(Task, task_id)
-                if task:
-                    task.status = "failed"
-                    session.add(task)
-                    session.commit()
+            if browser_lease is not None:
+                await browser_pool.release(browser_lease)
+            await _set_task_status(task_id, "failed")
             return
         
         run_id = f"task_{task_id}"
@@ -460,11 +547,16 @@ async def execute_task(task_id: int, api_key: str = None):
             f"task_{task_id}.gif",
         )
         
+        step_recorder = TaskStepRecorder(task_id)
+        
         async def step_callback_wrapper(state, output, step_num: int):
-            await _handle_new_step(state, output, step_num, task_id)
+            # Prompt size of the step the model just answered
+            input_tokens = agent._message_manager.state.history.current_tokens
+            step_recorder.record(agent.state.history.history, agent.step_timings)
+            await _handle_new_step(state, output, step_num, task_id, input_tokens)
         
-        def done_callback_wrapper(history: AgentHistoryList):
-            _handle_done(history, task_id)
+        async def done_callback_wrapper(history: AgentHistoryList):
+            await _handle_done(history, task_id)
         
         agent = BrowserUseAgent(
             task=task_prompt,
@@ -480,6 +572,7 @@ async def execute_task(task_id: int, api_key: str = None):
             max_input_tokens=128000,
             max_actions_per_step=10,
             tool_calling_method="auto",
+            screenshot_policy=screenshot_policy,
         )
         
         agent.state.agent_id = run_id
@@ -488,6 +581,7 @@ async def execute_task(task_id: int, api_key: str = None):
         running_tasks[task_id] = {
             "agent": agent,
             "browser": browser,
+            "browser_lease": browser_lease,
             "browser_context": browser_context,
             "controller": controller,
         }
@@ -496,12 +590,15 @@ async def execute_task(task_id: int, api_key: str = None):
             await agent.run(max_steps=50)
         except Exception as e:
             logger.error(f"Error running agent for task {task_id}: {e}", exc_info=True)
-            with Session(engine) as session:
-                task = session.get(Task, task_id)
-                if task:
-                    task.status = "failed"
-                    session.add(task)
-                    session.commit()
+            await _set_task_status(task_id, "failed")
+        
+        await step_recorder.finish(agent.state.history.history, agent.step_timings)
+        await _save_screenshot_report(task_id, screenshot_policy)
+        
+        resources = running_tasks.pop(task_id, None)
+        if resources is None:
+            logger.info(f"Task {task_id} was released by the stale task sweeper; skipping history and results")
+            return
         
         try:
             logger.info(f"Saving agent history to: {history_file}")
@@ -512,45 +609,42 @@ async def execute_task(task_id: int, api_key: str = None):
             else:
                 logger.warning(f"Agent history file not found after saving: {history_file}")
                 
-            if gif_path and os.path.exists(gif_path):
-                logger.info(f"GIF generated successfully: {gif_path}")
+            if agent.recording_job is not None:
+                logger.info(f"Recording queued for encoding: {gif_path}")
             else:
-                logger.info(f"GIF not generated or not found: {gif_path}")
+                logger.info(f"No recording frames captured for task {task_id}")
                 
         except Exception as e:
             logger.error(f"Error saving agent history for task {task_id}: {e}", exc_info=True)
         
+        task_status = None
         try:
-            with Session(engine) as session:
-                task = session.get(Task, task_id)
-                if task and task.status == "completed":
-                    logger.info(f"Starting result processing for completed task {task_id}")
-                    process_task_result_safe(task_id, gif_path)
-                    logger.info(f"Result processing completed for task {task_id}")
-                else:
-                    logger.info(f"Skipping result processing for task {task_id} - task status: {task.status if task else 'not found'}")
+            async with async_session_factory() as session:
+                task = await session.get(Task, task_id)
+                task_status = task.status if task else None
+            if task_status == "completed":
+                logger.info(f"Starting result processing for completed task {task_id}")
+                result_processed = await process_task_result(task_id, gif_path, recording_pending=agent.recording_job is not None)
+                logger.info(f"Result processing completed for task {task_id}")
+                await task_event_bus.publish(
+                    result_event(task_id, result_processed, recording_pending=agent.recording_job is not None)
+                )
+                publish_recording_later(task_id, agent.recording_job)
+            else:
+                logger.info(f"Skipping result processing for task {task_id} - task status: {task_status or 'not found'}")
         except Exception as e:
             logger.error(f"Error in result processing for task {task_id}: {str(e)}")
             logger.error("Task completion status remains unaffected by result processing errors")
+            if task_status == "completed":
+                await task_event_bus.publish(result_event(task_id, False))
         
-        try:
-            await browser_context.close()
-            await browser.close()
-            await controller.close_mcp_client()
-        except Exception as e:
-            logger.error(f"Error cleaning up resources for task {task_id}: {e}", exc_info=True)
-        
-        if task_id in running_tasks:
-            del running_tasks[task_id]
+        await _close_task_resources(task_id, resources)
+        # Playwright finishes writing the webm when the context closes
+        _transcode_browser_recordings(task_id, save_recording_path)
             
     except Exception as e:
         logger.error(f"Unhandled error executing task {task_id}: {e}", exc_info=True)
-        with Session(engine) as session:
-            task = session.get(Task, task_id)
-            if task:
-                task.status = "failed"
-                session.add(task)
-                session.commit()
+        await _set_task_status(task_id, "failed")
 
 
 async def start_task_execution(task_id: int, api_key: str = None):
@@ -0,0 +1,156 @@
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal, text, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.config import TASK_COUNT_EXACT_LIMIT
+from src.api.models.task import Task, TaskSummary
+from src.api.models.types import UTCDateTime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), task_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for anything that is not a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _apply_filters(
+    statement,
+    user_id: int,
+    statuses: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    statement = statement.where(Task.user_id == user_id)
+    if statuses:
+        statement = statement.where(Task.status.in_(statuses))
+    if created_after:
+        statement = statement.where(Task.created_at >= created_after)
+    if created_before:
+        statement = statement.where(Task.created_at < created_before)
+    return statement
+
+
+def task_summary_page_query(
+    user_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    statuses: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    """Newest-first page of TaskSummary columns; fetches one extra row to detect a next page."""
+    statement = _apply_filters(
+        select(Task.id, Task.task_name, Task.status, Task.created_at),
+        user_id,
+        statuses,
+        created_after,
+        created_before,
+    )
+    if cursor:
+        created_at, task_id = cursor
+        # Row comparison so (user_id, created_at, id) can be walked as one index range. The cursor time is
+        # bound as the column's type (naive UTC); bound as an aware timestamptz, Postgres would compare it
+        # in the session's TimeZone and pages would skip or repeat rows.
+        statement = statement.where(tuple_(Task.created_at, Task.id) < tuple_(literal(created_at, UTCDateTime), task_id))
+    return statement.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+
+
+def capped_task_count_query(
+    user_id: int,
+    exact_limit: int,
+    statuses: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    filtered = _apply_filters(select(Task.id), user_id, statuses, created_after, created_before)
+    return select(func.count()).select_from(filtered.limit(exact_limit + 1).subquery())
+
+
+async def get_task_summary_page(
+    session: AsyncSession,
+    user_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    statuses: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Tuple[List[TaskSummary], Optional[str]]:
+    """Returns one page of task summaries and the cursor for the next page (None on the last page)."""
+    statement = task_summary_page_query(
+        user_id,
+        limit,
+        decode_cursor(cursor) if cursor else None,
+        statuses,
+        created_after,
+        created_before,
+    )
+    rows = (await session.exec(statement)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return [TaskSummary(id=row.id, task_name=row.task_name, status=row.status) for row in rows], next_cursor
+
+
+async def _planner_row_estimate(session: AsyncSession, statement) -> Optional[int]:
+    compiled = statement.compile(
+        dialect=session.bind.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_tasks(
+    session: AsyncSession,
+    user_id: int,
+    statuses: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    exact_limit: int = TASK_COUNT_EXACT_LIMIT,
+) -> Tuple[int, bool]:
+    """Counts matching tasks, scanning at most exact_limit + 1 rows.
+
+    Returns (count, estimated). Beyond the limit the count comes from the
+    Postgres planner estimate, or is the limit itself as a lower bound on
+    databases without one.
+    """
+    capped = capped_task_count_query(user_id, exact_limit, statuses, created_after, created_before)
+    count = (await session.exec(capped)).one()
+    if count <= exact_limit:
+        return count, False
+
+    if session.bind.dialect.name == "postgresql":
+        try:
+            filtered = _apply_filters(select(Task.id), user_id, statuses, created_after, created_before)
+            estimate = await _planner_row_estimate(session, filtered)
+            return max(estimate, exact_limit), True
+        except Exception as e:
+            logger.warning(f"Planner estimate failed for user {user_id}: {e}")
+    return exact_limit, True
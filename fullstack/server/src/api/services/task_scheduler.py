@@ -0,0 +1,238 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.config import (
+    MAX_CONCURRENT_TASKS,
+    MAX_CONCURRENT_TASKS_PER_USER,
+    SCHEDULER_POLL_INTERVAL_SECONDS,
+)
+from src.api.db.session import engine as default_engine
+from src.api.models.task import Task
+from src.api.services.task_events import status_event, task_event_bus
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUEUED_STATUS = "queued"
+RUNNING_STATUS = "running"
+FAILED_STATUS = "failed"
+
+TaskRunner = Callable[[int, Optional[str]], Awaitable[None]]
+
+
+async def _run_agent_task(task_id: int, api_key: Optional[str]) -> None:
+    from src.api.services.task_execution import execute_task
+    await execute_task(task_id, api_key=api_key)
+
+
+async def _run_webui_task(task_id: int, api_key: Optional[str]) -> None:
+    from src.api.services.task_execution import execute_task_with_webui_wrapper
+    await execute_task_with_webui_wrapper(task_id)
+
+
+DEFAULT_RUNNERS: Dict[str, TaskRunner] = {
+    "agent": _run_agent_task,
+    "webui": _run_webui_task,
+}
+
+
+def queued_tasks_query():
+    return (
+        select(Task)
+        .where(Task.status == QUEUED_STATUS)
+        .order_by(Task.initiated_at, Task.id)
+    )
+
+
+def queue_position_query(task: Task):
+    return select(func.count()).select_from(Task).where(
+        Task.status == QUEUED_STATUS,
+        or_(
+            Task.initiated_at < task.initiated_at,
+            and_(Task.initiated_at == task.initiated_at, Task.id < task.id),
+        ),
+    )
+
+
+class TaskScheduler:
+    """Starts queued tasks as execution slots free up.
+
+    The tasks table is the durable queue: initiated tasks are stored with
+    status "queued" and ordered by (initiated_at, id). Only the decrypted API
+    keys live in memory, so an agent task is started only by the process it
+    was enqueued in. Agent tasks still queued when the scheduler starts lost
+    their key with the previous process and are marked failed rather than
+    run (and billed) on the provider's default key. With
+    TASK_EXECUTION_MODE=worker the scheduler is not started and
+    src.cli.task_worker processes claim tasks instead.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_TASKS,
+        max_per_user: int = MAX_CONCURRENT_TASKS_PER_USER,
+        poll_interval: float = SCHEDULER_POLL_INTERVAL_SECONDS,
+        engine=None,
+        runners: Optional[Dict[str, TaskRunner]] = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.poll_interval = poll_interval
+        self.engine = engine or default_engine
+        self.runners = runners or DEFAULT_RUNNERS
+        self.running: Dict[int, Tuple[int, asyncio.Task]] = {}
+        self._pending: Dict[int, Optional[str]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def is_running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self) -> None:
+        if self.is_running():
+            return
+        self._wakeup = asyncio.Event()
+        failed = await asyncio.to_thread(self._fail_orphaned_tasks)
+        if failed:
+            logger.warning(f"Marked {len(failed)} queued task(s) failed: their API keys were lost in a restart")
+        for task_id in failed:
+            await task_event_bus.publish(status_event(task_id, FAILED_STATUS))
+        self._loop_task = asyncio.create_task(self._run_loop())
+        logger.info(
+            f"Task scheduler started (max_concurrent={self.max_concurrent}, "
+            f"max_per_user={self.max_per_user})"
+        )
+
+    async def stop(self) -> None:
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        logger.info(f"Task scheduler stopped with {len(self.running)} task(s) still running")
+
+    def enqueue(self, task_id: int, api_key: Optional[str] = None) -> None:
+        """Registers the in-memory API key for a task already stored as queued."""
+        self._pending[task_id] = api_key
+        self.notify()
+
+    def discard(self, task_id: int) -> None:
+        self._pending.pop(task_id, None)
+
+    def notify(self) -> None:
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def queue_position(self, task: Task, session: AsyncSession) -> Optional[int]:
+        """1-based position of a queued task in the global FIFO, or None if not queued."""
+        if task.status != QUEUED_STATUS or task.initiated_at is None:
+            return None
+        return (await session.exec(queue_position_query(task))).one() + 1
+
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                await self.dispatch()
+            except Exception as e:
+                logger.error(f"Task scheduler dispatch failed: {e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _running_per_user(self) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for user_id, _ in self.running.values():
+            counts[user_id] = counts.get(user_id, 0) + 1
+        return counts
+
+    def _fail_orphaned_tasks(self) -> List[int]:
+        """Marks queued agent tasks no process holds a key for as failed; returns their ids."""
+        with Session(self.engine) as session:
+            result = session.execute(
+                update(Task)
+                .where(
+                    Task.status == QUEUED_STATUS,
+                    Task.runner == "agent",
+                    Task.id.not_in(list(self._pending)),
+                )
+                .values(status=FAILED_STATUS, queued_api_key=None)
+                .returning(Task.id)
+            )
+            failed = list(result.scalars())
+            session.commit()
+            return failed
+
+    def _mark_queued_running(
+        self, free_slots: int, per_user: Dict[int, int], pending: List[int]
+    ) -> List[Tuple[int, int, str]]:
+        """Marks the next queued tasks the limits allow as running; returns their (id, user_id, runner).
+
+        Agent tasks are only taken from ``pending``, the ones enqueued here
+        with their key. Each task is claimed with an UPDATE conditional on it
+        still being queued, so when two API processes race for a task only
+        one starts it. Blocking database work: dispatch() runs it in a worker
+        thread.
+        """
+        per_user = dict(per_user)
+        started = []
+        with Session(self.engine) as session:
+            candidates = session.exec(
+                queued_tasks_query().where(or_(Task.runner != "agent", Task.id.in_(pending)))
+            ).all()
+            for task in candidates:
+                if len(started) >= free_slots:
+                    break
+                if per_user.get(task.user_id, 0) >= self.max_per_user:
+                    continue
+
+                result = session.execute(
+                    update(Task)
+                    .where(Task.id == task.id, Task.status == QUEUED_STATUS)
+                    # initiated_at doubles as the start time for the staleness check
+                    .values(status=RUNNING_STATUS, initiated_at=datetime.now(timezone.utc))
+                )
+                session.commit()
+                if result.rowcount != 1:
+                    logger.info(f"Task {task.id} was started by another process")
+                    continue
+                started.append((task.id, task.user_id, task.runner))
+                per_user[task.user_id] = per_user.get(task.user_id, 0) + 1
+        return started
+
+    async def dispatch(self) -> int:
+        """Starts as many queued tasks as the limits allow. Returns how many were started."""
+        free_slots = self.max_concurrent - len(self.running)
+        if free_slots <= 0:
+            return 0
+
+        started = await asyncio.to_thread(
+            self._mark_queued_running, free_slots, self._running_per_user(), list(self._pending)
+        )
+        for task_id, user_id, runner_name in started:
+            api_key = self._pending.pop(task_id, None)
+            runner = self.runners.get(runner_name, self.runners["agent"])
+            self.running[task_id] = (user_id, asyncio.create_task(self._run_task(task_id, runner, api_key)))
+            logger.info(f"Task {task_id} started by scheduler ({len(self.running)}/{self.max_concurrent} slots in use)")
+        return len(started)
+
+    async def _run_task(self, task_id: int, runner: TaskRunner, api_key: Optional[str]) -> None:
+        try:
+            await runner(task_id, api_key)
+        except Exception as e:
+            logger.error(f"Scheduled task {task_id} raised: {e}", exc_info=True)
+        finally:
+            self.running.pop(task_id, None)
+            self.notify()
+
+
+task_scheduler = TaskScheduler()
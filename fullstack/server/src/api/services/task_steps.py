@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import delete, insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.config import TASK_STEP_BUFFER_MAX_ROWS, TASK_STEP_FLUSH_EVERY, TASK_STEP_FLUSH_INTERVAL_MS
+from src.api.db.session import async_session_factory
+from src.api.models.task_step import TaskStep
+
+logger = logging.getLogger(__name__)
+
+StepRow = Dict[str, Any]
+
+
+def step_row(task_id: int, item, fallback_step_number: int, timing: Optional[Dict[str, Any]] = None) -> StepRow:
+    """task_steps row for one AgentHistory item (model output, browser state, results, metadata).
+
+    ``timing`` is the agent's StepTimer output for the item; provider-reported
+    input tokens take precedence over browser-use's prompt size estimate.
+    """
+    metadata = item.metadata
+    timing = timing or {}
+    model_output = item.model_output
+    errors = [result.error for result in item.result or [] if result.error]
+    return {
+        "task_id": task_id,
+        "step_number": metadata.step_number if metadata else fallback_step_number,
+        "url": item.state.url if item.state else None,
+        "actions": [action.model_dump(exclude_unset=True, mode="json") for action in model_output.action] if model_output else [],
+        "duration_seconds": round(metadata.duration_seconds, 3) if metadata else None,
+        "input_tokens": timing.get("input_tokens") or (metadata.input_tokens if metadata else None),
+        "output_tokens": timing.get("output_tokens"),
+        "llm_seconds": timing.get("llm_seconds"),
+        "dom_seconds": timing.get("dom_seconds"),
+        "action_seconds": timing.get("action_seconds"),
+        "wait_seconds": timing.get("wait_seconds"),
+        "error": "\n".join(errors) or None,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+class StepWriteBuffer:
+    """Write-behind buffer for task_steps.
+
+    Rows from every running task are collected here and written with one
+    multi-row INSERT once ``flush_every`` rows are waiting or
+    ``flush_interval`` seconds after the first of them arrived. Flushes run
+    as background tasks so the agent never waits on the database; rows of a
+    failed flush are kept (up to ``max_rows``) for the next one.
+    """
+
+    def __init__(
+        self,
+        flush_every: int = TASK_STEP_FLUSH_EVERY,
+        flush_interval: float = TASK_STEP_FLUSH_INTERVAL_MS / 1000,
+        max_rows: int = TASK_STEP_BUFFER_MAX_ROWS,
+        session_factory=None,
+    ):
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.session_factory = session_factory or async_session_factory
+        self._rows: List[StepRow] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, rows: Sequence[StepRow]) -> None:
+        if not rows:
+            return
+        self._rows.extend(rows)
+        if len(self._rows) > self.max_rows:
+            dropped = len(self._rows) - self.max_rows
+            del self._rows[:dropped]
+            logger.warning(f"Step buffer full; dropped {dropped} unsaved step record(s)")
+
+        if len(self._rows) >= self.flush_every:
+            self._start_flush()
+        elif self._timer is None or self._timer.done() or self._timer.get_loop() is not asyncio.get_running_loop():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    def _start_flush(self) -> None:
+        flush = asyncio.create_task(self.flush())
+        self._flushes.add(flush)
+        flush.add_done_callback(self._flushes.discard)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Writes the buffered rows. Returns how many were written."""
+        if not self._rows:
+            return 0
+        rows, self._rows = self._rows, []
+        try:
+            async with self.session_factory() as session:
+                await session.exec(insert(TaskStep).values(rows))
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} step record(s): {e}")
+            self._rows = (rows + self._rows)[-self.max_rows:]
+            return 0
+        logger.debug(f"Wrote {len(rows)} step record(s)")
+        return len(rows)
+
+    async def drain(self) -> None:
+        """Waits for in-flight flushes, then writes whatever is still buffered."""
+        if self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+        await self.flush()
+
+
+class TaskStepRecorder:
+    """Feeds the steps of one agent run into the write buffer, each exactly once.
+
+    A step's history item (with its duration, tokens and errors) only exists
+    once the step has finished, so every step callback records the steps
+    completed before it and finish() picks up the last one. ``timings``,
+    when given, is the agent's step_timings list, aligned with the history.
+    """
+
+    def __init__(self, task_id: int, buffer: Optional[StepWriteBuffer] = None):
+        self.task_id = task_id
+        self.buffer = buffer if buffer is not None else task_step_buffer
+        self.recorded = 0
+
+    def record(self, history_items: Sequence, timings: Optional[Sequence[Dict[str, Any]]] = None) -> int:
+        new_items = history_items[self.recorded:]
+        if not new_items:
+            return 0
+        timings = timings or []
+        rows = []
+        for index, item in enumerate(new_items, start=self.recorded):
+            timing = timings[index] if index < len(timings) else None
+            rows.append(step_row(self.task_id, item, index + 1, timing))
+        self.recorded += len(new_items)
+        self.buffer.add(rows)
+        return len(rows)
+
+    async def finish(self, history_items: Sequence, timings: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        self.record(history_items, timings)
+        await self.buffer.drain()
+
+
+async def delete_task_steps(session: AsyncSession, task_id: int) -> None:
+    """Removes the steps of earlier runs; the caller commits."""
+    await session.exec(delete(TaskStep).where(TaskStep.task_id == task_id))
+
+
+async def get_task_steps(session: AsyncSession, task_id: int) -> List[TaskStep]:
+    statement = select(TaskStep).where(TaskStep.task_id == task_id).order_by(TaskStep.step_number, TaskStep.id)
+    return list((await session.exec(statement)).all())
+
+
+task_step_buffer = StepWriteBuffer()
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+from sqlalchemy import and_, or_, update
+from sqlmodel import Session
+
+from src.api.config import (
+    FAILURE_TIME_DELTA_IN_MINUTES,
+    STALE_TASK_SWEEP_INTERVAL_SECONDS,
+    WORKER_HEARTBEAT_INTERVAL_SECONDS,
+    WORKER_HEARTBEAT_MISSED_LIMIT,
+)
+from src.api.db.session import engine as default_engine
+from src.api.models.task import Task
+from src.api.services.task_events import status_event, task_event_bus
+from src.api.services.task_scheduler import FAILED_STATUS, RUNNING_STATUS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TaskCleanup = Callable[[int], Awaitable[None]]
+
+
+class SweptTask(NamedTuple):
+    task_id: int
+    worker_id: Optional[str]
+
+
+async def release_task_resources(task_id: int) -> None:
+    from src.api.services.task_execution import release_task_resources as release
+    await release(task_id)
+
+
+DEFAULT_HEARTBEAT_TIMEOUT_SECONDS = WORKER_HEARTBEAT_INTERVAL_SECONDS * WORKER_HEARTBEAT_MISSED_LIMIT
+
+
+def stale_running_tasks_update(cutoff: datetime, heartbeat_cutoff: datetime):
+    """Fails running tasks whose worker stopped heartbeating before heartbeat_cutoff.
+
+    Tasks without a heartbeat (run in the API process, or claimed by a
+    worker that never beat) fall back to starting before cutoff.
+    """
+    # Walks ix_tasks_status_initiated_at_id, so only running rows are touched
+    return (
+        update(Task)
+        .where(
+            Task.status == RUNNING_STATUS,
+            or_(
+                Task.heartbeat_at < heartbeat_cutoff,
+                and_(Task.heartbeat_at.is_(None), Task.initiated_at < cutoff),
+            ),
+        )
+        .values(status=FAILED_STATUS, queued_api_key=None)
+        .returning(Task.id, Task.worker_id)
+    )
+
+
+def sweep_stale_tasks(
+    engine,
+    max_running_minutes: float = FAILURE_TIME_DELTA_IN_MINUTES,
+    now: Optional[datetime] = None,
+    heartbeat_timeout_seconds: float = DEFAULT_HEARTBEAT_TIMEOUT_SECONDS,
+) -> List[SweptTask]:
+    """Marks every stale running task as failed in one statement.
+
+    A task is stale when its worker's heartbeat is older than
+    heartbeat_timeout_seconds or, without a heartbeat, when it has been
+    running longer than max_running_minutes.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=max_running_minutes)
+    heartbeat_cutoff = now - timedelta(seconds=heartbeat_timeout_seconds)
+    with Session(engine) as session:
+        rows = session.execute(stale_running_tasks_update(cutoff, heartbeat_cutoff)).all()
+        session.commit()
+    return [SweptTask(task_id, worker_id) for task_id, worker_id in rows]
+
+
+class TaskSweeper:
+    """Periodically fails tasks whose worker stopped heartbeating, or that have run too long without one.
+
+    Sweeping is a single UPDATE ... RETURNING, so any number of sweepers can
+    run against the same database and each stale task is reported to exactly
+    one of them. ``cleanup`` is awaited for every swept task to free the
+    browser and temp files held by this process; workers leave it unset and
+    release their own tasks when the heartbeat shows they were swept.
+    """
+
+    def __init__(
+        self,
+        interval: float = STALE_TASK_SWEEP_INTERVAL_SECONDS,
+        max_running_minutes: float = FAILURE_TIME_DELTA_IN_MINUTES,
+        engine=None,
+        cleanup: Optional[TaskCleanup] = None,
+        heartbeat_timeout_seconds: float = DEFAULT_HEARTBEAT_TIMEOUT_SECONDS,
+    ):
+        self.interval = interval
+        self.max_running_minutes = max_running_minutes
+        self.heartbeat_timeout_seconds = heartbeat_timeout_seconds
+        self.engine = engine or default_engine
+        self.cleanup = cleanup
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def is_running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self) -> None:
+        if self.is_running():
+            return
+        self._loop_task = asyncio.create_task(self._run_loop())
+        logger.info(
+            f"Task sweeper started (interval={self.interval}s, "
+            f"max_running_minutes={self.max_running_minutes}, heartbeat_timeout={self.heartbeat_timeout_seconds}s)"
+        )
+
+    async def stop(self) -> None:
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+            logger.info("Task sweeper stopped")
+
+    async def sweep(self) -> List[SweptTask]:
+        swept = await asyncio.to_thread(
+            sweep_stale_tasks, self.engine, self.max_running_minutes, None, self.heartbeat_timeout_seconds
+        )
+        for task in swept:
+            if task.worker_id:
+                reason = f"worker {task.worker_id} stopped heartbeating"
+            else:
+                reason = f"running for more than {self.max_running_minutes} minutes"
+            logger.warning(f"Task {task.task_id} marked as failed - {reason}")
+            await task_event_bus.publish(status_event(task.task_id, FAILED_STATUS))
+            if self.cleanup:
+                try:
+                    await self.cleanup(task.task_id)
+                except Exception as e:
+                    logger.error(f"Failed to release resources of stale task {task.task_id}: {e}", exc_info=True)
+        return swept
+
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Task sweep failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+
+task_sweeper = TaskSweeper(cleanup=release_task_resources)
@@ -0,0 +1,127 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.agent.browser_use.step_timing import SUMMED_FIELDS, TIMING_BUCKETS, summarize_timings, timing_totals
+from src.api.config import LLM_TOKEN_PRICES
+from src.api.models.task import Task
+from src.api.models.task_step import ModelTimingSummary, StepTiming, TaskStep, TaskTiming
+from src.api.services.task_steps import get_task_steps
+
+logger = logging.getLogger(__name__)
+
+TokenPrices = Dict[str, Tuple[float, float]]
+
+
+def parse_token_prices(spec: str) -> TokenPrices:
+    """"gpt-4o=2.5/10,o3-mini=1.1/4.4" -> {"gpt-4o": (2.5, 10.0), "o3-mini": (1.1, 4.4)} (USD per million tokens)"""
+    prices = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, pair = item.partition("=")
+        input_price, _, output_price = pair.partition("/")
+        try:
+            prices[model.strip()] = (float(input_price), float(output_price or 0))
+        except ValueError:
+            logger.warning(f"Ignoring invalid LLM_TOKEN_PRICES entry: {item!r}")
+    return prices
+
+
+token_prices = parse_token_prices(LLM_TOKEN_PRICES)
+
+
+def token_cost(
+    model: str,
+    input_tokens: Optional[int],
+    output_tokens: Optional[int],
+    prices: Optional[TokenPrices] = None,
+) -> Optional[float]:
+    """USD cost of the tokens, or None when the model has no configured price."""
+    price = (prices if prices is not None else token_prices).get(model)
+    if price is None:
+        return None
+    return round(((input_tokens or 0) * price[0] + (output_tokens or 0) * price[1]) / 1_000_000, 6)
+
+
+def _step_timing(step: TaskStep, model: str, prices: Optional[TokenPrices]) -> StepTiming:
+    measured = [getattr(step, f"{bucket}_seconds") for bucket in TIMING_BUCKETS]
+    other_seconds = None
+    if step.duration_seconds is not None and any(seconds is not None for seconds in measured):
+        other_seconds = round(max(step.duration_seconds - sum(seconds or 0 for seconds in measured), 0.0), 3)
+    return StepTiming(
+        step_number=step.step_number,
+        duration_seconds=step.duration_seconds,
+        llm_seconds=step.llm_seconds,
+        dom_seconds=step.dom_seconds,
+        action_seconds=step.action_seconds,
+        wait_seconds=step.wait_seconds,
+        other_seconds=other_seconds,
+        input_tokens=step.input_tokens,
+        output_tokens=step.output_tokens,
+        cost_usd=token_cost(model, step.input_tokens, step.output_tokens, prices),
+    )
+
+
+async def get_task_timing(session: AsyncSession, task: Task, prices: Optional[TokenPrices] = None) -> TaskTiming:
+    """Per-step latency, token and cost breakdown of a task's latest run, with totals."""
+    steps = await get_task_steps(session, task.id)
+    totals = summarize_timings(step.model_dump() for step in steps)
+    totals["cost_usd"] = token_cost(task.llm_model, totals["input_tokens"], totals["output_tokens"], prices)
+    return TaskTiming(
+        task_id=task.id,
+        llm_provider=task.llm_provider,
+        llm_model=task.llm_model,
+        totals=totals,
+        steps=[_step_timing(step, task.llm_model, prices) for step in steps],
+    )
+
+
+def timing_summary_query(
+    user_id: int,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    """Step counts and summed timings/tokens of a user's tasks, per provider and model."""
+    statement = (
+        select(
+            Task.llm_provider,
+            Task.llm_model,
+            func.count(func.distinct(TaskStep.task_id)).label("tasks"),
+            func.count(TaskStep.id).label("steps"),
+            *(func.sum(getattr(TaskStep, field)).label(field) for field in SUMMED_FIELDS),
+        )
+        .join(TaskStep, TaskStep.task_id == Task.id)
+        .where(Task.user_id == user_id)
+    )
+    if created_after:
+        statement = statement.where(Task.created_at >= created_after)
+    if created_before:
+        statement = statement.where(Task.created_at < created_before)
+    return statement.group_by(Task.llm_provider, Task.llm_model).order_by(Task.llm_provider, Task.llm_model)
+
+
+async def get_timing_summary(
+    session: AsyncSession,
+    user_id: int,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    prices: Optional[TokenPrices] = None,
+) -> List[ModelTimingSummary]:
+    rows = (await session.exec(timing_summary_query(user_id, created_after, created_before))).all()
+    summaries = []
+    for row in rows:
+        sums = row._mapping
+        totals = timing_totals(sums["steps"], sums)
+        summaries.append(
+            ModelTimingSummary(
+                llm_provider=row.llm_provider,
+                llm_model=row.llm_model,
+                tasks=sums["tasks"],
+                cost_usd=token_cost(row.llm_model, totals["input_tokens"], totals["output_tokens"], prices),
+                **totals,
+            )
+        )
+    return summaries
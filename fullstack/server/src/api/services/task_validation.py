@@ -2,15 +2,16 @@ import logging
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.api.models.task import Task
 from src.api.models.user import User
+from src.browser.screenshot_policy import SCREENSHOT_POLICIES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-VALID_STATUSES = ["initial", "running", "completed", "failed"]
+VALID_STATUSES = ["initial", "queued", "running", "completed", "failed"]
 
 UPDATABLE_STATUSES = ["initial", "failed", "completed"]
 
@@ -48,11 +49,36 @@ def validate_temperature(temperature: Optional[float]) -> None:
         )
 
 
-def get_task_or_404(
+def validate_screenshot_settings(
+    policy: Optional[str],
+    quality: Optional[int],
+    max_dimension: Optional[int],
+) -> None:
+    if policy is not None and policy not in SCREENSHOT_POLICIES:
+        logger.warning(f"Invalid screenshot policy: {policy}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Screenshot policy must be one of: {', '.join(SCREENSHOT_POLICIES)}",
+        )
+    if quality is not None and not 1 <= quality <= 95:
+        logger.warning(f"Invalid screenshot quality: {quality}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Screenshot quality must be between 1 and 95",
+        )
+    if max_dimension is not None and max_dimension < 64:
+        logger.warning(f"Invalid screenshot max dimension: {max_dimension}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Screenshot max dimension must be at least 64 pixels",
+        )
+
+
+async def get_task_or_404(
     task_id: int,
-    session: Session,
+    session: AsyncSession,
 ) -> Task:
-    task = session.get(Task, task_id)
+    task = await session.get(Task, task_id)
     if not task:
         logger.warning(f"Task not found: {task_id}")
         raise HTTPException(
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import and_, func, update
+from sqlmodel import Session, select
+
+from src.api.config import (
+    MAX_CONCURRENT_TASKS,
+    MAX_CONCURRENT_TASKS_PER_USER,
+    WORKER_CONCURRENCY,
+    WORKER_HEARTBEAT_INTERVAL_SECONDS,
+    WORKER_HEARTBEAT_MISSED_LIMIT,
+    WORKER_POLL_INTERVAL_SECONDS,
+)
+from src.api.db.session import engine as default_engine
+from src.api.models.task import Task
+from src.api.services.task_scheduler import DEFAULT_RUNNERS, QUEUED_STATUS, RUNNING_STATUS, TaskRunner
+from src.api.services.task_sweeper import FAILED_STATUS, TaskCleanup, TaskSweeper, release_task_resources
+
+logger = logging.getLogger(__name__)
+
+
+class ClaimedTask(NamedTuple):
+    task_id: int
+    user_id: int
+    runner: str
+    api_key: Optional[str]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def running_task_count_query():
+    return select(func.count()).select_from(Task).where(Task.status == RUNNING_STATUS)
+
+
+# pg_advisory_xact_lock key ("task" in ASCII) that serializes claims across workers
+TASK_CLAIM_LOCK_KEY = 0x7461736B
+
+
+def below_running_limits(user_id: int, max_concurrent: int, max_per_user: int):
+    """Condition for the claiming UPDATE: both running-task caps still have room."""
+    running = select(func.count()).select_from(Task).where(Task.status == RUNNING_STATUS).scalar_subquery()
+    user_running = (
+        select(func.count())
+        .select_from(Task)
+        .where(Task.status == RUNNING_STATUS, Task.user_id == user_id)
+        .scalar_subquery()
+    )
+    return and_(running < max_concurrent, user_running < max_per_user)
+
+
+def claim_candidate_query(max_per_user: int):
+    """Oldest queued task of a user below the per-user limit, locked for the claiming transaction."""
+    busy_users = (
+        select(Task.user_id)
+        .where(Task.status == RUNNING_STATUS)
+        .group_by(Task.user_id)
+        .having(func.count() >= max_per_user)
+    )
+    return (
+        select(Task)
+        .where(Task.status == QUEUED_STATUS, Task.user_id.not_in(busy_users))
+        .order_by(Task.initiated_at, Task.id)
+        .limit(1)
+        .with_for_update(skip_locked=True, of=Task)
+    )
+
+
+def claim_next_task(
+    engine,
+    worker_id: str,
+    max_concurrent: int = MAX_CONCURRENT_TASKS,
+    max_per_user: int = MAX_CONCURRENT_TASKS_PER_USER,
+) -> Optional[ClaimedTask]:
+    """Claims the oldest queued task whose user is below the per-user limit.
+
+    The caps are re-checked inside the claiming UPDATE, so the count and the
+    claim are one atomic step: on Postgres every claim first takes a
+    transaction-scoped advisory lock, so concurrent workers claim one at a
+    time and each sees the others' committed claims; SQLite runs the whole
+    UPDATE under its database write lock.
+    """
+    with Session(engine) as session:
+        if engine.dialect.name == "postgresql":
+            # Held until commit/rollback; without it two workers could both count spare capacity and both claim
+            session.execute(select(func.pg_advisory_xact_lock(TASK_CLAIM_LOCK_KEY)))
+        running = session.exec(running_task_count_query()).one()
+        if running >= max_concurrent:
+            return None
+
+        task = session.exec(claim_candidate_query(max_per_user)).first()
+        if not task:
+            return None
+
+        claimed = ClaimedTask(task.id, task.user_id, task.runner, task.queued_api_key)
+        now = datetime.now(timezone.utc)
+        result = session.execute(
+            update(Task)
+            .where(
+                Task.id == claimed.task_id,
+                Task.status == QUEUED_STATUS,
+                below_running_limits(claimed.user_id, max_concurrent, max_per_user),
+            )
+            .values(
+                status=RUNNING_STATUS,
+                worker_id=worker_id,
+                heartbeat_at=now,
+                # Start time; the sweeper judges worker tasks by heartbeat_at
+                initiated_at=now,
+                # The worker gets the key in memory; don't leave it on the row
+                queued_api_key=None,
+            )
+        )
+        if result.rowcount != 1:
+            session.rollback()
+            logger.info(f"Task {claimed.task_id} was claimed by another worker or the running limits were reached")
+            return None
+        session.commit()
+        return claimed
+
+
+def record_heartbeat(engine, worker_id: str, task_ids: List[int]) -> List[int]:
+    """Touches heartbeat_at on the running tasks owned by this worker and returns their ids."""
+    if not task_ids:
+        return []
+    with Session(engine) as session:
+        result = session.execute(
+            update(Task)
+            .where(
+                Task.id.in_(task_ids),
+                Task.worker_id == worker_id,
+                Task.status == RUNNING_STATUS,
+            )
+            .values(heartbeat_at=datetime.now(timezone.utc))
+            .returning(Task.id)
+        )
+        alive = list(result.scalars())
+        session.commit()
+        return alive
+
+
+def failed_task_ids(engine, task_ids: List[int]) -> List[int]:
+    if not task_ids:
+        return []
+    with Session(engine) as session:
+        return list(session.exec(select(Task.id).where(Task.id.in_(task_ids), Task.status == FAILED_STATUS)).all())
+
+
+def _decrypt_api_key(task_id: int, api_key: Optional[str]) -> Optional[str]:
+    if not api_key:
+        return None
+    from src.api.services.api_key_decrypter import get_api_key_decrypter
+
+    try:
+        return get_api_key_decrypter().decrypt_if_encrypted(api_key)
+    except Exception as e:
+        logger.error(f"Failed to decrypt API key for task {task_id}: {e}; using provider default")
+        return None
+
+
+class TaskWorker:
+    """Runs queued tasks outside the API process.
+
+    Any number of workers can poll the same tasks table; each claims at most
+    ``concurrency`` tasks at a time and keeps their heartbeat_at fresh while
+    they run. Every worker also sweeps stale running tasks; when its heartbeat
+    finds one of its own tasks marked failed, it releases that task's browser.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: int = WORKER_CONCURRENCY,
+        max_concurrent: int = MAX_CONCURRENT_TASKS,
+        max_per_user: int = MAX_CONCURRENT_TASKS_PER_USER,
+        poll_interval: float = WORKER_POLL_INTERVAL_SECONDS,
+        heartbeat_interval: float = WORKER_HEARTBEAT_INTERVAL_SECONDS,
+        engine=None,
+        runners: Optional[Dict[str, TaskRunner]] = None,
+        sweeper: Optional[TaskSweeper] = None,
+        release: TaskCleanup = release_task_resources,
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = concurrency
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.engine = engine or default_engine
+        self.runners = runners or DEFAULT_RUNNERS
+        self.sweeper = sweeper or TaskSweeper(
+            engine=self.engine, heartbeat_timeout_seconds=heartbeat_interval * WORKER_HEARTBEAT_MISSED_LIMIT
+        )
+        self.release = release
+        self.running: Dict[int, asyncio.Task] = {}
+        self._stopping = False
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def request_stop(self) -> None:
+        """Stops claiming new tasks; tasks already running are allowed to finish."""
+        self._stopping = True
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def claim_available(self) -> int:
+        """Claims and starts tasks until this worker is full or the queue is empty."""
+        started = 0
+        while not self._stopping and len(self.running) < self.concurrency:
+            claimed = await asyncio.to_thread(
+                claim_next_task, self.engine, self.worker_id, self.max_concurrent, self.max_per_user
+            )
+            if not claimed:
+                break
+            runner = self.runners.get(claimed.runner, self.runners["agent"])
+            api_key = await asyncio.to_thread(_decrypt_api_key, claimed.task_id, claimed.api_key)
+            if claimed.runner == "agent" and api_key is None:
+                logger.warning(f"Task {claimed.task_id} has no API key; using provider default")
+            self.running[claimed.task_id] = asyncio.create_task(
+                self._run_task(claimed.task_id, runner, api_key)
+            )
+            started += 1
+            logger.info(
+                f"Worker {self.worker_id} claimed task {claimed.task_id} "
+                f"({len(self.running)}/{self.concurrency} slots in use)"
+            )
+        return started
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        await self.sweeper.start()
+        logger.info(
+            f"Worker {self.worker_id} started (concurrency={self.concurrency}, "
+            f"max_concurrent={self.max_concurrent}, max_per_user={self.max_per_user})"
+        )
+        try:
+            while not self._stopping:
+                try:
+                    await self.claim_available()
+                except Exception as e:
+                    logger.error(f"Worker {self.worker_id} failed to claim tasks: {e}", exc_info=True)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+            if self.running:
+                logger.info(f"Worker {self.worker_id} waiting for {len(self.running)} running task(s)")
+                await asyncio.gather(*list(self.running.values()), return_exceptions=True)
+        finally:
+            await self.sweeper.stop()
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+            logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} heartbeat failed: {e}")
+
+    async def heartbeat(self) -> List[int]:
+        """Refreshes heartbeats and releases local tasks that were swept as stale. Returns the released ids."""
+        task_ids = list(self.running)
+        alive = await asyncio.to_thread(record_heartbeat, self.engine, self.worker_id, task_ids)
+        lost = [task_id for task_id in task_ids if task_id not in alive]
+        released = await asyncio.to_thread(failed_task_ids, self.engine, lost)
+        for task_id in released:
+            logger.warning(f"Task {task_id} on worker {self.worker_id} was marked failed; releasing its resources")
+            await self.release(task_id)
+        return released
+
+    async def _run_task(self, task_id: int, runner: TaskRunner, api_key: Optional[str]) -> None:
+        try:
+            await runner(task_id, api_key)
+        except Exception as e:
+            logger.error(f"Task {task_id} raised in worker {self.worker_id}: {e}", exc_info=True)
+        finally:
+            self.running.pop(task_id, None)
+            if self._wakeup:
+                self._wakeup.set()
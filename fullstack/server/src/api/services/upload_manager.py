@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, NamedTuple, Optional
+
+from src.api.config import (
+    UPLOAD_BACKOFF_BASE_SECONDS,
+    UPLOAD_BACKOFF_MAX_SECONDS,
+    UPLOAD_CHUNK_SIZE_BYTES,
+    UPLOAD_CHUNKED_THRESHOLD_BYTES,
+    UPLOAD_MAX_ATTEMPTS,
+    UPLOAD_MAX_IN_FLIGHT,
+)
+from src.api.services.artifact_storage import ARTIFACT_KINDS, create_storage_backend
+
+logger = logging.getLogger(__name__)
+
+class UploadRecord(NamedTuple):
+    task_id: int
+    kind: str
+    size_bytes: int
+    attempts: int
+    seconds: float
+    chunked: bool
+    url: Optional[str]
+
+
+class UploadManager:
+    """Puts task artifacts into the storage backend off the event loop, with retries and a global in-flight cap.
+
+    Failed attempts are retried with exponential backoff and full jitter.
+    Files larger than ``chunked_threshold`` are sent in ``chunk_size`` pieces.
+    The latest 1000 uploads are kept in ``records`` for latency reporting.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        max_in_flight: int = UPLOAD_MAX_IN_FLIGHT,
+        max_attempts: int = UPLOAD_MAX_ATTEMPTS,
+        backoff_base: float = UPLOAD_BACKOFF_BASE_SECONDS,
+        backoff_max: float = UPLOAD_BACKOFF_MAX_SECONDS,
+        chunked_threshold: int = UPLOAD_CHUNKED_THRESHOLD_BYTES,
+        chunk_size: int = UPLOAD_CHUNK_SIZE_BYTES,
+        sleep: Callable[[float], "asyncio.Future"] = asyncio.sleep,
+    ):
+        self.backend = backend or create_storage_backend()
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.chunked_threshold = chunked_threshold
+        self.chunk_size = chunk_size
+        self._sleep = sleep
+        self._slots: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self.records: Deque[UploadRecord] = deque(maxlen=1000)
+
+    def is_available(self) -> bool:
+        return self.backend.is_available()
+
+    def unavailability_reason(self) -> Optional[str]:
+        return self.backend.unavailability_reason()
+
+    def backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            for stale_loop in [known for known in self._slots if known.is_closed()]:
+                del self._slots[stale_loop]
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_in_flight)
+        return slots
+
+    async def upload(self, file_path: str, key: str, kind: str, task_id: int) -> Optional[str]:
+        """Stores file_path under key and returns its URL, or None once every attempt has failed."""
+        label = kind.upper()
+        if kind not in ARTIFACT_KINDS:
+            logger.error(f"Unsupported artifact kind: {kind}")
+            return None
+        if not self.is_available():
+            logger.warning(f"Skipping {label} upload for task {task_id}: {self.unavailability_reason()}")
+            return None
+
+        try:
+            size_bytes = os.path.getsize(file_path)
+        except OSError:
+            logger.info(f"{label} file not found at {file_path} for task {task_id} - skipping upload")
+            return None
+        if size_bytes == 0:
+            logger.warning(f"{label} file is empty for task {task_id}: {file_path}")
+            return None
+
+        chunk_size = self.chunk_size if size_bytes > self.chunked_threshold else None
+
+        start = time.perf_counter()
+        url = None
+        attempt = 0
+        while attempt < self.max_attempts:
+            attempt += 1
+            try:
+                # The slot is only held while bytes are moving, not during backoff
+                async with self._get_slots():
+                    logger.info(
+                        f"Starting {self.backend.name} {label} upload for task {task_id} "
+                        f"(attempt {attempt}/{self.max_attempts}, {size_bytes} bytes{', chunked' if chunk_size else ''})"
+                    )
+                    url = await asyncio.to_thread(self.backend.put, file_path, key, kind, chunk_size)
+                break
+            except Exception as e:
+                logger.error(f"{label} upload failed for task {task_id} (attempt {attempt}): {str(e)}")
+                if attempt < self.max_attempts:
+                    delay = self.backoff_delay(attempt - 1)
+                    logger.info(f"Retrying {label} upload for task {task_id} in {delay:.2f}s")
+                    await self._sleep(delay)
+
+        record = UploadRecord(task_id, kind, size_bytes, attempt, time.perf_counter() - start, bool(chunk_size), url)
+        self.records.append(record)
+        if url:
+            logger.info(
+                f"Uploaded {label} for task {task_id} in {record.seconds:.2f}s "
+                f"({attempt} attempt(s)): {url}"
+            )
+        else:
+            logger.error(f"All {label} upload attempts failed for task {task_id}")
+        return url
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Upload count, failures and mean/max latency per artifact kind over the recent records."""
+        summary: Dict[str, Dict[str, float]] = {}
+        for kind in ARTIFACT_KINDS:
+            records = [record for record in self.records if record.kind == kind]
+            if not records:
+                continue
+            latencies = [record.seconds for record in records]
+            summary[kind] = {
+                "uploads": len(records),
+                "failures": sum(1 for record in records if not record.url),
+                "mean_seconds": round(sum(latencies) / len(latencies), 3),
+                "max_seconds": round(max(latencies), 3),
+            }
+        return summary
+
+
+upload_manager = UploadManager()
@@ -27,12 +27,20 @@ from browser_use.utils import time_execution_async
 import socket
 
 from .custom_context import CustomBrowserContext, CustomBrowserContextConfig
+from .playwright_runtime import playwright_runtime
 
 logger = logging.getLogger(__name__)
 
 
 class CustomBrowser(Browser):
 
+    @time_execution_async('--init (browser)')
+    async def _init(self):
+        # The driver is shared, so self.playwright stays None and close() leaves it running
+        browser = await playwright_runtime.run(self._setup_browser)
+        self.playwright_browser = browser
+        return self.playwright_browser
+
     async def new_context(self, config: CustomBrowserContextConfig | None = None) -> CustomBrowserContext:
         browser_config = self.config.model_dump() if self.config else {}
         context_config = config.model_dump() if config else {}
@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+from contextlib import nullcontext
 from typing import Optional
 
 from browser_use.browser.browser import IN_DOCKER, Browser
@@ -12,6 +13,9 @@ from browser_use.browser.context import (
 from playwright.async_api import Browser as PlaywrightBrowser
 from playwright.async_api import BrowserContext as PlaywrightBrowserContext
 
+from src.agent.browser_use.step_timing import StepTimer
+from src.browser.screenshot_policy import ScreenshotPolicy
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +31,31 @@ class CustomBrowserContext(BrowserContext):
             state: Optional[BrowserContextState] = None,
     ):
         super(CustomBrowserContext, self).__init__(browser=browser, config=config, state=state)
+        # Set by the agent running on this context to account page waits and DOM extraction per step
+        self.step_timer: Optional[StepTimer] = None
+        # Set by the agent; under the "off" policy states are built without a screenshot
+        self.screenshot_policy: Optional[ScreenshotPolicy] = None
+        self._skip_screenshot = False
+
+    def _measure(self, bucket: str):
+        return self.step_timer.measure(bucket) if self.step_timer is not None else nullcontext()
+
+    async def _wait_for_page_and_frames_load(self, timeout_overwrite: float | None = None):
+        async with self._measure("wait"):
+            return await super()._wait_for_page_and_frames_load(timeout_overwrite)
+
+    async def _get_updated_state(self, focus_element: int = -1):
+        async with self._measure("dom"):
+            self._skip_screenshot = self.screenshot_policy is not None and not self.screenshot_policy.captures_screenshots
+            try:
+                return await super()._get_updated_state(focus_element)
+            finally:
+                self._skip_screenshot = False
+
+    async def take_screenshot(self, full_page: bool = False) -> Optional[str]:
+        if self._skip_screenshot:
+            return None
+        return await super().take_screenshot(full_page)
 
     async def _create_context(self, browser: PlaywrightBrowser):
         if not self.config.force_new_context and self.browser.config.cdp_url and len(browser.contexts) > 0:
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from playwright.async_api import Playwright, async_playwright
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STOP_TIMEOUT_SECONDS = 10
+
+
+def driver_alive(playwright: Playwright) -> bool:
+    """False once the driver subprocess has exited or its connection was closed."""
+    connection = getattr(getattr(playwright, "_impl_obj", None), "_connection", None)
+    if connection is None:
+        return True
+    if getattr(connection, "_closed_error", None) is not None:
+        return False
+    process = getattr(getattr(connection, "_transport", None), "_proc", None)
+    return process is None or process.returncode is None
+
+
+async def _start_driver() -> Playwright:
+    return await async_playwright().start()
+
+
+class PlaywrightRuntime:
+    """One Playwright driver (a Node subprocess) shared by every browser this process launches.
+
+    Agent browsers, the conversion refiner and the benchmark CLIs all ask
+    for the driver here instead of starting their own. It is started on
+    first use, restarted when it has died, and stopped by stop() on exit.
+    A driver belongs to the event loop that started it, so a new loop
+    (e.g. another asyncio.run) gets a new driver.
+    """
+
+    def __init__(self, starter: Callable[[], Awaitable[Playwright]] = _start_driver):
+        self.starter = starter
+        self.restarts = 0
+        self._playwright: Optional[Playwright] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def is_running(self) -> bool:
+        return self._playwright is not None and driver_alive(self._playwright)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._playwright is not None:
+                logger.info("Event loop changed; starting a new Playwright driver")
+            # The old driver's pipes are tied to a loop that can no longer run them
+            self._playwright = None
+            self._loop = loop
+            self._lock = asyncio.Lock()
+
+    async def get(self) -> Playwright:
+        """The running driver, started or restarted as needed."""
+        self._bind_loop()
+        async with self._lock:
+            if self._playwright is not None and not driver_alive(self._playwright):
+                logger.warning("Playwright driver died; restarting it")
+                await self._stop_driver()
+                self.restarts += 1
+            if self._playwright is None:
+                self._playwright = await self.starter()
+                logger.info("Started shared Playwright driver")
+            return self._playwright
+
+    async def run(self, operation: Callable[[Playwright], Awaitable[T]]) -> T:
+        """Calls operation with the driver, retrying once on a fresh driver if it died during the call."""
+        playwright = await self.get()
+        try:
+            return await operation(playwright)
+        except Exception:
+            if driver_alive(playwright):
+                raise
+            logger.warning("Playwright driver died during a call; retrying on a new driver")
+        return await operation(await self.get())
+
+    async def _stop_driver(self) -> None:
+        playwright, self._playwright = self._playwright, None
+        if playwright is None:
+            return
+        try:
+            await asyncio.wait_for(playwright.stop(), timeout=STOP_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.debug(f"Error stopping Playwright driver: {e}")
+
+    async def stop(self) -> None:
+        """Stops the driver; browsers launched on it must be closed first."""
+        if self._playwright is None or self._loop is not asyncio.get_running_loop():
+            self._playwright = None
+            return
+        async with self._lock:
+            await self._stop_driver()
+        logger.info("Stopped shared Playwright driver")
+
+
+async def run_with_playwright_runtime(main: Awaitable[T]) -> T:
+    """Runs a CLI entry point and stops the shared driver when it finishes."""
+    try:
+        return await main
+    finally:
+        await playwright_runtime.stop()
+
+
+playwright_runtime = PlaywrightRuntime()
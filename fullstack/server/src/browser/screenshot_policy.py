@@ -0,0 +1,96 @@
+import base64
+import io
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+FULL = "full"
+OFF = "off"
+KEY_STEPS = "key_steps"
+JPEG = "jpeg"
+SCREENSHOT_POLICIES = (FULL, OFF, KEY_STEPS, JPEG)
+
+# Steps whose screenshot is kept under key_steps, besides the first step, URL changes and steps without model output
+KEY_ACTIONS = {"go_to_url", "search_google", "go_back", "open_tab", "switch_tab", "done"}
+
+
+def downscale_jpeg(screenshot_b64: str, quality: int, max_dimension: int) -> Optional[str]:
+    """Re-encodes a base64 screenshot as a JPEG whose longer side is at most max_dimension, or None without Pillow."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        image = Image.open(io.BytesIO(base64.b64decode(screenshot_b64)))
+        image.thumbnail((max_dimension, max_dimension))
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True)
+        return base64.b64encode(buffer.getvalue()).decode("ascii")
+    except Exception as e:
+        logger.debug(f"Could not downscale screenshot: {e}")
+        return None
+
+
+class ScreenshotPolicy:
+    """What an agent run keeps of the screenshot browser-use captures with every state.
+
+    - full: every step's screenshot as captured (PNG)
+    - off: no screenshots; the capture itself is skipped
+    - key_steps: full screenshots only for the first step, steps that land on
+      a new URL or navigate/finish (KEY_ACTIONS) and steps without model output
+    - jpeg: every step, re-encoded as JPEG at ``quality`` with the longer side
+      at most ``max_dimension`` pixels
+
+    The agent applies select() once per step, before the step callback and
+    the history item see the state, so streaming, saved history and the GIF
+    agree; under "off" the browser context does not take the screenshot.
+    Sizes are counted in base64 characters, as stored and streamed.
+    """
+
+    def __init__(self, mode: str = FULL, quality: int = 70, max_dimension: int = 1024):
+        if mode not in SCREENSHOT_POLICIES:
+            raise ValueError(f"Invalid screenshot policy {mode!r}; expected one of {', '.join(SCREENSHOT_POLICIES)}")
+        self.mode = mode
+        self.quality = quality
+        self.max_dimension = max_dimension
+        self.steps = 0
+        self.kept = 0
+        self.captured_bytes = 0
+        self.kept_bytes = 0
+        self._last_url: Optional[str] = None
+
+    @property
+    def captures_screenshots(self) -> bool:
+        return self.mode != OFF
+
+    def is_key_step(self, url: Optional[str], action_names: Optional[Iterable[str]]) -> bool:
+        if self.steps == 0 or action_names is None or url != self._last_url:
+            return True
+        return any(name in KEY_ACTIONS for name in action_names)
+
+    def select(self, url: Optional[str], screenshot_b64: Optional[str], action_names: Optional[Iterable[str]]) -> Optional[str]:
+        """Screenshot a step keeps; action_names is None when the step has no model output."""
+        kept = screenshot_b64
+        if self.mode == KEY_STEPS and not self.is_key_step(url, action_names):
+            kept = None
+        elif self.mode == JPEG and screenshot_b64:
+            kept = downscale_jpeg(screenshot_b64, self.quality, self.max_dimension) or screenshot_b64
+        self.steps += 1
+        self._last_url = url
+        self.captured_bytes += len(screenshot_b64 or "")
+        if kept:
+            self.kept += 1
+            self.kept_bytes += len(kept)
+        return kept
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "steps": self.steps,
+            "screenshots_kept": self.kept,
+            "captured_bytes": self.captured_bytes,
+            "kept_bytes": self.kept_bytes,
+            # Unknown under "off": nothing was captured to measure
+            "saved_bytes": self.captured_bytes - self.kept_bytes if self.captures_screenshots else None,
+        }
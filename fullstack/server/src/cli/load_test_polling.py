@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def login(client, username, password):
+    response = await client.post("/auth/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def poll(client, paths, deadline, latencies, errors):
+    index = 0
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        token = await login(client, args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await client.get("/tasks", headers=headers)
+        response.raise_for_status()
+        task_ids = [task["id"] for task in response.json()][: args.max_tasks]
+
+    # Mirrors the client: the task list plus the detail view of each task
+    paths = ["/tasks"] + [f"/tasks/{task_id}" for task_id in task_ids]
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=args.timeout, limits=limits) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(poll(client, paths, deadline, latencies, errors) for _ in range(args.clients)))
+
+    return {
+        "clients": args.clients,
+        "duration_seconds": args.duration,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": round(len(latencies) / args.duration, 1),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies), 2) if latencies else None,
+            "p95": round(percentile(latencies, 95), 2) if latencies else None,
+            "p99": round(percentile(latencies, 99), 2) if latencies else None,
+            "max": round(max(latencies), 2) if latencies else None,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure API latency under concurrent task polling.")
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent polling clients.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to poll for.")
+    parser.add_argument("--max-tasks", type=int, default=20, help="Task detail pages to include in the rotation.")
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
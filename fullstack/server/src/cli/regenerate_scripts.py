@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from dotenv import load_dotenv
+
+from src.api.config import AGENT_HISTORY_DIR, SCRIPT_REGENERATION_CHUNKSIZE, SCRIPT_REGENERATION_WORKERS
+from src.api.services.script_regeneration import regenerate_all_scripts
+
+load_dotenv()
+logger = logging.getLogger("regenerate_scripts")
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate stored task scripts from their refined action lists.")
+    parser.add_argument("--base-dir", default=AGENT_HISTORY_DIR, help="Directory holding task_<id>/ history folders.")
+    parser.add_argument("--workers", type=int, default=SCRIPT_REGENERATION_WORKERS, help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunksize", type=int, default=SCRIPT_REGENERATION_CHUNKSIZE, help="Scripts per worker dispatch.")
+    parser.add_argument("--force", action="store_true", help="Regenerate even unchanged scripts.")
+    parser.add_argument("--no-upload", action="store_true", help="Only write scripts locally; do not update stored results.")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        regenerate_all_scripts(
+            base_dir=args.base_dir,
+            workers=args.workers,
+            chunksize=args.chunksize,
+            force=args.force,
+            upload=not args.no_upload,
+        )
+    )
+    print(json.dumps(report, indent=2))
@@ -12,7 +12,7 @@ import uuid
 import threading
 import time
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import fix_o3_mini
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
@@ -26,10 +26,13 @@ from browser_use.browser.context import BrowserContextWindowSize
 from dotenv import load_dotenv
 
 from src.agent.browser_use.browser_use_agent import BrowserUseAgent
+from src.agent.browser_use.step_timing import summarize_timings
 from src.browser.custom_browser import CustomBrowser
 from src.browser.custom_context import CustomBrowserContext, CustomBrowserContextConfig
+from src.browser.playwright_runtime import run_with_playwright_runtime
 from src.controller.custom_controller import CustomController
 from src.utils import llm_provider
+from src.utils.recording_encoder import recording_encoder, recording_options, transcode_video
 
 load_dotenv()
 logger = logging.getLogger("run_tests")
@@ -162,6 +165,28 @@ async def _interactive_wait(delay_seconds: float) -> None:
 
 
 
+def _step_timings(agent: BrowserUseAgent) -> List[Dict[str, Any]]:
+    """Per-step duration with its llm/dom/action/wait split and token usage, in history order."""
+    steps = []
+    for index, item in enumerate(agent.state.history.history):
+        timing = agent.step_timings[index] if index < len(agent.step_timings) else {}
+        metadata = item.metadata
+        steps.append({
+            "step_number": metadata.step_number if metadata else index + 1,
+            "duration_seconds": round(metadata.duration_seconds, 3) if metadata else None,
+            **timing,
+            "input_tokens": timing.get("input_tokens") or (metadata.input_tokens if metadata else None),
+        })
+    return steps
+
+
+def _write_timing_summary(path: Path, steps: List[Dict[str, Any]], **extra: Any) -> Dict[str, Any]:
+    summary = summarize_timings(steps)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump({**extra, "summary": summary, "steps": steps}, f, indent=2)
+    return summary
+
+
 def _safe_name(name: str) -> str:
     return re.sub(r"[^\w\-\.]+", "_", name.strip())
 
@@ -200,7 +225,14 @@ async def _run_single_test(
         max_steps: int = 50,
         window_w: int = 1280,
         window_h: int = 720,
-):
+        recording_jobs: Optional[List[asyncio.Future]] = None,
+) -> List[Dict[str, Any]]:
+    """Runs one test case; returns its step timings (empty if the agent never started).
+
+    The GIF and the browser videos are encoded in the recording encoder's
+    process pool; their futures are appended to recording_jobs so the next
+    test case can start while they encode.
+    """
     testcase_name = _safe_name(prompt.get("name", f"case_{uuid.uuid4().hex[:6]}"))
     out_dir = root_out / testcase_name
     trace_dir = out_dir / "traces"
@@ -262,6 +294,7 @@ async def _run_single_test(
     controller: Optional[CustomController] = None
     agent: Optional[BrowserUseAgent] = None
     history_file = out_dir / "agent_history.json"
+    step_timings: List[Dict[str, Any]] = []
     
     try:
         context = await browser.new_context(
@@ -309,7 +342,19 @@ async def _run_single_test(
             history = agent.state.history
 
         agent.save_history(str(history_file))
+        step_timings = _step_timings(agent)
+        summary = _write_timing_summary(out_dir / "step_timings.json", step_timings, testcase=testcase_name)
         logger.info("✓  Completed '%s' – success: %s", testcase_name, history.is_successful())
+        logger.info(
+            "   %d steps in %.1fs: llm %.1fs, dom %.1fs, action %.1fs, wait %.1fs, other %.1fs",
+            summary["steps"],
+            summary["duration_seconds"],
+            summary["llm_seconds"],
+            summary["dom_seconds"],
+            summary["action_seconds"],
+            summary["wait_seconds"],
+            summary["other_seconds"],
+        )
         
     finally:
         for _ in range(2):
@@ -323,9 +368,16 @@ async def _run_single_test(
                 browser = None
         if controller:
             await controller.close_mcp_client()
+        if recording_jobs is not None:
+            if agent and agent.recording_job is not None:
+                recording_jobs.append(agent.recording_job)
+            for video in video_dir.glob("*.webm"):
+                job = {"source_path": str(video), "target_bytes": recording_options()["target_bytes"]}
+                recording_jobs.append(recording_encoder.submit(transcode_video, job))
     
     if history_file.exists():
         _process_agent_history_screenshots(history_file)
+    return step_timings
 
 
 
@@ -352,10 +404,24 @@ async def _main(json_path: Path, headless: bool = False, model_spec: str = "open
     logger.info("Results will be stored under '%s/'", root_output_dir)
     logger.info("Using LLM: %s/%s", provider, model_name)
     
+    dataset_steps: List[Dict[str, Any]] = []
+    case_summaries: Dict[str, Dict[str, Any]] = {}
+    recording_jobs: List[asyncio.Future] = []
     for idx, case in enumerate(data["testcases"], start=1):
         prompt = case.get("prompt", {})
         logger.info("┌─ Test-case %d/%d: %s", idx, len(data["testcases"]), prompt.get("name", "Unnamed"))
-        await _run_single_test(prompt, root_output_dir, provider, model_name, headless=headless)
+        case_steps = await _run_single_test(
+            prompt, root_output_dir, provider, model_name, headless=headless, recording_jobs=recording_jobs
+        )
+        dataset_steps.extend(case_steps)
+        case_summaries[prompt.get("name", f"case_{idx}")] = summarize_timings(case_steps)
+        _write_timing_summary(
+            root_output_dir / "timing_summary.json",
+            dataset_steps,
+            provider=provider,
+            model=model_name,
+            testcases=case_summaries,
+        )
         logger.info("└─ Finished test-case %d/%d\n", idx, len(data["testcases"]))
         
         if idx < len(data["testcases"]):
@@ -365,6 +431,11 @@ async def _main(json_path: Path, headless: bool = False, model_spec: str = "open
             await _interactive_wait(delay_seconds)
             logger.info("✅ Resuming test execution")
 
+    if recording_jobs:
+        logger.info("Waiting for %d recording(s) to finish encoding...", len(recording_jobs))
+        await asyncio.gather(*recording_jobs, return_exceptions=True)
+        logger.info("Recording encoder: %s", recording_encoder.stats())
+
 
 async def _run_all_json_files(headless: bool, model_spec: str) -> None:
     dataset_dir = ROOT_DIR / "dataset"
@@ -399,9 +470,12 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
+    # Every test case's browser runs on the same Playwright driver, stopped once at the end
     if args.json_target.lower() == "all":
-        asyncio.run(_run_all_json_files(headless=args.headless, model_spec=args.model))
+        asyncio.run(run_with_playwright_runtime(_run_all_json_files(headless=args.headless, model_spec=args.model)))
     else:
         asyncio.run(
-            _main(Path(args.json_target).resolve(), headless=args.headless, model_spec=args.model)
+            run_with_playwright_runtime(
+                _main(Path(args.json_target).resolve(), headless=args.headless, model_spec=args.model)
+            )
         )
\ No newline at end of file
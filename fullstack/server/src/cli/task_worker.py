@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.api.config import MAX_CONCURRENT_TASKS, MAX_CONCURRENT_TASKS_PER_USER, WORKER_CONCURRENCY
+from src.api.services.browser_pool import browser_pool
+from src.api.services.result_processing import wait_for_recording_publishes
+from src.api.services.task_worker import TaskWorker
+from src.browser.playwright_runtime import playwright_runtime
+from src.utils.llm_clients import close_client_registry
+from src.utils.recording_encoder import recording_encoder
+
+logger = logging.getLogger("task_worker")
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+async def main(args):
+    worker = TaskWorker(
+        worker_id=args.worker_id,
+        concurrency=args.concurrency,
+        max_concurrent=args.max_concurrent,
+        max_per_user=args.max_per_user,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.request_stop)
+    await browser_pool.start()
+    try:
+        await worker.run()
+    finally:
+        await browser_pool.stop()
+        await playwright_runtime.stop()
+        await close_client_registry()
+        await wait_for_recording_publishes()
+        await asyncio.to_thread(recording_encoder.shutdown)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued tasks outside the API process.")
+    parser.add_argument("--worker-id", default=None, help="Identifier stored on claimed tasks (default: hostname-pid).")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Tasks this worker runs at once.")
+    parser.add_argument("--max-concurrent", type=int, default=MAX_CONCURRENT_TASKS, help="Running tasks allowed across all workers.")
+    parser.add_argument("--max-per-user", type=int, default=MAX_CONCURRENT_TASKS_PER_USER, help="Running tasks allowed per user.")
+    asyncio.run(main(parser.parse_args()))
@@ -26,6 +26,7 @@ from dotenv import load_dotenv
 from src.agent.browser_use.browser_use_agent import BrowserUseAgent
 from src.browser.custom_browser import CustomBrowser
 from src.browser.custom_context import CustomBrowserContext, CustomBrowserContextConfig
+from src.browser.playwright_runtime import run_with_playwright_runtime
 from src.controller.custom_controller import CustomController
 from src.utils import llm_provider
 
@@ -352,9 +353,12 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
+    # Every test case's browser runs on the same Playwright driver, stopped once at the end
     if args.json_target.lower() == "all":
-        asyncio.run(_run_all_json_files(headless=args.headless, model_spec=args.model))
+        asyncio.run(run_with_playwright_runtime(_run_all_json_files(headless=args.headless, model_spec=args.model)))
     else:
         asyncio.run(
-            _main(Path(args.json_target).resolve(), headless=args.headless, model_spec=args.model)
+            run_with_playwright_runtime(
+                _main(Path(args.json_target).resolve(), headless=args.headless, model_spec=args.model)
+            )
         )
\ No newline at end of file
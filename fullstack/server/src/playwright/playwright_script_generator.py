@@ -5,6 +5,8 @@ from typing import Any
 
 from browser_use.browser.browser import BrowserConfig, BrowserContextConfig
 
+from src.playwright.playwright_script_helpers import RUNTIME_VERSION
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,11 +18,15 @@ class PlaywrightScriptGenerator:
 		sensitive_data_keys: list[str] | None = None,
 		browser_config: BrowserConfig | None = None,
 		context_config: BrowserContextConfig | None = None,
+		inline_helpers: bool = True,
+		runtime_module: str = 'src.playwright.playwright_script_helpers',
 	):
 		self.history = history_list
 		self.sensitive_data_keys = sensitive_data_keys or []
 		self.browser_config = browser_config
 		self.context_config = context_config
+		self.inline_helpers = inline_helpers
+		self.runtime_module = runtime_module
 		self._imports_helpers_added = False
 		self._page_counter = 0
 
@@ -503,22 +509,38 @@ class PlaywrightScriptGenerator:
 			script_lines.extend(self._get_imports_and_helpers())
 			self._imports_helpers_added = True
 
-		helper_script_path = Path(__file__).parent / 'playwright_script_helpers.py'
-		try:
-			with open(helper_script_path, encoding='utf-8') as f_helper:
-				helper_script_content = f_helper.read()
-		except FileNotFoundError:
-			logger.error(f'Helper script not found at {helper_script_path}. Cannot generate script.')
-			return '# Error: Helper script file missing.'
-		except Exception as e:
-			logger.error(f'Error reading helper script {helper_script_path}: {e}')
-			return f'# Error: Could not read helper script: {e}'
+		if self.inline_helpers:
+			helper_script_path = Path(__file__).parent / 'playwright_script_helpers.py'
+			try:
+				with open(helper_script_path, encoding='utf-8') as f_helper:
+					helper_script_content = f_helper.read()
+			except FileNotFoundError:
+				logger.error(f'Helper script not found at {helper_script_path}. Cannot generate script.')
+				return '# Error: Helper script file missing.'
+			except Exception as e:
+				logger.error(f'Error reading helper script {helper_script_path}: {e}')
+				return f'# Error: Could not read helper script: {e}'
 
 		script_lines.extend(self._get_sensitive_data_definitions())
 
-		script_lines.append('\n# --- Helper Functions (from playwright_script_helpers.py) ---')
-		script_lines.append(helper_script_content)
-		script_lines.append('# --- End Helper Functions ---')
+		if self.inline_helpers:
+			script_lines.append('\n# --- Helper Functions (from playwright_script_helpers.py) ---')
+			script_lines.append(helper_script_content)
+			script_lines.append('# --- End Helper Functions ---')
+		else:
+			script_lines.extend(
+				[
+					f'from {self.runtime_module} import (',
+					'    PlaywrightActionError,',
+					'    _try_locate_and_act,',
+					'    check_runtime_version,',
+					'    replace_sensitive_data,',
+					')',
+					'',
+					f'check_runtime_version({RUNTIME_VERSION!r})',
+					'',
+				]
+			)
 
 		browser_launch_args = self._generate_browser_launch_args()
 		context_options = self._generate_context_options()
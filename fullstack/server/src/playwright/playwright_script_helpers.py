@@ -1,5 +1,16 @@
 from playwright.async_api import Page
 
+RUNTIME_VERSION = '1.0'
+
+
+def check_runtime_version(required: str) -> None:
+	installed_major, installed_minor = (int(part) for part in RUNTIME_VERSION.split('.')[:2])
+	required_major, required_minor = (int(part) for part in required.split('.')[:2])
+	if installed_major != required_major or installed_minor < required_minor:
+		raise RuntimeError(
+			f'Generated script requires playwright_script_helpers {required}, but {RUNTIME_VERSION} is installed.'
+		)
+
 
 def replace_sensitive_data(text: str, sensitive_map: dict) -> str:
 	if not isinstance(text, str):
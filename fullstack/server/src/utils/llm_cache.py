@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+logger = logging.getLogger(__name__)
+
+PASSTHROUGH = "passthrough"
+RECORD = "record"
+REPLAY = "replay"
+CACHE_MODES = (PASSTHROUGH, RECORD, REPLAY)
+
+DEFAULT_CACHE_PATH = "./tmp/llm_cache.sqlite3"
+
+# Prompt text that changes between otherwise identical runs; replaced before hashing
+VOLATILE_PATTERNS = [
+    # browser-use's per-step info
+    (re.compile(r"Current date and time: \d{4}-\d{2}-\d{2} \d{2}:\d{2}"), "Current date and time: <now>"),
+]
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode for a prompt that was never recorded."""
+
+    def __init__(self, key: str, model: str):
+        super().__init__(f"No recorded response for {model} prompt {key[:12]} (LLM_CACHE_MODE=replay)")
+        self.key = key
+
+
+def cache_mode() -> str:
+    mode = os.getenv("LLM_CACHE_MODE", PASSTHROUGH).lower()
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Invalid LLM_CACHE_MODE {mode!r}; expected one of {', '.join(CACHE_MODES)}")
+    return mode
+
+
+def _normalize_text(text: str) -> str:
+    for pattern, replacement in VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return _normalize_text(content)
+    if isinstance(content, list):
+        return [_normalize_content(part) for part in content]
+    if isinstance(content, dict):
+        return {name: _normalize_content(value) for name, value in content.items()}
+    return content
+
+
+def _normalize_message(message: BaseMessage) -> Dict[str, Any]:
+    """The parts of a message the model sees; ids and response metadata are left out."""
+    normalized = {"type": message.type, "content": _normalize_content(message.content)}
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        normalized["tool_calls"] = [{"name": call["name"], "args": call["args"], "id": call.get("id")} for call in tool_calls]
+    for field in ("tool_call_id", "name"):
+        if getattr(message, field, None):
+            normalized[field] = getattr(message, field)
+    return normalized
+
+
+def model_label(llm: BaseChatModel) -> str:
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or getattr(llm, "model_id", None)
+    return f"{llm.__class__.__name__}:{model}"
+
+
+def cache_key(llm: BaseChatModel, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+    """SHA-256 of the model, its sampling temperature, the normalized messages and the call options (tools etc.)."""
+    payload = {
+        "model": model_label(llm),
+        "temperature": getattr(llm, "temperature", None),
+        "messages": [_normalize_message(message) for message in messages],
+        "stop": stop,
+        "options": kwargs,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Chat model responses in a SQLite file, keyed by prompt hash.
+
+    One connection is shared by all threads behind a lock; lookups and
+    inserts are single-row statements, so the lock is held briefly.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, "
+            "created_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        with self._lock:
+            row = self._connection.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute("UPDATE llm_responses SET hits = hits + 1 WHERE key = ?", (key,))
+        return messages_from_dict([json.loads(row[0])])[0]
+
+    def put(self, key: str, model: str, message: BaseMessage) -> None:
+        response = json.dumps(message_to_dict(message), default=str)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, response, time.time()),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_caches: Dict[str, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(path: Optional[str] = None) -> LLMResponseCache:
+    """Process-wide cache for a file (LLM_CACHE_PATH by default)."""
+    path = os.path.abspath(path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = LLMResponseCache(path)
+        return _caches[path]
+
+
+def with_response_cache(
+    llm: BaseChatModel,
+    mode: Optional[str] = None,
+    cache: Optional[LLMResponseCache] = None,
+) -> BaseChatModel:
+    """Routes the model's invoke/ainvoke through the response cache.
+
+    The methods are replaced on the instance, so the model keeps its class
+    (browser-use looks at the class name) and its own invoke/ainvoke
+    overrides, as in DeepSeekR1ChatOpenAI, still produce recorded responses.
+    Structured output and tool binding call these methods too.
+    """
+    mode = mode or cache_mode()
+    if mode == PASSTHROUGH:
+        return llm
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Invalid LLM cache mode {mode!r}; expected one of {', '.join(CACHE_MODES)}")
+    cache = cache if cache is not None else get_response_cache()
+    label = model_label(llm)
+    live_invoke = llm.invoke
+    live_ainvoke = llm.ainvoke
+
+    def lookup(input, stop, kwargs):
+        key = cache_key(llm, llm._convert_input(input).to_messages(), stop, kwargs)
+        return key, cache.get(key)
+
+    def invoke(input, config=None, *, stop=None, **kwargs):
+        key, cached = lookup(input, stop, kwargs)
+        if cached is not None:
+            return cached
+        if mode == REPLAY:
+            raise LLMCacheMiss(key, label)
+        message = live_invoke(input, config, stop=stop, **kwargs)
+        cache.put(key, label, message)
+        return message
+
+    async def ainvoke(input, config=None, *, stop=None, **kwargs):
+        key, cached = await asyncio.to_thread(lookup, input, stop, kwargs)
+        if cached is not None:
+            return cached
+        if mode == REPLAY:
+            raise LLMCacheMiss(key, label)
+        message = await live_ainvoke(input, config, stop=stop, **kwargs)
+        await asyncio.to_thread(cache.put, key, label, message)
+        return message
+
+    # Chat models are pydantic models; plain attribute assignment would be validated as a field
+    object.__setattr__(llm, "invoke", invoke)
+    object.__setattr__(llm, "ainvoke", ainvoke)
+    logger.info(f"LLM response cache ({mode}) enabled for {label} at {cache.path}")
+    return llm
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+ClientKey = Tuple[str, str, str]
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """Short hash identifying an API key without keeping it in the registry's keys."""
+    if not api_key:
+        return "none"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _parse_provider_limits(spec: str) -> Dict[str, int]:
+    """"openai=16,ollama=2" -> {"openai": 16, "ollama": 2}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        provider, _, value = item.partition("=")
+        try:
+            limits[provider.strip().lower()] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid LLM_PROVIDER_CONCURRENCY entry: {item!r}")
+    return limits
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that gives the concurrency slot back once it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, semaphore: asyncio.Semaphore):
+        self._stream = stream
+        self._semaphore = semaphore
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._semaphore.release()
+
+
+class ConcurrencyLimitedTransport(httpx.AsyncBaseTransport):
+    """Lets at most the semaphore's value of requests be in flight, counting until each response body is closed."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, semaphore: asyncio.Semaphore):
+        self.transport = transport
+        self.semaphore = semaphore
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.semaphore.acquire()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, self.semaphore)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class LLMClientRegistry:
+    """HTTP clients shared by every chat model the process creates.
+
+    Clients are keyed by provider, base URL and API key fingerprint, so
+    tasks using the same account reuse one keep-alive connection pool
+    instead of opening their own. Each pool is bounded by max_connections,
+    and async requests to a provider are additionally capped by its
+    concurrency limit across all of its pools. Async clients belong to
+    the event loop they were created on; a new loop gets new ones.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 90,
+        default_concurrency: int = 8,
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        async_transport_factory=None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.default_concurrency = default_concurrency
+        self.provider_concurrency = provider_concurrency or {}
+        self.async_transport_factory = async_transport_factory or (lambda: httpx.AsyncHTTPTransport(limits=self.limits))
+        self._lock = threading.Lock()
+        self._sync_clients: Dict[ClientKey, httpx.Client] = {}
+        self._async_clients: Dict[ClientKey, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ollama_clients: Dict[str, Any] = {}
+
+    @classmethod
+    def from_env(cls) -> "LLMClientRegistry":
+        return cls(
+            max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "90")),
+            default_concurrency=int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "8")),
+            provider_concurrency=_parse_provider_limits(os.getenv("LLM_PROVIDER_CONCURRENCY", "")),
+        )
+
+    def concurrency_limit(self, provider: str) -> int:
+        return self.provider_concurrency.get(provider.lower(), self.default_concurrency)
+
+    def _bind_loop(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not self._loop:
+            # Connections and semaphores of another loop cannot be awaited here
+            self._async_clients = {}
+            self._semaphores = {}
+            self._ollama_clients = {host: (sync_client, None) for host, (sync_client, _) in self._ollama_clients.items()}
+            self._loop = loop
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(self.concurrency_limit(provider))
+        return self._semaphores[provider]
+
+    def _async_transport(self, provider: str) -> httpx.AsyncBaseTransport:
+        return ConcurrencyLimitedTransport(self.async_transport_factory(), self._semaphore(provider))
+
+    def http_client(self, provider: str, base_url: Optional[str], api_key: Optional[str]) -> httpx.Client:
+        key = (provider, base_url or "", key_fingerprint(api_key))
+        with self._lock:
+            client = self._sync_clients.get(key)
+            if client is None or client.is_closed:
+                client = self._sync_clients[key] = httpx.Client(limits=self.limits, timeout=None)
+            return client
+
+    def http_async_client(self, provider: str, base_url: Optional[str], api_key: Optional[str]) -> httpx.AsyncClient:
+        key = (provider, base_url or "", key_fingerprint(api_key))
+        with self._lock:
+            self._bind_loop()
+            client = self._async_clients.get(key)
+            if client is None or client.is_closed:
+                client = self._async_clients[key] = httpx.AsyncClient(transport=self._async_transport(provider), timeout=None)
+                logger.info(f"Created shared {provider} HTTP client for {base_url or 'default endpoint'}")
+            return client
+
+    def ollama_clients(self, host: str) -> Tuple[Any, Any]:
+        """ollama.Client/AsyncClient pair for a host; the ollama SDK builds its own httpx clients from these options."""
+        from ollama import AsyncClient, Client
+
+        with self._lock:
+            self._bind_loop()
+            clients = self._ollama_clients.get(host)
+            if clients is None or clients[1] is None:
+                sync_client = clients[0] if clients else Client(host=host, limits=self.limits)
+                async_client = None
+                if self._loop is not None:
+                    async_client = AsyncClient(host=host, transport=self._async_transport("ollama"))
+                clients = self._ollama_clients[host] = (sync_client, async_client)
+            return clients
+
+    def attach(self, llm, provider: str, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        """Points a chat model whose SDK clients are built internally (Anthropic, Ollama) at the shared pools."""
+        from langchain_anthropic import ChatAnthropic
+        from langchain_ollama import ChatOllama
+
+        if isinstance(llm, ChatAnthropic):
+            import anthropic
+
+            params = llm._client_params
+            # _client/_async_client are cached properties; pre-filling them skips the per-model clients
+            object.__setattr__(llm, "_client", anthropic.Client(**params, http_client=self.http_client(provider, base_url, api_key)))
+            object.__setattr__(
+                llm,
+                "_async_client",
+                anthropic.AsyncClient(**params, http_client=self.http_async_client(provider, base_url, api_key)),
+            )
+        elif isinstance(llm, ChatOllama):
+            sync_client, async_client = self.ollama_clients(base_url)
+            llm._client = sync_client
+            if async_client is not None:
+                llm._async_client = async_client
+        return llm
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sync_clients": len(self._sync_clients),
+            "async_clients": len(self._async_clients),
+            "in_flight": {
+                provider: self.concurrency_limit(provider) - semaphore._value
+                for provider, semaphore in self._semaphores.items()
+            },
+        }
+
+    async def aclose(self) -> None:
+        with self._lock:
+            sync_clients, self._sync_clients = list(self._sync_clients.values()), {}
+            async_clients, self._async_clients = list(self._async_clients.values()), {}
+            self._ollama_clients = {}
+        for client in sync_clients:
+            client.close()
+        for client in async_clients:
+            await client.aclose()
+
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def shared_clients_enabled() -> bool:
+    return os.getenv("LLM_SHARED_HTTP_CLIENTS", "true").lower() == "true"
+
+
+def get_client_registry() -> LLMClientRegistry:
+    """Process-wide registry, configured from the environment on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMClientRegistry.from_env()
+        return _registry
+
+
+async def close_client_registry() -> None:
+    if _registry is not None:
+        await _registry.aclose()
@@ -49,7 +49,7 @@ from langchain_ibm import ChatWatsonx
 from langchain_aws import ChatBedrock
 from pydantic import SecretStr
 
-from src.utils import config
+from src.utils import config, llm_cache, llm_clients
 
 
 class DeepSeekR1ChatOpenAI(ChatOpenAI):
@@ -58,7 +58,8 @@ class DeepSeekR1ChatOpenAI(ChatOpenAI):
         super().__init__(*args, **kwargs)
         self.client = OpenAI(
             base_url=kwargs.get("base_url"),
-            api_key=kwargs.get("api_key")
+            api_key=kwargs.get("api_key"),
+            http_client=kwargs.get("http_client"),
         )
 
     async def ainvoke(
@@ -157,7 +158,8 @@ class O3MiniChatOpenAI(ChatOpenAI):
         
         self.client = OpenAI(
             base_url=kwargs.get("base_url"),
-            api_key=kwargs.get("api_key")
+            api_key=kwargs.get("api_key"),
+            http_client=kwargs.get("http_client"),
         )
 
     async def ainvoke(
@@ -214,6 +216,33 @@ class O3MiniChatOpenAI(ChatOpenAI):
 
 
 def get_llm_model(provider: str, **kwargs):
+    """Chat model for the provider, behind the response cache when LLM_CACHE_MODE is record or replay."""
+    mode = llm_cache.cache_mode()
+    if mode == llm_cache.REPLAY and provider not in ["ollama", "bedrock"]:
+        if not (kwargs.get("api_key") or os.getenv(f"{provider.upper()}_API_KEY")):
+            # Replay never reaches the provider, so recorded runs work without credentials
+            kwargs["api_key"] = "replay-only"
+    return llm_cache.with_response_cache(_create_llm_model(provider, **kwargs), mode)
+
+
+def _http_clients(provider: str, base_url: Optional[str], api_key: Optional[str]) -> dict:
+    """Shared keep-alive HTTP clients for OpenAI-compatible models, or none if LLM_SHARED_HTTP_CLIENTS=false."""
+    if not llm_clients.shared_clients_enabled():
+        return {}
+    registry = llm_clients.get_client_registry()
+    return {
+        "http_client": registry.http_client(provider, base_url, api_key),
+        "http_async_client": registry.http_async_client(provider, base_url, api_key),
+    }
+
+
+def _with_shared_clients(llm, provider: str, base_url: Optional[str], api_key: Optional[str] = None):
+    if llm_clients.shared_clients_enabled():
+        llm_clients.get_client_registry().attach(llm, provider, base_url, api_key)
+    return llm
+
+
+def _create_llm_model(provider: str, **kwargs):
     if provider not in ["ollama", "bedrock"]:
         env_var = f"{provider.upper()}_API_KEY"
         api_key = kwargs.get("api_key", "") or os.getenv(env_var, "")
@@ -229,12 +258,13 @@ def get_llm_model(provider: str, **kwargs):
         else:
             base_url = kwargs.get("base_url")
 
-        return ChatAnthropic(
+        llm = ChatAnthropic(
             model=kwargs.get("model_name", "claude-3-5-sonnet-20241022"),
             temperature=kwargs.get("temperature", 0.0),
             base_url=base_url,
             api_key=api_key,
         )
+        return _with_shared_clients(llm, provider, base_url, api_key)
     elif provider == 'mistral':
         if not kwargs.get("base_url", ""):
             base_url = os.getenv("MISTRAL_ENDPOINT", "https://api.mistral.ai/v1")
@@ -264,6 +294,7 @@ def get_llm_model(provider: str, **kwargs):
                 model=model_name,
                 base_url=base_url,
                 api_key=api_key,
+                **_http_clients(provider, base_url, api_key),
             )
         else:
             return ChatOpenAI(
@@ -271,6 +302,7 @@ def get_llm_model(provider: str, **kwargs):
                 temperature=kwargs.get("temperature", 0.0),
                 base_url=base_url,
                 api_key=api_key,
+                **_http_clients(provider, base_url, api_key),
             )
     elif provider == "deepseek":
         if not kwargs.get("base_url", ""):
@@ -284,6 +316,7 @@ def get_llm_model(provider: str, **kwargs):
                 temperature=kwargs.get("temperature", 0.0),
                 base_url=base_url,
                 api_key=api_key,
+                **_http_clients(provider, base_url, api_key),
             )
         else:
             return ChatOpenAI(
@@ -291,6 +324,7 @@ def get_llm_model(provider: str, **kwargs):
                 temperature=kwargs.get("temperature", 0.0),
                 base_url=base_url,
                 api_key=api_key,
+                **_http_clients(provider, base_url, api_key),
             )
     elif provider == "google":
         return ChatGoogleGenerativeAI(
@@ -305,20 +339,21 @@ def get_llm_model(provider: str, **kwargs):
             base_url = kwargs.get("base_url")
 
         if "deepseek-r1" in kwargs.get("model_name", "qwen2.5:7b"):
-            return DeepSeekR1ChatOllama(
+            llm = DeepSeekR1ChatOllama(
                 model=kwargs.get("model_name", "deepseek-r1:14b"),
                 temperature=kwargs.get("temperature", 0.0),
                 num_ctx=kwargs.get("num_ctx", 32000),
                 base_url=base_url,
             )
         else:
-            return ChatOllama(
+            llm = ChatOllama(
                 model=kwargs.get("model_name", "qwen2.5:7b"),
                 temperature=kwargs.get("temperature", 0.0),
                 num_ctx=kwargs.get("num_ctx", 32000),
                 num_predict=kwargs.get("num_predict", 1024),
                 base_url=base_url,
             )
+        return _with_shared_clients(llm, provider, base_url)
     elif provider == "azure_openai":
         if not kwargs.get("base_url", ""):
             base_url = os.getenv("AZURE_OPENAI_ENDPOINT", "")
@@ -331,6 +366,7 @@ def get_llm_model(provider: str, **kwargs):
             api_version=api_version,
             azure_endpoint=base_url,
             api_key=api_key,
+            **_http_clients(provider, base_url, api_key),
         )
     elif provider == "alibaba":
         if not kwargs.get("base_url", ""):
@@ -343,6 +379,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url=base_url,
             api_key=api_key,
+            **_http_clients(provider, base_url, api_key),
         )
     elif provider == "ibm":
         parameters = {
@@ -367,6 +404,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url=os.getenv("MOONSHOT_ENDPOINT"),
             api_key=os.getenv("MOONSHOT_API_KEY"),
+            **_http_clients(provider, os.getenv("MOONSHOT_ENDPOINT"), os.getenv("MOONSHOT_API_KEY")),
         )
     elif provider == "unbound":
         return ChatOpenAI(
@@ -374,6 +412,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url=os.getenv("UNBOUND_ENDPOINT", "https://api.getunbound.ai"),
             api_key=api_key,
+            **_http_clients(provider, os.getenv("UNBOUND_ENDPOINT", "https://api.getunbound.ai"), api_key),
         )
     elif provider == "siliconflow":
         if not kwargs.get("api_key", ""):
@@ -389,6 +428,7 @@ def get_llm_model(provider: str, **kwargs):
             base_url=base_url,
             model_name=kwargs.get("model_name", "Qwen/QwQ-32B"),
             temperature=kwargs.get("temperature", 0.0),
+            **_http_clients(provider, base_url, api_key),
         )
     elif provider == "openrouter":
         model_name = kwargs.get("model_name", "openai/gpt-4o")
@@ -401,6 +441,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url='https://openrouter.ai/api/v1',
             api_key=api_key,
+            **_http_clients(provider, 'https://openrouter.ai/api/v1', api_key),
         )
     else:
         raise ValueError(f"Unsupported provider: {provider}")
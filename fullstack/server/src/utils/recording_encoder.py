@@ -0,0 +1,345 @@
+import asyncio
+import base64
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+RECORDING_FORMATS = ("gif", "webp", "mp4")
+FRAMES_INDEX = "frames.jsonl"
+JPEG_MAGIC = b"\xff\xd8\xff"
+
+# Attempts from best to smallest: (scale, palette colours | WebP quality | x264 CRF); the first that fits the target wins
+QUALITY_LADDERS: Dict[str, List[Tuple[float, int]]] = {
+    "gif": [(1.0, 256), (1.0, 128), (0.75, 128), (0.75, 64), (0.5, 64), (0.5, 32)],
+    "webp": [(1.0, 80), (1.0, 60), (0.75, 60), (0.75, 40), (0.5, 40), (0.5, 25)],
+    "mp4": [(1.0, 23), (1.0, 28), (0.75, 30), (0.5, 32), (0.5, 36)],
+}
+
+
+def recording_options() -> Dict[str, Any]:
+    """Output settings for agent recordings, read from the environment at call time."""
+    recording_format = os.getenv("RECORDING_FORMAT", "gif").lower()
+    if recording_format not in RECORDING_FORMATS:
+        raise ValueError(f"Invalid RECORDING_FORMAT {recording_format!r}; expected one of {', '.join(RECORDING_FORMATS)}")
+    return {
+        "format": recording_format,
+        "target_bytes": int(os.getenv("RECORDING_TARGET_BYTES", "0")),
+        "frame_duration_ms": int(os.getenv("RECORDING_FRAME_DURATION_MS", "3000")),
+    }
+
+
+def output_path_for(path: str, recording_format: str) -> str:
+    return f"{os.path.splitext(path)[0]}.{recording_format}"
+
+
+class FrameSpool:
+    """Step screenshots written to disk while the agent runs, so encoding can start from files later.
+
+    Each append decodes one base64 screenshot into its own file and adds a
+    line to frames.jsonl with the step number and goal shown in the overlay.
+    Frames left over from an earlier run at the same path are discarded.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.count = 0
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+    def append(self, screenshot_b64: str, step_number: int, goal: Optional[str]) -> None:
+        data = base64.b64decode(screenshot_b64)
+        self.count += 1
+        extension = "jpg" if data[:3] == JPEG_MAGIC else "png"
+        filename = f"frame_{self.count:05d}.{extension}"
+        with open(os.path.join(self.directory, filename), "wb") as f:
+            f.write(data)
+        with open(os.path.join(self.directory, FRAMES_INDEX), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"file": filename, "step": step_number, "goal": goal}) + "\n")
+
+    @staticmethod
+    def read(directory: str) -> List[Dict[str, Any]]:
+        index_path = os.path.join(directory, FRAMES_INDEX)
+        if not os.path.exists(index_path):
+            return []
+        with open(index_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def fit_to_size(encode: Callable[[float, int], bytes], ladder: Sequence[Tuple[float, int]], target_bytes: int) -> Tuple[bytes, int]:
+    """Encodes down the quality ladder until the output fits target_bytes (0 = first attempt).
+
+    Returns the output and the ladder index used; the smallest attempt is
+    returned when nothing fits.
+    """
+    for level, (scale, quality) in enumerate(ladder):
+        data = encode(scale, quality)
+        if not target_bytes or len(data) <= target_bytes:
+            return data, level
+    return data, level
+
+
+def ffmpeg_path() -> Optional[str]:
+    return shutil.which(os.getenv("FFMPEG_BINARY", "ffmpeg"))
+
+
+def _scaled(image, scale: float):
+    if scale >= 1.0:
+        return image
+    from PIL import Image
+
+    return image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))), Image.Resampling.LANCZOS)
+
+
+def _load_fonts():
+    from PIL import ImageFont
+
+    for font_name in ("Helvetica", "ArialUni", "Arial", "DejaVuSans", "Verdana"):
+        try:
+            return ImageFont.truetype(font_name, 40), ImageFont.truetype(font_name, 56), True
+        except OSError:
+            continue
+    return ImageFont.load_default(), ImageFont.load_default(), False
+
+
+def render_frames(spool_dir: str, task: Optional[str], show_goals: bool = True) -> list:
+    """Spooled screenshots as PIL images with browser-use's task frame and step/goal overlays."""
+    frames = FrameSpool.read(spool_dir)
+    if not frames:
+        return []
+    from browser_use.agent.gif import _add_overlay_to_image, _create_task_frame
+    from PIL import Image
+
+    regular_font, title_font, truetype = _load_fonts()
+    images = []
+    if task and truetype:
+        # The task frame sizes its text from a TrueType font; the bitmap fallback has none
+        with open(os.path.join(spool_dir, frames[0]["file"]), "rb") as f:
+            first_screenshot = base64.b64encode(f.read()).decode("ascii")
+        images.append(_create_task_frame(task, first_screenshot, title_font, regular_font))
+    for frame in frames:
+        image = Image.open(os.path.join(spool_dir, frame["file"]))
+        image.load()
+        if show_goals and frame.get("goal"):
+            image = _add_overlay_to_image(
+                image=image,
+                step_number=frame["step"],
+                goal_text=frame["goal"],
+                regular_font=regular_font,
+                title_font=title_font,
+                margin=40,
+            )
+        images.append(image.convert("RGB"))
+    return images
+
+
+def _encode_gif(images: list, duration_ms: int, scale: float, colors: int) -> bytes:
+    from PIL import Image
+
+    # Adaptive palette per frame, no dithering (flat UI colours compress better), unchanged pixels optimised away
+    frames = [_scaled(image, scale).quantize(colors=colors, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE) for image in images]
+    with tempfile.SpooledTemporaryFile() as buffer:
+        frames[0].save(buffer, format="GIF", save_all=True, append_images=frames[1:], duration=duration_ms, loop=0, optimize=True)
+        buffer.seek(0)
+        return buffer.read()
+
+
+def _encode_webp(images: list, duration_ms: int, scale: float, quality: int) -> bytes:
+    frames = [_scaled(image, scale) for image in images]
+    with tempfile.SpooledTemporaryFile() as buffer:
+        frames[0].save(
+            buffer, format="WEBP", save_all=True, append_images=frames[1:], duration=duration_ms, loop=0, quality=quality, method=4
+        )
+        buffer.seek(0)
+        return buffer.read()
+
+
+def _run_ffmpeg(arguments: List[str], output_suffix: str) -> bytes:
+    with tempfile.TemporaryDirectory() as scratch:
+        output = os.path.join(scratch, f"out{output_suffix}")
+        subprocess.run([ffmpeg_path(), "-y", "-loglevel", "error", *arguments, output], check=True, capture_output=True)
+        with open(output, "rb") as f:
+            return f.read()
+
+
+def _x264_arguments(scale: float, crf: int) -> List[str]:
+    # x264 needs even dimensions
+    scale_filter = f"scale=trunc(iw*{scale}/2)*2:trunc(ih*{scale}/2)*2"
+    return ["-vf", scale_filter, "-c:v", "libx264", "-preset", "veryfast", "-crf", str(crf), "-pix_fmt", "yuv420p", "-movflags", "+faststart"]
+
+
+def _encode_mp4(images: list, duration_ms: int, scale: float, crf: int) -> bytes:
+    with tempfile.TemporaryDirectory() as frames_dir:
+        size = images[0].size
+        for index, image in enumerate(images, start=1):
+            # One video size for all frames; pages of a different size are fitted onto it
+            if image.size != size:
+                image = image.resize(size)
+            image.save(os.path.join(frames_dir, f"frame_{index:05d}.png"))
+        framerate = f"1000/{duration_ms}"
+        return _run_ffmpeg(["-framerate", framerate, "-i", os.path.join(frames_dir, "frame_%05d.png"), *_x264_arguments(scale, crf)], ".mp4")
+
+
+ENCODERS = {"gif": _encode_gif, "webp": _encode_webp, "mp4": _encode_mp4}
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    # Readers (result processing, the web UI) only ever see a complete file
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".encoding-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def encode_history_recording(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Process-pool entry point: spooled frames -> GIF/WebP/MP4 at job["output_path"].
+
+    MP4 falls back to GIF when ffmpeg is not installed. The spool directory
+    is removed once the recording is written.
+    """
+    start = time.perf_counter()
+    recording_format = job.get("format", "gif")
+    if recording_format == "mp4" and not ffmpeg_path():
+        recording_format = "gif"
+    output_path = output_path_for(job["output_path"], recording_format)
+
+    images = render_frames(job["spool_dir"], job.get("task"), job.get("show_goals", True))
+    if not images:
+        shutil.rmtree(job["spool_dir"], ignore_errors=True)
+        return {"path": None, "format": recording_format, "frames": 0, "seconds": round(time.perf_counter() - start, 3)}
+
+    encoder = ENCODERS[recording_format]
+    data, level = fit_to_size(
+        lambda scale, quality: encoder(images, job.get("frame_duration_ms", 3000), scale, quality),
+        QUALITY_LADDERS[recording_format],
+        job.get("target_bytes", 0),
+    )
+    _write_atomically(output_path, data)
+    shutil.rmtree(job["spool_dir"], ignore_errors=True)
+    return {
+        "path": output_path,
+        "format": recording_format,
+        "frames": len(images),
+        "bytes": len(data),
+        "level": level,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def transcode_video(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Process-pool entry point: a browser webm recording -> H.264 MP4 within job["target_bytes"].
+
+    The webm is left untouched (and reported as skipped) without ffmpeg.
+    """
+    start = time.perf_counter()
+    source = job["source_path"]
+    if not ffmpeg_path():
+        return {"path": source, "skipped": "ffmpeg not found", "seconds": 0.0}
+    data, level = fit_to_size(
+        lambda scale, crf: _run_ffmpeg(["-i", source, "-an", *_x264_arguments(scale, crf)], ".mp4"),
+        QUALITY_LADDERS["mp4"],
+        job.get("target_bytes", 0),
+    )
+    output_path = output_path_for(source, "mp4")
+    _write_atomically(output_path, data)
+    source_bytes = os.path.getsize(source)
+    if job.get("remove_source", True):
+        os.remove(source)
+    return {
+        "path": output_path,
+        "source_bytes": source_bytes,
+        "bytes": len(data),
+        "level": level,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+class RecordingEncoder:
+    """Process pool for recording post-processing (GIF/WebP/MP4 encoding, webm transcoding).
+
+    Pillow and ffmpeg work runs in worker processes, so it neither blocks an
+    agent's event loop nor competes for the GIL. At most ``workers`` jobs
+    encode at once (CPU count by default); further jobs queue in the pool.
+    submit() returns an asyncio future that callers await only if they need
+    the file.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.encode_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RecordingEncoder":
+        return cls(workers=int(os.getenv("RECORDING_ENCODE_WORKERS", "0")) or None)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a process that runs an event loop and browser threads can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def submit(self, function: Callable[[Dict[str, Any]], Dict[str, Any]], job: Dict[str, Any]) -> asyncio.Future:
+        future = asyncio.get_running_loop().run_in_executor(self._get_executor(), function, job)
+        self.submitted += 1
+        self.pending += 1
+        future.add_done_callback(lambda done: self._record(function.__name__, done))
+        return future
+
+    def _record(self, name: str, future: asyncio.Future) -> None:
+        self.pending -= 1
+        if future.cancelled():
+            self.failed += 1
+            return
+        error = future.exception()
+        if error is not None:
+            self.failed += 1
+            logger.error(f"Recording job {name} failed: {type(error).__name__}: {error}")
+            return
+        self.completed += 1
+        report = future.result()
+        self.encode_seconds += report.get("seconds") or 0.0
+        logger.info(f"Recording job {name} finished: {report}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "encode_seconds": round(self.encode_seconds, 3),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+recording_encoder = RecordingEncoder.from_env()
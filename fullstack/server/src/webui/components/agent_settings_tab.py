@@ -78,6 +78,29 @@ def create_agent_settings_tab(webui_manager: WebuiManager):
                 info="Your API key (leave blank to use .env)",
             )
 
+        with gr.Row():
+            screenshot_policy = gr.Dropdown(
+                choices=["full", "off", "key_steps", "jpeg"],
+                value="full",
+                label="Screenshot Policy",
+                info="Screenshots kept in history, GIF and chat: all, none, key steps only or downscaled JPEG",
+                interactive=True,
+            )
+            screenshot_quality = gr.Slider(
+                minimum=10,
+                maximum=95,
+                value=70,
+                step=5,
+                label="JPEG Quality",
+                interactive=True,
+            )
+            screenshot_max_dimension = gr.Number(
+                label="JPEG Max Dimension",
+                value=1024,
+                precision=0,
+                interactive=True,
+            )
+
     tab_components.update(
         dict(
             llm_provider=llm_provider,
@@ -87,6 +110,9 @@ def create_agent_settings_tab(webui_manager: WebuiManager):
             ollama_num_ctx=ollama_num_ctx,
             llm_base_url=llm_base_url,
             llm_api_key=llm_api_key,
+            screenshot_policy=screenshot_policy,
+            screenshot_quality=screenshot_quality,
+            screenshot_max_dimension=screenshot_max_dimension,
         )
     )
     webui_manager.add_components("agent_settings", tab_components)
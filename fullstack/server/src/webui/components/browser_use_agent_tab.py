@@ -37,6 +37,7 @@ from langchain_core.language_models.chat_models import BaseChatModel
 from src.agent.browser_use.browser_use_agent import BrowserUseAgent
 from src.browser.custom_browser import CustomBrowser
 from src.browser.custom_context import CustomBrowserContext, CustomBrowserContextConfig
+from src.browser.screenshot_policy import ScreenshotPolicy
 from src.controller.custom_controller import CustomController
 from src.utils import llm_provider
 from src.webui.webui_manager import WebuiManager
@@ -363,6 +364,11 @@ async def run_agent_task(
     llm_model_name = get_setting("llm_model_name", None)
     llm_temperature = get_setting("llm_temperature", 0.6)
     use_vision = get_setting("use_vision", False)
+    screenshot_policy = ScreenshotPolicy(
+        get_setting("screenshot_policy", "full") or "full",
+        int(get_setting("screenshot_quality", 70)),
+        int(get_setting("screenshot_max_dimension", 1024)),
+    )
     ollama_num_ctx = get_setting("ollama_num_ctx", 16000)
     llm_base_url = get_setting("llm_base_url") or None
     llm_api_key = get_setting("llm_api_key") or None
@@ -503,6 +509,7 @@ async def run_agent_task(
                 max_input_tokens=max_input_tokens,
                 max_actions_per_step=max_actions,
                 tool_calling_method=tool_calling_method,
+                screenshot_policy=screenshot_policy,
             )
             webui_manager.bu_agent.state.agent_id = webui_manager.bu_agent_task_id
             webui_manager.bu_agent.settings.generate_gif = gif_path
@@ -510,6 +517,7 @@ async def run_agent_task(
             webui_manager.bu_agent.state.agent_id = webui_manager.bu_agent_task_id
             webui_manager.bu_agent.add_new_task(task)
             webui_manager.bu_agent.settings.generate_gif = gif_path
+            webui_manager.bu_agent.screenshot_policy = screenshot_policy
             webui_manager.bu_agent.browser = webui_manager.bu_browser
             webui_manager.bu_agent.browser_context = webui_manager.bu_browser_context
             webui_manager.bu_agent.controller = webui_manager.bu_controller
@@ -654,10 +662,6 @@ async def run_agent_task(
             if os.path.exists(history_file):
                 final_update[history_file_comp] = gr.File(value=history_file)
 
-            if gif_path and os.path.exists(gif_path):
-                logger.info(f"GIF found at: {gif_path}")
-                final_update[gif_comp] = gr.Image(value=gif_path)
-
         except asyncio.CancelledError:
             logger.info("Agent task was cancelled.")
             if not any(
@@ -716,6 +720,18 @@ async def run_agent_task(
             )
             yield final_update
 
+            # The recording encodes in the encoder pool; the controls are usable again while it does
+            recording_job = webui_manager.bu_agent.recording_job
+            if webui_manager.bu_wait_for_recording and recording_job is not None:
+                try:
+                    recording_path = (await recording_job).get("path")
+                except Exception as e:
+                    logger.error(f"Recording encoding failed: {e}")
+                    recording_path = None
+                if recording_path and recording_path.endswith((".gif", ".webp")):
+                    logger.info(f"Recording ready at: {recording_path}")
+                    yield {gif_comp: gr.Image(value=recording_path)}
+
     except Exception as e:
         logger.error(f"Error setting up agent task: {e}", exc_info=True)
         webui_manager.bu_current_task = None
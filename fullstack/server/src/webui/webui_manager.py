@@ -35,6 +35,8 @@ class WebuiManager:
         self.bu_user_help_response: Optional[str] = None
         self.bu_current_task: Optional[asyncio.Task] = None
         self.bu_agent_task_id: Optional[str] = None
+        # Show the recording once the encoder pool has written it; the task API publishes it itself
+        self.bu_wait_for_recording: bool = True
 
 
     def add_components(self, tab_name: str, components_dict: dict[str, "Component"]) -> None:
@@ -0,0 +1,49 @@
+import asyncio
+import sys
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+sys.path.append(".")
+
+from src.api.models.user import User
+
+
+@pytest.fixture(name="seed_rows")
+def seed_rows_fixture():
+    """Rows added to the test database; modules override this with their own."""
+    return [User(id=1, username="alice", hashed_password="x")]
+
+
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path, seed_rows):
+    db_path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(seed_rows)
+        session.commit()
+    engine.dispose()
+    return db_path
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(db_path):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    yield async_engine
+    # Tests drive their own event loops, so pooled aiosqlite connections are closed in a fresh one
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture(name="session_factory")
+def session_factory_fixture(async_engine):
+    return async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
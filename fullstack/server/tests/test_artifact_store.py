@@ -0,0 +1,184 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from sqlmodel import Session
+
+sys.path.append(".")
+
+from src.api.models.artifact import ArtifactBlob
+from src.api.models.result import Result
+from src.api.models.task import Task
+from src.api.models.user import User
+from src.api.services.artifact_storage import LocalStorageBackend, S3StorageBackend, storage_key
+from src.api.services.artifact_store import (
+    DELETING_REF_COUNT,
+    ArtifactStore,
+    assign_result_artifacts,
+    file_digest,
+    prune_recordings,
+    release_result_artifacts,
+)
+from src.api.services.upload_manager import UploadManager
+
+
+class CountingBackend(LocalStorageBackend):
+    def __init__(self, root):
+        super().__init__(root)
+        self.puts = []
+
+    def put(self, file_path, key, kind, chunk_size):
+        self.puts.append(key)
+        return super().put(file_path, key, kind, chunk_size)
+
+
+@pytest.fixture(name="seed_rows")
+def seed_rows_fixture():
+    rows = [User(id=1, username="alice", hashed_password="x")]
+    for task_id in range(1, 4):
+        rows += [Task(id=task_id, task_name=f"task {task_id}", user_id=1, status="completed"), Result(task_id=task_id)]
+    return rows
+
+
+@pytest.fixture(name="store")
+def store_fixture(session_factory, tmp_path):
+    backend = CountingBackend(str(tmp_path / "uploads"))
+    return ArtifactStore(UploadManager(backend=backend), session_factory)
+
+
+def _assign(engine, task_id, **artifacts):
+    with Session(engine) as session:
+        result = session.get(Result, task_id)
+        assign_result_artifacts(session, result, **artifacts)
+        session.add(result)
+        session.commit()
+
+
+def test_identical_files_are_uploaded_once_and_shared(engine, store, tmp_path):
+    first, second = tmp_path / "task_1.py", tmp_path / "task_2.py"
+    first.write_text("print('same')")
+    second.write_text("print('same')")
+
+    stored = [asyncio.run(store.store(str(path), "script", task_id)) for task_id, path in ((1, first), (2, second))]
+    _assign(engine, 1, script=stored[0])
+    _assign(engine, 2, script=stored[1])
+
+    digest = file_digest(str(first))
+    assert stored[0] == stored[1]
+    assert stored[0].digest == digest
+    assert store.backend.puts == [storage_key("script", digest)]
+    with Session(engine) as session:
+        assert session.get(ArtifactBlob, digest).ref_count == 2
+        assert session.get(Result, 2).result_json_url == stored[0].url
+
+
+def test_garbage_collection_only_removes_unreferenced_blobs(engine, store, tmp_path):
+    kept, dropped = tmp_path / "kept.gif", tmp_path / "dropped.gif"
+    kept.write_bytes(b"GIF89a kept")
+    dropped.write_bytes(b"GIF89a dropped")
+    kept_artifact = asyncio.run(store.store(str(kept), "gif", 1))
+    dropped_artifact = asyncio.run(store.store(str(dropped), "gif", 2))
+    _assign(engine, 1, gif=kept_artifact)
+    _assign(engine, 2, gif=dropped_artifact)
+
+    # Replacing an artifact moves the reference, releasing a result drops it
+    _assign(engine, 2, gif=kept_artifact)
+    with Session(engine) as session:
+        result = session.get(Result, 1)
+        assert release_result_artifacts(session, result) == 1
+        session.delete(result)
+        session.commit()
+
+    assert asyncio.run(store.collect_garbage(grace_seconds=3600)) == []
+    assert asyncio.run(store.collect_garbage(grace_seconds=0)) == [dropped_artifact.digest]
+
+    assert os.path.exists(kept_artifact.url)
+    assert not os.path.exists(dropped_artifact.url)
+    with Session(engine) as session:
+        assert session.get(ArtifactBlob, kept_artifact.digest).ref_count == 1
+        assert session.get(ArtifactBlob, dropped_artifact.digest) is None
+
+
+
+def test_blob_whose_storage_delete_fails_is_kept_and_retried(engine, store, tmp_path, monkeypatch):
+    dropped = tmp_path / "dropped.gif"
+    dropped.write_bytes(b"GIF89a dropped")
+    artifact = asyncio.run(store.store(str(dropped), "gif", 1))
+
+    def refuse(key, kind):
+        raise RuntimeError("storage unavailable")
+
+    monkeypatch.setattr(store.backend, "delete", refuse)
+    assert asyncio.run(store.collect_garbage(grace_seconds=0)) == []
+    assert os.path.exists(artifact.url)
+    with Session(engine) as session:
+        assert session.get(ArtifactBlob, artifact.digest).ref_count == DELETING_REF_COUNT
+
+    # A blob being deleted is uploaded again rather than reused
+    assert asyncio.run(store.store(str(dropped), "gif", 2)) == artifact
+    assert len(store.backend.puts) == 2
+    with Session(engine) as session:
+        assert session.get(ArtifactBlob, artifact.digest).ref_count == 0
+
+    monkeypatch.undo()
+    assert asyncio.run(store.collect_garbage(grace_seconds=0)) == [artifact.digest]
+    assert not os.path.exists(artifact.url)
+    with Session(engine) as session:
+        assert session.get(ArtifactBlob, artifact.digest) is None
+
+def test_prune_recordings_removes_old_files(tmp_path):
+    old, recent = tmp_path / "old.webm", tmp_path / "recent.webm"
+    old.write_bytes(b"old")
+    recent.write_bytes(b"recent")
+    two_days_ago = time.time() - 48 * 3600
+    os.utime(old, (two_days_ago, two_days_ago))
+
+    assert prune_recordings(str(tmp_path), max_age_hours=24) == 1
+    assert not old.exists()
+    assert recent.exists()
+    assert prune_recordings(str(tmp_path / "missing"), max_age_hours=24) == 0
+
+
+def test_prune_recordings_descends_into_task_directories(tmp_path):
+    finished, running = tmp_path / "task_1", tmp_path / "task_2"
+    finished.mkdir()
+    running.mkdir()
+    old = finished / "page.webm"
+    old.write_bytes(b"old")
+    two_days_ago = time.time() - 48 * 3600
+    os.utime(old, (two_days_ago, two_days_ago))
+
+    assert prune_recordings(str(tmp_path), max_age_hours=24) == 1
+    assert not finished.exists()
+    # Empty but new: a task that has not written its video yet
+    assert running.exists()
+
+
+def test_s3_backend_uploads_with_content_type_and_deletes_by_key(tmp_path):
+    class FakeS3Client:
+        def __init__(self):
+            self.calls = []
+
+        def upload_file(self, file_path, bucket, key, ExtraArgs=None, Config=None):
+            self.calls.append(("upload", bucket, key, ExtraArgs["ContentType"], Config is not None))
+
+        def delete_object(self, Bucket, Key):
+            self.calls.append(("delete", Bucket, Key))
+
+    client = FakeS3Client()
+    backend = S3StorageBackend(bucket="artifacts", endpoint_url="http://minio:9000", client=client)
+    gif = tmp_path / "task_1.gif"
+    gif.write_bytes(b"GIF89a")
+
+    url = backend.put(str(gif), "gif/ab/abcd.gif", "gif", None)
+    backend.delete("gif/ab/abcd.gif", "gif")
+
+    assert backend.is_available()
+    assert url == "http://minio:9000/artifacts/gif/ab/abcd.gif"
+    assert client.calls == [
+        ("upload", "artifacts", "gif/ab/abcd.gif", "image/gif", False),
+        ("delete", "artifacts", "gif/ab/abcd.gif"),
+    ]
+    assert S3StorageBackend(bucket=None, client=client).unavailability_reason() == "S3_BUCKET is not set"
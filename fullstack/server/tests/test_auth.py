@@ -2,37 +2,52 @@ import os
 import sys
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
-from sqlmodel.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 sys.path.append(".")
 
+from src.api.db.session import get_session
 from src.api.main import app
 from src.api.models.user import User
+from src.api.services import auth
+from src.api.services.principal_cache import PrincipalCache, principal_cache
 from src.api.services.security import hash_password
 
 
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path):
+    return tmp_path / "test.db"
+
+
 @pytest.fixture(name="session")
-def session_fixture():
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
+def session_fixture(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
     SQLModel.metadata.create_all(engine)
     with Session(engine) as session:
         yield session
 
 
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
+def client_fixture(session: Session, db_path):
     hashed_password = hash_password("testpassword")
     test_user = User(username="testuser", hashed_password=hashed_password)
     session.add(test_user)
     session.commit()
     
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_test_session():
+        async with session_factory() as async_session:
+            yield async_session
+
+    app.dependency_overrides[get_session] = get_test_session
     client = TestClient(app)
     yield client
+    app.dependency_overrides.clear()
 
 
 def test_login_success(client: TestClient):
@@ -79,4 +94,72 @@ def test_protected_endpoint_no_token(client: TestClient):
     assert response.status_code == 401
     data = response.json()
     assert "detail" in data
-    assert data["detail"] == "Not authenticated"
\ No newline at end of file
+    assert data["detail"] == "Not authenticated"
+
+
+def _login(client: TestClient) -> dict:
+    response = client.post(
+        "/api/v1/auth/token",
+        data={"username": "testuser", "password": "testpassword"},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_principal_cache_skips_user_lookup(client: TestClient, session: Session):
+    headers = _login(client)
+    before = principal_cache.stats()
+    assert client.get("/api/v1/hello/protected", headers=headers).status_code == 200
+
+    # Removed behind the ORM's back: only the cached principal can still answer
+    session.execute(text("DELETE FROM users"))
+    session.commit()
+    assert client.get("/api/v1/hello/protected", headers=headers).status_code == 200
+
+    after = principal_cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
+
+def test_principal_cache_invalidated_on_user_change(client: TestClient, session: Session):
+    headers = _login(client)
+    assert client.get("/api/v1/hello/protected", headers=headers).status_code == 200
+
+    user = session.exec(select(User).where(User.username == "testuser")).one()
+    session.delete(user)
+    session.commit()
+
+    assert client.get("/api/v1/hello/protected", headers=headers).status_code == 401
+
+
+def test_trusted_token_claims_skip_database(client: TestClient, session: Session, monkeypatch):
+    headers = _login(client)
+    session.execute(text("DELETE FROM users"))
+    session.commit()
+    monkeypatch.setattr(auth, "AUTH_TRUST_TOKEN_CLAIMS", True)
+
+    response = client.get("/api/v1/hello/protected", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Hello, testuser!"
+
+
+def test_principal_cache_ttl_and_lru():
+    now = [0.0]
+    cache = PrincipalCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+    alice, bob, carol = (User(id=i, username=name, hashed_password="x") for i, name in enumerate(["alice", "bob", "carol"], 1))
+
+    cache.put("a", alice)
+    cache.put("b", bob)
+    assert cache.get("a") is alice
+    cache.put("c", carol, token_expires_in=5)
+    # "b" was least recently used
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    # Entries never outlive their token
+    now[0] = 6
+    assert cache.get("a") is alice
+    assert cache.get("c") is None
+
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,207 @@
+import asyncio
+import sys
+import threading
+
+from fastapi.testclient import TestClient
+
+sys.path.append(".")
+
+from src.api.main import app
+from src.api.models.user import User
+from src.api.services.auth import get_current_user
+from src.api.services.browser_pool import BrowserPool, BrowserProfile
+
+HEADLESS = BrowserProfile()
+HEADFUL = BrowserProfile(headless=False)
+
+
+class FakeBrowser:
+    def __init__(self, profile):
+        self.profile = profile
+        self.contexts_served = 0
+        self.connected = True
+        self.memory = 100 * 1024 * 1024
+        self.closed = False
+        self.probed_on = []
+
+    def is_connected(self):
+        return self.connected
+
+    def memory_bytes(self):
+        self.probed_on.append(threading.get_ident())
+        return self.memory
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeLauncher:
+    def __init__(self):
+        self.launched = []
+
+    async def __call__(self, profile):
+        browser = FakeBrowser(profile)
+        self.launched.append(browser)
+        return browser
+
+
+def _pool(**kwargs):
+    launcher = FakeLauncher()
+    options = {"size": 1, "max_contexts": 3, "max_memory_mb": 500, "health_check_interval": 60, "prewarm": False}
+    options.update(kwargs)
+    return BrowserPool(launcher=launcher, **options), launcher
+
+
+def test_released_browsers_are_reused_per_profile():
+    pool, launcher = _pool()
+
+    async def scenario():
+        first = await pool.acquire(HEADLESS)
+        await pool.release(first)
+        second = await pool.acquire(HEADLESS)
+        other = await pool.acquire(HEADFUL)
+        return first, second, other
+
+    first, second, other = asyncio.run(scenario())
+
+    assert second is first
+    assert other is not first and other.profile == HEADFUL
+    assert len(launcher.launched) == 2
+    assert pool.stats()["reused"] == 1
+
+
+def test_browsers_are_leased_exclusively_and_extras_closed_on_release():
+    pool, launcher = _pool()
+
+    async def scenario():
+        first = await pool.acquire(HEADLESS)
+        second = await pool.acquire(HEADLESS)
+        await pool.release(first)
+        await pool.release(second)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first is not second
+    assert not first.closed
+    assert second.closed
+    assert pool.stats()["closed"]["pool_full"] == 1
+
+
+def test_browser_is_recycled_after_serving_max_contexts():
+    pool, launcher = _pool()
+
+    async def scenario():
+        for _ in range(3):
+            await pool.release(await pool.acquire(HEADLESS))
+        await asyncio.sleep(0)
+        return await pool.acquire(HEADLESS)
+
+    fresh = asyncio.run(scenario())
+
+    assert launcher.launched[0].closed
+    assert launcher.launched[0].contexts_served == 3
+    assert fresh is launcher.launched[1]
+    assert pool.stats()["closed"]["max_contexts"] == 1
+
+
+def test_browser_over_the_memory_limit_is_not_returned():
+    pool, launcher = _pool()
+
+    async def scenario():
+        browser = await pool.acquire(HEADLESS)
+        browser.memory = 600 * 1024 * 1024
+        await pool.release(browser)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert launcher.launched[0].closed
+    # The process probe runs in a worker thread, not on the event loop
+    assert launcher.launched[0].probed_on and threading.get_ident() not in launcher.launched[0].probed_on
+    assert pool.stats()["closed"]["memory"] == 1
+    # Replacement launched in the background
+    assert pool.stats()["idle"] == {"headless-1280x720-insecure": 1}
+
+
+def test_health_check_replaces_dead_idle_browsers():
+    pool, launcher = _pool(size=2)
+
+    async def scenario():
+        await pool.fill(HEADLESS)
+        launcher.launched[0].connected = False
+        closed = await pool.check_health()
+        return closed, await pool.acquire(HEADLESS), await pool.acquire(HEADLESS)
+
+    closed, first, second = asyncio.run(scenario())
+
+    assert closed == 1
+    assert len(launcher.launched) == 3
+    assert launcher.launched[0] not in (first, second)
+    assert pool.stats()["cold_starts"] == 0
+
+
+def test_health_check_only_refills_profiles_it_closed_browsers_of():
+    pool, launcher = _pool()
+
+    async def scenario():
+        await pool.fill(HEADLESS)
+        await pool.fill(HEADFUL)
+        launcher.launched[0].connected = False
+        # Leaves the headful profile with no idle browser
+        leased = await pool.acquire(HEADFUL)
+        return await pool.check_health(), leased
+
+    closed, leased = asyncio.run(scenario())
+
+    assert closed == 1
+    assert leased is launcher.launched[1]
+    assert len(launcher.launched) == 3
+    assert launcher.launched[2].profile == HEADLESS
+    assert pool.stats()["idle"] == {"headless-1280x720-insecure": 1, "headful-1280x720-insecure": 0}
+
+
+def test_stop_closes_idle_browsers_and_later_releases():
+    pool, launcher = _pool(size=2)
+
+    async def scenario():
+        await pool.fill(HEADLESS)
+        leased = await pool.acquire(HEADLESS)
+        await pool.stop()
+        await pool.release(leased)
+
+    asyncio.run(scenario())
+
+    assert all(browser.closed for browser in launcher.launched)
+
+
+def test_disabled_pool_launches_per_task():
+    pool, launcher = _pool(size=0)
+
+    async def scenario():
+        await pool.start()
+        first = await pool.acquire(HEADLESS)
+        await pool.release(first)
+        second = await pool.acquire(HEADLESS)
+        await pool.stop()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first.closed
+    assert second is not first
+
+
+def test_pool_stats_endpoint(monkeypatch):
+    pool, _ = _pool()
+    asyncio.run(pool.release(asyncio.run(pool.acquire(HEADLESS))))
+    monkeypatch.setattr("src.api.routers.tasks.browser_pool", pool)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="alice", hashed_password="x")
+    try:
+        response = TestClient(app).get("/api/v1/tasks/browser-pool")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["idle"] == {"headless-1280x720-insecure": 1}
+    assert response.json()["cold_starts"] == 1
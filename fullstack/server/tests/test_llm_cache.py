@@ -0,0 +1,134 @@
+import asyncio
+import sys
+from typing import Any, List
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import BaseModel
+
+sys.path.append(".")
+
+from src.utils.llm_cache import LLMCacheMiss, LLMResponseCache, with_response_cache
+
+
+class CountingChatModel(BaseChatModel):
+    """Answers every prompt with a tool call and counts how often it was really called."""
+
+    model_name: str = "counting-1"
+    temperature: float = 0.0
+    calls: List[Any] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls.append(messages)
+        message = AIMessage(content="", tool_calls=[{"name": "Answer", "args": {"value": len(self.calls)}, "id": "1"}])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[tool.model_json_schema() for tool in tools], **kwargs)
+
+
+class ReasoningChatModel(CountingChatModel):
+    """Overrides invoke/ainvoke like DeepSeekR1ChatOpenAI and O3MiniChatOpenAI do."""
+
+    def invoke(self, input, config=None, *, stop=None, **kwargs):
+        self.calls.append(input)
+        return AIMessage(content=f"answer {len(self.calls)}", reasoning_content="thought about it")
+
+    async def ainvoke(self, input, config=None, *, stop=None, **kwargs):
+        return self.invoke(input, config, stop=stop, **kwargs)
+
+
+class Answer(BaseModel):
+    value: int
+
+
+def _prompt(time_str="2025-01-01 10:00", question="Open the login page"):
+    return [
+        SystemMessage(content="You are a browser agent."),
+        HumanMessage(content=f"{question}\nCurrent date and time: {time_str}"),
+    ]
+
+
+@pytest.fixture(name="cache")
+def cache_fixture(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_record_mode_answers_repeated_prompts_from_the_cache(cache):
+    llm = with_response_cache(CountingChatModel(calls=[]), "record", cache)
+
+    async def scenario():
+        first = await llm.ainvoke(_prompt("2025-01-01 10:00"))
+        # Only the timestamp differs
+        second = await llm.ainvoke(_prompt("2025-06-30 18:45"))
+        third = await llm.ainvoke(_prompt(question="Open the signup page"))
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert len(llm.calls) == 2
+    assert second.tool_calls == first.tool_calls
+    assert third.tool_calls[0]["args"] == {"value": 2}
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+
+def test_structured_output_is_replayed_offline(cache):
+    recorder = with_response_cache(CountingChatModel(calls=[]), "record", cache)
+    asyncio.run(recorder.with_structured_output(Answer, include_raw=True).ainvoke(_prompt()))
+
+    replayer = with_response_cache(CountingChatModel(calls=[]), "replay", cache)
+    response = asyncio.run(replayer.with_structured_output(Answer, include_raw=True).ainvoke(_prompt("2030-12-31 23:59")))
+
+    assert response["parsed"] == Answer(value=1)
+    assert replayer.calls == []
+
+
+def test_replay_mode_raises_for_unrecorded_prompts(cache):
+    llm = with_response_cache(CountingChatModel(calls=[]), "replay", cache)
+
+    with pytest.raises(LLMCacheMiss):
+        llm.invoke(_prompt())
+    assert llm.calls == []
+
+
+def test_tools_and_model_are_part_of_the_key(cache):
+    llm = with_response_cache(CountingChatModel(calls=[]), "record", cache)
+    other_model = with_response_cache(CountingChatModel(model_name="counting-2", calls=[]), "record", cache)
+
+    llm.invoke(_prompt())
+    llm.bind_tools([Answer]).invoke(_prompt())
+    other_model.invoke(_prompt())
+
+    assert len(cache) == 3
+
+
+def test_invoke_overrides_are_cached_with_their_extra_fields(cache):
+    llm = with_response_cache(ReasoningChatModel(calls=[]), "record", cache)
+
+    first = llm.invoke(_prompt())
+    second = asyncio.run(llm.ainvoke(_prompt()))
+
+    assert len(llm.calls) == 1
+    assert second.content == first.content == "answer 1"
+    assert second.reasoning_content == "thought about it"
+    assert type(llm).__name__ == "ReasoningChatModel"
+
+
+def test_passthrough_leaves_the_model_untouched(cache):
+    model = CountingChatModel(calls=[])
+    llm = with_response_cache(model, "passthrough", cache)
+
+    llm.invoke(_prompt())
+    llm.invoke(_prompt())
+
+    assert llm is model
+    assert len(model.calls) == 2
+    assert len(cache) == 0
@@ -0,0 +1,106 @@
+import asyncio
+import sys
+
+import httpx
+from langchain_anthropic import ChatAnthropic
+from langchain_openai import ChatOpenAI
+
+sys.path.append(".")
+
+from src.utils.llm_clients import LLMClientRegistry, _parse_provider_limits
+
+
+class JsonBody(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        yield b'{"ok": true}'
+
+
+class SlowTransport(httpx.AsyncBaseTransport):
+    """Answers after a short delay and records the highest number of overlapping requests."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    async def handle_async_request(self, request):
+        self.stats["active"] += 1
+        self.stats["peak"] = max(self.stats["peak"], self.stats["active"])
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.stats["active"] -= 1
+        # Unread like a network response, so the client reads and closes the body
+        return httpx.Response(200, headers={"content-type": "application/json"}, stream=JsonBody())
+
+
+def test_clients_are_shared_per_provider_endpoint_and_key():
+    registry = LLMClientRegistry()
+
+    async def scenario():
+        first = registry.http_async_client("openai", "https://api.openai.com/v1", "sk-one")
+        same = registry.http_async_client("openai", "https://api.openai.com/v1", "sk-one")
+        other_key = registry.http_async_client("openai", "https://api.openai.com/v1", "sk-two")
+        other_url = registry.http_async_client("openai", "https://proxy.example.com/v1", "sk-one")
+        await registry.aclose()
+        return first, same, other_key, other_url
+
+    first, same, other_key, other_url = asyncio.run(scenario())
+
+    assert same is first
+    assert other_key is not first and other_url is not first
+    assert registry.http_client("openai", None, "sk-one") is registry.http_client("openai", None, "sk-one")
+
+
+def test_provider_concurrency_is_capped_across_its_clients():
+    stats = {"active": 0, "peak": 0}
+    registry = LLMClientRegistry(
+        default_concurrency=10,
+        provider_concurrency={"openai": 2},
+        async_transport_factory=lambda: SlowTransport(stats),
+    )
+
+    async def scenario():
+        clients = [registry.http_async_client("openai", "https://api.openai.com/v1", key) for key in ("a", "b")]
+        responses = await asyncio.gather(*(clients[i % 2].get("https://api.openai.com/v1/models") for i in range(6)))
+        in_flight = registry.stats()["in_flight"]
+        await registry.aclose()
+        return responses, in_flight
+
+    responses, in_flight = asyncio.run(scenario())
+
+    assert all(response.json() == {"ok": True} for response in responses)
+    assert stats["peak"] == 2
+    assert in_flight == {"openai": 0}
+
+
+def test_async_clients_are_recreated_for_a_new_event_loop():
+    registry = LLMClientRegistry()
+
+    async def client():
+        return registry.http_async_client("openai", None, "sk-one")
+
+    assert asyncio.run(client()) is not asyncio.run(client())
+
+
+def test_chat_models_use_the_shared_clients():
+    registry = LLMClientRegistry()
+
+    async def scenario():
+        http_async_client = registry.http_async_client("openai", "https://api.openai.com/v1", "sk-one")
+        openai_models = [
+            ChatOpenAI(model="gpt-4o", api_key="sk-one", http_async_client=http_async_client) for _ in range(2)
+        ]
+        anthropic_models = [
+            registry.attach(ChatAnthropic(model="claude-3-5-sonnet-20241022", api_key="sk-ant"), "anthropic", None, "sk-ant")
+            for _ in range(2)
+        ]
+        return http_async_client, openai_models, anthropic_models
+
+    http_async_client, openai_models, anthropic_models = asyncio.run(scenario())
+
+    assert all(model.root_async_client._client is http_async_client for model in openai_models)
+    assert anthropic_models[0]._async_client._client is anthropic_models[1]._async_client._client
+    assert anthropic_models[0]._client._client is registry.http_client("anthropic", None, "sk-ant")
+
+
+def test_provider_limits_are_parsed_from_the_environment_format():
+    assert _parse_provider_limits("openai=16, ollama=2,bad") == {"openai": 16, "ollama": 2}
@@ -0,0 +1,109 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(".")
+
+from src.browser.playwright_runtime import PlaywrightRuntime
+
+
+class FakeDriver:
+    """Mimics the parts of a Playwright object the runtime looks at."""
+
+    def __init__(self):
+        self.process = SimpleNamespace(returncode=None)
+        self._impl_obj = SimpleNamespace(
+            _connection=SimpleNamespace(_closed_error=None, _transport=SimpleNamespace(_proc=self.process))
+        )
+        self.stopped = False
+
+    def kill(self):
+        self.process.returncode = -9
+
+    async def stop(self):
+        self.stopped = True
+
+
+class FakeStarter:
+    def __init__(self):
+        self.drivers = []
+
+    async def __call__(self):
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        return driver
+
+
+def test_driver_is_started_once_and_shared():
+    starter = FakeStarter()
+    runtime = PlaywrightRuntime(starter)
+
+    async def scenario():
+        drivers = await asyncio.gather(*(runtime.get() for _ in range(5)))
+        await runtime.stop()
+        return drivers
+
+    drivers = asyncio.run(scenario())
+
+    assert len(starter.drivers) == 1
+    assert all(driver is starter.drivers[0] for driver in drivers)
+    assert starter.drivers[0].stopped
+    assert not runtime.is_running()
+
+
+def test_dead_driver_is_restarted():
+    starter = FakeStarter()
+    runtime = PlaywrightRuntime(starter)
+
+    async def scenario():
+        first = await runtime.get()
+        first.kill()
+        return first, await runtime.get()
+
+    first, second = asyncio.run(scenario())
+
+    assert second is not first
+    assert runtime.restarts == 1
+
+
+def test_call_is_retried_when_the_driver_dies_during_it():
+    starter = FakeStarter()
+    runtime = PlaywrightRuntime(starter)
+    calls = []
+
+    async def launch(driver):
+        calls.append(driver)
+        if len(calls) == 1:
+            driver.kill()
+            raise Exception("Connection closed while reading from the driver")
+        return "browser"
+
+    assert asyncio.run(runtime.run(launch)) == "browser"
+    assert calls == starter.drivers
+    assert len(calls) == 2
+
+
+def test_errors_on_a_live_driver_are_not_retried():
+    runtime = PlaywrightRuntime(FakeStarter())
+    calls = []
+
+    async def launch(driver):
+        calls.append(driver)
+        raise RuntimeError("Executable doesn't exist")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(runtime.run(launch))
+    assert len(calls) == 1
+
+
+def test_new_event_loop_gets_a_new_driver():
+    starter = FakeStarter()
+    runtime = PlaywrightRuntime(starter)
+
+    first = asyncio.run(runtime.get())
+    second = asyncio.run(runtime.get())
+
+    assert second is not first
+    assert runtime.restarts == 0
@@ -0,0 +1,135 @@
+import asyncio
+import base64
+import io
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(".")
+
+from src.utils.recording_encoder import (
+    FrameSpool,
+    RecordingEncoder,
+    encode_history_recording,
+    fit_to_size,
+    output_path_for,
+)
+
+PNG = base64.b64encode(b"\x89PNG" + b"\x00" * 64).decode("ascii")
+JPEG = base64.b64encode(b"\xff\xd8\xff" + b"\x00" * 64).decode("ascii")
+
+
+def _slow_job(job):
+    time.sleep(job["seconds"])
+    return {"pid": os.getpid(), "seconds": job["seconds"]}
+
+
+def _failing_job(job):
+    raise RuntimeError("ffmpeg exited with 1")
+
+
+def test_spool_writes_frames_and_starts_fresh(tmp_path):
+    directory = str(tmp_path / "task_1.gif.frames")
+    spool = FrameSpool(directory)
+    spool.append(PNG, 1, "Open the login page")
+    spool.append(JPEG, 2, None)
+
+    frames = FrameSpool.read(directory)
+
+    assert [(frame["file"], frame["step"], frame["goal"]) for frame in frames] == [
+        ("frame_00001.png", 1, "Open the login page"),
+        ("frame_00002.jpg", 2, None),
+    ]
+    assert (tmp_path / "task_1.gif.frames" / "frame_00002.jpg").read_bytes() == base64.b64decode(JPEG)
+    # A second run at the same path does not inherit the first run's frames
+    FrameSpool(directory).append(PNG, 1, "Retry")
+    assert [frame["goal"] for frame in FrameSpool.read(directory)] == ["Retry"]
+
+
+def test_fit_to_size_walks_down_the_ladder_until_the_output_fits():
+    attempts = []
+
+    def encode(scale, quality):
+        attempts.append((scale, quality))
+        return b"x" * int(1000 * scale * quality / 100)
+
+    ladder = [(1.0, 100), (1.0, 50), (0.5, 50), (0.5, 10)]
+
+    assert fit_to_size(encode, ladder, target_bytes=300) == (b"x" * 250, 2)
+    assert attempts == ladder[:3]
+    # Nothing fits: the smallest attempt is returned; no target: the first
+    assert fit_to_size(encode, ladder, target_bytes=10)[1] == 3
+    assert fit_to_size(encode, ladder, target_bytes=0) == (b"x" * 1000, 0)
+
+
+def test_encoder_runs_jobs_in_a_bounded_process_pool():
+    encoder = RecordingEncoder(workers=2)
+
+    async def scenario():
+        jobs = [encoder.submit(_slow_job, {"seconds": 0.3}) for _ in range(4)]
+        failed = encoder.submit(_failing_job, {})
+        # Submitting returns at once; the event loop is not blocked by the encoding
+        assert encoder.stats()["pending"] == 5
+        reports = await asyncio.gather(*jobs)
+        with pytest.raises(RuntimeError):
+            await failed
+        return reports
+
+    try:
+        reports = asyncio.run(scenario())
+    finally:
+        encoder.shutdown()
+
+    assert len({report["pid"] for report in reports}) <= 2
+    assert os.getpid() not in {report["pid"] for report in reports}
+    stats = encoder.stats()
+    assert (stats["submitted"], stats["pending"], stats["completed"], stats["failed"]) == (5, 0, 4, 1)
+    assert stats["encode_seconds"] == pytest.approx(1.2)
+
+
+def test_recording_without_frames_cleans_up_the_spool(tmp_path):
+    spool_dir = tmp_path / "task_1.gif.frames"
+    spool_dir.mkdir()
+
+    report = encode_history_recording({"spool_dir": str(spool_dir), "output_path": str(tmp_path / "task_1.gif")})
+
+    assert (report["path"], report["frames"]) == (None, 0)
+    assert not spool_dir.exists()
+    assert output_path_for("videos/task_1.gif", "webp") == "videos/task_1.webp"
+
+
+@pytest.mark.parametrize("recording_format", ["gif", "webp"])
+def test_spooled_frames_encode_within_the_target_size(tmp_path, recording_format):
+    Image = pytest.importorskip("PIL.Image")
+    spool = FrameSpool(str(tmp_path / "task_1.gif.frames"))
+    for step in range(1, 4):
+        buffer = io.BytesIO()
+        Image.effect_noise((640, 360), 40 * step).convert("RGB").save(buffer, format="PNG")
+        spool.append(base64.b64encode(buffer.getvalue()).decode("ascii"), step, f"Step {step}")
+    unbounded = encode_history_recording(
+        {"spool_dir": spool.directory, "output_path": str(tmp_path / "full.gif"), "format": recording_format, "show_goals": False}
+    )
+    spool = FrameSpool(spool.directory)
+    for step in range(1, 4):
+        buffer = io.BytesIO()
+        Image.effect_noise((640, 360), 40 * step).convert("RGB").save(buffer, format="PNG")
+        spool.append(base64.b64encode(buffer.getvalue()).decode("ascii"), step, f"Step {step}")
+
+    report = encode_history_recording(
+        {
+            "spool_dir": spool.directory,
+            "output_path": str(tmp_path / "task_1.gif"),
+            "format": recording_format,
+            "target_bytes": unbounded["bytes"] // 2,
+            "show_goals": False,
+        }
+    )
+
+    assert report["path"] == str(tmp_path / f"task_1.{recording_format}")
+    assert report["frames"] == 3
+    assert report["level"] > 0
+    assert os.path.getsize(report["path"]) == report["bytes"] < unbounded["bytes"]
+    assert Image.open(report["path"]).n_frames == 3
+    assert not os.path.exists(spool.directory)
@@ -0,0 +1,140 @@
+import asyncio
+import sys
+
+import pytest
+from sqlmodel import Session, select
+
+sys.path.append(".")
+
+from src.api.models.result import Result
+from src.api.models.task import Task
+from src.api.models.user import User
+from src.api.services import result_processing
+from src.api.services.artifact_storage import LocalStorageBackend, storage_key
+from src.api.services.artifact_store import ArtifactStore, file_digest
+from src.api.services.task_events import TaskEventBus
+from src.api.services.upload_manager import UploadManager
+
+
+@pytest.fixture(name="seed_rows")
+def seed_rows_fixture():
+    return [User(id=1, username="alice", hashed_password="x")] + [
+        Task(id=task_id, task_name=f"task {task_id}", user_id=1, status="completed") for task_id in range(1, 5)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def result_processing_fixture(tmp_path, session_factory, monkeypatch):
+    for task_id in range(1, 5):
+        history_dir = tmp_path / "history" / f"task_{task_id}"
+        history_dir.mkdir(parents=True)
+        (history_dir / f"task_{task_id}.json").write_text("{}")
+    monkeypatch.setattr(result_processing, "async_session_factory", session_factory)
+    monkeypatch.setattr(
+        result_processing,
+        "artifact_store",
+        ArtifactStore(UploadManager(backend=LocalStorageBackend(str(tmp_path / "uploads"))), session_factory),
+    )
+    monkeypatch.setattr(result_processing, "AGENT_HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(result_processing, "RESULT_PIPELINE_CONCURRENCY", 2)
+
+
+def test_results_are_processed_concurrently_up_to_the_limit(engine, monkeypatch):
+    active, peak = [0], [0]
+
+    async def convert(agent_history_path, task_id):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.05)
+        active[0] -= 1
+        return f"# script for task {task_id}"
+
+    monkeypatch.setattr(result_processing, "convert_agent_history_to_script", convert)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        outcomes = await asyncio.gather(*(result_processing.process_task_result(task_id) for task_id in range(1, 5)))
+        ticking.cancel()
+        return outcomes, ticks
+
+    outcomes, ticks = asyncio.run(scenario())
+
+    assert outcomes == [True] * 4
+    assert peak[0] == 2
+    # The loop kept serving other work while results were processed
+    assert ticks >= 10
+    with Session(engine) as session:
+        assert sorted(result.task_id for result in session.exec(select(Result)).all()) == [1, 2, 3, 4]
+
+
+def test_failed_conversion_still_records_result(engine, monkeypatch):
+    async def convert(agent_history_path, task_id):
+        raise RuntimeError("refiner crashed")
+
+    monkeypatch.setattr(result_processing, "convert_agent_history_to_script", convert)
+
+    assert asyncio.run(result_processing.process_task_result(1)) is True
+    with Session(engine) as session:
+        result = session.get(Result, 1)
+        assert result.result_json_url is None
+        assert result.result_gif is None
+
+
+def test_script_and_gif_are_stored_under_their_digests(engine, tmp_path, monkeypatch):
+    gif_path = tmp_path / "history" / "task_2" / "task_2.gif"
+    gif_path.write_bytes(b"GIF89a")
+    gif_digest = file_digest(str(gif_path))
+
+    async def convert(agent_history_path, task_id):
+        return "print('hello')"
+
+    monkeypatch.setattr(result_processing, "convert_agent_history_to_script", convert)
+
+    assert asyncio.run(result_processing.process_task_result(2)) is True
+    with Session(engine) as session:
+        result = session.get(Result, 2)
+        assert result.gif_digest == gif_digest
+        assert result.result_gif == str(tmp_path / "uploads" / storage_key("gif", gif_digest))
+        assert result.result_json_url == str(tmp_path / "uploads" / storage_key("script", result.script_digest))
+        assert open(result.result_json_url).read() == "print('hello')"
+    # The local GIF is removed once it has been uploaded
+    assert not gif_path.exists()
+
+
+def test_pending_recording_is_attached_once_encoded(engine, tmp_path, monkeypatch):
+    recording_path = tmp_path / "history" / "task_3" / "task_3.webp"
+
+    async def convert(agent_history_path, task_id):
+        return "print('hello')"
+
+    monkeypatch.setattr(result_processing, "convert_agent_history_to_script", convert)
+    bus = TaskEventBus()
+    monkeypatch.setattr(result_processing, "task_event_bus", bus)
+
+    async def scenario():
+        encoding = asyncio.get_running_loop().create_future()
+        processed = await result_processing.process_task_result(3, recording_pending=True)
+        with Session(engine) as session:
+            # The result is stored while the recording is still encoding
+            assert session.get(Result, 3).result_json_url is not None
+        recording_path.write_bytes(b"RIFF....WEBP")
+        encoding.set_result({"path": str(recording_path), "seconds": 0.1, "bytes": 12})
+        published = await result_processing.publish_recording(3, encoding)
+        return processed, published
+
+    assert asyncio.run(scenario()) == (True, True)
+    with Session(engine) as session:
+        result = session.get(Result, 3)
+        assert result.result_gif == str(tmp_path / "uploads" / storage_key("webp", result.gif_digest))
+        assert result.result_json_url is not None
+    assert not recording_path.exists()
+    # Subscribers told by the result event to wait for the recording learn where it is
+    assert bus.recent_events(3) == [{"type": "recording", "task_id": 3, "url": result.result_gif}]
@@ -0,0 +1,111 @@
+import base64
+import io
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+sys.path.append(".")
+
+from src.api.db.session import get_session
+from src.api.main import app
+from src.api.models.task import Task
+from src.api.models.user import User
+from src.api.services.auth import get_current_user
+from src.browser.screenshot_policy import ScreenshotPolicy
+
+SCREENSHOT = base64.b64encode(b"\x89PNG" + b"\x00" * 996).decode("ascii")
+
+
+def _run(policy, steps):
+    """Feeds (url, action names) steps through the policy; returns which steps kept their screenshot."""
+    return [policy.select(url, SCREENSHOT, actions) is not None for url, actions in steps]
+
+
+def test_key_steps_keeps_first_navigation_new_page_and_failed_steps():
+    policy = ScreenshotPolicy("key_steps")
+
+    kept = _run(
+        policy,
+        [
+            ("about:blank", ["go_to_url"]),
+            ("https://example.com", ["input_text"]),
+            ("https://example.com", ["click_element_by_index"]),
+            ("https://example.com/login", ["input_text", "click_element_by_index"]),
+            ("https://example.com/login", None),
+            ("https://example.com/login", ["done"]),
+        ],
+    )
+
+    assert kept == [True, True, False, True, True, True]
+    report = policy.report()
+    assert (report["steps"], report["screenshots_kept"]) == (6, 5)
+    assert report["saved_bytes"] == len(SCREENSHOT)
+
+
+def test_full_keeps_everything_and_off_reports_nothing_measured():
+    full = ScreenshotPolicy("full")
+    off = ScreenshotPolicy("off")
+
+    assert _run(full, [("https://example.com", ["click_element_by_index"])] * 3) == [True] * 3
+    assert full.report()["saved_bytes"] == 0
+    assert off.select("https://example.com", None, ["done"]) is None
+    assert not off.captures_screenshots
+    assert off.report()["saved_bytes"] is None
+
+
+def test_jpeg_downscales_to_the_max_dimension():
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.effect_noise((1600, 900), 64).convert("RGB").save(buffer, format="PNG")
+    screenshot = base64.b64encode(buffer.getvalue()).decode("ascii")
+    policy = ScreenshotPolicy("jpeg", quality=50, max_dimension=800)
+
+    kept = policy.select("https://example.com", screenshot, ["click_element_by_index"])
+
+    image = Image.open(io.BytesIO(base64.b64decode(kept)))
+    assert (image.format, image.size) == ("JPEG", (800, 450))
+    assert policy.report()["saved_bytes"] == len(screenshot) - len(kept) > 0
+
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ScreenshotPolicy("thumbnails")
+
+
+def test_browser_settings_update_the_task_policy(tmp_path):
+    db_path = tmp_path / "tasks.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, username="alice", hashed_password="x"))
+        session.add(Task(id=1, task_name="login", user_id=1))
+        session.commit()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_session_override():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="alice", hashed_password="x")
+    try:
+        client = TestClient(app)
+        invalid = client.patch("/api/v1/tasks/1/browser-settings", json={"screenshot_policy": "thumbnails"})
+        response = client.patch(
+            "/api/v1/tasks/1/browser-settings",
+            json={"screenshot_policy": "jpeg", "screenshot_quality": 50, "screenshot_max_dimension": 800},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    engine.dispose()
+
+    assert invalid.status_code == 422
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["screenshot_policy"], body["screenshot_quality"], body["screenshot_max_dimension"]) == ("jpeg", 50, 800)
+    assert body["screenshot_bytes_saved"] is None
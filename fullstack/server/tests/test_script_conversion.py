@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(".")
+
+from src.api.services import script_conversion_service
+from src.api.services.script_conversion_service import (
+    convert_agent_history_to_script,
+    get_refined_actions_path,
+    task_scratch_dir,
+)
+
+PARSED = [{"go_to_url": {"url": "https://example.com"}}]
+REFINED = [{"action": "go_to_url", "url": "https://example.com"}]
+
+
+def _stub_stages(monkeypatch, calls):
+    def parse(agent_history_path):
+        calls.append("parse")
+        return PARSED
+
+    async def refine(parsed_actions):
+        calls.append(("refine", parsed_actions))
+        return REFINED
+
+    def generate(refined_actions):
+        calls.append(("generate", refined_actions))
+        return "print('generated')"
+
+    monkeypatch.setattr(script_conversion_service, "parse_agent_history", parse)
+    monkeypatch.setattr(script_conversion_service, "refine_actions", refine)
+    monkeypatch.setattr(script_conversion_service, "generate_script", generate)
+    # Conversion no longer scans the system temp directory
+    monkeypatch.setattr(os, "listdir", lambda path=".": (_ for _ in ()).throw(AssertionError(f"listdir({path})")))
+
+
+def test_stages_pass_objects_in_memory(tmp_path, monkeypatch):
+    history_path = tmp_path / "task_3" / "task_3.json"
+    history_path.parent.mkdir()
+    history_path.write_text("{}")
+    calls = []
+    _stub_stages(monkeypatch, calls)
+
+    script = asyncio.run(convert_agent_history_to_script(str(history_path), 3, debug_dir=None))
+
+    assert script == "print('generated')"
+    assert calls == ["parse", ("refine", PARSED), ("generate", REFINED)]
+    # Only the refined list (kept for regeneration) is written
+    assert sorted(entry.name for entry in os.scandir(history_path.parent)) == ["task_3.json", "task_3_refined.json"]
+    with open(get_refined_actions_path(str(history_path), 3)) as f:
+        assert json.load(f) == REFINED
+
+
+def test_debug_dir_receives_every_stage(tmp_path, monkeypatch):
+    history_path = tmp_path / "task_4" / "task_4.json"
+    history_path.parent.mkdir()
+    history_path.write_text("{}")
+    debug_dir = tmp_path / "debug"
+    _stub_stages(monkeypatch, [])
+
+    asyncio.run(convert_agent_history_to_script(str(history_path), 4, debug_dir=str(debug_dir)))
+    asyncio.run(convert_agent_history_to_script(str(history_path), 4, debug_dir=str(debug_dir)))
+
+    assert sorted(entry.name for entry in os.scandir(debug_dir)) == ["task_4"]
+    assert sorted(entry.name for entry in os.scandir(debug_dir / "task_4")) == [
+        "task_4_parse.json",
+        "task_4_refine.json",
+        "task_4_script.py",
+    ]
+
+
+def test_scratch_dir_is_removed_even_after_errors(tmp_path):
+    try:
+        with task_scratch_dir(str(tmp_path), 5) as scratch:
+            with open(os.path.join(scratch, "partial.py"), "w") as f:
+                f.write("x")
+            raise RuntimeError("upload failed")
+    except RuntimeError:
+        pass
+
+    assert list(os.scandir(tmp_path)) == []
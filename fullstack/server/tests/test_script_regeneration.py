@@ -0,0 +1,46 @@
+import asyncio
+import json
+import sys
+
+sys.path.append(".")
+
+from src.api.services.script_regeneration import MANIFEST_FILENAME, regenerate_all_scripts
+
+
+def _write_refined(base_dir, task_id, url):
+    task_dir = base_dir / f"task_{task_id}"
+    task_dir.mkdir(exist_ok=True)
+    (task_dir / f"task_{task_id}_refined.json").write_text(
+        json.dumps([{"action": "go_to_url", "url": url}]), encoding="utf-8"
+    )
+    return task_dir / f"task_{task_id}_script.py"
+
+
+def test_regeneration_skips_unchanged_inputs(tmp_path, monkeypatch):
+    base_dir = tmp_path / "agent_history"
+    base_dir.mkdir()
+    first_script = _write_refined(base_dir, 1, "https://example.com")
+    _write_refined(base_dir, 2, "https://example.org")
+    # The generator is found relative to the module, not the working directory
+    monkeypatch.chdir(tmp_path)
+
+    def regenerate(**kwargs):
+        return asyncio.run(regenerate_all_scripts(base_dir=str(base_dir), workers=1, upload=False, **kwargs))
+
+    report = regenerate()
+    assert (report["total"], report["generated"], report["skipped"], report["failed"]) == (2, 2, 0, {})
+    assert "https://example.com" in first_script.read_text(encoding="utf-8")
+    manifest = json.loads((base_dir / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    assert sorted(manifest) == ["1", "2"]
+
+    report = regenerate()
+    assert (report["generated"], report["skipped"]) == (0, 2)
+
+    _write_refined(base_dir, 2, "https://example.net")
+    report = regenerate()
+    assert (report["generated"], report["skipped"]) == (1, 1)
+    assert json.loads((base_dir / MANIFEST_FILENAME).read_text(encoding="utf-8"))["1"] == manifest["1"]
+
+    first_script.unlink()
+    assert regenerate()["generated"] == 1
+    assert regenerate(force=True)["generated"] == 2
@@ -0,0 +1,83 @@
+import asyncio
+import sys
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+sys.path.append(".")
+
+from src.agent.browser_use.step_timing import StepTimer, collect_usage, summarize_timings
+
+
+class UsageReportingChatModel(BaseChatModel):
+    """Reports fixed token usage for every answer, like provider responses do."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "usage-reporting"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = AIMessage(
+            content="done",
+            usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def test_nested_buckets_are_counted_exclusively():
+    timer = StepTimer()
+
+    async def scenario():
+        async with timer.measure("action"):
+            await asyncio.sleep(0.05)
+            async with timer.measure("wait"):
+                await asyncio.sleep(0.1)
+            async with timer.measure("dom"):
+                await asyncio.sleep(0.05)
+        async with timer.measure("llm"):
+            await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    timings = timer.finish_step()
+
+    assert 0.04 <= timings["action_seconds"] < 0.09
+    assert 0.09 <= timings["wait_seconds"] < 0.14
+    assert 0.04 <= timings["dom_seconds"] < 0.09
+    assert 0.04 <= timings["llm_seconds"] < 0.09
+    # finish_step starts the next step from zero
+    assert timer.finish_step()["action_seconds"] == 0.0
+
+
+def test_reported_token_usage_is_collected_for_the_step():
+    timer = StepTimer()
+    llm = UsageReportingChatModel()
+
+    async def scenario():
+        with collect_usage(timer):
+            await llm.ainvoke([HumanMessage(content="first")])
+            llm.invoke([HumanMessage(content="retry")])
+        # Outside the context nothing is recorded
+        await llm.ainvoke([HumanMessage(content="later")])
+
+    asyncio.run(scenario())
+    timings = timer.finish_step()
+
+    assert (timings["input_tokens"], timings["output_tokens"]) == (240, 60)
+
+
+def test_summary_reports_other_time_and_shares():
+    summary = summarize_timings(
+        [
+            {"duration_seconds": 4.0, "llm_seconds": 2.0, "dom_seconds": 0.5, "action_seconds": 0.5, "wait_seconds": 0.5, "input_tokens": 100},
+            {"duration_seconds": 2.0, "llm_seconds": 1.0, "output_tokens": 20},
+        ]
+    )
+
+    assert summary["steps"] == 2
+    assert summary["llm_seconds"] == 3.0
+    assert summary["other_seconds"] == 1.5
+    assert summary["mean_step_seconds"] == 3.0
+    assert summary["share"]["llm"] == 0.5
+    assert (summary["input_tokens"], summary["output_tokens"]) == (100, 20)
+    assert summarize_timings([])["share"]["llm"] is None
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlmodel import Session
+
+sys.path.append(".")
+
+from src.api.db.session import get_session
+from src.api.main import app
+from src.api.models.task import Task
+from src.api.models.user import User
+from src.api.services import task_events
+from src.api.services.auth import get_current_user
+from src.api.services.task_events import (
+    PostgresEventChannel,
+    TaskEventBus,
+    recording_event,
+    result_event,
+    status_event,
+    step_event,
+    task_event_stream,
+)
+
+
+class ClickAction(BaseModel):
+    click_element: dict
+
+
+def _parse_stream(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture(name="seed_rows")
+def seed_rows_fixture():
+    return [
+        User(id=1, username="alice", hashed_password="x"),
+        User(id=2, username="bob", hashed_password="x"),
+        Task(id=1, task_name="running", user_id=1, status="running"),
+        Task(id=2, task_name="failed", user_id=1, status="failed"),
+    ]
+
+
+@pytest.fixture(name="client")
+def client_fixture(session_factory, monkeypatch):
+    bus = TaskEventBus()
+    monkeypatch.setattr(task_events, "task_event_bus", bus)
+    monkeypatch.setattr(task_events, "async_session_factory", session_factory)
+
+    async def get_session_override():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="alice", hashed_password="x")
+    yield TestClient(app), bus
+    app.dependency_overrides.clear()
+
+
+def test_subscribers_get_live_and_recent_events():
+    bus = TaskEventBus(queue_size=2)
+
+    async def scenario():
+        await bus.publish(status_event(1, "running"))
+        async with bus.subscribe(1) as queue:
+            # Replayed from before the subscription
+            assert (await queue.get())["status"] == "running"
+            for step in (1, 2, 3):
+                await bus.publish({"type": "step", "task_id": 1, "step": step})
+            await bus.publish(status_event(2, "running"))
+            # The full queue dropped its oldest event
+            return [queue.get_nowait()["step"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == [2, 3]
+    assert bus.subscriber_count(1) == 0
+
+    # A new run starts with a clean replay buffer
+    asyncio.run(bus.publish(status_event(1, "running")))
+    assert bus.recent_events(1) == [status_event(1, "running")]
+
+
+def test_channel_events_are_delivered_by_the_listener_only():
+    class LoopbackChannel:
+        def __init__(self):
+            self.sent, self.sink = [], None
+
+        async def start(self, sink):
+            self.sink = sink
+
+        async def stop(self):
+            pass
+
+        async def send(self, event):
+            self.sent.append(event)
+
+    channel = LoopbackChannel()
+    bus = TaskEventBus(channel=channel)
+
+    async def scenario():
+        await bus.start()
+        async with bus.subscribe(1) as queue:
+            await bus.publish(status_event(1, "running"))
+            assert queue.empty()
+            channel.sink(json.loads(json.dumps(channel.sent[0])))
+            return queue.get_nowait()
+
+    assert asyncio.run(scenario()) == status_event(1, "running")
+
+
+def test_step_event_summarizes_the_step_and_fits_notify_payloads():
+    state = SimpleNamespace(url="https://example.com", title="Example", screenshot=None)
+    output = SimpleNamespace(
+        current_state=SimpleNamespace(next_goal="Open login", evaluation_previous_goal="Success"),
+        action=[ClickAction(click_element={"index": 3})],
+    )
+
+    event = step_event(1, 4, state, output, input_tokens=1234)
+
+    assert event["step"] == 4
+    assert event["url"] == "https://example.com"
+    assert event["actions"] == ['click_element({"index": 3})']
+    assert event["input_tokens"] == 1234
+    oversized = {**event, "thumbnail": "x" * 10000}
+    assert json.loads(PostgresEventChannel.encode(oversized))["thumbnail"] is None
+
+
+def test_event_stream_replays_progress_and_ends_with_the_result(client):
+    test_client, bus = client
+    bus.deliver(status_event(1, "running"))
+    bus.deliver({"type": "step", "task_id": 1, "step": 1})
+    bus.deliver(result_event(1, True))
+
+    response = test_client.get("/api/v1/tasks/1/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [name for name, _ in _parse_stream(response.text)] == ["status", "status", "step", "result"]
+
+
+def test_event_stream_of_finished_task_only_sends_its_status(client):
+    test_client, _ = client
+
+    response = test_client.get("/api/v1/tasks/2/events")
+
+    assert _parse_stream(response.text) == [("status", status_event(2, "failed"))]
+
+
+def test_event_stream_is_owner_only(client):
+    test_client, _ = client
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, username="bob", hashed_password="x")
+
+    assert test_client.get("/api/v1/tasks/1/events").status_code == 403
+
+
+def test_keepalive_notices_tasks_finished_without_an_event(engine, session_factory):
+    async def scenario():
+        chunks = []
+        async for chunk in task_event_stream(1, bus=TaskEventBus(), keepalive=0.05, session_factory=session_factory):
+            chunks.append(chunk)
+            if len(chunks) == 2:
+                with Session(engine) as session:
+                    task = session.get(Task, 1)
+                    task.status = "failed"
+                    session.add(task)
+                    session.commit()
+        return chunks
+
+    chunks = asyncio.run(scenario())
+
+    assert chunks[1] == ": keepalive\n\n"
+    assert _parse_stream(chunks[-1]) == [("status", status_event(1, "failed"))]
+
+
+def test_completed_task_without_a_result_ends_after_the_result_wait(engine, session_factory):
+    with Session(engine) as session:
+        session.add(Task(id=3, task_name="completed", user_id=1, status="completed"))
+        session.commit()
+
+    async def scenario(result_wait):
+        stream = task_event_stream(
+            3, bus=TaskEventBus(), keepalive=0.05, session_factory=session_factory, result_wait=result_wait
+        )
+        return [chunk async for chunk in stream]
+
+    # Result processing failed or was skipped, so no result row or result event will come
+    chunks = asyncio.run(scenario(result_wait=0.2))
+    assert chunks[1] == ": keepalive\n\n"
+    assert _parse_stream(chunks[-1]) == [("status", status_event(3, "completed"))]
+    assert asyncio.run(scenario(result_wait=0)) == [chunks[0]]
+
+
+def test_stream_waits_for_a_pending_recording(session_factory):
+    bus = TaskEventBus()
+
+    async def scenario():
+        chunks = []
+        bus.deliver(status_event(1, "running"))
+        bus.deliver(status_event(1, "completed"))
+        bus.deliver(result_event(1, True, recording_pending=True))
+        async for chunk in task_event_stream(1, bus=bus, keepalive=0.05, session_factory=session_factory):
+            chunks.append(chunk)
+            if chunk.startswith(": keepalive"):
+                bus.deliver(recording_event(1, "https://cdn.example/task_1.gif"))
+        return chunks
+
+    chunks = asyncio.run(scenario())
+
+    assert [name for name, _ in _parse_stream("".join(chunks))] == ["status", "status", "status", "result", "recording"]
+    assert _parse_stream(chunks[-1]) == [("recording", recording_event(1, "https://cdn.example/task_1.gif"))]
@@ -0,0 +1,123 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+sys.path.append(".")
+
+from src.api.db.session import get_session
+from src.api.main import app
+from src.api.models.task import Task
+from src.api.models.user import User
+from src.api.services.auth import get_current_user
+from src.api.services.task_queries import count_tasks
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(name="client")
+def client_fixture(tmp_path):
+    db_path = tmp_path / "tasks.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, username="alice", hashed_password="x"))
+        session.add(User(id=2, username="bob", hashed_password="x"))
+        for index in range(7):
+            session.add(
+                Task(
+                    task_name=f"task {index}",
+                    user_id=1,
+                    status="completed" if index % 2 else "failed",
+                    instruction="long text " * 100,
+                    created_at=BASE_TIME + timedelta(minutes=index // 2),
+                )
+            )
+        session.add(Task(task_name="other user", user_id=2, created_at=BASE_TIME))
+        session.commit()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_test_session():
+        async with session_factory() as async_session:
+            yield async_session
+
+    app.dependency_overrides[get_session] = get_test_session
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="alice", hashed_password="x")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _walk_pages(client, params):
+    names, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/api/v1/tasks", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        names.extend(task["task_name"] for task in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return names, pages
+
+
+def test_keyset_pages_are_newest_first_without_gaps(client):
+    # created_at ties (two tasks per minute) must be broken by id
+    names, pages = _walk_pages(client, {"limit": 2})
+
+    assert names == [f"task {index}" for index in reversed(range(7))]
+    assert pages == 4
+
+
+def test_status_and_date_filters(client):
+    names, _ = _walk_pages(client, {"status": "completed", "limit": 10})
+    assert names == ["task 5", "task 3", "task 1"]
+
+    response = client.get(
+        "/api/v1/tasks",
+        params={"created_after": (BASE_TIME + timedelta(minutes=1)).isoformat(), "created_before": (BASE_TIME + timedelta(minutes=3)).isoformat()},
+    )
+    assert [task["task_name"] for task in response.json()] == ["task 5", "task 4", "task 3", "task 2"]
+
+
+def test_invalid_cursor_and_status_are_rejected(client):
+    assert client.get("/api/v1/tasks", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/v1/tasks", params={"status": "bogus"}).status_code == 422
+
+
+def test_count_is_exact_below_limit_and_capped_above(client, tmp_path):
+    response = client.get("/api/v1/tasks/count", params={"status": "failed"})
+    assert response.json() == {"count": 4, "estimated": False}
+
+    async def capped_count():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}")
+        async with AsyncSession(async_engine) as session:
+            result = await count_tasks(session, user_id=1, exact_limit=5)
+        await async_engine.dispose()
+        return result
+
+    assert asyncio.run(capped_count()) == (5, True)
+
+
+def test_cursor_binds_naive_utc_for_asyncpg():
+    from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+    from src.api.models.types import UTCDateTime
+    from src.api.services.task_queries import decode_cursor, encode_cursor, task_summary_page_query
+
+    # A cursor taken from a row read back as aware UTC, here written with a +02:00 offset
+    cursor = decode_cursor(encode_cursor(datetime(2025, 1, 1, 12, 30, tzinfo=timezone(timedelta(hours=2))), 42))
+    compiled = task_summary_page_query(user_id=1, cursor=cursor).compile(dialect=asyncpg_dialect())
+
+    # Before the fix this rendered as TIMESTAMP WITH TIME ZONE
+    assert "(tasks.created_at, tasks.id) < ($2::TIMESTAMP WITHOUT TIME ZONE, $3::INTEGER)" in str(compiled)
+    cursor_binds = [compiled.binds[name] for name in compiled.positiontup if compiled.binds[name].value == cursor[0]]
+    assert len(cursor_binds) == 1
+    assert isinstance(cursor_binds[0].type, UTCDateTime)
+    processor = cursor_binds[0].type.bind_processor(compiled.dialect)
+    assert processor(cursor[0]) == datetime(2025, 1, 1, 10, 30)
@@ -0,0 +1,198 @@
+import asyncio
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.pool import StaticPool
+
+sys.path.append(".")
+
+from src.api.models.task import Task
+from src.api.models.user import User
+from src.api.services import task_scheduler
+from src.api.services.task_scheduler import TaskScheduler
+
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, username="alice", hashed_password="x"))
+        session.add(User(id=2, username="bob", hashed_password="x"))
+        session.commit()
+    return engine
+
+
+def _queue_tasks(engine, user_ids, runner="agent"):
+    base_time = datetime.now(timezone.utc)
+    task_ids = []
+    with Session(engine) as session:
+        for offset, user_id in enumerate(user_ids):
+            task = Task(
+                task_name=f"task {offset}",
+                user_id=user_id,
+                status="queued",
+                runner=runner,
+                initiated_at=base_time + timedelta(seconds=offset),
+            )
+            session.add(task)
+            session.commit()
+            task_ids.append(task.id)
+    return task_ids
+
+
+class BlockingRunner:
+    def __init__(self):
+        self.started = []
+        self.api_keys = {}
+        self.release = asyncio.Event()
+
+    async def __call__(self, task_id, api_key):
+        self.started.append(task_id)
+        self.api_keys[task_id] = api_key
+        await self.release.wait()
+
+
+def test_dispatch_respects_global_and_per_user_limits(engine):
+    task_ids = _queue_tasks(engine, [1, 1, 2, 2, 2])
+
+    async def scenario():
+        runner = BlockingRunner()
+        scheduler = TaskScheduler(max_concurrent=3, max_per_user=1, engine=engine, runners={"agent": runner})
+        for task_id in task_ids:
+            scheduler.enqueue(task_id)
+
+        assert await scheduler.dispatch() == 2
+        await asyncio.sleep(0)
+        assert runner.started == [task_ids[0], task_ids[2]]
+
+        runner.release.set()
+        await asyncio.gather(*(task for _, task in list(scheduler.running.values())))
+        assert scheduler.running == {}
+
+        runner.release = asyncio.Event()
+        assert await scheduler.dispatch() == 2
+        await asyncio.sleep(0)
+        assert runner.started[2:] == [task_ids[1], task_ids[3]]
+        runner.release.set()
+
+    asyncio.run(scenario())
+
+    with Session(engine) as session:
+        statuses = [session.get(Task, task_id).status for task_id in task_ids]
+    assert statuses == ["running", "running", "running", "running", "queued"]
+
+
+def test_enqueue_passes_api_key_to_runner(engine):
+    (task_id,) = _queue_tasks(engine, [1])
+
+    async def scenario():
+        runner = BlockingRunner()
+        runner.release.set()
+        scheduler = TaskScheduler(max_concurrent=1, max_per_user=1, engine=engine, runners={"agent": runner})
+        scheduler.enqueue(task_id, api_key="sk-test")
+        await scheduler.dispatch()
+        await asyncio.gather(*(task for _, task in list(scheduler.running.values())))
+        return runner
+
+    runner = asyncio.run(scenario())
+    assert runner.api_keys == {task_id: "sk-test"}
+
+
+def test_dispatch_queries_the_database_off_the_event_loop(engine):
+    (task_id,) = _queue_tasks(engine, [1])
+    scheduler = TaskScheduler(engine=engine, runners={"agent": BlockingRunner()})
+    scheduler.enqueue(task_id)
+    mark_queued_running = scheduler._mark_queued_running
+    threads = []
+
+    def recording_mark(*args):
+        threads.append(threading.get_ident())
+        return mark_queued_running(*args)
+
+    scheduler._mark_queued_running = recording_mark
+
+    async def scenario():
+        started = await scheduler.dispatch()
+        for _, task in scheduler.running.values():
+            task.cancel()
+        return started
+
+    assert asyncio.run(scenario()) == 1
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_start_fails_agent_tasks_whose_key_was_lost(engine):
+    orphaned, pending = _queue_tasks(engine, [1, 2])
+    (webui,) = _queue_tasks(engine, [1], runner="webui")
+    runner = BlockingRunner()
+    runner.release.set()
+    scheduler = TaskScheduler(engine=engine, runners={"agent": runner, "webui": runner})
+    scheduler.enqueue(pending, api_key="sk-test")
+
+    async def scenario():
+        await scheduler.start()
+        await scheduler.stop()
+        await scheduler.dispatch()
+        await asyncio.gather(*(task for _, task in list(scheduler.running.values())))
+
+    asyncio.run(scenario())
+
+    with Session(engine) as session:
+        assert session.get(Task, orphaned).status == "failed"
+    # Without an API key in memory the orphaned task is never run on the provider's default key
+    assert sorted(runner.started) == sorted([pending, webui])
+    assert runner.api_keys[pending] == "sk-test"
+
+
+def test_dispatch_skips_tasks_another_process_started(engine, monkeypatch):
+    (task_id,) = _queue_tasks(engine, [1])
+    # A stale candidate list: the other process started the task after this one read the queue
+    monkeypatch.setattr(task_scheduler, "queued_tasks_query", lambda: select(Task).order_by(Task.id))
+    with Session(engine) as session:
+        session.get(Task, task_id).status = "running"
+        session.commit()
+    scheduler = TaskScheduler(engine=engine, runners={"agent": BlockingRunner()})
+    scheduler.enqueue(task_id)
+
+    assert asyncio.run(scheduler.dispatch()) == 0
+    assert scheduler.running == {}
+
+
+def test_queue_position_is_fifo(tmp_path):
+    db_path = tmp_path / "queue.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, username="alice", hashed_password="x"))
+        session.add(User(id=2, username="bob", hashed_password="x"))
+        session.commit()
+    task_ids = _queue_tasks(engine, [1, 2, 1])
+    scheduler = TaskScheduler(engine=engine)
+
+    async def scenario():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            positions = [
+                await scheduler.queue_position(await session.get(Task, task_id), session)
+                for task_id in task_ids
+            ]
+            started = await session.get(Task, task_ids[0])
+            started.status = "running"
+            session.add(started)
+            await session.commit()
+            assert await scheduler.queue_position(await session.get(Task, task_ids[2]), session) == 2
+            assert await scheduler.queue_position(started, session) is None
+        await async_engine.dispose()
+        return positions
+
+    assert asyncio.run(scenario()) == [1, 2, 3]
@@ -0,0 +1,216 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+sys.path.append(".")
+
+from src.api.db.session import get_session
+from src.api.main import app
+from src.api.models.task import Task
+from src.api.models.task_step import TaskStep
+from src.api.models.user import User
+from src.api.services.auth import get_current_user
+from src.api.services import task_timing
+from src.api.services.task_steps import StepWriteBuffer, TaskStepRecorder
+
+
+class GoToUrlAction(BaseModel):
+    go_to_url: dict
+
+
+def _history_item(step_number, url, error=None):
+    return SimpleNamespace(
+        model_output=SimpleNamespace(action=[GoToUrlAction(go_to_url={"url": url})]),
+        state=SimpleNamespace(url=url),
+        result=[SimpleNamespace(error=error)],
+        metadata=SimpleNamespace(step_number=step_number, duration_seconds=1.23456, input_tokens=100 * step_number),
+    )
+
+
+def _row(task_id, step_number):
+    return {"task_id": task_id, "step_number": step_number, "actions": []}
+
+
+@pytest.fixture(name="seed_rows")
+def seed_rows_fixture():
+    return [
+        User(id=1, username="alice", hashed_password="x"),
+        Task(id=1, task_name="first", user_id=1, status="running"),
+        Task(id=2, task_name="second", user_id=1, status="running"),
+    ]
+
+
+def _steps(engine):
+    with Session(engine) as session:
+        return [
+            (step.task_id, step.step_number)
+            for step in session.exec(select(TaskStep).order_by(TaskStep.task_id, TaskStep.step_number)).all()
+        ]
+
+
+def test_steps_are_written_in_one_insert_per_batch(engine, async_engine, session_factory):
+    inserts = []
+    event.listen(
+        async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT") else None,
+    )
+    buffer = StepWriteBuffer(flush_every=3, flush_interval=60, session_factory=session_factory)
+
+    async def scenario():
+        buffer.add([_row(1, 1), _row(2, 1)])
+        await asyncio.sleep(0.05)
+        written_early = _steps(engine)
+        buffer.add([_row(1, 2)])
+        await buffer.drain()
+        return written_early
+
+    assert asyncio.run(scenario()) == []
+    assert _steps(engine) == [(1, 1), (1, 2), (2, 1)]
+    assert len(inserts) == 1
+
+
+def test_partial_batches_are_flushed_after_the_interval(engine, session_factory):
+    buffer = StepWriteBuffer(flush_every=100, flush_interval=0.05, session_factory=session_factory)
+
+    async def scenario():
+        buffer.add([_row(1, 1)])
+        await asyncio.sleep(0.2)
+
+    asyncio.run(scenario())
+    assert _steps(engine) == [(1, 1)]
+    assert len(buffer) == 0
+
+
+def test_failed_flush_keeps_rows_for_the_next_one(engine, session_factory):
+    def unavailable():
+        raise ConnectionError("database is down")
+
+    buffer = StepWriteBuffer(flush_every=100, flush_interval=60, max_rows=2, session_factory=unavailable)
+
+    async def scenario():
+        buffer.add([_row(1, 1), _row(1, 2)])
+        assert await buffer.flush() == 0
+        buffer.add([_row(1, 3)])
+        buffer.session_factory = session_factory
+        return await buffer.flush()
+
+    # The oldest row was dropped once the buffer exceeded max_rows
+    assert asyncio.run(scenario()) == 2
+    assert _steps(engine) == [(1, 2), (1, 3)]
+
+
+def test_recorder_writes_each_finished_step_once(engine, session_factory):
+    buffer = StepWriteBuffer(flush_every=100, flush_interval=60, session_factory=session_factory)
+    recorder = TaskStepRecorder(1, buffer)
+    history = []
+
+    async def scenario():
+        history.append(_history_item(1, "https://example.com"))
+        assert recorder.record(history) == 1
+        assert recorder.record(history) == 0
+        history.append(_history_item(2, "https://example.com/login", error="Element not found"))
+        await recorder.finish(history)
+
+    asyncio.run(scenario())
+    with Session(engine) as session:
+        steps = session.exec(select(TaskStep).order_by(TaskStep.step_number)).all()
+    assert [step.step_number for step in steps] == [1, 2]
+    assert steps[1].url == "https://example.com/login"
+    assert steps[1].actions == [{"go_to_url": {"url": "https://example.com/login"}}]
+    assert steps[1].duration_seconds == 1.235
+    assert steps[1].input_tokens == 200
+    assert steps[1].error == "Element not found"
+    assert steps[0].error is None
+
+
+def test_recorder_stores_the_agent_step_timings(engine, session_factory):
+    buffer = StepWriteBuffer(flush_every=100, flush_interval=60, session_factory=session_factory)
+    recorder = TaskStepRecorder(1, buffer)
+    history = [_history_item(1, "https://example.com"), _history_item(2, "https://example.com/login")]
+    timings = [
+        {"llm_seconds": 0.8, "dom_seconds": 0.2, "action_seconds": 0.1, "wait_seconds": 0.05, "input_tokens": 1500, "output_tokens": 90},
+        {"llm_seconds": 0.6, "dom_seconds": 0.1, "action_seconds": 0.2, "wait_seconds": 0.1, "input_tokens": None, "output_tokens": None},
+    ]
+
+    asyncio.run(recorder.finish(history, timings))
+    with Session(engine) as session:
+        steps = session.exec(select(TaskStep).order_by(TaskStep.step_number)).all()
+
+    assert (steps[0].llm_seconds, steps[0].wait_seconds, steps[0].output_tokens) == (0.8, 0.05, 90)
+    # Provider-reported prompt tokens replace browser-use's estimate when present
+    assert [step.input_tokens for step in steps] == [1500, 200]
+
+
+def test_timing_endpoints_break_down_steps_and_aggregate_per_model(engine, session_factory, monkeypatch):
+    monkeypatch.setattr(task_timing, "token_prices", task_timing.parse_token_prices("gpt-4o=2.5/10, bad"))
+    with Session(engine) as session:
+        session.get(Task, 2).llm_model = "claude-3-5-sonnet-20241022"
+        session.add_all(
+            [
+                TaskStep(task_id=1, step_number=1, duration_seconds=2.0, llm_seconds=1.2, dom_seconds=0.3,
+                         action_seconds=0.2, wait_seconds=0.1, input_tokens=1000, output_tokens=100),
+                TaskStep(task_id=1, step_number=2, duration_seconds=2.0, llm_seconds=1.0, dom_seconds=0.2,
+                         action_seconds=0.4, wait_seconds=0.2, input_tokens=3000, output_tokens=100),
+                TaskStep(task_id=2, step_number=1, duration_seconds=1.0, input_tokens=500),
+            ]
+        )
+        session.commit()
+
+    async def get_session_override():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="alice", hashed_password="x")
+    try:
+        client = TestClient(app)
+        timing = client.get("/api/v1/tasks/1/timing").json()
+        summary = client.get("/api/v1/tasks/timing-summary").json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert timing["steps"][0]["other_seconds"] == 0.2
+    assert timing["steps"][1]["cost_usd"] == 0.0085
+    assert timing["totals"]["llm_seconds"] == 2.2
+    assert timing["totals"]["share"]["llm"] == 0.55
+    assert timing["totals"]["cost_usd"] == 0.012
+    assert [(row["llm_model"], row["tasks"], row["steps"]) for row in summary] == [
+        ("claude-3-5-sonnet-20241022", 1, 1),
+        ("gpt-4o", 1, 2),
+    ]
+    assert summary[0]["cost_usd"] is None
+    assert summary[0]["other_seconds"] == 1.0
+    assert summary[1]["mean_step_seconds"] == 2.0
+
+
+def test_steps_endpoint_and_task_deletion(engine, session_factory):
+    with Session(engine) as session:
+        task = session.get(Task, 1)
+        task.status = "completed"
+        session.add(task)
+        session.add_all([TaskStep(task_id=1, step_number=number, url=f"https://example.com/{number}") for number in (2, 1)])
+        session.commit()
+
+    async def get_session_override():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="alice", hashed_password="x")
+    try:
+        client = TestClient(app)
+        response = client.get("/api/v1/tasks/1/steps")
+        assert response.status_code == 200
+        assert [step["url"] for step in response.json()] == ["https://example.com/1", "https://example.com/2"]
+
+        assert client.delete("/api/v1/tasks/1").status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+    assert _steps(engine) == []
@@ -0,0 +1,125 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+sys.path.append(".")
+
+from src.api.db.session import get_session
+from src.api.main import app
+from src.api.models.task import Task
+from src.api.models.user import User
+from src.api.services.auth import get_current_user
+from src.api.services.task_sweeper import TaskSweeper, sweep_stale_tasks
+from src.api.services.task_worker import TaskWorker, claim_next_task
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture(name="seed_rows")
+def seed_rows_fixture():
+    tasks = [
+        ("stale", "running", NOW - timedelta(minutes=30), "worker-a"),
+        ("fresh", "running", NOW - timedelta(minutes=1), None),
+        ("old queued", "queued", NOW - timedelta(minutes=30), None),
+        ("old completed", "completed", NOW - timedelta(minutes=30), None),
+    ]
+    return [User(id=1, username="alice", hashed_password="x")] + [
+        Task(id=index, task_name=name, user_id=1, status=status, initiated_at=initiated_at, worker_id=worker_id)
+        for index, (name, status, initiated_at, worker_id) in enumerate(tasks, start=1)
+    ]
+
+
+def _statuses(engine):
+    with Session(engine) as session:
+        return {task.task_name: task.status for task in session.exec(select(Task)).all()}
+
+
+def test_sweep_fails_only_stale_running_tasks(engine):
+    swept = sweep_stale_tasks(engine, max_running_minutes=10, now=NOW)
+
+    assert [(task.task_id, task.worker_id) for task in swept] == [(1, "worker-a")]
+    assert _statuses(engine) == {
+        "stale": "failed",
+        "fresh": "running",
+        "old queued": "queued",
+        "old completed": "completed",
+    }
+    assert sweep_stale_tasks(engine, max_running_minutes=10, now=NOW) == []
+
+
+def test_sweep_uses_heartbeats_for_worker_tasks(engine):
+    with Session(engine) as session:
+        session.add(
+            Task(id=5, task_name="long but alive", user_id=1, status="running", worker_id="worker-b",
+                 initiated_at=NOW - timedelta(hours=2), heartbeat_at=NOW - timedelta(seconds=10))
+        )
+        session.add(
+            Task(id=6, task_name="new but silent", user_id=1, status="running", worker_id="worker-c",
+                 initiated_at=NOW - timedelta(minutes=2), heartbeat_at=NOW - timedelta(minutes=2))
+        )
+        session.commit()
+
+    # Judged at NOW, not the wall clock, so a slow run cannot age the live heartbeat past the timeout
+    swept = sweep_stale_tasks(engine, max_running_minutes=10, now=NOW, heartbeat_timeout_seconds=60)
+
+    # Task 1 was claimed but never beat, so it falls back to initiated_at
+    assert sorted(task.task_id for task in swept) == [1, 6]
+    statuses = _statuses(engine)
+    assert (statuses["long but alive"], statuses["new but silent"]) == ("running", "failed")
+
+
+def test_sweeper_releases_swept_tasks(engine):
+    released = []
+
+    async def cleanup(task_id):
+        released.append(task_id)
+
+    sweeper = TaskSweeper(max_running_minutes=10, engine=engine, cleanup=cleanup)
+    swept = asyncio.run(sweeper.sweep())
+
+    assert [task.task_id for task in swept] == released == [1]
+
+
+def test_worker_heartbeat_releases_its_swept_tasks(engine):
+    claimed = claim_next_task(engine, "worker-b", max_concurrent=10, max_per_user=10)
+    assert claimed.task_id == 3
+    released = []
+
+    async def release(task_id):
+        released.append(task_id)
+
+    async def scenario():
+        worker = TaskWorker(worker_id="worker-b", engine=engine, release=release)
+        worker.running = {3: None}
+        assert await worker.heartbeat() == []
+        with Session(engine) as session:
+            # Worker-b stopped heartbeating task 3 (its process hung or died)
+            session.get(Task, 3).heartbeat_at = NOW - timedelta(minutes=5)
+            session.commit()
+        # Also sweeps task 1, which belongs to worker-a and is left for that worker to release
+        swept = await worker.sweeper.sweep()
+        return sorted(task.task_id for task in swept), await worker.heartbeat()
+
+    assert asyncio.run(scenario()) == ([1, 3], [3])
+    assert released == [3]
+
+
+def test_get_task_does_not_fail_stale_task(engine, session_factory):
+    async def get_test_session():
+        async with session_factory() as async_session:
+            yield async_session
+
+    app.dependency_overrides[get_session] = get_test_session
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="alice", hashed_password="x")
+    try:
+        response = TestClient(app).get("/api/v1/tasks/1")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "running"
+    assert _statuses(engine)["stale"] == "running"
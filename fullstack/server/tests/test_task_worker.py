@@ -0,0 +1,205 @@
+import asyncio
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import false
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.pool import StaticPool
+
+sys.path.append(".")
+
+from src.api.db.session import get_session
+from src.api.main import app
+from src.api.models.task import Task
+from src.api.models.user import User
+from src.api.routers import tasks as tasks_router
+from src.api.services import api_key_decrypter, task_worker
+from src.api.services.auth import get_current_user
+from src.api.services.task_worker import TaskWorker, claim_next_task, record_heartbeat
+
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, username="alice", hashed_password="x"))
+        session.add(User(id=2, username="bob", hashed_password="x"))
+        session.commit()
+    return engine
+
+
+def _queue_tasks(engine, user_ids, runner="agent"):
+    base_time = datetime.now(timezone.utc)
+    task_ids = []
+    with Session(engine) as session:
+        for offset, user_id in enumerate(user_ids):
+            task = Task(
+                task_name=f"task {offset}",
+                user_id=user_id,
+                status="queued",
+                runner=runner,
+                queued_api_key=f"key-{offset}",
+                initiated_at=base_time + timedelta(seconds=offset),
+            )
+            session.add(task)
+            session.commit()
+            task_ids.append(task.id)
+    return task_ids
+
+
+@pytest.mark.parametrize("runner", ["agent", "webui"])
+def test_claim_marks_task_running_and_clears_api_key(engine, runner):
+    (task_id,) = _queue_tasks(engine, [1], runner=runner)
+
+    claimed = claim_next_task(engine, "worker-a")
+
+    assert claimed.task_id == task_id
+    assert claimed.api_key == "key-0"
+    with Session(engine) as session:
+        task = session.get(Task, task_id)
+        assert task.status == "running"
+        assert task.worker_id == "worker-a"
+        assert task.heartbeat_at is not None
+        assert task.queued_api_key is None
+    assert claim_next_task(engine, "worker-b") is None
+
+
+def test_claim_respects_global_and_per_user_limits(engine):
+    task_ids = _queue_tasks(engine, [1, 1, 2, 2])
+
+    first = claim_next_task(engine, "worker-a", max_concurrent=2, max_per_user=1)
+    second = claim_next_task(engine, "worker-b", max_concurrent=2, max_per_user=1)
+    third = claim_next_task(engine, "worker-a", max_concurrent=2, max_per_user=1)
+
+    assert (first.task_id, second.task_id) == (task_ids[0], task_ids[2])
+    assert third is None
+
+
+def test_claim_rechecks_limits_when_the_count_is_stale(engine, monkeypatch):
+    task_ids = _queue_tasks(engine, [1, 2, 2, 2])
+    claim_next_task(engine, "worker-a", max_concurrent=2, max_per_user=1)
+    claim_next_task(engine, "worker-b", max_concurrent=2, max_per_user=1)
+    # As seen by a worker whose count ran before the other claims committed
+    monkeypatch.setattr(
+        task_worker,
+        "running_task_count_query",
+        lambda: select(func.count()).select_from(Task).where(false()),
+    )
+
+    assert claim_next_task(engine, "worker-c", max_concurrent=3, max_per_user=5) is not None
+    assert claim_next_task(engine, "worker-c", max_concurrent=3, max_per_user=5) is None
+    with Session(engine) as session:
+        assert [session.get(Task, task_id).status for task_id in task_ids] == ["running", "running", "running", "queued"]
+
+
+def test_concurrent_claims_never_exceed_the_global_limit(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'claims.db'}", connect_args={"timeout": 30})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(User(id=user_id, username=f"user{user_id}", hashed_password="x") for user_id in range(1, 9))
+        session.commit()
+    _queue_tasks(engine, list(range(1, 9)))
+    barrier = threading.Barrier(8)
+    claims = []
+
+    def claim(index):
+        barrier.wait()
+        claims.append(claim_next_task(engine, f"worker-{index}", max_concurrent=3, max_per_user=1))
+
+    threads = [threading.Thread(target=claim, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with Session(engine) as session:
+        running = session.exec(select(func.count()).select_from(Task).where(Task.status == "running")).one()
+    engine.dispose()
+    assert running == len([claimed for claimed in claims if claimed]) <= 3
+
+
+def test_heartbeat_only_touches_own_tasks(engine):
+    task_ids = _queue_tasks(engine, [1, 2])
+    claim_next_task(engine, "worker-a")
+    claim_next_task(engine, "worker-b")
+
+    assert record_heartbeat(engine, "worker-a", task_ids) == [task_ids[0]]
+
+
+def test_worker_runs_claimed_tasks(engine):
+    task_ids = _queue_tasks(engine, [1, 2])
+    started = []
+
+    async def runner(task_id, api_key):
+        started.append((task_id, api_key))
+
+    async def scenario():
+        worker = TaskWorker(worker_id="worker-a", concurrency=2, engine=engine, runners={"agent": runner})
+        assert await worker.claim_available() == 2
+        await asyncio.gather(*list(worker.running.values()))
+        assert worker.running == {}
+
+    asyncio.run(scenario())
+    assert started == [(task_ids[0], "key-0"), (task_ids[1], "key-1")]
+
+
+def test_worker_mode_initiate_keeps_the_key_out_of_task_read(tmp_path, monkeypatch):
+    db_path = tmp_path / "initiate.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, username="alice", hashed_password="x"))
+        session.add(Task(id=1, task_name="task", user_id=1))
+        session.commit()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_session_override():
+        async with session_factory() as session:
+            yield session
+
+    class FakeDecrypter:
+        def is_encrypted(self, api_key):
+            return api_key.startswith("enc:")
+
+        def decrypt_if_encrypted(self, api_key):
+            return api_key.removeprefix("enc:")
+
+    monkeypatch.setattr(tasks_router, "TASK_EXECUTION_MODE", "worker")
+    monkeypatch.setattr(api_key_decrypter, "get_api_key_decrypter", lambda: FakeDecrypter())
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, username="alice", hashed_password="x")
+    form = {
+        "instruction": "Log in",
+        "description": "",
+        "search_input_input": "",
+        "search_input_action": "",
+        "expected_outcome": "",
+        "expected_status": "",
+    }
+    try:
+        client = TestClient(app)
+        rejected = client.patch("/api/v1/tasks/1/initiate", json={**form, "api_key": "sk-plain"})
+        response = client.patch("/api/v1/tasks/1/initiate", json={**form, "api_key": "enc:sk-secret"})
+        fetched = client.get("/api/v1/tasks/1")
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(async_engine.dispose())
+
+    assert rejected.status_code == 400
+    assert response.status_code == 200
+    assert "queued_api_key" not in response.json() and "queued_api_key" not in fetched.json()
+    assert response.json()["api_key"] is None and fetched.json()["api_key"] is None
+    with Session(engine) as session:
+        assert session.get(Task, 1).queued_api_key == "enc:sk-secret"
+    engine.dispose()
@@ -0,0 +1,100 @@
+import asyncio
+import sys
+import threading
+import time
+
+sys.path.append(".")
+
+from src.api.services.artifact_storage import LocalStorageBackend
+from src.api.services.upload_manager import UploadManager
+
+
+class FlakyBackend(LocalStorageBackend):
+    name = "flaky"
+
+    def __init__(self, root, failures=0, delay=0.0):
+        super().__init__(root)
+        self.failures = failures
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def put(self, file_path, key, kind, chunk_size):
+        with self._lock:
+            self.calls.append((key, chunk_size))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if len(self.calls) <= self.failures:
+                raise ConnectionError("connection reset")
+            return super().put(file_path, key, kind, chunk_size)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _write(path, size):
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_local_backend_stores_files_by_key(tmp_path):
+    manager = UploadManager(backend=LocalStorageBackend(str(tmp_path / "uploads")))
+    gif = _write(tmp_path / "task_7.gif", 10)
+
+    url = asyncio.run(manager.upload(gif, "gif/ab/abcd.gif", "gif", 7))
+
+    assert url == str(tmp_path / "uploads" / "gif" / "ab" / "abcd.gif")
+    assert (tmp_path / "uploads" / "gif" / "ab" / "abcd.gif").read_bytes() == b"x" * 10
+    assert manager.records[-1].attempts == 1
+
+
+def test_retries_with_jittered_exponential_backoff(tmp_path):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    backend = FlakyBackend(str(tmp_path / "uploads"), failures=2)
+    manager = UploadManager(backend=backend, max_attempts=4, backoff_base=1, backoff_max=3, sleep=sleep)
+    script = _write(tmp_path / "script.py", 10)
+
+    assert asyncio.run(manager.upload(script, "script/ab/abcd.py", "script", 3)).endswith("abcd.py")
+    assert len(backend.calls) == 3
+    assert 0 <= delays[0] <= 1 and 0 <= delays[1] <= 2
+    assert manager.records[-1].attempts == 3
+    assert manager.stats()["script"]["failures"] == 0
+
+
+def test_gives_up_after_max_attempts(tmp_path):
+    async def sleep(delay):
+        pass
+
+    backend = FlakyBackend(str(tmp_path / "uploads"), failures=10)
+    manager = UploadManager(backend=backend, max_attempts=3, sleep=sleep)
+
+    assert asyncio.run(manager.upload(_write(tmp_path / "a.gif", 1), "gif/ab/abcd.gif", "gif", 1)) is None
+    assert len(backend.calls) == 3
+    assert manager.stats()["gif"]["failures"] == 1
+
+
+def test_caps_in_flight_uploads_and_chunks_large_files(tmp_path):
+    backend = FlakyBackend(str(tmp_path / "uploads"), delay=0.05)
+    manager = UploadManager(backend=backend, max_in_flight=2, chunked_threshold=100, chunk_size=64)
+    paths = [_write(tmp_path / f"task_{task_id}.gif", 50 if task_id % 2 else 500) for task_id in range(1, 6)]
+
+    async def scenario():
+        return await asyncio.gather(*(manager.upload(path, f"gif/{task_id}.gif", "gif", task_id) for task_id, path in enumerate(paths, 1)))
+
+    assert all(asyncio.run(scenario()))
+    assert backend.peak == 2
+    assert {key: chunk_size for key, chunk_size in backend.calls} == {
+        "gif/1.gif": None,
+        "gif/2.gif": 64,
+        "gif/3.gif": None,
+        "gif/4.gif": 64,
+        "gif/5.gif": None,
+    }
@@ -0,0 +1,182 @@
+"""Generate many scripts in parallel from refined action lists.
+
+Generation is pure CPU work, so inputs are spread over a process pool in
+chunks. A manifest of content hashes lets repeated runs skip inputs whose
+action list and generator settings have not changed.
+
+Usage:
+    python -m automate.bulk runs/ --output generated_scripts --workers 8
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from automate.utils.generator import ProcessedScriptGenerator, RUNTIME_SOURCE_PATH
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "bulk_manifest.json"
+GENERATOR_SOURCE_PATH = Path(__file__).resolve().parent / "utils" / "generator.py"
+
+
+def generator_fingerprint() -> str:
+    """Hash of the generator and runtime sources, so upgrading either invalidates the manifest."""
+    digest = hashlib.sha256()
+    for path in (GENERATOR_SOURCE_PATH, RUNTIME_SOURCE_PATH):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def input_hash(action_list_bytes: bytes, options: dict[str, Any], fingerprint: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(fingerprint.encode())
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    digest.update(action_list_bytes)
+    return digest.hexdigest()
+
+
+def _generate_one(job: tuple[str, str, dict[str, Any]]) -> tuple[str, str | None, str | None]:
+    """Worker entry point: generates one script and writes it to disk.
+
+    Returns (input path, output hash, error). Only the hash crosses the process
+    boundary, not the script text.
+    """
+    input_path, output_path, options = job
+    try:
+        with open(input_path, "r", encoding="utf-8") as f:
+            action_list = json.load(f)
+        content = ProcessedScriptGenerator(action_list, **options).generate_script_content()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return input_path, hashlib.sha256(content.encode()).hexdigest(), None
+    except Exception as e:
+        return input_path, None, f"{type(e).__name__}: {e}"
+
+
+def output_path_for(input_path: Path, input_root: Path, output_root: Path) -> Path:
+    """Mirrors the input layout: runs/site/case/refined_agent_list.json -> out/site/case.py"""
+    relative = input_path.relative_to(input_root)
+    if relative.parent != Path("."):
+        return output_root / relative.parent.with_suffix(".py")
+    return output_root / relative.with_suffix(".py")
+
+
+def load_manifest(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+        return {}
+
+
+def bulk_generate(
+    input_paths: list[Path],
+    input_root: Path,
+    output_root: Path,
+    generator_options: dict[str, Any] | None = None,
+    workers: int | None = None,
+    chunksize: int = 16,
+    force: bool = False,
+) -> dict[str, Any]:
+    """Generates a script for every refined action list, skipping unchanged inputs.
+
+    Returns a report with generated/skipped/failed counts and throughput.
+    """
+    options = generator_options or {}
+    output_root.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_root / MANIFEST_FILENAME
+    manifest = load_manifest(manifest_path)
+    fingerprint = generator_fingerprint()
+
+    start = time.perf_counter()
+    jobs = []
+    pending_hashes = {}
+    skipped = 0
+    for input_path in input_paths:
+        output_path = output_path_for(input_path, input_root, output_root)
+        current_hash = input_hash(input_path.read_bytes(), options, fingerprint)
+        entry = manifest.get(str(input_path))
+        if not force and entry and entry.get("input_hash") == current_hash and output_path.exists():
+            skipped += 1
+            continue
+        pending_hashes[str(input_path)] = (current_hash, str(output_path))
+        jobs.append((str(input_path), str(output_path), options))
+
+    failed = {}
+    generated = 0
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            for input_path, output_hash, error in executor.map(_generate_one, jobs, chunksize=chunksize):
+                if error:
+                    failed[input_path] = error
+                    logger.error(f"Failed to generate script for {input_path}: {error}")
+                    continue
+                current_hash, output_path = pending_hashes[input_path]
+                manifest[input_path] = {
+                    "input_hash": current_hash,
+                    "output_path": output_path,
+                    "output_hash": output_hash,
+                }
+                generated += 1
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "total": len(input_paths),
+        "generated": generated,
+        "skipped": skipped,
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "scripts_per_second": round(generated / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate scripts from many refined action lists in parallel.")
+    parser.add_argument("input", help="Directory searched recursively for refined action lists")
+    parser.add_argument("--output", default="generated_scripts", help="Output directory")
+    parser.add_argument("--pattern", default="refined_agent_list.json", help="Filename glob of refined action lists")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=16, help="Inputs dispatched to a worker at a time")
+    parser.add_argument("--replay-mode", choices=["faithful", "fast"], default="faithful")
+    parser.add_argument("--thin", action="store_true", help="Import helpers from automate.runtime instead of inlining them")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if the manifest says the input is unchanged")
+    args = parser.parse_args()
+
+    input_root = Path(args.input)
+    input_paths = sorted(input_root.rglob(args.pattern))
+    print(f"Found {len(input_paths)} refined action list(s) under {input_root}")
+
+    report = bulk_generate(
+        input_paths,
+        input_root,
+        Path(args.output),
+        generator_options={"replay_mode": args.replay_mode, "inline_helpers": not args.thin},
+        workers=args.workers,
+        chunksize=args.chunksize,
+        force=args.force,
+    )
+    print(
+        f"Generated {report['generated']}, skipped {report['skipped']} unchanged, "
+        f"failed {len(report['failed'])} in {report['elapsed_seconds']:.2f}s "
+        f"({report['scripts_per_second']} scripts/sec)"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,215 @@
+"""Rule-based optimizer for refined action lists.
+
+Runs between refinement and generation. Each rule may only delete or merge
+actions; the relative order of the remaining actions is never changed, so
+state-changing steps (clicks, input, navigation) replay exactly as recorded.
+"""
+
+import logging
+from copy import deepcopy
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Seconds a removed step would have cost in a faithful replay (wait_for_page_stable)
+STEP_SETTLE_SECONDS = 1
+
+# Actions that neither navigate nor change page content
+PASSIVE_ACTIONS = {"wait", "scroll_down", "scroll_up", "scroll_to_text"}
+
+# Fields an action needs for the generator to emit anything but a comment
+REQUIRED_FIELDS = {
+    "go_to_url": ("url",),
+    "open_tab": ("url",),
+    "input_text": ("selector",),
+    "click_element": ("selector",),
+    "click_element_by_index": ("selector",),
+    "scroll_to_text": ("text",),
+    "send_keys": ("keys",),
+    "select_dropdown_option": ("selector", "text"),
+}
+
+CLICK_ACTIONS = {"click_element", "click_element_by_index"}
+
+
+def is_no_op(action: dict[str, Any]) -> bool:
+    """Returns True if the generator would skip this action (missing fields or no action type)."""
+    action_type = action.get("action")
+    if not action_type:
+        return True
+    return any(not action.get(field) for field in REQUIRED_FIELDS.get(action_type, ()))
+
+
+class OptimizationRule:
+    """Base class for optimizer rules.
+
+    Subclasses implement ``apply``, which returns the new action list and the
+    number of seconds the change saves in a faithful replay.
+    """
+
+    name = "rule"
+
+    def apply(self, actions: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], float]:
+        raise NotImplementedError
+
+
+class CancelOpposingScrolls(OptimizationRule):
+    """Removes a scroll_down immediately followed by a scroll_up (and vice versa)."""
+
+    name = "cancel_opposing_scrolls"
+    OPPOSITES = {"scroll_down": "scroll_up", "scroll_up": "scroll_down"}
+
+    def apply(self, actions):
+        result = []
+        saved = 0.0
+        for action in actions:
+            previous = result[-1] if result else None
+            if previous and self.OPPOSITES.get(previous.get("action")) == action.get("action"):
+                result.pop()
+                saved += 2 * STEP_SETTLE_SECONDS
+                continue
+            result.append(action)
+        return result, saved
+
+
+class DropRedundantNavigation(OptimizationRule):
+    """Drops go_to_url to the URL the page is already on.
+
+    The current URL is only considered known while every action since the
+    last navigation was passive; any click, input or tab change resets it.
+    """
+
+    name = "drop_redundant_navigation"
+
+    def apply(self, actions):
+        result = []
+        saved = 0.0
+        current_url = None
+        for action in actions:
+            action_type = action.get("action")
+            if action_type == "go_to_url":
+                if action.get("url") and action.get("url") == current_url:
+                    saved += STEP_SETTLE_SECONDS
+                    continue
+                current_url = action.get("url")
+            elif action_type == "open_tab":
+                current_url = action.get("url")
+            elif action_type not in PASSIVE_ACTIONS:
+                current_url = None
+            result.append(action)
+        return result, saved
+
+
+class DropScrollBeforeClick(OptimizationRule):
+    """Drops scroll_to_text when the next real action clicks an element with that text.
+
+    Playwright scrolls elements into view before clicking, so the explicit
+    scroll only adds a step.
+    """
+
+    name = "drop_scroll_before_click"
+
+    def apply(self, actions):
+        result = []
+        saved = 0.0
+        for index, action in enumerate(actions):
+            if action.get("action") == "scroll_to_text" and action.get("text"):
+                next_action = next(
+                    (candidate for candidate in actions[index + 1 :] if candidate.get("action") != "wait"),
+                    None,
+                )
+                if (
+                    next_action
+                    and next_action.get("action") in CLICK_ACTIONS
+                    and f'"{action["text"]}"' in (next_action.get("selector") or "")
+                ):
+                    saved += STEP_SETTLE_SECONDS
+                    continue
+            result.append(action)
+        return result, saved
+
+
+class MergeWaits(OptimizationRule):
+    """Merges waits separated only by no-op actions into a single wait.
+
+    The no-ops between merged waits are dropped (the generator would only
+    emit comments for them); no-ops after the last wait of a run are kept.
+    The total wait time is preserved (clamping is the generator's job), so this
+    rule shortens the script without changing its timing.
+    """
+
+    name = "merge_waits"
+
+    def apply(self, actions):
+        result = []
+        pending_wait = None
+        pending_no_ops = []
+        for action in actions:
+            if action.get("action") == "wait":
+                if pending_wait is None:
+                    pending_wait = dict(action)
+                else:
+                    pending_wait["seconds"] = pending_wait.get("seconds", 3) + action.get("seconds", 3)
+                    pending_no_ops = []
+                continue
+            if pending_wait is not None and is_no_op(action):
+                pending_no_ops.append(action)
+                continue
+            if pending_wait is not None:
+                result.append(pending_wait)
+                result.extend(pending_no_ops)
+                pending_wait = None
+                pending_no_ops = []
+            result.append(action)
+        if pending_wait is not None:
+            result.append(pending_wait)
+            result.extend(pending_no_ops)
+        return result, 0.0
+
+
+DEFAULT_RULES = [
+    CancelOpposingScrolls(),
+    DropRedundantNavigation(),
+    DropScrollBeforeClick(),
+    MergeWaits(),
+]
+
+
+def optimize_action_list(
+    action_list: list[dict[str, Any]],
+    rules: list[OptimizationRule] | None = None,
+    max_passes: int = 5,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Applies optimizer rules until the action list stops changing.
+
+    Returns the optimized list and a report with per-rule savings.
+    """
+    rules = DEFAULT_RULES if rules is None else rules
+    actions = deepcopy(action_list)
+    report = {
+        "original_actions": len(action_list),
+        "rules": {rule.name: {"removed_actions": 0, "saved_seconds": 0.0} for rule in rules},
+    }
+
+    for _ in range(max_passes):
+        changed = False
+        for rule in rules:
+            before = len(actions)
+            actions, saved = rule.apply(actions)
+            removed = before - len(actions)
+            if removed:
+                changed = True
+                report["rules"][rule.name]["removed_actions"] += removed
+                report["rules"][rule.name]["saved_seconds"] += saved
+        if not changed:
+            break
+
+    report["optimized_actions"] = len(actions)
+    report["removed_actions"] = len(action_list) - len(actions)
+    report["saved_seconds"] = sum(stats["saved_seconds"] for stats in report["rules"].values())
+
+    for name, stats in report["rules"].items():
+        if stats["removed_actions"]:
+            logger.info(f"{name}: removed {stats['removed_actions']} action(s), ~{stats['saved_seconds']:.1f}s saved")
+
+    return actions, report
@@ -0,0 +1,268 @@
+"""Generate a pytest suite from refined action lists.
+
+Each test case in a dataset JSON becomes one async test function. The suite
+shares a session-scoped browser (one per pytest-xdist worker) and gives every
+test a fresh context and page.
+
+Usage:
+    python -m automate.pytest_suite ../dataset/gutenberg.json \
+        --refined-dir runs/gutenberg --output generated_tests
+
+    cd generated_tests && pytest -n auto -m "site_gutenberg and category_navigation"
+"""
+
+import argparse
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any
+
+from automate.utils.browser_config import BrowserConfig, BrowserContextConfig
+from automate.utils.generator import RUNTIME_SOURCE_PATH, ProcessedScriptGenerator
+
+logger = logging.getLogger(__name__)
+
+REFINED_LIST_FILENAME = "refined_agent_list.json"
+SUITE_RUNTIME_MODULE = "suite_runtime"
+
+
+def safe_name(name: str) -> str:
+    """Same directory naming as the dataset runner (src/cli/run_tests.py)."""
+    return re.sub(r"[^\w\-\.]+", "_", name.strip())
+
+
+def marker_name(prefix: str, value: str) -> str:
+    """Builds a valid pytest marker name such as ``category_search_filter``."""
+    slug = re.sub(r"[^0-9a-zA-Z]+", "_", value).strip("_").lower()
+    return f"{prefix}_{slug or 'unknown'}"
+
+
+def build_test_name(name: str) -> str:
+    slug = re.sub(r"[^0-9a-zA-Z]+", "_", name).strip("_").lower()
+    return f"test_{slug or 'case'}"
+
+
+def dedent_step_line(line: str) -> str:
+    """Re-indents a step line from the standalone script body (12 spaces) to a test body (4)."""
+    return re.sub(r"^(\n?) {12}", r"\1    ", line)
+
+
+class PytestSuiteGenerator:
+    """Generates pytest modules plus a shared conftest from refined action lists.
+
+    ``cases`` are dicts with ``name``, ``category`` and ``action_list`` keys.
+    """
+
+    def __init__(
+        self,
+        site: str,
+        cases: list[dict[str, Any]],
+        sensitive_data_keys: list[str] | None = None,
+        browser_config: BrowserConfig | None = None,
+        context_config: BrowserContextConfig | None = None,
+        replay_mode: str = "faithful",
+        max_wait_seconds: float | None = None,
+    ):
+        self.site = site
+        self.cases = cases
+        self.sensitive_data_keys = sensitive_data_keys or []
+        self.browser_config = browser_config
+        self.context_config = context_config
+        self.replay_mode = replay_mode
+        self.max_wait_seconds = max_wait_seconds
+
+    def _script_generator(self, action_list: list[dict[str, Any]]) -> ProcessedScriptGenerator:
+        return ProcessedScriptGenerator(
+            action_list,
+            sensitive_data_keys=self.sensitive_data_keys,
+            browser_config=self.browser_config,
+            context_config=self.context_config,
+            inline_helpers=False,
+            runtime_module=SUITE_RUNTIME_MODULE,
+            replay_mode=self.replay_mode,
+            max_wait_seconds=self.max_wait_seconds,
+        )
+
+    def markers(self) -> set[str]:
+        """Returns every marker used by this suite's tests."""
+        markers = {marker_name("site", self.site)}
+        markers.update(marker_name("category", case.get("category") or "uncategorized") for case in self.cases)
+        return markers
+
+    def generate_test_module(self) -> str:
+        """Generates a test module with one test function per case."""
+        # Imports, runtime check and SENSITIVE_DATA are identical for every case
+        header_generator = self._script_generator([])
+        lines = [
+            '"""Generated from refined agent histories. Do not edit by hand."""',
+            "",
+            "import pytest",
+            *header_generator._get_imports_and_helpers(),
+            *header_generator._get_sensitive_data_definitions(),
+            'pytestmark = pytest.mark.asyncio(loop_scope="session")',
+            "",
+        ]
+
+        used_names = set()
+        for case in self.cases:
+            function_name = build_test_name(case["name"])
+            suffix = 2
+            while function_name in used_names:
+                function_name = f"{build_test_name(case['name'])}_{suffix}"
+                suffix += 1
+            used_names.add(function_name)
+
+            step_lines = self._script_generator(case["action_list"]).generate_step_lines()
+            lines.extend(
+                [
+                    "",
+                    f"@pytest.mark.{marker_name('site', self.site)}",
+                    f"@pytest.mark.{marker_name('category', case.get('category') or 'uncategorized')}",
+                    f"async def {function_name}(context, page):",
+                    f"    {json.dumps(case['name'])}",
+                ]
+            )
+            lines.extend(dedent_step_line(line) for line in step_lines)
+            lines.append("")
+
+        return "\n".join(lines)
+
+    def generate_conftest(self, markers: set[str] | None = None) -> str:
+        """Generates the conftest with the shared browser and per-test context fixtures."""
+        header_generator = self._script_generator([])
+        browser_launch_args = header_generator._generate_browser_launch_args()
+        context_options = header_generator._generate_context_options()
+        browser_type = "chromium"
+        if self.browser_config and self.browser_config.browser_class in ["firefox", "webkit"]:
+            browser_type = self.browser_config.browser_class
+        markers = sorted(markers or self.markers())
+
+        lines = [
+            '"""Shared fixtures for the generated suite. Do not edit by hand."""',
+            "",
+            "import os",
+            "",
+            "import pytest",
+            "import pytest_asyncio",
+            "from playwright.async_api import async_playwright",
+            "",
+            f"MARKERS = {json.dumps(markers, indent=4)}",
+            "",
+            "",
+            "def pytest_configure(config):",
+            "    for marker in MARKERS:",
+            '        config.addinivalue_line("markers", f"{marker}: generated suite marker")',
+            "",
+            "",
+            "def _launch_args():",
+            f"    kwargs = dict({browser_launch_args})",
+            '    if os.getenv("HEADLESS") is not None:',
+            '        kwargs["headless"] = os.getenv("HEADLESS", "1").lower() not in ("0", "false", "no")',
+            "    return kwargs",
+            "",
+            "",
+            '@pytest_asyncio.fixture(scope="session", loop_scope="session")',
+            "async def browser():",
+            "    # One browser per session; under pytest-xdist every worker gets its own",
+            "    async with async_playwright() as p:",
+            f"        browser = await p.{browser_type}.launch(**_launch_args())",
+            "        yield browser",
+            "        await browser.close()",
+            "",
+            "",
+            '@pytest_asyncio.fixture(loop_scope="session")',
+            "async def context(browser):",
+            f"    context = await browser.new_context({context_options})",
+            "    yield context",
+            "    await context.close()",
+            "",
+            "",
+            '@pytest_asyncio.fixture(loop_scope="session")',
+            "async def page(context):",
+            "    return await context.new_page()",
+            "",
+        ]
+        return "\n".join(lines)
+
+
+def load_cases(dataset_path: Path, refined_dir: Path) -> list[dict[str, Any]]:
+    """Pairs dataset test cases with their refined action lists.
+
+    Refined lists are looked up at ``<refined_dir>/<safe case name>/refined_agent_list.json``.
+    """
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    cases = []
+    for case in data.get("testcases", []):
+        prompt = case.get("prompt", {})
+        name = prompt.get("name")
+        if not name:
+            continue
+        refined_path = refined_dir / safe_name(name) / REFINED_LIST_FILENAME
+        if not refined_path.exists():
+            logger.warning(f"Skipping '{name}': no refined action list at {refined_path}")
+            continue
+        with open(refined_path, "r", encoding="utf-8") as f:
+            action_list = json.load(f)
+        cases.append({"name": name, "category": prompt.get("category"), "action_list": action_list})
+    return cases
+
+
+def write_suite(generators: list[PytestSuiteGenerator], output_dir: Path) -> list[Path]:
+    """Writes one test module per site, a shared conftest and the vendored runtime."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    markers = set()
+    for generator in generators:
+        markers.update(generator.markers())
+        module_path = output_dir / f"test_{safe_name(generator.site).lower()}.py"
+        module_path.write_text(generator.generate_test_module(), encoding="utf-8")
+        written.append(module_path)
+
+    if generators:
+        conftest_path = output_dir / "conftest.py"
+        conftest_path.write_text(generators[0].generate_conftest(markers), encoding="utf-8")
+        written.append(conftest_path)
+
+    runtime_path = output_dir / f"{SUITE_RUNTIME_MODULE}.py"
+    runtime_path.write_text(RUNTIME_SOURCE_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    written.append(runtime_path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a pytest suite from refined action lists.")
+    parser.add_argument("datasets", nargs="+", help="Dataset JSON files (one test module per file)")
+    parser.add_argument("--refined-dir", required=True, help="Directory with one subdirectory of refined lists per dataset file")
+    parser.add_argument("--output", default="generated_tests", help="Output directory for the suite")
+    parser.add_argument("--headless", action="store_true", help="Launch the shared browser headless")
+    parser.add_argument("--replay-mode", choices=["faithful", "fast"], default="faithful")
+    args = parser.parse_args()
+
+    refined_root = Path(args.refined_dir)
+    generators = []
+    for dataset in args.datasets:
+        dataset_path = Path(dataset)
+        # Accept either <refined-dir>/<case> for a single dataset or <refined-dir>/<site>/<case>
+        site_dir = refined_root / dataset_path.stem
+        cases = load_cases(dataset_path, site_dir if site_dir.is_dir() else refined_root)
+        print(f"{dataset_path.stem}: {len(cases)} test case(s)")
+        generators.append(
+            PytestSuiteGenerator(
+                dataset_path.stem,
+                cases,
+                browser_config=BrowserConfig(headless=args.headless),
+                replay_mode=args.replay_mode,
+            )
+        )
+
+    for path in write_suite(generators, Path(args.output)):
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
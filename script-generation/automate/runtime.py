@@ -0,0 +1,205 @@
+"""Runtime helpers shared by generated Playwright scripts.
+
+Scripts generated with ``inline_helpers=False`` import these helpers instead of
+carrying their own copy. Scripts generated in inline mode embed the source of
+this file, so it must stay self-contained (no imports from ``automate``).
+"""
+
+import asyncio
+import re
+
+from playwright.async_api import BrowserContext, Page, expect
+
+RUNTIME_VERSION = "1.2"
+
+# True for <input>/<textarea> fields whose value should read back exactly as typed:
+# contenteditable elements, typed inputs (number, date, ...) and masked inputs reformat it.
+PLAIN_TEXT_FIELD_JS = """el => {
+    if (el.tagName === 'TEXTAREA') return true;
+    if (el.tagName !== 'INPUT') return false;
+    const type = (el.getAttribute('type') || 'text').toLowerCase();
+    if (!['text', 'search', 'email', 'url', 'tel', 'password'].includes(type)) return false;
+    const maskAttributes = ['mask', 'data-mask', 'data-inputmask', 'data-maska', 'v-mask', 'x-mask'];
+    return !maskAttributes.some(name => el.hasAttribute(name));
+}"""
+
+
+def check_runtime_version(required: str):
+    """Fail fast when a generated script needs a newer runtime than the installed one."""
+    installed_major, installed_minor = (int(part) for part in RUNTIME_VERSION.split(".")[:2])
+    required_major, required_minor = (int(part) for part in required.split(".")[:2])
+    if installed_major != required_major or installed_minor < required_minor:
+        raise RuntimeError(
+            f"Generated script requires automate.runtime {required}, "
+            f"but {RUNTIME_VERSION} is installed. Regenerate the script or upgrade the runtime."
+        )
+
+
+def get_locator_from_selector(page: Page, selector: str):
+    """Gets a Playwright locator based on a selector string."""
+    if selector.startswith("role="):
+        if "[name=" in selector:
+            role_part = selector.split("[")[0].replace("role=", "")
+            name_part = selector.split('[name="')[1].split('"]')[0]
+            return page.get_by_role(role_part, name=name_part, exact=True).first
+        else:
+            role_part = selector.replace("role=", "")
+            return page.get_by_role(role_part, exact=True).first
+    elif selector.startswith("[data-testid="):
+        test_id = selector.split('="')[1].split('"]')[0]
+        return page.get_by_test_id(test_id).first
+    elif selector.startswith("placeholder="):
+        placeholder = selector.split('="')[1].split('"]')[0]
+        return page.get_by_placeholder(placeholder, exact=True).first
+    elif selector.startswith("text="):
+        match = re.search(r'text="([^"]*)"', selector)
+        text_content = match.group(1) if match else None
+        return page.get_by_text(text_content, exact=True).first
+    elif selector.startswith("label="):
+        label = selector.split('="')[1].split('"]')[0]
+        return page.get_by_label(label, exact=True).first
+    else:
+        return page.locator(selector).first
+
+
+async def wait_for_page_stable(page: Page, timeout: int = 3000):
+    """Wait for the page to be stable and ready for interaction."""
+    try:
+        # Wait for the DOM to be loaded
+        await page.wait_for_load_state("domcontentloaded", timeout=timeout)
+        await asyncio.sleep(1)
+    except Exception:
+        pass
+
+
+async def wait_for_page_ready(page: Page, timeout: int = 3000, idle_timeout: int = 500):
+    """Event-driven replacement for wait_for_page_stable used by fast-replay scripts.
+
+    Waits for the DOM to load and gives the network a short chance to go idle,
+    without any unconditional sleep. Element readiness is left to locator auto-wait.
+    """
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=timeout)
+    except Exception:
+        return
+    try:
+        await page.wait_for_load_state("networkidle", timeout=idle_timeout)
+    except Exception:
+        pass
+
+
+async def click_and_handle_navigation(page: Page, context: BrowserContext, locator):
+    """Click an element and handle potential navigation or new tab/window."""
+    current_url = page.url
+    current_page_count = len(context.pages)
+
+    # Perform the click
+    await locator.click()
+
+    # Check if a new page/tab was opened
+    if len(context.pages) > current_page_count:
+        # New tab/window opened, switch to it
+        new_page = context.pages[-1]
+        await new_page.wait_for_load_state("domcontentloaded")
+        print(f"  New tab/window opened, switched to: {new_page.url}")
+        return new_page
+    elif page.url != current_url:
+        # Same tab navigation occurred
+        await page.wait_for_load_state("domcontentloaded")
+        print(f"  Navigated to: {page.url}")
+
+    return page
+
+
+async def click_and_wait_for_navigation(
+    page: Page, context: BrowserContext, locator, start_timeout: int = 250, timeout: int = 30000
+):
+    """Fast-replay click: wait for a navigation the click starts instead of sleeping.
+
+    ``click_and_handle_navigation`` only sees navigations that committed before the
+    click returned. Here a main-frame document request within ``start_timeout`` ms of
+    the click is treated as a navigation and awaited up to domcontentloaded.
+    """
+    loop = asyncio.get_running_loop()
+    requested = loop.create_future()
+    committed = loop.create_future()
+
+    def on_request(request):
+        try:
+            is_main_frame = request.frame == page.main_frame
+        except Exception:
+            # Service worker requests have no frame
+            return
+        if request.is_navigation_request() and is_main_frame and not requested.done():
+            requested.set_result(None)
+
+    def on_frame_navigated(frame):
+        if frame == page.main_frame and not committed.done():
+            committed.set_result(None)
+
+    page.on("request", on_request)
+    page.on("framenavigated", on_frame_navigated)
+    try:
+        new_page = await click_and_handle_navigation(page, context, locator)
+        if new_page is not page or committed.done():
+            return new_page
+        try:
+            await asyncio.wait_for(asyncio.shield(requested), start_timeout / 1000)
+        except asyncio.TimeoutError:
+            return page
+        try:
+            await asyncio.wait_for(asyncio.shield(committed), timeout / 1000)
+            await page.wait_for_load_state("domcontentloaded", timeout=timeout)
+        except Exception:
+            # Downloads and aborted navigations never commit; the next step's locator auto-waits
+            return page
+        print(f"  Navigated to: {page.url}")
+        return page
+    finally:
+        page.remove_listener("request", on_request)
+        page.remove_listener("framenavigated", on_frame_navigated)
+
+
+async def fill_and_confirm(locator, text: str):
+    """Fill a field and, for plain text fields, wait until it holds the value."""
+    await locator.fill(text)
+    if await locator.evaluate(PLAIN_TEXT_FIELD_JS):
+        await expect(locator).to_have_value(text)
+
+
+async def scroll_to_text(page: Page, text: str):
+    """Scroll to an element containing the specified text."""
+    try:
+        # Try to find element with exact text match
+        element = page.get_by_text(text, exact=False).first
+        await element.scroll_into_view_if_needed(timeout=1000)
+        print(f"  Successfully scrolled to text: {text}")
+    except Exception:
+        # If exact text not found, try with XPath
+        try:
+            # Escape quotes in text for XPath
+            escaped_text = text.replace("'", "\\'").replace('"', '\\"')
+            element = page.locator(f"//*[contains(text(), '{escaped_text}')]").first
+            await element.scroll_into_view_if_needed(timeout=1000)
+            print(f"  Successfully scrolled to text (XPath match): {text}")
+        except Exception:
+            # As fallback, scroll through the page looking for the text
+            print(f"  Could not find element with text, scrolling through page...")
+            for i in range(10):  # Max 10 scroll attempts
+                # Check if text is visible on current viewport
+                is_visible = await page.evaluate('''(text) => {
+                    const elements = Array.from(document.querySelectorAll('*'));
+                    return elements.some(el => {
+                        const rect = el.getBoundingClientRect();
+                        return el.textContent && el.textContent.includes(text) &&
+                               rect.top >= 0 && rect.bottom <= window.innerHeight;
+                    });
+                }''', text)
+
+                if is_visible:
+                    print(f"  Text found in viewport after {i} scrolls")
+                    break
+
+                # Scroll down by one viewport height
+                await page.evaluate('window.scrollBy(0, window.innerHeight)')
+                await asyncio.sleep(0.5)
@@ -0,0 +1,122 @@
+"""Compare faithful and fast-replay runs of the same refined action list.
+
+Usage:
+    python -m automate.timing_report test-scripts/refined_agent_list.json \
+        --output test-scripts/timing_report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from automate.utils.browser_config import BrowserConfig
+from automate.utils.generator import REPLAY_MODES, ProcessedScriptGenerator
+
+logger = logging.getLogger(__name__)
+
+
+async def run_script(script_path: Path, timeout: float) -> dict[str, Any]:
+    """Runs a generated script in a subprocess and measures its wall-clock duration."""
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        str(script_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return {
+            "duration_seconds": round(time.perf_counter() - start, 3),
+            "returncode": None,
+            "error": f"timed out after {timeout}s",
+        }
+
+    duration = round(time.perf_counter() - start, 3)
+    stderr_text = stderr.decode(errors="replace").strip()
+    # Generated scripts report failures on stderr but still exit with 0
+    error = stderr_text[-500:] if "An error occurred" in stderr_text else None
+    return {
+        "duration_seconds": duration,
+        "returncode": process.returncode,
+        "error": error,
+    }
+
+
+async def build_timing_report(
+    action_list: list[dict[str, Any]],
+    output_dir: Path,
+    headless: bool = True,
+    max_wait_seconds: float | None = None,
+    timeout: float = 600,
+) -> dict[str, Any]:
+    """Generates both replay variants of a script, runs them and compares their durations."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report: dict[str, Any] = {"modes": {}}
+
+    for mode in REPLAY_MODES:
+        generator = ProcessedScriptGenerator(
+            action_list,
+            browser_config=BrowserConfig(headless=headless),
+            replay_mode=mode,
+            max_wait_seconds=max_wait_seconds if mode == "fast" else None,
+        )
+        script_path = output_dir / f"test_script_{mode}.py"
+        script_path.write_text(generator.generate_script_content(), encoding="utf-8")
+
+        logger.info(f"Running {mode} script: {script_path}")
+        result = await run_script(script_path, timeout)
+        result["script"] = str(script_path)
+        report["modes"][mode] = result
+
+    faithful = report["modes"]["faithful"]["duration_seconds"]
+    fast = report["modes"]["fast"]["duration_seconds"]
+    report["saved_seconds"] = round(faithful - fast, 3)
+    report["speedup"] = round(faithful / fast, 2) if fast else None
+    return report
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Time faithful vs fast-replay generated scripts.")
+    parser.add_argument("refined_action_list", help="Path to a refined action list JSON file")
+    parser.add_argument("--output", help="Where to write the JSON report")
+    parser.add_argument("--scripts-dir", default="test-scripts/timing", help="Where to write the generated variants")
+    parser.add_argument("--headed", action="store_true", help="Run the scripts with a visible browser")
+    parser.add_argument("--max-wait-seconds", type=float, default=None, help="Clamp literal waits in fast mode instead of dropping them")
+    parser.add_argument("--timeout", type=float, default=600, help="Per-script timeout in seconds")
+    args = parser.parse_args()
+
+    with open(args.refined_action_list, "r") as f:
+        action_list = json.load(f)
+
+    report = await build_timing_report(
+        action_list,
+        Path(args.scripts_dir),
+        headless=not args.headed,
+        max_wait_seconds=args.max_wait_seconds,
+        timeout=args.timeout,
+    )
+    report["input"] = args.refined_action_list
+
+    for mode, result in report["modes"].items():
+        status = "ok" if not result["error"] else f"error: {result['error'].splitlines()[-1]}"
+        print(f"{mode:>8}: {result['duration_seconds']:8.2f}s  ({status})")
+    print(f"   saved: {report['saved_seconds']:8.2f}s  speedup: {report['speedup']}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Timing report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,9 +1,14 @@
 import json
 import logging
+from pathlib import Path
 from typing import Any
 
+from automate.runtime import RUNTIME_VERSION
 from automate.utils.browser_config import BrowserConfig, BrowserContextConfig
 
+RUNTIME_SOURCE_PATH = Path(__file__).resolve().parent.parent / "runtime.py"
+REPLAY_MODES = ("faithful", "fast")
+
 
 class ProcessedScriptGenerator:
     """Generates a Playwright script from a processed action list."""
@@ -14,11 +19,34 @@ class ProcessedScriptGenerator:
         sensitive_data_keys: list[str] | None = None,
         browser_config: BrowserConfig | None = None,
         context_config: BrowserContextConfig | None = None,
+        inline_helpers: bool = True,
+        runtime_module: str = "automate.runtime",
+        replay_mode: str = "faithful",
+        max_wait_seconds: float | None = None,
     ):
+        """
+        Args:
+            inline_helpers: Embed the runtime helpers in the script so it runs standalone.
+                When False, the script imports them from ``runtime_module`` instead.
+            runtime_module: Import path of the shared runtime used by thin scripts.
+            replay_mode: "faithful" replays the agent's pacing (fixed settle sleeps and
+                literal waits). "fast" emits event-driven waits: load-state awaits,
+                locator auto-wait and ``expect`` assertions after input.
+            max_wait_seconds: Upper bound for literal ``wait`` actions. In fast mode
+                the default of None drops them entirely.
+        """
+        if replay_mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay_mode {replay_mode!r}, expected one of {REPLAY_MODES}")
         self.action_list = action_list
         self.sensitive_data_keys = sensitive_data_keys or []
         self.browser_config = browser_config
         self.context_config = context_config
+        self.inline_helpers = inline_helpers
+        self.runtime_module = runtime_module
+        self.replay_mode = replay_mode
+        self.max_wait_seconds = max_wait_seconds
+        self._page_wait = "wait_for_page_ready" if replay_mode == "fast" else "wait_for_page_stable"
+        self._click = "click_and_wait_for_navigation" if replay_mode == "fast" else "click_and_handle_navigation"
         self._imports_helpers_added = False
 
         # Simplified action handlers for processed actions
@@ -91,109 +119,38 @@ class ProcessedScriptGenerator:
 
     def _get_imports_and_helpers(self) -> list[str]:
         """Generates necessary import statements and helper functions."""
-        return [
+        lines = [
             "import asyncio",
             "import json",
             "import os",
             "import sys",
             "import re",
-            "from playwright.async_api import async_playwright, Page, BrowserContext",
-            "",
-            "def get_locator_from_selector(page: Page, selector: str):",
-            '    """Gets a Playwright locator based on a selector string."""',
-            '    if selector.startswith("role="):',
-            '        if "[name=" in selector:',
-            '            role_part = selector.split("[")[0].replace("role=", "")',
-            "            name_part = selector.split('[name=\"')[1].split('\"]')[0]",
-            "            return page.get_by_role(role_part, name=name_part, exact=True).first",
-            "        else:",
-            '            role_part = selector.replace("role=", "")',
-            "            return page.get_by_role(role_part, exact=True).first",
-            '    elif selector.startswith("[data-testid="):',
-            "        test_id = selector.split('=\"')[1].split('\"]')[0]",
-            "        return page.get_by_test_id(test_id).first",
-            '    elif selector.startswith("placeholder="):',
-            "        placeholder = selector.split('=\"')[1].split('\"]')[0]",
-            "        return page.get_by_placeholder(placeholder, exact=True).first",
-            '    elif selector.startswith("text="):',
-            '        match = re.search(r\'text="([^"]*)"\', selector)',
-            "        text_content = match.group(1) if match else None",
-            "        return page.get_by_text(text_content, exact=True).first",
-            '    elif selector.startswith("label="):',
-            "        label = selector.split('=\"')[1].split('\"]')[0]",
-            "        return page.get_by_label(label, exact=True).first",
-            "    else:",
-            "        return page.locator(selector).first",
-            "",
-            "async def wait_for_page_stable(page: Page, timeout: int = 3000):",
-            '    """Wait for the page to be stable and ready for interaction."""',
-            "    try:",
-            "        # Wait for the DOM to be loaded",
-            '        await page.wait_for_load_state("domcontentloaded", timeout=timeout)',
-            "        await asyncio.sleep(1)",
-            "    except Exception:",
-            "        pass",
-            "",
-            "async def click_and_handle_navigation(page: Page, context: BrowserContext, locator):",
-            '    """Click an element and handle potential navigation or new tab/window."""',
-            "    current_url = page.url",
-            "    current_page_count = len(context.pages)",
-            "    ",
-            "    # Perform the click",
-            "    await locator.click()",
-            "    ",
-            "    # Check if a new page/tab was opened",
-            "    if len(context.pages) > current_page_count:",
-            "        # New tab/window opened, switch to it",
-            "        new_page = context.pages[-1]",
-            "        await new_page.wait_for_load_state('domcontentloaded')",
-            '        print(f"  New tab/window opened, switched to: {new_page.url}")',
-            "        return new_page",
-            "    elif page.url != current_url:",
-            "        # Same tab navigation occurred",
-            "        await page.wait_for_load_state('domcontentloaded')",
-            '        print(f"  Navigated to: {page.url}")',
-            "    ",
-            "    return page",
-            "",
-            "async def scroll_to_text(page: Page, text: str):",
-            '    """Scroll to an element containing the specified text."""',
-            "    try:",
-            "        # Try to find element with exact text match",
-            "        element = page.get_by_text(text, exact=False).first",
-            "        await element.scroll_into_view_if_needed(timeout=1000)",
-            '        print(f"  Successfully scrolled to text: {text}")',
-            "    except Exception:",
-            "        # If exact text not found, try with XPath",
-            "        try:",
-            "            # Escape quotes in text for XPath",
-            "            escaped_text = text.replace(\"'\", \"\\\\'\").replace('\"', '\\\\\"')",
-            "            element = page.locator(f\"//*[contains(text(), '{escaped_text}')]\").first",
-            "            await element.scroll_into_view_if_needed(timeout=1000)",
-            '            print(f"  Successfully scrolled to text (XPath match): {text}")',
-            "        except Exception:",
-            "            # As fallback, scroll through the page looking for the text",
-            '            print(f"  Could not find element with text, scrolling through page...")',
-            "            for i in range(10):  # Max 10 scroll attempts",
-            "                # Check if text is visible on current viewport",
-            "                is_visible = await page.evaluate('''(text) => {",
-            "                    const elements = Array.from(document.querySelectorAll('*'));",
-            "                    return elements.some(el => {",
-            "                        const rect = el.getBoundingClientRect();",
-            "                        return el.textContent && el.textContent.includes(text) && ",
-            "                               rect.top >= 0 && rect.bottom <= window.innerHeight;",
-            "                    });",
-            "                }''', text)",
-            "                ",
-            "                if is_visible:",
-            '                    print(f"  Text found in viewport after {i} scrolls")',
-            "                    break",
-            "                ",
-            "                # Scroll down by one viewport height",
-            "                await page.evaluate('window.scrollBy(0, window.innerHeight)')",
-            "                await asyncio.sleep(0.5)",
+            "from playwright.async_api import async_playwright, expect, Page, BrowserContext",
             "",
         ]
+        if not self.inline_helpers:
+            lines.extend(
+                [
+                    f"from {self.runtime_module} import (",
+                    "    check_runtime_version,",
+                    f"    {self._click},",
+                    *(["    fill_and_confirm,"] if self.replay_mode == "fast" else []),
+                    "    get_locator_from_selector,",
+                    "    scroll_to_text,",
+                    f"    {self._page_wait},",
+                    ")",
+                    "",
+                    f"check_runtime_version({json.dumps(RUNTIME_VERSION)})",
+                    "",
+                ]
+            )
+            return lines
+
+        lines.append("# --- Helper Functions (from automate/runtime.py) ---")
+        lines.append(RUNTIME_SOURCE_PATH.read_text(encoding="utf-8"))
+        lines.append("# --- End Helper Functions ---")
+        lines.append("")
+        return lines
 
     def _get_sensitive_data_definitions(self) -> list[str]:
         """Generates the SENSITIVE_DATA dictionary definition."""
@@ -228,12 +185,21 @@ class ProcessedScriptGenerator:
             return [
                 f'            print(f"Navigating to: {url} ({step_info_str})")',
                 f"            await page.goto({escaped_url}, timeout={goto_timeout})",
-                f"            await wait_for_page_stable(page)",
+                f"            await {self._page_wait}(page)",
             ]
         return [f"            # Skipping go_to_url ({step_info_str}): missing url"]
 
     def _map_wait(self, action: dict, step_info_str: str) -> list[str]:
         seconds = action.get("seconds", 3)
+        if self.max_wait_seconds is not None:
+            if seconds > self.max_wait_seconds:
+                seconds = self.max_wait_seconds
+                if seconds <= 0:
+                    return [f"            # Dropped literal wait ({step_info_str}): max_wait_seconds is {seconds}"]
+        elif self.replay_mode == "fast":
+            return [f"            # Dropped literal wait ({step_info_str}): fast replay relies on event-driven waits"]
+        if seconds <= 0:
+            return [f"            # Skipping wait ({step_info_str}): no duration"]
         return [
             f'            print(f"Waiting for {seconds} seconds... ({step_info_str})")',
             f"            await asyncio.sleep({seconds})",
@@ -247,8 +213,12 @@ class ProcessedScriptGenerator:
             return [
                 f'            print(f"Inputting text into element: {selector.replace("\"", "'").replace("\n", "")} ({step_info_str.replace("\"", "'").replace("\n", "")})")',
                 f"            locator = get_locator_from_selector(page, {json.dumps(selector)})",
-                f"            await locator.fill({clean_text})",
-                f"            await wait_for_page_stable(page)",
+                (
+                    f"            await fill_and_confirm(locator, {clean_text})"
+                    if self.replay_mode == "fast"
+                    else f"            await locator.fill({clean_text})"
+                ),
+                f"            await {self._page_wait}(page)",
             ]
         return [
             f"            # Skipping input_text ({step_info_str}): missing selector"
@@ -260,8 +230,8 @@ class ProcessedScriptGenerator:
             return [
                 f'            print(f"Clicking element: {selector.replace("\"", "'").replace("\n"," ")} ({step_info_str.replace("\"", "'")})")',
                 f"            locator = get_locator_from_selector(page, {json.dumps(selector)})",
-                "            page = await click_and_handle_navigation(page, context, locator)",
-                f"            await wait_for_page_stable(page)",
+                f"            page = await {self._click}(page, context, locator)",
+                f"            await {self._page_wait}(page)",
             ]
         return [
             f"            # Skipping click_element ({step_info_str}): missing selector"
@@ -271,14 +241,14 @@ class ProcessedScriptGenerator:
         return [
             f'            print(f"Scrolling down ({step_info_str})")',
             "            await page.evaluate('window.scrollBy(0, window.innerHeight)')",
-            f"            await wait_for_page_stable(page)",
+            f"            await {self._page_wait}(page)",
         ]
 
     def _map_scroll_up(self, action: dict, step_info_str: str) -> list[str]:
         return [
             f'            print(f"Scrolling up ({step_info_str})")',
             "            await page.evaluate('window.scrollBy(0, -window.innerHeight)')",
-            f"            await wait_for_page_stable(page)",
+            f"            await {self._page_wait}(page)",
         ]
 
     def _map_scroll_to_text(self, action: dict, step_info_str: str) -> list[str]:
@@ -288,7 +258,7 @@ class ProcessedScriptGenerator:
             return [
                 f'            print(f"Scrolling to text: {text} ({step_info_str})")',
                 f"            await scroll_to_text(page, {escaped_text})",
-                f"            await wait_for_page_stable(page)",
+                f"            await {self._page_wait}(page)",
             ]
         return [
             f"            # Skipping scroll_to_text ({step_info_str}): missing text"
@@ -303,13 +273,13 @@ class ProcessedScriptGenerator:
                 return [
                     f'            print(f"Sending key: {keys} ({step_info_str})")',
                     f"            await page.keyboard.press({json.dumps(keys)})",
-                    f"            await wait_for_page_stable(page)",
+                    f"            await {self._page_wait}(page)",
                 ]
             else:
                 return [
                     f'            print(f"Typing text: {keys} ({step_info_str})")',
                     f"            await page.keyboard.type({json.dumps(keys)})",
-                    f"            await wait_for_page_stable(page)",
+                    f"            await {self._page_wait}(page)",
                 ]
         return [f"            # Skipping send_keys ({step_info_str}): missing keys"]
 
@@ -321,7 +291,7 @@ class ProcessedScriptGenerator:
                 f'            print(f"Selecting option \'{text}\' in dropdown: {selector.replace("\"", "\'").replace("\\n", "")} ({step_info_str.replace("\"", "\'").replace("\\n", "")})")',
                 f"            locator = get_locator_from_selector(page, {json.dumps(selector)})",
                 f"            await locator.select_option(label={json.dumps(text)})",
-                f"            await wait_for_page_stable(page)",
+                f"            await {self._page_wait}(page)",
             ]
         return [
             f"            # Skipping select_dropdown_option ({step_info_str}): missing selector or text"
@@ -332,7 +302,7 @@ class ProcessedScriptGenerator:
         return [
             f'            print(f"Navigating back ({step_info_str})")',
             f"            await page.go_back(timeout={goto_timeout})",
-            f"            await wait_for_page_stable(page)",
+            f"            await {self._page_wait}(page)",
         ]
 
     def _map_open_tab(self, action: dict, step_info_str: str) -> list[str]:
@@ -343,7 +313,7 @@ class ProcessedScriptGenerator:
                 f'            print(f"Opening new tab: {url} ({step_info_str})")',
                 "            page = await context.new_page()",
                 f"            await page.goto({json.dumps(url)}, timeout={goto_timeout})",
-                f"            await wait_for_page_stable(page)",
+                f"            await {self._page_wait}(page)",
             ]
         return [f"            # Skipping open_tab ({step_info_str}): missing url"]
 
@@ -363,7 +333,7 @@ class ProcessedScriptGenerator:
                 f"            if {page_id} < len(context.pages):",
                 f"                page = context.pages[{page_id}]",
                 "                await page.bring_to_front()",
-                f"                await wait_for_page_stable(page)",
+                f"                await {self._page_wait}(page)",
                 "            else:",
                 f'                print(f"  Warning: Tab index {page_id} not found.")',
             ]
@@ -379,6 +349,24 @@ class ProcessedScriptGenerator:
             f'            print(f"Final Message: {{ {final_message} }}")',
         ]
 
+    def generate_step_lines(self) -> list[str]:
+        """Generates the statements for every action, indented for the script body."""
+        step_lines = []
+        for index, action in enumerate(self.action_list):
+            step_lines.append(f"\n            # --- Step {index + 1} ---")
+            action_type = action.get("action")
+            handler = self._action_handlers.get(action_type)
+
+            if handler:
+                step_info_str = f"Step {index + 1}, Action: {action_type}"
+                action_lines = handler(action, step_info_str)
+                step_lines.extend(action_lines)
+                if action_type == "done":
+                    break  # Stop after 'done' action
+            else:
+                step_lines.append(f"            # Unsupported action: {action_type}")
+        return step_lines
+
     def generate_script_content(self) -> str:
         """Generates the full Playwright script content as a string."""
         script_lines = []
@@ -416,23 +404,12 @@ class ProcessedScriptGenerator:
             ]
         )
 
-        for index, action in enumerate(self.action_list):
-            script_lines.append(f"\n            # --- Step {index + 1} ---")
-            action_type = action.get("action")
-            handler = self._action_handlers.get(action_type)
-
-            if handler:
-                step_info_str = f"Step {index + 1}, Action: {action_type}"
-                action_lines = handler(action, step_info_str)
-                script_lines.extend(action_lines)
-                if action_type == "done":
-                    break  # Stop after 'done' action
-            else:
-                script_lines.append(f"            # Unsupported action: {action_type}")
+        script_lines.extend(self.generate_step_lines())
 
         # Wait for 5 seconds after the last action
         script_lines.append(f"\n            print('End of script execution')\n")
-        script_lines.append(f"            await asyncio.sleep(3)")
+        if self.replay_mode == "faithful":
+            script_lines.append(f"            await asyncio.sleep(3)")
 
         script_lines.extend(
             [
@@ -4,6 +4,7 @@ import os
 from playwright.async_api import async_playwright
 from automate.parser import process_file
 from automate.refiner import process_action_list
+from automate.optimizer import optimize_action_list
 from automate.utils.generator import ProcessedScriptGenerator
 
 AGENT_HISTORY_PATH =  "test-scripts/agent_history.json"
@@ -41,8 +42,16 @@ async def main():
             json.dump(refined_agent_list, f, indent=4)
         print(f"Refined agent history saved to: test-scripts/refined_agent_list.json")
 
+        # Drop redundant actions before generation
+        optimized_agent_list, optimization_report = optimize_action_list(refined_agent_list)
+        print(
+            f"Optimizer removed {optimization_report['removed_actions']} of "
+            f"{optimization_report['original_actions']} actions "
+            f"(~{optimization_report['saved_seconds']:.1f}s saved per run)"
+        )
+
         # Generate the script
-        playwright_processed_script_generator = ProcessedScriptGenerator(refined_agent_list)
+        playwright_processed_script_generator = ProcessedScriptGenerator(optimized_agent_list)
         playwright_script_content = playwright_processed_script_generator.generate_script_content()
 
         # Save the script
@@ -0,0 +1,48 @@
+import json
+import sys
+
+import pytest
+
+sys.path.append(".")
+
+if sys.version_info < (3, 12):
+    # automate/utils/generator.py nests quotes inside f-strings (PEP 701)
+    pytest.skip("the script generator needs Python 3.12+", allow_module_level=True)
+
+from automate.bulk import MANIFEST_FILENAME, bulk_generate, output_path_for
+
+
+def _write_case(root, case, url):
+    path = root / "site" / case / "refined_agent_list.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps([{"action": "go_to_url", "url": url}]), encoding="utf-8")
+    return path
+
+
+def test_bulk_generate_skips_unchanged_inputs(tmp_path):
+    runs, output = tmp_path / "runs", tmp_path / "out"
+    inputs = [_write_case(runs, "login", "https://example.com"), _write_case(runs, "search", "https://example.org")]
+
+    def generate(**kwargs):
+        return bulk_generate(inputs, runs, output, workers=1, **kwargs)
+
+    report = generate()
+    assert (report["total"], report["generated"], report["skipped"], report["failed"]) == (2, 2, 0, {})
+    login_script = output_path_for(inputs[0], runs, output)
+    assert login_script == output / "site" / "login.py"
+    assert "https://example.com" in login_script.read_text(encoding="utf-8")
+    manifest = json.loads((output / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    assert sorted(manifest) == sorted(str(path) for path in inputs)
+
+    report = generate()
+    assert (report["generated"], report["skipped"]) == (0, 2)
+
+    _write_case(runs, "search", "https://example.net")
+    report = generate()
+    assert (report["generated"], report["skipped"]) == (1, 1)
+
+    # Generator options are part of the hash
+    assert generate(generator_options={"replay_mode": "fast"})["generated"] == 2
+    login_script.unlink()
+    assert generate(generator_options={"replay_mode": "fast"})["generated"] == 1
+    assert generate(force=True)["generated"] == 2
@@ -0,0 +1,117 @@
+import sys
+
+sys.path.append(".")
+
+from automate.optimizer import (
+    STEP_SETTLE_SECONDS,
+    CancelOpposingScrolls,
+    DropRedundantNavigation,
+    DropScrollBeforeClick,
+    MergeWaits,
+    optimize_action_list,
+)
+
+STATE_CHANGING = {"click_element", "click_element_by_index", "input_text", "go_to_url", "open_tab", "send_keys"}
+
+
+def _types(actions):
+    return [action["action"] for action in actions]
+
+
+def test_cancel_opposing_scrolls_removes_adjacent_pairs_only():
+    actions = [
+        {"action": "scroll_down"},
+        {"action": "scroll_up"},
+        {"action": "scroll_up"},
+        {"action": "click_element", "selector": 'text="Next"'},
+        {"action": "scroll_down"},
+    ]
+
+    kept, saved = CancelOpposingScrolls().apply(actions)
+
+    assert _types(kept) == ["scroll_up", "click_element", "scroll_down"]
+    assert saved == 2 * STEP_SETTLE_SECONDS
+
+
+def test_drop_redundant_navigation_only_while_the_url_is_known():
+    actions = [
+        {"action": "go_to_url", "url": "https://example.com"},
+        {"action": "scroll_down"},
+        {"action": "go_to_url", "url": "https://example.com"},
+        {"action": "click_element", "selector": 'text="Login"'},
+        # The click may have navigated, so this one is kept
+        {"action": "go_to_url", "url": "https://example.com"},
+    ]
+
+    kept, saved = DropRedundantNavigation().apply(actions)
+
+    assert kept == [actions[0], actions[1], actions[3], actions[4]]
+    assert saved == STEP_SETTLE_SECONDS
+
+
+def test_drop_scroll_before_click_needs_the_clicked_text():
+    actions = [
+        {"action": "scroll_to_text", "text": "Checkout"},
+        {"action": "wait", "seconds": 1},
+        {"action": "click_element", "selector": 'role=button[name="Checkout"]'},
+        {"action": "scroll_to_text", "text": "Footer"},
+        {"action": "click_element", "selector": 'role=link[name="Privacy"]'},
+    ]
+
+    kept, saved = DropScrollBeforeClick().apply(actions)
+
+    assert kept == actions[1:]
+    assert saved == STEP_SETTLE_SECONDS
+
+
+def test_merge_waits_sums_durations_and_drops_no_ops_between_them():
+    no_op = {"action": "click_element"}  # no selector: the generator would only emit a comment
+    trailing_no_op = {"action": "input_text", "text": "x"}
+    actions = [
+        {"action": "wait", "seconds": 2},
+        no_op,
+        {"action": "wait"},
+        trailing_no_op,
+        {"action": "input_text", "selector": "#q", "text": "shoes"},
+        {"action": "wait", "seconds": 1},
+    ]
+
+    kept, saved = MergeWaits().apply(actions)
+
+    assert kept == [
+        {"action": "wait", "seconds": 5},
+        trailing_no_op,
+        {"action": "input_text", "selector": "#q", "text": "shoes"},
+        {"action": "wait", "seconds": 1},
+    ]
+    assert no_op not in kept
+    assert saved == 0.0
+
+
+def test_state_changing_actions_keep_their_relative_order():
+    actions = [
+        {"action": "go_to_url", "url": "https://shop.example"},
+        {"action": "scroll_down"},
+        {"action": "scroll_up"},
+        {"action": "go_to_url", "url": "https://shop.example"},
+        {"action": "scroll_to_text", "text": "Search"},
+        {"action": "click_element", "selector": 'role=button[name="Search"]'},
+        {"action": "wait", "seconds": 1},
+        {"action": "wait", "seconds": 1},
+        {"action": "input_text", "selector": "#q", "text": "shoes"},
+        {"action": "send_keys", "keys": "Enter"},
+        {"action": "open_tab", "url": "https://shop.example/cart"},
+        {"action": "go_to_url", "url": "https://shop.example/cart"},
+        {"action": "click_element_by_index", "selector": 'text="Pay"'},
+    ]
+
+    optimized, report = optimize_action_list(actions)
+
+    state_changing = [action for action in actions if action["action"] in STATE_CHANGING]
+    kept_state_changing = [action for action in optimized if action["action"] in STATE_CHANGING]
+    # Only the two go_to_url calls to the page already open are dropped
+    assert kept_state_changing == [action for index, action in enumerate(state_changing) if index not in (1, 6)]
+    assert report["removed_actions"] == len(actions) - len(optimized) == 6
+    assert report["saved_seconds"] == 5 * STEP_SETTLE_SECONDS
+    # The input list is left untouched
+    assert actions[6] == {"action": "wait", "seconds": 1}
@@ -0,0 +1,32 @@
+import sys
+
+import pytest
+
+sys.path.append(".")
+
+if sys.version_info < (3, 12):
+    # automate/utils/generator.py nests quotes inside f-strings (PEP 701)
+    pytest.skip("the script generator needs Python 3.12+", allow_module_level=True)
+
+from automate.pytest_suite import PytestSuiteGenerator, write_suite
+
+
+def test_write_suite_generates_one_test_per_case(tmp_path):
+    cases = [
+        {"name": "Open home", "category": "Navigation", "action_list": [{"action": "go_to_url", "url": "https://example.com"}]},
+        {"name": "Open home!", "category": None, "action_list": [{"action": "scroll_down"}]},
+    ]
+
+    written = write_suite([PytestSuiteGenerator("Example Site", cases)], tmp_path)
+
+    assert [path.name for path in written] == ["test_example_site.py", "conftest.py", "suite_runtime.py"]
+    module = written[0].read_text(encoding="utf-8")
+    compile(module, str(written[0]), "exec")
+    # Colliding test names get a suffix instead of shadowing each other
+    assert "async def test_open_home(context, page):" in module
+    assert "async def test_open_home_2(context, page):" in module
+    assert "@pytest.mark.category_uncategorized" in module
+    assert "from suite_runtime import (" in module
+    conftest = written[1].read_text(encoding="utf-8")
+    compile(conftest, str(written[1]), "exec")
+    assert '"site_example_site"' in conftest and '"category_navigation"' in conftest
@@ -0,0 +1,104 @@
+import asyncio
+import sys
+import time
+
+sys.path.append(".")
+
+from automate.runtime import PLAIN_TEXT_FIELD_JS, click_and_wait_for_navigation, fill_and_confirm
+
+
+class FakeRequest:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def is_navigation_request(self):
+        return True
+
+
+class FakePage:
+    def __init__(self):
+        self.main_frame = object()
+        self.url = "https://example.com/"
+        self.listeners = {}
+        self.load_states = []
+
+    def on(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def remove_listener(self, event, callback):
+        self.listeners[event].remove(callback)
+
+    def emit(self, event, *args):
+        for callback in list(self.listeners.get(event, [])):
+            callback(*args)
+
+    async def wait_for_load_state(self, state, timeout=None):
+        self.load_states.append(state)
+
+
+class FakeContext:
+    def __init__(self, page):
+        self.pages = [page]
+
+
+class ClickLocator:
+    def __init__(self, on_click=None):
+        self.on_click = on_click
+
+    async def click(self):
+        if self.on_click:
+            self.on_click()
+
+
+def test_click_without_navigation_returns_after_the_start_window():
+    page = FakePage()
+
+    async def scenario():
+        started = time.monotonic()
+        result = await click_and_wait_for_navigation(page, FakeContext(page), ClickLocator(), start_timeout=50)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert result is page
+    assert elapsed < 1
+    assert page.load_states == []
+    assert page.listeners == {"request": [], "framenavigated": []}
+
+
+def test_click_waits_for_a_navigation_that_commits_after_the_click():
+    page = FakePage()
+
+    def start_navigation():
+        # The document request starts during the click; the commit arrives later
+        page.emit("request", FakeRequest(page.main_frame))
+        asyncio.get_running_loop().call_later(0.1, page.emit, "framenavigated", page.main_frame)
+
+    async def scenario():
+        return await click_and_wait_for_navigation(
+            page, FakeContext(page), ClickLocator(start_navigation), start_timeout=50
+        )
+
+    assert asyncio.run(scenario()) is page
+    assert page.load_states == ["domcontentloaded"]
+
+
+def test_fill_and_confirm_skips_the_value_check_for_fields_that_reformat_input():
+    class FieldLocator:
+        def __init__(self):
+            self.filled = None
+            self.evaluated = None
+
+        async def fill(self, text):
+            self.filled = text
+
+        async def evaluate(self, expression):
+            self.evaluated = expression
+            # e.g. a contenteditable div or an <input data-mask="...">
+            return False
+
+    locator = FieldLocator()
+    asyncio.run(fill_and_confirm(locator, "4111 1111"))
+
+    assert locator.filled == "4111 1111"
+    assert locator.evaluated == PLAIN_TEXT_FIELD_JS